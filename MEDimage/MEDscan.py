@@ -304,6 +304,7 @@ class MEDscan(object):
             # initialize radiomics structure
             self.radiomics.image = {}
             self.radiomics.params = im_param_scan
+            self.radiomics.fingerprints = {}
             self.params.radiomics.scale_name = ''
             self.params.radiomics.ih_name = ''
             self.params.radiomics.ivh_name = ''
@@ -584,6 +585,54 @@ class MEDscan(object):
         if ngldm_features:
             self.radiomics.image['texture']['ngldm_3D'][self.params.radiomics.processing_name] = ngldm_features
 
+    def get_radiomics_paths(self) -> Dict[str, List[str]]:
+        """Gets the keys under which :func:`update_radiomics` saves each feature family with the current
+        scale, discretisation and texture names.
+
+        Returns:
+            Dict[str, List[str]]: Keys of each family in the radiomics structure, keyed by argument of
+            :func:`update_radiomics`.
+        """
+        paths = {
+            'int_vol_hist_features': ['intVolHist_3D', self.params.radiomics.ivh_name],
+            'morph_features': ['morph_3D', self.params.radiomics.scale_name],
+            'loc_int_features': ['locInt_3D', self.params.radiomics.scale_name],
+            'stats_features': ['stats_3D', self.params.radiomics.scale_name],
+            'int_hist_features': ['intHist_3D', self.params.radiomics.ih_name]
+        }
+        if self.params.radiomics.name_text_types:
+            texture_features = [
+                'glcm_features',
+                'glrlm_features',
+                'glszm_features',
+                'gldzm_features',
+                'ngtdm_features',
+                'ngldm_features'
+            ]
+            for name, text_type in zip(texture_features, self.params.radiomics.name_text_types):
+                paths[name] = ['texture', text_type, self.params.radiomics.processing_name]
+
+        return paths
+
+    def update_fingerprints(self, fingerprints: Dict[str, str]) -> None:
+        """Records the fingerprints (see :func:`MEDimage.utils.get_fingerprint`) of the features saved by
+        :func:`update_radiomics`, so that a later extraction can reuse the features whose parameters did
+        not change.
+
+        Args:
+            fingerprints(Dict[str, str]): Fingerprint of each feature family, keyed by argument of
+                :func:`update_radiomics`.
+
+        Returns:
+            None.
+        """
+        paths = self.get_radiomics_paths()
+        for name, fingerprint in fingerprints.items():
+            entry = self.radiomics.fingerprints
+            for key in paths[name][:-1]:
+                entry = entry.setdefault(key, {})
+            entry[paths[name][-1]] = fingerprint
+
     def save_radiomics(
                     self, scan_file_name: List, 
                     path_save: Path, roi_type: str, 
@@ -633,8 +682,11 @@ class MEDscan(object):
         else:
             raise ValueError("`patient_num` must be specified or `scan_file_name` must be str")
 
-        with open(path_save / f"{name_save}.json", "w") as fp:   
+        # Written under a temporary name then renamed, so that a saved file is always complete
+        path_tmp = path_save / f"{name_save}.json.{os.getpid()}.tmp"
+        with open(path_tmp, "w") as fp:   
             dump(self.radiomics.to_json(), fp, indent=4, cls=NumpyEncoder)
+        os.replace(path_tmp, path_save / f"{name_save}.json")
 
 
     class Params:
@@ -1105,17 +1157,20 @@ class MEDscan(object):
     class Radiomics:
         """Organizes all the extracted features.
         """
-        def __init__(self, image: Dict = None, params: Dict = None) -> None:
+        def __init__(self, image: Dict = None, params: Dict = None, fingerprints: Dict = None) -> None:
             """Constructor of the Radiomics class
             Args:
                 image(Dict): Dict of the extracted features.
                 params(Dict): Dict of the parameters used in features extraction (roi type, voxels diemension...)
+                fingerprints(Dict): Dict of the fingerprints of the parameters of each extracted feature family,
+                    with the same structure as `image`.
             
             Returns:
                 None
             """
             self.image = image if image else {}
             self.params = params if params else {}
+            self.fingerprints = fingerprints if fingerprints else {}
 
         def update_params(self, params: Dict) -> None:
             """Updates `params` attribute from a given Dict
@@ -1139,7 +1194,8 @@ class MEDscan(object):
             """
             radiomics = {
                 'image': self.image,
-                'params': self.params
+                'params': self.params,
+                'fingerprints': getattr(self, 'fingerprints', {})
             }
             return radiomics
 
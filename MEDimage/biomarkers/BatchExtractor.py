@@ -1,139 +1,78 @@
 import logging
 import math
 import os
-import pickle
 import sys
 from copy import deepcopy
 from datetime import datetime
 from itertools import product
 from pathlib import Path
+from concurrent.futures import FIRST_COMPLETED, wait
 from time import time
-from typing import Dict, List, Union
+from typing import Dict, List, Tuple, Union
 
 import numpy as np
 import pandas as pd
-import ray
-from tqdm import trange
+from tqdm import tqdm
 
 import MEDimage
 
+from ..MEDscan import MEDscan
+from ..utils.image_volume_obj import image_volume_obj
+from ..utils.profiler import TOTAL_STAGE, StageProfiler
+from ..utils.volume_cache import VolumeCache
 
-class BatchExtractor(object):
-    """
-    Organizes all the patients/scans in batches to extract all the radiomic features
-    """
+# Keys of the extraction parameters of each scan modality
+IM_PARAMS_KEYS = {'CTscan': 'imParamCT', 'MRscan': 'imParamMR', 'PTscan': 'imParamPET'}
 
-    def __init__(
-            self, 
-            path_read: Union[str, Path],
-            path_csv: Union[str, Path],
-            path_params: Union[str, Path],
-            path_save: Union[str, Path],
-            n_batch: int = 4,
-            skip_existing: bool = False
-    ) -> None:
-        """
-        constructor of the BatchExtractor class 
-        """
-        self._path_csv = Path(path_csv)
-        self._path_params = Path(path_params)
-        self._path_read = Path(path_read)
-        self._path_save = Path(path_save)
-        self.roi_types = []
-        self.roi_type_labels = []
-        self.n_bacth = n_batch
-        self.skip_existing = skip_existing
+# Processing parameters of the interpolation and re-segmentation, used in the volume cache keys
+CACHED_PROCESS_PARAMS = ['vol_interp', 'gl_round', 'roi_interp', 'roi_pv', 'box_string', 'im_range', 'outliers']
 
-    def __load_and_process_params(self) -> Dict:
-        """Load and process the computing & batch parameters from JSON file"""
-        # Load json parameters
-        im_params = MEDimage.utils.json_utils.load_json(self._path_params)
-        
-        # Update class attributes
-        self.roi_types.extend(im_params['roi_types'])
-        self.roi_type_labels.extend(im_params['roi_type_labels'])
-        self.n_bacth = im_params['n_batch'] if 'n_batch' in im_params else self.n_bacth
 
-        return im_params
-
-    @ray.remote
-    def __compute_radiomics_one_patient(
-            self,
-            name_patient: str,
-            roi_name: str,
-            im_params: Dict,
-            roi_type: str,
-            roi_type_label: str,
-            log_file: Union[Path, str]
-        ) -> str:
-        """
-        Computes all radiomics features (Texture & Non-texture) for one patient/scan
-
-        Args:
-            name_patient(str): scan or patient full name. It has to respect the MEDimage naming convention:
-                PatientID__ImagingScanName.ImagingModality.npy
-            roi_name(str): name of the ROI that will  be used in computation.
-            im_params(Dict): Dict of parameters/settings that will be used in the processing and computation.
-            roi_type(str): Type of ROI used in the processing and computation (for identification purposes)
-            roi_type_label(str): Label of the ROI used, to make it identifiable from other ROIs.
-            log_file(Union[Path, str]): Path to the logging file.
-
-        Returns:
-            Union[Path, str]: Path to the updated logging file.
-        """
-        # Setting up logging settings
-        logging.basicConfig(filename=log_file, level=logging.DEBUG, force=True)
-
-        # Check if features are already computed for the current scan
-        if self.skip_existing:
-            modality = name_patient.split('.')[1]
-            name_save = name_patient.split('.')[0] + f'({roi_type_label})' + f'.{modality}.json'
-            if Path(self._path_save / f'features({roi_type})' / name_save).exists():
-                logging.info("Skipping existing features for scan: {name_patient}")
-                return log_file
-
-        # start timer
-        t_start = time()
-
-        # Initialization
-        message = f"\n***************** COMPUTING FEATURES: {name_patient} *****************"
-        logging.info(message)
-
-        # Load MEDscan instance
-        try:
-            with open(self._path_read / name_patient, 'rb') as f: medscan = pickle.load(f)
-            medscan = MEDimage.MEDscan(medscan)
-        except Exception as e:
-            print(f"\n ERROR LOADING PATIENT {name_patient}:\n {e}")
-            return None
-
-        # Init processing & computation parameters
-        medscan.init_params(im_params)
-        logging.debug('Parameters parsed, json file is valid.')
-
-        # Get ROI (region of interest)
-        logging.info("\n--> Extraction of ROI mask:")
-        try:
-            vol_obj_init, roi_obj_init = MEDimage.processing.get_roi_from_indexes(
-                medscan,
-                name_roi=roi_name,
-                box_string=medscan.params.process.box_string
-            )
-        except:
-            # if for the current scan ROI is not found, computation is aborted. 
-            return log_file
-
-        start = time()
-        message = '--> Non-texture features pre-processing (interp + re-seg) for "Scale={}"'.\
-            format(str(medscan.params.process.scale_non_text[0]))
-        logging.info(message)
-
-        # Interpolation
+def interp_and_re_seg(
+        medscan: MEDscan,
+        vol_obj_init: image_volume_obj,
+        roi_obj_init: image_volume_obj,
+        vox_dim: List,
+        volume_cache: VolumeCache = None,
+        path_scan: Path = None,
+        roi_name: str = None,
+        profiler: StageProfiler = None
+    ) -> Tuple[image_volume_obj, image_volume_obj, image_volume_obj]:
+    """
+    Interpolates the imaging volume and the ROI mask of a scan, then re-segments the intensity mask.
+    If a volume cache is given, the volumes are read from the cache when they were already computed.
+
+    Args:
+        medscan(MEDscan): MEDscan instance with the processing parameters.
+        vol_obj_init(image_volume_obj): Imaging volume of the ROI box.
+        roi_obj_init(image_volume_obj): ROI mask of the ROI box.
+        vox_dim(List): Voxel dimension of the interpolation.
+        volume_cache(VolumeCache, optional): Cache of the processed volumes.
+        path_scan(Path, optional): Path of the saved MEDscan, used in the cache key.
+        roi_name(str, optional): Name of the ROI, used in the cache key.
+        profiler(StageProfiler, optional): Profiler of the interpolation and re-segmentation stages.
+
+    Returns:
+        Tuple[image_volume_obj, image_volume_obj, image_volume_obj]: Interpolated imaging volume,
+        morphological mask and intensity mask.
+    """
+    profiler = profiler or StageProfiler()
+    if volume_cache is not None:
+        process_params = {name: getattr(medscan.params.process, name) for name in CACHED_PROCESS_PARAMS}
+        key = volume_cache.get_key(path_scan, roi_name, vox_dim, process_params)
+        with profiler.span('cache_read'):
+            volumes = volume_cache.get(key)
+        if volumes is not None:
+            logging.info(f"Volumes read from the cache: {key}")
+            return volumes
+
+    # Interpolation
+    with profiler.span('interpolation'):
         # Intensity Mask
         vol_obj = MEDimage.processing.interp_volume(
             medscan=medscan,
             vol_obj_s=vol_obj_init,
-            vox_dim=medscan.params.process.scale_non_text,
+            vox_dim=vox_dim,
             interp_met=medscan.params.process.vol_interp,
             round_val=medscan.params.process.gl_round,
             image_type='image',
@@ -144,7 +83,7 @@ class BatchExtractor(object):
         roi_obj_morph = MEDimage.processing.interp_volume(
             medscan=medscan,
             vol_obj_s=roi_obj_init,
-            vox_dim=medscan.params.process.scale_non_text,
+            vox_dim=vox_dim,
             interp_met=medscan.params.process.roi_interp,
             round_val=medscan.params.process.roi_pv,
             image_type='roi', 
@@ -152,7 +91,8 @@ class BatchExtractor(object):
             box_string=medscan.params.process.box_string
         )
 
-        # Re-segmentation
+    # Re-segmentation
+    with profiler.span('re_segmentation'):
         # Intensity mask range re-segmentation
         roi_obj_int = deepcopy(roi_obj_morph)
         roi_obj_int.data = MEDimage.processing.range_re_seg(
@@ -169,45 +109,343 @@ class BatchExtractor(object):
             ),
             roi_obj_int.data
         ).astype(int)
-        logging.info(f"{time() - start}\n")
-
-        # Reset timer
-        start = time()
 
-        # Preparation of computation :
-        medscan.init_ntf_calculation(vol_obj)
+    if volume_cache is not None:
+        with profiler.span('cache_write'):
+            volume_cache.put(key, vol_obj, roi_obj_morph, roi_obj_int)
+
+    return vol_obj, roi_obj_morph, roi_obj_int
+
+def compute_texture_features(
+        vol: np.ndarray,
+        roi_int: np.ndarray,
+        roi_morph: np.ndarray,
+        algo: str,
+        n_q: float,
+        user_set_min_val: float,
+        extract: Dict,
+        dist_correction: Dict,
+        profiler: StageProfiler = None
+    ) -> Dict:
+    """
+    Computes the texture features of one texture experiment (scale, discretisation algorithm and grey level)
+    of an interpolated and re-segmented volume.
+
+    Args:
+        vol(ndarray): Interpolated (and filtered) imaging volume.
+        roi_int(ndarray): Intensity mask of the ROI.
+        roi_morph(ndarray): Morphological mask of the ROI.
+        algo(str): Discretisation algorithm, 'FBN' or 'FBS'.
+        n_q(float): Number of bins (FBN) or bin width (FBS) of the discretisation.
+        user_set_min_val(float): Minimum value of the FBS discretisation.
+        extract(Dict): Texture families to extract, e.g. ``{'GLCM': True, ...}``.
+        dist_correction(Dict): Distance correction of the GLCM, GLRLM and NGTDM features.
+        profiler(StageProfiler, optional): Profiler of the discretisation and of each texture family.
+
+    Returns:
+        Dict: Features of each texture family, keyed by the arguments of
+        :func:`MEDimage.MEDscan.update_radiomics` (None for the families not extracted).
+    """
+    profiler = profiler or StageProfiler()
+
+    # ROI Extraction :
+    with profiler.span('intensity_mask'):
+        vol_int_re = MEDimage.processing.roi_extract(
+            vol=vol, 
+            roi=roi_int)
+
+    # Discretisation :
+    try:
+        with profiler.span('discretisation'):
+            vol_quant_re, _ = MEDimage.processing.discretize(
+                vol_re=vol_int_re,
+                discr_type=algo, 
+                n_q=n_q, 
+                user_set_min_val=user_set_min_val
+            )
+    except Exception as e:
+        logging.error(f'PROBLEM WITH DISCRETIZATION: {e}')
+        vol_quant_re = None
+
+    # GLCM features extraction
+    try:
+        if extract['GLCM']:
+            with profiler.span('glcm'):
+                glcm = MEDimage.biomarkers.glcm.extract_all(
+                    vol=vol_quant_re, 
+                    dist_correction=dist_correction['GLCM'])
+        else:
+            glcm = None
+    except Exception as e:
+        logging.error(f'PROBLEM WITH COMPUTATION OF GLCM FEATURES {e}')
+        glcm = None
+
+    # GLRLM features extraction
+    try:
+        if extract['GLRLM']:
+            with profiler.span('glrlm'):
+                glrlm = MEDimage.biomarkers.glrlm.extract_all(
+                    vol=vol_quant_re,
+                    dist_correction=dist_correction['GLRLM'])
+        else:
+            glrlm = None
+    except Exception as e:
+        logging.error(f'PROBLEM WITH COMPUTATION OF GLRLM FEATURES {e}')
+        glrlm = None
+
+    # Zones labelling (single pass shared by GLSZM and GLDZM)
+    try:
+        if extract['GLSZM'] or extract['GLDZM']:
+            with profiler.span('zones'):
+                zones = MEDimage.biomarkers.utils.get_zones(
+                    vol=vol_quant_re,
+                    levels=np.arange(1, np.nanmax(vol_quant_re)+1))
+        else:
+            zones = None
+    except Exception as e:
+        logging.error(f'PROBLEM WITH LABELLING OF ZONES {e}')
+        zones = None
+
+    # GLSZM features extraction
+    try:
+        if extract['GLSZM']:
+            with profiler.span('glszm'):
+                glszm = MEDimage.biomarkers.glszm.extract_all(
+                    vol=vol_quant_re,
+                    zones=zones)
+        else:
+            glszm = None
+    except Exception as e:
+        logging.error(f'PROBLEM WITH COMPUTATION OF GLSZM FEATURES {e}')
+        glszm = None
+
+    # GLDZM features extraction
+    try:
+        if extract['GLDZM']:
+            with profiler.span('gldzm'):
+                gldzm = MEDimage.biomarkers.gldzm.extract_all(
+                    vol_int=vol_quant_re, 
+                    mask_morph=roi_morph,
+                    zones=zones)
+        else:
+            gldzm = None
+    except Exception as e:
+        logging.error(f'PROBLEM WITH COMPUTATION OF GLDZM FEATURES {e}')
+        gldzm = None
+
+    # NGTDM features extraction
+    try:
+        if extract['NGTDM']:
+            with profiler.span('ngtdm'):
+                ngtdm = MEDimage.biomarkers.ngtdm.extract_all(
+                    vol=vol_quant_re, 
+                    dist_correction=dist_correction['NGTDM'])
+        else:
+            ngtdm = None
+    except Exception as e:
+        logging.error(f'PROBLEM WITH COMPUTATION OF NGTDM FEATURES {e}')
+        ngtdm = None
+
+    # NGLDM features extraction
+    try:
+        if extract['NGLDM']:
+            with profiler.span('ngldm'):
+                ngldm = MEDimage.biomarkers.ngldm.extract_all(
+                    vol=vol_quant_re)
+        else:
+            ngldm = None
+    except Exception as e:
+        logging.error(f'PROBLEM WITH COMPUTATION OF NGLDM FEATURES {e}')
+        ngldm = None
+
+    return {
+        'glcm_features': glcm,
+        'glrlm_features': glrlm,
+        'glszm_features': glszm,
+        'gldzm_features': gldzm,
+        'ngtdm_features': ngtdm,
+        'ngldm_features': ngldm
+    }
+
+def compute_radiomics_one_patient(
+        path_read: Path,
+        path_save: Path,
+        name_patient: str,
+        roi_name: str,
+        im_params: Dict,
+        roi_type: str,
+        roi_type_label: str,
+        log_file: Union[Path, str],
+        skip_existing: bool = False,
+        texture_backend: str = 'serial',
+        n_texture_workers: int = 1,
+        path_cache: Union[Path, str] = None,
+        cache_max_size: int = None,
+        incremental: bool = False,
+        path_profile: Union[Path, str] = None
+    ) -> str:
+    """
+    Computes all radiomics features (Texture & Non-texture) for one patient/scan
+
+    Args:
+        path_read(Path): Path to the folder of the saved MEDscan instances.
+        path_save(Path): Path to the folder where the features are saved.
+        name_patient(str): scan or patient full name. It has to respect the MEDimage naming convention:
+            PatientID__ImagingScanName.ImagingModality.npy
+        roi_name(str): name of the ROI that will  be used in computation.
+        im_params(Dict): Dict of parameters/settings that will be used in the processing and computation.
+        roi_type(str): Type of ROI used in the processing and computation (for identification purposes)
+        roi_type_label(str): Label of the ROI used, to make it identifiable from other ROIs.
+        log_file(Union[Path, str]): Path to the logging file.
+        skip_existing(bool, optional): True to skip the scan if its features were already computed.
+        texture_backend(str, optional): Execution backend of the texture experiments of the scan, 'serial',
+            'thread' or 'process' (see :func:`MEDimage.utils.get_executor`). Threads share the
+            interpolated volumes, processes receive a copy.
+        n_texture_workers(int, optional): Number of texture experiments computed at the same time.
+        path_cache(Union[Path, str], optional): Path to the cache of the interpolated and re-segmented volumes
+            (see :class:`MEDimage.utils.VolumeCache`). If None, the volumes are not cached.
+        cache_max_size(int, optional): Maximum size of the volume cache in bytes.
+        incremental(bool, optional): True to only compute the features that are missing from the saved features
+            of the scan, or whose parameters changed since they were saved (see
+            :func:`MEDimage.utils.get_non_texture_fingerprints`). The other saved features are kept.
+        path_profile(Union[Path, str], optional): Path to the JSONL file where the wall time, CPU time and peak memory
+            of each stage are appended (see :class:`MEDimage.utils.StageProfiler`). If None, stages are not profiled.
+
+    Returns:
+        Union[Path, str]: Path to the updated logging file.
+
+    Raises:
+        Exception: If the scan cannot be loaded, its ROI cannot be extracted or is empty, or its filtering fails,
+            so that the failure is recorded (see :func:`MEDimage.utils.run_ledger_task`).
+    """
+    # Setting up logging settings
+    logging.basicConfig(filename=log_file, level=logging.DEBUG, force=True)
+
+    # Check if features are already computed for the current scan
+    modality = name_patient.split('.')[1]
+    name_save = name_patient.split('.')[0] + f'({roi_type_label})' + f'.{modality}.json'
+    path_features = Path(path_save / f'features({roi_type})' / name_save)
+    if skip_existing and path_features.exists():
+        logging.info("Skipping existing features for scan: {name_patient}")
+        return log_file
 
-        # Image filtering: linear
-        if medscan.params.filter.filter_type:
-            if medscan.params.filter.filter_type.lower() == 'textural':
-                raise ValueError('For textural filtering, please use the BatchExtractorTexturalFilters class.')
-            try:
+    # start timer
+    t_start = time()
+    profiler = StageProfiler(path_profile, scan=name_patient, roi=roi_name)
+
+    # Initialization
+    message = f"\n***************** COMPUTING FEATURES: {name_patient} *****************"
+    logging.info(message)
+
+    # Load MEDscan instance
+    try:
+        with profiler.span('load'):
+            medscan = MEDimage.utils.load_MEDscan(path_read / name_patient)
+    except Exception as e:
+        print(f"\n ERROR LOADING PATIENT {name_patient}:\n {e}")
+        raise
+
+    # Init processing & computation parameters
+    medscan.init_params(im_params)
+    logging.debug('Parameters parsed, json file is valid.')
+
+    # Cache of the interpolated and re-segmented volumes
+    volume_cache = VolumeCache(path_cache, cache_max_size) if path_cache else None
+
+    # Saved features, reused when their parameters did not change
+    scan_fingerprint = MEDimage.utils.get_scan_fingerprint(path_read / name_patient)
+    saved_radiomics = {}
+    if incremental and path_features.exists():
+        try:
+            saved_radiomics = MEDimage.utils.json_utils.load_json(path_features)
+        except ValueError:
+            logging.warning(f"The saved features {path_features} are corrupted and will be computed again.")
+
+    # Get ROI (region of interest)
+    logging.info("\n--> Extraction of ROI mask:")
+    try:
+        with profiler.span('roi_extraction'):
+            vol_obj_init, roi_obj_init = MEDimage.processing.get_roi_from_indexes(
+                medscan,
+                name_roi=roi_name,
+                box_string=medscan.params.process.box_string
+            )
+    except Exception as e:
+        # if for the current scan ROI is not found, computation is aborted. 
+        logging.error(f'PROBLEM WITH EXTRACTION OF ROI {roi_name}: {e}')
+        raise
+
+    start = time()
+    message = '--> Non-texture features pre-processing (interp + re-seg) for "Scale={}"'.\
+        format(str(medscan.params.process.scale_non_text[0]))
+    logging.info(message)
+
+    vol_obj, roi_obj_morph, roi_obj_int = interp_and_re_seg(
+        medscan,
+        vol_obj_init,
+        roi_obj_init,
+        medscan.params.process.scale_non_text,
+        volume_cache,
+        path_read / name_patient,
+        roi_name,
+        profiler
+    )
+    logging.info(f"{time() - start}\n")
+
+    # Reset timer
+    start = time()
+
+    # Preparation of computation :
+    medscan.init_ntf_calculation(vol_obj)
+
+    # Non-texture features saved with the same parameters are not computed again
+    non_text_fingerprints = MEDimage.utils.get_non_texture_fingerprints(medscan, scan_fingerprint, roi_name)
+    saved_features = MEDimage.utils.get_saved_features(
+        medscan,
+        saved_radiomics,
+        non_text_fingerprints,
+        MEDimage.utils.NON_TEXTURE_FEATURES,
+        any_entry=True
+    )
+    extract = {
+        family: medscan.params.radiomics.extract[family] and name not in saved_features
+        for family, name in MEDimage.utils.NON_TEXTURE_FEATURES.items()
+    }
+
+    # Image filtering: linear
+    if medscan.params.filter.filter_type:
+        if medscan.params.filter.filter_type.lower() == 'textural':
+            raise ValueError('For textural filtering, please use the BatchExtractorTexturalFilters class.')
+        try:
+            with profiler.span('filtering'):
                 vol_obj = MEDimage.filters.apply_filter(medscan, vol_obj)
-            except Exception as e:
-                logging.error(f'PROBLEM WITH LINEAR FILTERING: {e}')
-                return log_file
+        except Exception as e:
+            logging.error(f'PROBLEM WITH LINEAR FILTERING: {e}')
+            raise
 
-        # ROI Extraction :
-        try:
+    # ROI Extraction :
+    try:
+        with profiler.span('intensity_mask'):
             vol_int_re = MEDimage.processing.roi_extract(
                 vol=vol_obj.data, 
                 roi=roi_obj_int.data
             )
-        except Exception as e:
-            print(name_patient, e)
-            return log_file
-
-        # check if ROI is empty
-        if math.isnan(np.nanmax(vol_int_re)) and math.isnan(np.nanmin(vol_int_re)):
-            logging.error(f'PROBLEM WITH INTENSITY MASK. ROI {roi_name} IS EMPTY.')
-            return log_file
-        
-        # Computation of non-texture features
-        logging.info("--> Computation of non-texture features:")
-
-        # Morphological features extraction
-        try:
-            if medscan.params.radiomics.extract['Morph']:
+    except Exception as e:
+        print(name_patient, e)
+        raise
+
+    # check if ROI is empty
+    if math.isnan(np.nanmax(vol_int_re)) and math.isnan(np.nanmin(vol_int_re)):
+        logging.error(f'PROBLEM WITH INTENSITY MASK. ROI {roi_name} IS EMPTY.')
+        raise ValueError(f'The ROI {roi_name} of {name_patient} is empty.')
+
+    # Computation of non-texture features
+    logging.info("--> Computation of non-texture features:")
+
+    # Morphological features extraction
+    try:
+        if extract['Morph']:
+            with profiler.span('morph'):
                 morph = MEDimage.biomarkers.morph.extract_all(
                     vol=vol_obj.data, 
                     mask_int=roi_obj_int.data, 
@@ -215,63 +453,68 @@ class BatchExtractor(object):
                     res=medscan.params.process.scale_non_text,
                     intensity_type=medscan.params.process.intensity_type
                 )
-            else:
-                morph = None
-        except Exception as e:
-            logging.error(f'PROBLEM WITH COMPUTATION OF MORPHOLOGICAL FEATURES {e}')
+        else:
             morph = None
-
-        # Local intensity features extraction
-        try:
-            if medscan.params.radiomics.extract['LocalIntensity']:
+    except Exception as e:
+        logging.error(f'PROBLEM WITH COMPUTATION OF MORPHOLOGICAL FEATURES {e}')
+        morph = None
+
+    # Local intensity features extraction
+    try:
+        if extract['LocalIntensity']:
+            with profiler.span('local_intensity'):
                 local_intensity = MEDimage.biomarkers.local_intensity.extract_all(
                     img_obj=vol_obj.data,
                     roi_obj=roi_obj_int.data,
                     res=medscan.params.process.scale_non_text,
                     intensity_type=medscan.params.process.intensity_type
                 )
-            else:
-                local_intensity = None
-        except Exception as e:
-            logging.error(f'PROBLEM WITH COMPUTATION OF LOCAL INTENSITY FEATURES {e}')
+        else:
             local_intensity = None
-
-        # statistical features extraction
-        try:
-            if medscan.params.radiomics.extract['Stats']:
+    except Exception as e:
+        logging.error(f'PROBLEM WITH COMPUTATION OF LOCAL INTENSITY FEATURES {e}')
+        local_intensity = None
+
+    # statistical features extraction
+    try:
+        if extract['Stats']:
+            with profiler.span('stats'):
                 stats = MEDimage.biomarkers.stats.extract_all(
                     vol=vol_int_re,
                     intensity_type=medscan.params.process.intensity_type
                 )
-            else:
-                stats = None
-        except Exception as e:
-            logging.error(f'PROBLEM WITH COMPUTATION OF STATISTICAL FEATURES {e}')
+        else:
             stats = None
+    except Exception as e:
+        logging.error(f'PROBLEM WITH COMPUTATION OF STATISTICAL FEATURES {e}')
+        stats = None
 
-        # Intensity histogram equalization of the imaging volume
+    # Intensity histogram equalization of the imaging volume
+    with profiler.span('discretisation'):
         vol_quant_re, _ = MEDimage.processing.discretize(
             vol_re=vol_int_re,
             discr_type=medscan.params.process.ih['type'], 
             n_q=medscan.params.process.ih['val'], 
             user_set_min_val=medscan.params.process.user_set_min_value
         )
-        
-        # Intensity histogram features extraction
-        try:
-            if medscan.params.radiomics.extract['IntensityHistogram']:
+
+    # Intensity histogram features extraction
+    try:
+        if extract['IntensityHistogram']:
+            with profiler.span('intensity_histogram'):
                 int_hist = MEDimage.biomarkers.intensity_histogram.extract_all(
                     vol=vol_quant_re
                 )
-            else:
-                int_hist = None
-        except Exception as e:
-            logging.error(f'PROBLEM WITH COMPUTATION OF INTENSITY HISTOGRAM FEATURES {e}')
+        else:
             int_hist = None
-        
-        # Intensity histogram equalization of the imaging volume
-        if medscan.params.process.ivh and 'type' in medscan.params.process.ivh and 'val' in medscan.params.process.ivh:
-            if medscan.params.process.ivh['type'] and medscan.params.process.ivh['val']:
+    except Exception as e:
+        logging.error(f'PROBLEM WITH COMPUTATION OF INTENSITY HISTOGRAM FEATURES {e}')
+        int_hist = None
+
+    # Intensity histogram equalization of the imaging volume
+    if medscan.params.process.ivh and 'type' in medscan.params.process.ivh and 'val' in medscan.params.process.ivh:
+        if medscan.params.process.ivh['type'] and medscan.params.process.ivh['val']:
+            with profiler.span('discretisation'):
                 vol_quant_re, wd = MEDimage.processing.discretize(
                         vol_re=vol_int_re,
                         discr_type=medscan.params.process.ivh['type'], 
@@ -279,301 +522,386 @@ class BatchExtractor(object):
                         user_set_min_val=medscan.params.process.user_set_min_value,
                         ivh=True
                 )
-        else:
-            vol_quant_re = vol_int_re
-            wd = 1
+    else:
+        vol_quant_re = vol_int_re
+        wd = 1
 
-        # Intensity volume histogram features extraction
-        if medscan.params.radiomics.extract['IntensityVolumeHistogram']:
+    # Intensity volume histogram features extraction
+    if extract['IntensityVolumeHistogram']:
+        with profiler.span('intensity_volume_histogram'):
             int_vol_hist = MEDimage.biomarkers.int_vol_hist.extract_all(
                         medscan=medscan,
                         vol=vol_quant_re,
                         vol_int_re=vol_int_re, 
                         wd=wd
             )
-        else:
-            int_vol_hist = None
-
-        # End of Non-Texture features extraction
-        logging.info(f"End of non-texture features extraction: {time() - start}\n")
-
-        # Computation of texture features
-        logging.info("--> Computation of texture features:")
-
-        # Compute radiomics features for each scale text
-        count = 0
+    else:
+        int_vol_hist = None
+
+    non_text_features = {
+        'int_vol_hist_features': int_vol_hist,
+        'morph_features': morph,
+        'loc_int_features': local_intensity,
+        'stats_features': stats,
+        'int_hist_features': int_hist,
+        **saved_features
+    }
+
+    # End of Non-Texture features extraction
+    logging.info(f"End of non-texture features extraction: {time() - start}\n")
+
+    # Computation of texture features
+    logging.info("--> Computation of texture features:")
+
+    # Texture experiments (scale, algo, gl) run as jobs sharing the interpolated volume of their scale.
+    # The volume of the next scale is interpolated while the jobs of the previous ones are running.
+    experiments = []
+    with MEDimage.utils.get_executor(texture_backend, n_texture_workers) as executor:
         for s in range(medscan.params.process.n_scale):
+            # Texture features saved with the same parameters are not computed again
+            scale_experiments = []
+            for a, n in product(range(medscan.params.process.n_algo), range(medscan.params.process.n_gl)):
+                medscan.init_tf_calculation(algo=a, gl=n, scale=s)
+                text_fingerprints = MEDimage.utils.get_texture_fingerprints(
+                    medscan, scan_fingerprint, roi_name, a, n, s
+                )
+                saved_features = MEDimage.utils.get_saved_features(
+                    medscan,
+                    saved_radiomics,
+                    text_fingerprints,
+                    MEDimage.utils.TEXTURE_FEATURES
+                )
+                extract = {
+                    family: medscan.params.radiomics.extract[family] and name not in saved_features
+                    for family, name in MEDimage.utils.TEXTURE_FEATURES.items()
+                }
+                scale_experiments.append((a, n, text_fingerprints, saved_features, extract))
+            if not any(any(extract.values()) for *_, extract in scale_experiments):
+                experiments.extend(
+                    (s, a, n, text_fingerprints, saved_features, None)
+                    for a, n, text_fingerprints, saved_features, _ in scale_experiments
+                )
+                logging.info(f'--> Texture features for "Scale={str(medscan.params.process.scale_text[s][0])}" '
+                             'are up to date.')
+                continue
+
             start = time()
+            scale_profiler = profiler.child(scale=medscan.params.process.scale_text[s][0])
             message = '--> Texture features: pre-processing (interp + ' \
                     f'reSeg) for "Scale={str(medscan.params.process.scale_text[s][0])}": '
             logging.info(message)
 
-            # Interpolation
-            # Intensity Mask
-            vol_obj = MEDimage.processing.interp_volume(
-                medscan=medscan,
-                vol_obj_s=vol_obj_init,
-                vox_dim=medscan.params.process.scale_text[s],
-                interp_met=medscan.params.process.vol_interp,
-                round_val=medscan.params.process.gl_round,
-                image_type='image', 
-                roi_obj_s=roi_obj_init,
-                box_string=medscan.params.process.box_string
-            )
-            # Morphological Mask
-            roi_obj_morph = MEDimage.processing.interp_volume(
-                medscan=medscan,
-                vol_obj_s=roi_obj_init,
-                vox_dim=medscan.params.process.scale_text[s],
-                interp_met=medscan.params.process.roi_interp,
-                round_val=medscan.params.process.roi_pv, 
-                image_type='roi', 
-                roi_obj_s=roi_obj_init,
-                box_string=medscan.params.process.box_string
-            )
-
-            # Re-segmentation
-            # Intensity mask range re-segmentation
-            roi_obj_int = deepcopy(roi_obj_morph)
-            roi_obj_int.data = MEDimage.processing.range_re_seg(
-                vol=vol_obj.data, 
-                roi=roi_obj_int.data,
-                im_range=medscan.params.process.im_range
+            vol_obj, roi_obj_morph, roi_obj_int = interp_and_re_seg(
+                medscan,
+                vol_obj_init,
+                roi_obj_init,
+                medscan.params.process.scale_text[s],
+                volume_cache,
+                path_read / name_patient,
+                roi_name,
+                scale_profiler
             )
-            # Intensity mask outlier re-segmentation
-            roi_obj_int.data = np.logical_and(
-                MEDimage.processing.outlier_re_seg(
-                    vol=vol_obj.data, 
-                    roi=roi_obj_int.data, 
-                    outliers=medscan.params.process.outliers
-                ),
-                roi_obj_int.data
-            ).astype(int)
 
             # Image filtering: linear
             if medscan.params.filter.filter_type:
                 if medscan.params.filter.filter_type.lower() == 'textural':
                     raise ValueError('For textural filtering, please use the BatchExtractorTexturalFilters class.')
                 try:
-                    vol_obj = MEDimage.filters.apply_filter(medscan, vol_obj)
+                    with scale_profiler.span('filtering'):
+                        vol_obj = MEDimage.filters.apply_filter(medscan, vol_obj)
                 except Exception as e:
                     logging.error(f'PROBLEM WITH LINEAR FILTERING: {e}')
-                    return log_file
+                    raise
 
             logging.info(f"{time() - start}\n")
-            
-            # Compute features for each discretisation algorithm and for each grey-level  
-            for a, n in product(range(medscan.params.process.n_algo), range(medscan.params.process.n_gl)):
-                count += 1 
-                start = time()
+
+            # Compute features for each discretisation algorithm and for each grey-level
+            for a, n, text_fingerprints, saved_features, extract in scale_experiments:
                 message = '--> Computation of texture features in image ' \
                         'space for "Scale= {}", "Algo={}", "GL={}" ({}):'.format(
                             str(medscan.params.process.scale_text[s][1]),
                             medscan.params.process.algo[a],
                             str(medscan.params.process.gray_levels[a][n]),
-                            str(count) + '/' + str(medscan.params.process.n_exp)
+                            str(len(experiments) + 1) + '/' + str(medscan.params.process.n_exp)
                             )
                 logging.info(message)
+                future = executor.submit(
+                    compute_texture_features,
+                    vol=vol_obj.data,
+                    roi_int=roi_obj_int.data,
+                    roi_morph=roi_obj_morph.data,
+                    algo=medscan.params.process.algo[a],
+                    n_q=medscan.params.process.gray_levels[a][n],
+                    user_set_min_val=medscan.params.process.user_set_min_value,
+                    extract=extract,
+                    dist_correction={
+                        'GLCM': medscan.params.radiomics.glcm.dist_correction,
+                        'GLRLM': medscan.params.radiomics.glrlm.dist_correction,
+                        'NGTDM': medscan.params.radiomics.ngtdm.dist_correction
+                    },
+                    profiler=scale_profiler.child(
+                        algo=medscan.params.process.algo[a],
+                        gray_levels=medscan.params.process.gray_levels[a][n]
+                    )
+                ) if any(extract.values()) else None
+                experiments.append((s, a, n, text_fingerprints, saved_features, future))
+
+    # Update radiomics results class, in the order of the experiments
+    for s, a, n, text_fingerprints, saved_features, future in experiments:
+        medscan.init_tf_calculation(algo=a, gl=n, scale=s)
+        features = {
+            **non_text_features,
+            **(future.result() if future is not None else {}),
+            **saved_features
+        }
+        medscan.update_radiomics(**features)
+        fingerprints = {**non_text_fingerprints, **text_fingerprints}
+        medscan.update_fingerprints({name: fingerprints[name] for name, value in features.items() if value})
+
+    # Saved features that were not computed again are kept
+    if saved_radiomics:
+        medscan.radiomics.image = MEDimage.utils.merge_radiomics(
+            medscan.radiomics.image,
+            saved_radiomics.get('image', {})
+        )
+        medscan.radiomics.fingerprints = MEDimage.utils.merge_radiomics(
+            medscan.radiomics.fingerprints,
+            saved_radiomics.get('fingerprints', {})
+        )
 
-                # Preparation of computation :
-                medscan.init_tf_calculation(algo=a, gl=n, scale=s)
-
-                # ROI Extraction :
-                vol_int_re = MEDimage.processing.roi_extract(
-                    vol=vol_obj.data, 
-                    roi=roi_obj_int.data)
+    # End of texture features extraction
+    logging.info(f"End of texture features extraction: {time() - start}\n")
+    if volume_cache is not None:
+        logging.info(f"Volume cache: {volume_cache.get_stats()}")
 
-                # Discretisation :
-                try:
-                    vol_quant_re, _ = MEDimage.processing.discretize(
-                        vol_re=vol_int_re,
-                        discr_type=medscan.params.process.algo[a], 
-                        n_q=medscan.params.process.gray_levels[a][n], 
-                        user_set_min_val=medscan.params.process.user_set_min_value
+    # Saving radiomics results
+    with profiler.span('save'):
+        medscan.save_radiomics(
+                        scan_file_name=name_patient,
+                        path_save=path_save,
+                        roi_type=roi_type,
+                        roi_type_label=roi_type_label,
                     )
-                except Exception as e:
-                    logging.error(f'PROBLEM WITH DISCRETIZATION: {e}')
-                    vol_quant_re = None
 
-                # GLCM features extraction
-                try:
-                    if medscan.params.radiomics.extract['GLCM']:
-                        glcm = MEDimage.biomarkers.glcm.extract_all(
-                            vol=vol_quant_re, 
-                            dist_correction=medscan.params.radiomics.glcm.dist_correction)
-                    else:
-                        glcm = None
-                except Exception as e:
-                    logging.error(f'PROBLEM WITH COMPUTATION OF GLCM FEATURES {e}')
-                    glcm = None
+    # Appending the features to the feature stores of the radiomics tables
+    name_json = name_save[:-len('.json')]
+    radiomics = medscan.radiomics.to_json()
+    for im_space in [key for key in radiomics.keys() if key not in ['params', 'fingerprints']]:
+        name_table = get_radiomics_table_name(
+            MEDimage.utils.get_scan_name_from_rad_name(name_json),
+            roi_type_label,
+            im_space,
+            modality,
+            im_params
+        )
+        MEDimage.utils.FeatureStore(path_features.parent / (name_table + MEDimage.utils.STORE_SUFFIX)).append(
+            MEDimage.utils.get_patient_id_from_scan_name(name_json),
+            MEDimage.utils.flatten_radiomics(radiomics[im_space])
+        )
 
-                # GLRLM features extraction
-                try:
-                    if medscan.params.radiomics.extract['GLRLM']:
-                        glrlm = MEDimage.biomarkers.glrlm.extract_all(
-                            vol=vol_quant_re,
-                            dist_correction=medscan.params.radiomics.glrlm.dist_correction)
-                    else:
-                        glrlm = None
-                except Exception as e:
-                    logging.error(f'PROBLEM WITH COMPUTATION OF GLRLM FEATURES {e}')
-                    glrlm = None
+    profiler.record(TOTAL_STAGE, time() - t_start)
+    logging.info(f"TOTAL TIME:{time() - t_start} seconds\n\n")
 
-                # GLSZM features extraction
-                try:
-                    if medscan.params.radiomics.extract['GLSZM']:
-                        glszm = MEDimage.biomarkers.glszm.extract_all(
-                            vol=vol_quant_re)
-                    else:
-                        glszm = None
-                except Exception as e:
-                    logging.error(f'PROBLEM WITH COMPUTATION OF GLSZM FEATURES {e}')
-                    glszm = None
+    return log_file
 
-                # GLDZM features extraction
-                try:
-                    if medscan.params.radiomics.extract['GLDZM']:
-                        gldzm = MEDimage.biomarkers.gldzm.extract_all(
-                            vol_int=vol_quant_re, 
-                            mask_morph=roi_obj_morph.data)
-                    else:
-                        gldzm = None
-                except Exception as e:
-                    logging.error(f'PROBLEM WITH COMPUTATION OF GLDZM FEATURES {e}')
-                    gldzm = None
+def get_radiomics_table_name(
+        scan: str,
+        roi_type_label: str,
+        im_space: str,
+        modality: str,
+        im_params: Dict
+    ) -> str:
+    """
+    Gets the name of the radiomics table of a scan, ROI type and imaging space (or filter space)
 
-                # NGTDM features extraction
-                try:
-                    if medscan.params.radiomics.extract['NGTDM']:
-                        ngtdm = MEDimage.biomarkers.ngtdm.extract_all(
-                            vol=vol_quant_re, 
-                            dist_correction=medscan.params.radiomics.ngtdm.dist_correction)
-                    else:
-                        ngtdm = None
-                except Exception as e:
-                    logging.error(f'PROBLEM WITH COMPUTATION OF NGTDM FEATURES {e}')
-                    ngtdm = None
+    Args:
+        scan(str): Imaging scan name, e.g. 'CT'.
+        roi_type_label(str): Label of the ROI type.
+        im_space(str): Imaging space of the features, e.g. 'image'.
+        modality(str): Imaging modality, e.g. 'CTscan'.
+        im_params(Dict): Dictionary of parameters.
 
-                # NGLDM features extraction
-                try:
-                    if medscan.params.radiomics.extract['NGLDM']:
-                        ngldm = MEDimage.biomarkers.ngldm.extract_all(
-                            vol=vol_quant_re)
-                    else:
-                        ngldm = None
-                except Exception as e:
-                    logging.error(f'PROBLEM WITH COMPUTATION OF NGLDM FEATURES {e}')
-                    ngldm = None
-                
-                # Update radiomics results class
-                medscan.update_radiomics(
-                                int_vol_hist_features=int_vol_hist, 
-                                morph_features=morph,
-                                loc_int_features=local_intensity, 
-                                stats_features=stats, 
-                                int_hist_features=int_hist,
-                                glcm_features=glcm, 
-                                glrlm_features=glrlm, 
-                                glszm_features=glszm, 
-                                gldzm_features=gldzm, 
-                                ngtdm_features=ngtdm, 
-                                ngldm_features=ngldm
-                            )
-                
-        # End of texture features extraction
-        logging.info(f"End of texture features extraction: {time() - start}\n")
+    Returns:
+        str: Name of the radiomics table, without extension.
+    """
+    # extract name save of the used filter
+    im_params_mod = im_params.get(IM_PARAMS_KEYS.get(modality, ''), {})
+    name_save = ''
+    if 'filter_type' in im_params_mod:
+        filter_type = im_params_mod['filter_type']
+        if filter_type in im_params['imParamFilter'] and 'name_save' in im_params['imParamFilter'][filter_type]:
+            name_save = im_params['imParamFilter'][filter_type]['name_save']
+
+    return 'radiomics__' + scan + '(' + roi_type_label + ')__' + (name_save or im_space)
+
+def compute_radiomics_tables(
+        path_save: Path,
+        table_tags: List,
+        log_file: Union[str, Path],
+        im_params: Dict
+    ) -> None:
+    """
+    Creates radiomic tables off of the saved dicts with the computed features and save it as CSV files
 
-        # Saving radiomics results
-        medscan.save_radiomics(
-                        scan_file_name=name_patient,
-                        path_save=self._path_save,
-                        roi_type=roi_type,
-                        roi_type_label=roi_type_label,
-                    )
-        
-        logging.info(f"TOTAL TIME:{time() - t_start} seconds\n\n")
+    Args:
+        path_save(Path): Path to the folder where the features are saved.
+        table_tags(List): Lists of information about scans, roi type and imaging space (or filter space)
+        log_file(Union[str, Path]): Path to logging file.
+        im_params(Dict): Dictionary of parameters.
 
-        return log_file
+    Returns:
+        None.
+    """
+    n_tables = len(table_tags)
 
-    @ray.remote
-    def __compute_radiomics_tables(
-            self,
-            table_tags: List,
-            log_file: Union[str, Path],
-            im_params: Dict
-        ) -> None:
-        """
-        Creates radiomic tables off of the saved dicts with the computed features and save it as CSV files
+    for t in range(0, n_tables):
+        scan = table_tags[t][0]
+        roi_type = table_tags[t][1]
+        roi_label = table_tags[t][2]
+        im_space = table_tags[t][3]
+        modality = table_tags[t][4]
 
-        Args:
-            table_tags(List): Lists of information about scans, roi type and imaging space (or filter space)
-            log_file(Union[str, Path]): Path to logging file.
-            im_params(Dict): Dictionary of parameters.
-        
-        Returns:
-            None.
-        """
-        n_tables = len(table_tags)
+        # set up table name
+        name_table = get_radiomics_table_name(scan, roi_type, im_space, modality, im_params) + '.npy'
 
-        for t in range(0, n_tables):
-            scan = table_tags[t][0]
-            roi_type = table_tags[t][1]
-            roi_label = table_tags[t][2]
-            im_space = table_tags[t][3]
-            modality = table_tags[t][4]
-
-            # extract parameters for the current modality
-            if modality == 'CTscan' and 'imParamCT' in im_params:
-                im_params_mod = im_params['imParamCT']
-            elif modality== 'MRscan' and 'imParamMR' in im_params:
-                im_params_mod = im_params['imParamMR']
-            elif modality == 'PTscan' and 'imParamPET' in im_params:
-                im_params_mod = im_params['imParamPET']
-            # extract name save of the used filter
-            if 'filter_type' in im_params_mod:
-                filter_type = im_params_mod['filter_type']
-                if filter_type in im_params['imParamFilter'] and 'name_save' in im_params['imParamFilter'][filter_type]:
-                    name_save = im_params['imParamFilter'][filter_type]['name_save']
-                else:
-                    name_save= ''
-            else:
-                name_save= ''
-            
-            # set up table name
-            if name_save:
-                name_table = 'radiomics__' + scan + \
-                '(' + roi_type + ')__'  + name_save + '.npy'   
-            else:
-                name_table = 'radiomics__' + scan + \
-                '(' + roi_type + ')__' + im_space + '.npy'
-
-            # Start timer
-            start = time()
-            logging.info("\n --> Computing radiomics table: {name_table}...")
+        # Start timer
+        start = time()
+        logging.info("\n --> Computing radiomics table: {name_table}...")
+
+        # Wildcard used to look only in the parent folder (save path),
+        # no need to recursively look into sub-folders using '**/'.
+        wildcard = '*_' + scan + '(' + roi_type + ')*.json'
+
+        # Create radiomics table from the feature store, which the extraction workers append to
+        save_path = path_save / f'features({roi_label})' / name_table
+        radiomics_table_dict = MEDimage.utils.create_store_radiomics_table(
+            MEDimage.utils.get_file_paths(path_save / f'features({roi_label})', wildcard),
+            im_space,
+            save_path.with_suffix(MEDimage.utils.STORE_SUFFIX)
+        )
+        radiomics_table_dict['Properties']['Description'] = name_table
 
-            # Wildcard used to look only in the parent folder (save path),
-            # no need to recursively look into sub-folders using '**/'.
-            wildcard = '*_' + scan + '(' + roi_type + ')*.json'
+        # Save radiomics table
+        np.save(save_path, [radiomics_table_dict])
 
-            # Create radiomics table
-            radiomics_table_dict = MEDimage.utils.create_radiomics_table(
-                MEDimage.utils.get_file_paths(self._path_save / f'features({roi_label})', wildcard),
-                im_space, 
-                log_file
-            )
-            radiomics_table_dict['Properties']['Description'] = name_table
+        # Create CSV table and Definitions
+        MEDimage.utils.write_radiomics_csv(save_path)
 
-            # Save radiomics table
-            save_path = self._path_save / f'features({roi_label})' / name_table
-            np.save(save_path, [radiomics_table_dict])
+        logging.info(f"DONE\n {time() - start}\n")
 
-            # Create CSV table and Definitions
-            MEDimage.utils.write_radiomics_csv(save_path)
+    return log_file
 
-            logging.info(f"DONE\n {time() - start}\n")
 
-        return log_file
-    
+class BatchExtractor(object):
+    """
+    Organizes all the patients/scans in batches to extract all the radiomic features
+    """
+
+    def __init__(
+            self, 
+            path_read: Union[str, Path],
+            path_csv: Union[str, Path],
+            path_params: Union[str, Path],
+            path_save: Union[str, Path],
+            n_batch: int = 4,
+            skip_existing: bool = False,
+            backend: str = 'process',
+            threads_per_worker: int = 1,
+            texture_backend: str = 'serial',
+            n_texture_workers: int = 1,
+            path_cache: Union[str, Path] = None,
+            cache_max_size: int = None,
+            incremental: bool = False,
+            path_profile: Union[str, Path] = None,
+            resume: bool = False,
+            max_attempts: int = 3,
+            memory_limit: int = None
+    ) -> None:
+        """
+        constructor of the BatchExtractor class 
+
+        Args:
+            path_read(Union[str, Path]): Path to the folder of the saved MEDscan instances.
+            path_csv(Union[str, Path]): Path to the folder of the CSV files of the ROI names.
+            path_params(Union[str, Path]): Path to the JSON file of the parameters.
+            path_save(Union[str, Path]): Path to the folder where the features are saved.
+            n_batch(int, optional): Number of scans processed at the same time.
+            skip_existing(bool, optional): True to skip the scans whose features were already computed.
+            backend(str, optional): Execution backend of the scans, 'serial', 'process' or 'ray'
+                (see :func:`MEDimage.utils.get_executor`).
+            threads_per_worker(int, optional): Number of BLAS/FFT threads of each worker.
+            texture_backend(str, optional): Execution backend of the texture experiments of each scan,
+                'serial', 'thread' or 'process' (see :func:`compute_radiomics_one_patient`).
+            n_texture_workers(int, optional): Number of texture experiments of a scan computed at the same
+                time. Useful for cohorts of a few large scans.
+            path_cache(Union[str, Path], optional): Path to the cache of the interpolated and re-segmented
+                volumes, shared by all the workers. Experiments that only change the features or the
+                discretisation then read the volumes from the cache. If None, the volumes are not cached.
+            cache_max_size(int, optional): Maximum size of the volume cache in bytes, the least recently
+                used volumes are removed above it. If None, the cache is not limited.
+            incremental(bool, optional): True to only compute the features that are missing from the saved
+                features of each scan, or whose parameters changed, e.g. after enabling a feature family or
+                adding a grey level. Unlike ``skip_existing``, scans with saved features are still updated.
+            path_profile(Union[str, Path], optional): Path to the JSONL file where the wall time, CPU time and
+                peak memory of the stages of every scan are appended (see :class:`MEDimage.utils.StageProfiler`).
+                The hottest stages and scans are ranked by :func:`MEDimage.utils.summarize_profile`. If None,
+                the stages are not profiled.
+            resume(bool, optional): True to resume an interrupted run from the task ledger of ``path_save``
+                (see :class:`MEDimage.utils.TaskLedger`): finished scans are skipped without reading their
+                features, failed or interrupted scans are computed again.
+            max_attempts(int, optional): Maximum number of attempts of a scan when resuming.
+            memory_limit(int, optional): Memory limit of each worker process in bytes, so that a scan that
+                goes over it fails, and is recorded as failed, instead of being killed by the system.
+                Only used with the 'process' and 'ray' backends.
+        """
+        # The paths are made absolute as the working directory is changed to path_save during the run
+        self._path_csv = Path(path_csv).resolve()
+        self._path_params = Path(path_params).resolve()
+        self._path_read = Path(path_read).resolve()
+        self._path_save = Path(path_save).resolve()
+        self.roi_types = []
+        self.roi_type_labels = []
+        self.n_bacth = n_batch
+        self.skip_existing = skip_existing
+        self.backend = backend
+        self.threads_per_worker = threads_per_worker
+        self.texture_backend = texture_backend
+        self.n_texture_workers = n_texture_workers
+        self.path_cache = Path(path_cache).resolve() if path_cache else None
+        self.cache_max_size = cache_max_size
+        self.incremental = incremental
+        self.path_profile = Path(path_profile).resolve() if path_profile else None
+        self.resume = resume
+        self.max_attempts = max_attempts
+        self.memory_limit = memory_limit
+
+    def __load_and_process_params(self) -> Dict:
+        """Load and process the computing & batch parameters from JSON file"""
+        # Load json parameters
+        im_params = MEDimage.utils.json_utils.load_json(self._path_params)
+        
+        # Update class attributes
+        self.roi_types.extend(im_params['roi_types'])
+        self.roi_type_labels.extend(im_params['roi_type_labels'])
+        self.n_bacth = im_params['n_batch'] if 'n_batch' in im_params else self.n_bacth
+        self.backend = im_params['backend'] if 'backend' in im_params else self.backend
+        self.threads_per_worker = im_params['threads_per_worker'] if 'threads_per_worker' in im_params \
+                                    else self.threads_per_worker
+        self.texture_backend = im_params['texture_backend'] if 'texture_backend' in im_params \
+                                    else self.texture_backend
+        self.n_texture_workers = im_params['n_texture_workers'] if 'n_texture_workers' in im_params \
+                                    else self.n_texture_workers
+        self.path_cache = Path(im_params['path_cache']).resolve() if 'path_cache' in im_params else self.path_cache
+        self.cache_max_size = im_params['cache_max_size'] if 'cache_max_size' in im_params \
+                                    else self.cache_max_size
+        self.incremental = im_params['incremental'] if 'incremental' in im_params else self.incremental
+        self.path_profile = Path(im_params['path_profile']).resolve() if 'path_profile' in im_params else self.path_profile
+        self.resume = im_params['resume'] if 'resume' in im_params else self.resume
+        self.max_attempts = im_params['max_attempts'] if 'max_attempts' in im_params else self.max_attempts
+        self.memory_limit = im_params['memory_limit'] if 'memory_limit' in im_params else self.memory_limit
+
+        return im_params
+
     def __batch_all_patients(self, im_params: Dict) -> None:
         """
         Create batches of scans to process and compute radiomics features for every single scan.
@@ -605,6 +933,31 @@ class BatchExtractor(object):
             tabel_roi = tabel_roi.drop(columns=['under', 'under', 'dot', 'npy'])
             roi_names = tabel_roi.ROIname.tolist()
 
+            # Every task is recorded in the ledger. When resuming, the finished tasks are skipped and the
+            # failed or interrupted ones are retried, up to the maximum number of attempts. Otherwise, the
+            # tasks of previous runs are reset.
+            ledger = MEDimage.utils.TaskLedger(self._path_save / MEDimage.utils.TASK_LEDGER_NAME)
+            task_ids = [roi_type_label + '/' + name_patient for name_patient in name_patients]
+            ledger.add(task_ids, reset=not self.resume)
+            if self.resume:
+                ledger_tasks = ledger.get_tasks()
+                kept = []
+                for i, task_id in enumerate(task_ids):
+                    task = ledger_tasks[task_id]
+                    if task['state'] == MEDimage.utils.DONE:
+                        continue
+                    if task['attempts'] >= self.max_attempts:
+                        logging.warning(f'Task {task_id} is not retried after {task["attempts"]} attempts: '
+                                        f'{task["error"]}')
+                        continue
+                    kept.append(i)
+                name_patients = [name_patients[i] for i in kept]
+                roi_names = [roi_names[i] for i in kept]
+                task_ids = [task_ids[i] for i in kept]
+                if not task_ids:
+                    print('ALL TASKS ARE DONE')
+                    continue
+
             # INITIALIZATION
             os.chdir(self._path_save)
             name_bacth_log = 'batchLog_' + roi_type_label
@@ -638,37 +991,55 @@ class BatchExtractor(object):
             # Produce a list log_file path.
             log_files = [path_batch / ('log_file_' + str(i) + '.log') for i in range(n_batch)]
 
-            # Distribute the first tasks to all workers
-            ids = [self.__compute_radiomics_one_patient.remote(
-                        self,
-                        name_patient=name_patients[i],
-                        roi_name=roi_names[i], 
-                        im_params=im_params,
-                        roi_type=roi_type,
-                        roi_type_label=roi_type_label,
-                        log_file=log_files[i])
-            for i in range(n_batch)]
+            # The memory limit applies to a whole process, so only to worker processes
+            memory_limit = self.memory_limit if self.backend in ['process', 'ray'] else None
+            if self.memory_limit and memory_limit is None:
+                logging.warning(f'The memory limit is ignored with the {self.backend} backend.')
+
+            # Estimate the cost of each scan from the scan index to process the largest scans first
+            file_paths = [self._path_read / name for name in name_patients if (self._path_read / name).exists()]
+            scan_index = MEDimage.utils.get_scan_index(self._path_read, file_paths)
+            costs = []
+            for name_patient, roi_name in zip(name_patients, roi_names):
+                scan_info = scan_index.get(name_patient)
+                im_params_mod = im_params.get(IM_PARAMS_KEYS.get(name_patient.split('.')[-2], ''), {})
+                costs.append(MEDimage.utils.estimate_task_cost(scan_info, roi_name, im_params_mod) if scan_info else 0)
+
+            # Each worker writes in its own log file
+            tasks = [{
+                'task_fn': compute_radiomics_one_patient,
+                'task_id': task_ids[i],
+                'path_ledger': ledger.path_ledger,
+                'memory_limit': memory_limit,
+                'path_read': self._path_read,
+                'path_save': self._path_save,
+                'name_patient': name_patients[i],
+                'roi_name': roi_names[i],
+                'im_params': im_params,
+                'roi_type': roi_type,
+                'roi_type_label': roi_type_label,
+                'skip_existing': self.skip_existing,
+                'texture_backend': self.texture_backend,
+                'n_texture_workers': self.n_texture_workers,
+                'path_cache': self.path_cache,
+                'cache_max_size': self.cache_max_size,
+                'incremental': self.incremental,
+                'path_profile': self.path_profile
+            } for i in range(n_patients)]
+            with MEDimage.utils.get_executor(self.backend, n_batch, self.threads_per_worker) as executor:
+                MEDimage.utils.run_largest_first(
+                    executor,
+                    MEDimage.utils.run_ledger_task,
+                    tasks,
+                    costs,
+                    [{'log_file': log_file} for log_file in log_files]
+                )
 
-            # Distribute the remaining tasks
-            nb_job_left = n_patients - n_batch
-            for _ in trange(n_patients):
-                ready, not_ready = ray.wait(ids, num_returns=1)
-                ids = not_ready
-                log_file = ray.get(ready)[0]
-                if nb_job_left > 0:
-                    idx = n_patients - nb_job_left
-                    ids.extend([self.__compute_radiomics_one_patient.remote(
-                                    self,
-                                    name_patients[idx],
-                                    roi_names[idx], 
-                                    im_params,
-                                    roi_type,
-                                    roi_type_label,
-                                    log_file)
-                                ])
-                    nb_job_left -= 1
-
-            print('DONE')
+            failed = ledger.get_tasks([MEDimage.utils.FAILED])
+            failed = {task_id: failed[task_id] for task_id in task_ids if task_id in failed}
+            for task_id, task in failed.items():
+                logging.error(f'TASK {task_id} FAILED: {task["error"]}')
+            print(f'DONE ({len(failed)} failed, see {ledger.path_ledger})' if failed else 'DONE')
 
     def __batch_all_tables(self, im_params: Dict):
         """
@@ -708,8 +1079,7 @@ class BatchExtractor(object):
                 # Finding the images spaces for a test file (assuming that all
                 # files for a given scan and roi_type_label have the same image spaces
                 radiomics = MEDimage.utils.json_utils.load_json(file_paths[0])
-                im_spaces = [key for key in radiomics.keys()]
-                im_spaces = im_spaces[:-1]
+                im_spaces = [key for key in radiomics.keys() if key not in ['params', 'fingerprints']]
                 n_im_spaces = len(im_spaces)
                 # Constructing the table_tags variable
                 for i in range(0, n_im_spaces):
@@ -750,31 +1120,34 @@ class BatchExtractor(object):
         log_files = [path_batch / ('log_file_' + str(i) + '.txt') for i in range(self.n_bacth)]
 
         # Distribute the first tasks to all workers
-        ids = [self.__compute_radiomics_tables.remote(
-                                self, 
-                                [table_tags[i]], 
-                                log_files[i],
-                                im_params)
-                for i in range(self.n_bacth)]
-
-        nb_job_left = n_tables - self.n_bacth
-
-        for _ in trange(n_tables):
-            ready, not_ready = ray.wait(ids, num_returns=1)
-            ids = not_ready
-
-            # We verify if error has occur during the process
-            log_file = ray.get(ready)[0]
+        with MEDimage.utils.get_executor(self.backend, self.n_bacth, self.threads_per_worker) as executor:
+            futures = {executor.submit(
+                            compute_radiomics_tables,
+                            self._path_save,
+                            [table_tags[i]],
+                            log_files[i],
+                            im_params): log_files[i]
+                for i in range(self.n_bacth)}
 
             # Distribute the remaining tasks
-            if nb_job_left > 0:
-                idx = n_tables - nb_job_left
-                ids.extend([self.__compute_radiomics_tables.remote(
-                                self,
-                                [table_tags[idx]], 
-                                log_file,
-                                im_params)])
-                nb_job_left -= 1
+            nb_job_left = n_tables - self.n_bacth
+            with tqdm(total=n_tables) as pbar:
+                while futures:
+                    done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        log_file = futures.pop(future)
+                        if future.exception() is not None:
+                            logging.error(f'PROBLEM WITH THE CREATION OF A RADIOMICS TABLE: {future.exception()}')
+                        pbar.update()
+                        if nb_job_left > 0:
+                            idx = n_tables - nb_job_left
+                            futures[executor.submit(
+                                        compute_radiomics_tables,
+                                        self._path_save,
+                                        [table_tags[idx]],
+                                        log_file,
+                                        im_params)] = log_file
+                            nb_job_left -= 1
 
         print('DONE')
 
@@ -792,12 +1165,6 @@ class BatchExtractor(object):
         # Load and process computing parameters
         im_params = self.__load_and_process_params()
 
-        # Initialize ray
-        if ray.is_initialized():
-            ray.shutdown()
-
-        ray.init(local_mode=True, include_dashboard=True, num_cpus=self.n_bacth)
-
         # Batch all scans from CSV file and compute radiomics for each scan
         self.__batch_all_patients(im_params)
 
@@ -1,19 +1,18 @@
 import logging
 import math
 import os
-import pickle
 import sys
 from copy import deepcopy
 from datetime import datetime
 from itertools import product
+from concurrent.futures import FIRST_COMPLETED, wait
 from pathlib import Path
 from time import time
 from typing import Dict, List, Union
 
 import numpy as np
 import pandas as pd
-import ray
-from tqdm import trange
+from tqdm import tqdm, trange
 
 import MEDimage
 
@@ -29,10 +28,22 @@ class BatchExtractorTexturalFilters(object):
             path_csv: Union[str, Path],
             path_params: Union[str, Path],
             path_save: Union[str, Path],
-            n_batch: int = 4
+            n_batch: int = 4,
+            backend: str = 'process',
+            threads_per_worker: int = 1
     ) -> None:
         """
         constructor of the BatchExtractor class 
+
+        Args:
+            path_read(Union[str, Path]): Path to the folder of the saved MEDscan instances.
+            path_csv(Union[str, Path]): Path to the folder of the CSV files of the ROI names.
+            path_params(Union[str, Path]): Path to the JSON file of the parameters.
+            path_save(Union[str, Path]): Path to the folder where the features are saved.
+            n_batch(int, optional): Number of filtered volumes (or tables) processed at the same time.
+            backend(str, optional): Execution backend of the filtered volumes and tables, 'serial', 'thread',
+                'process' or 'ray' (see :func:`MEDimage.utils.get_executor`).
+            threads_per_worker(int, optional): Number of BLAS/FFT threads of each worker.
         """
         self._path_csv = Path(path_csv)
         self._path_params = Path(path_params)
@@ -41,6 +52,8 @@ class BatchExtractorTexturalFilters(object):
         self.roi_types = []
         self.roi_type_labels = []
         self.n_bacth = n_batch
+        self.backend = backend
+        self.threads_per_worker = threads_per_worker
         self.glcm_features = [
             "Fcm_joint_max",
             "Fcm_joint_avg",
@@ -78,6 +91,9 @@ class BatchExtractorTexturalFilters(object):
         self.roi_types.extend(im_params['roi_types'])
         self.roi_type_labels.extend(im_params['roi_type_labels'])
         self.n_bacth = im_params['n_batch'] if 'n_batch' in im_params else self.n_bacth
+        self.backend = im_params['backend'] if 'backend' in im_params else self.backend
+        self.threads_per_worker = im_params['threads_per_worker'] if 'threads_per_worker' in im_params \
+                                    else self.threads_per_worker
 
         return im_params
 
@@ -108,6 +124,7 @@ class BatchExtractorTexturalFilters(object):
             Union[Path, str]: Path to the updated logging file.
         """
         # Check if the features for the current filter have already been computed
+        list_feature = list(range(len(self.glcm_features)))
         if skip_existing:
             list_feature = []
             # Find the glcm filters that have not been computed yet
@@ -135,8 +152,7 @@ class BatchExtractorTexturalFilters(object):
 
         # Load MEDscan instance
         try:
-            with open(self._path_read / name_patient, 'rb') as f: medscan = pickle.load(f)
-            medscan = MEDimage.MEDscan(medscan)
+            medscan = MEDimage.utils.load_MEDscan(self._path_read / name_patient)
         except Exception as e:
             logging.error(f"\n ERROR LOADING PATIENT {name_patient}:\n {e}")
             return None
@@ -238,78 +254,40 @@ class BatchExtractorTexturalFilters(object):
             logging.error(f'PROBLEM WITH TEXTURAL FILTERING: {e}')
             return log_file
         
-        # Initialize ray
-        if ray.is_initialized():
-            ray.shutdown()
-
-        ray.init(local_mode=True, include_dashboard=True, num_cpus=self.n_bacth)
-
-        # Loop through all the filters and extract the features for each filter
-        ids = []
-        nb_filters = len(list_feature)
-        if nb_filters < self.n_bacth:
-            self.n_bacth = nb_filters
-        for i in range(self.n_bacth):
-            # Extract the filtered volume
-            filter_idx = list_feature[i]
-            vol_obj.data = deepcopy(vol_obj_all_features[...,filter_idx])
-
-            # Compute radiomics features
-            logging.info(f"--> Computation of radiomics features for filter {filter_idx}:")
-
-            ids.append(
-                self.__compute_radiomics_filtered_volume.remote(
-                    self,
-                    medscan=medscan,
-                    vol_obj=vol_obj,
-                    roi_obj_int=roi_obj_int,
-                    roi_obj_morph=roi_obj_morph,
-                    name_patient=name_patient,
-                    roi_name=roi_name,
-                    roi_type=roi_type + '_' + self.glcm_features[filter_idx],
-                    roi_type_label=roi_type_label,
-                    log_file=log_file
-                )
+        # Extract the features of each filtered volume, n_batch volumes at a time
+        n_batch = self.n_bacth
+        if n_batch is None or n_batch < 1:
+            n_batch = 1
+        tasks = []
+        for filter_idx in list_feature:
+            vol_obj_filter = deepcopy(vol_obj)
+            vol_obj_filter.data = vol_obj_all_features[..., filter_idx].copy()
+            tasks.append({
+                'medscan': medscan,
+                'vol_obj': vol_obj_filter,
+                'roi_obj_int': roi_obj_int,
+                'roi_obj_morph': roi_obj_morph,
+                'name_patient': name_patient,
+                'roi_name': roi_name,
+                'roi_type': roi_type + '_' + self.glcm_features[filter_idx],
+                'roi_type_label': roi_type_label
+            })
+        logging.info(f"--> Computation of radiomics features for filters {list_feature}:")
+        with MEDimage.utils.get_executor(self.backend, n_batch, self.threads_per_worker) as executor:
+            MEDimage.utils.run_largest_first(
+                executor,
+                self._compute_radiomics_filtered_volume,
+                tasks,
+                [1.0] * len(tasks),
+                [{'log_file': log_file}] * min(n_batch, len(tasks))
             )
-        # Distribute the remaining tasks
-        nb_job_left = nb_filters - self.n_bacth
-        if nb_job_left > 0:
-            for i in range(nb_filters - nb_job_left, nb_filters):
-                ready, not_ready = ray.wait(ids, num_returns=1)
-                ids = not_ready
-                try:
-                    log_file = ray.get(ready)[0]
-                except:
-                    pass
-                # Extract the filtered volume
-                filter_idx = list_feature[i]
-                vol_obj.data = deepcopy(vol_obj_all_features[...,filter_idx])
-
-                # Compute radiomics features
-                logging.info(f"--> Computation of radiomics features for filter {filter_idx}:")
-
-                ids.append(
-                    self.__compute_radiomics_filtered_volume.remote(
-                        self,
-                        medscan=medscan,
-                        vol_obj=vol_obj,
-                        roi_obj_int=roi_obj_int,
-                        roi_obj_morph=roi_obj_morph,
-                        name_patient=name_patient,
-                        roi_name=roi_name,
-                        roi_type=roi_type + '_' + self.glcm_features[filter_idx],
-                        roi_type_label=roi_type_label,
-                        log_file=log_file
-                    )
-                )
         
         logging.info(f"TOTAL TIME:{time() - t_start} seconds\n\n")
 
         # Empty memory
         del medscan
 
-    @ray.remote
-    def __compute_radiomics_filtered_volume(
+    def _compute_radiomics_filtered_volume(
             self,
             medscan: MEDimage.MEDscan,
             vol_obj,
@@ -325,6 +303,9 @@ class BatchExtractorTexturalFilters(object):
         # time
         t_start = time()
 
+        # The features are saved in the MEDscan instance, which is shared by the filters with the thread backend
+        medscan = deepcopy(medscan)
+
         # ROI Extraction :
         vol_int_re = deepcopy(vol_obj.data)
 
@@ -479,9 +460,19 @@ class BatchExtractorTexturalFilters(object):
                 logging.error(f'PROBLEM WITH COMPUTATION OF GLRLM FEATURES {e}')
                 glrlm = None
 
+            # Zones labelling (single pass shared by GLSZM and GLDZM)
+            try:
+                zones = MEDimage.biomarkers.utils.get_zones(
+                    vol=vol_quant_re,
+                    levels=np.arange(1, np.nanmax(vol_quant_re)+1)
+                )
+            except Exception as e:
+                logging.error(f'PROBLEM WITH LABELLING OF ZONES {e}')
+                zones = None
+
             # GLSZM features extraction
             try:
-                glszm = MEDimage.biomarkers.glszm.extract_all(vol=vol_quant_re)
+                glszm = MEDimage.biomarkers.glszm.extract_all(vol=vol_quant_re, zones=zones)
             except Exception as e:
                 logging.error(f'PROBLEM WITH COMPUTATION OF GLSZM FEATURES {e}')
                 glszm = None
@@ -490,7 +481,8 @@ class BatchExtractorTexturalFilters(object):
             try:
                 gldzm = MEDimage.biomarkers.gldzm.extract_all(
                     vol_int=vol_quant_re, 
-                    mask_morph=roi_obj_morph.data
+                    mask_morph=roi_obj_morph.data,
+                    zones=zones
                 )
             except Exception as e:
                 logging.error(f'PROBLEM WITH COMPUTATION OF GLDZM FEATURES {e}')
@@ -543,8 +535,7 @@ class BatchExtractorTexturalFilters(object):
 
         return log_file
     
-    @ray.remote
-    def __compute_radiomics_tables(
+    def _compute_radiomics_tables(
             self,
             table_tags: List,
             log_file: Union[str, Path],
@@ -604,16 +595,16 @@ class BatchExtractorTexturalFilters(object):
             # no need to recursively look into sub-folders using '**/'.
             wildcard = '*_' + scan + '(' + roi_type + ')*.json'
 
-            # Create radiomics table
-            radiomics_table_dict = MEDimage.utils.create_radiomics_table(
+            # Create radiomics table from its feature store
+            save_path = self._path_save / f'features({roi_label})' / name_table
+            radiomics_table_dict = MEDimage.utils.create_store_radiomics_table(
                 MEDimage.utils.get_file_paths(self._path_save / f'features({roi_label})', wildcard),
-                im_space, 
-                log_file
+                im_space,
+                save_path.with_suffix(MEDimage.utils.STORE_SUFFIX)
             )
             radiomics_table_dict['Properties']['Description'] = name_table
 
             # Save radiomics table
-            save_path = self._path_save / f'features({roi_label})' / name_table
             np.save(save_path, [radiomics_table_dict])
 
             # Create CSV table and Definitions
@@ -761,8 +752,7 @@ class BatchExtractorTexturalFilters(object):
                     # Finding the images spaces for a test file (assuming that all
                     # files for a given scan and roi_type_label have the same image spaces
                     radiomics = MEDimage.utils.json_utils.load_json(file_paths[0])
-                    im_spaces = [key for key in radiomics.keys()]
-                    im_spaces = im_spaces[:-1]
+                    im_spaces = [key for key in radiomics.keys() if key not in ['params', 'fingerprints']]
                     n_im_spaces = len(im_spaces)
                     # Constructing the table_tags variable
                     for i in range(0, n_im_spaces):
@@ -771,49 +761,46 @@ class BatchExtractorTexturalFilters(object):
 
             # PRODUCE BATCH COMPUTATIONS
             n_tables = len(table_tags)
-            self.n_bacth = self.n_bacth
-            if self.n_bacth is None or self.n_bacth < 0:
-                self.n_bacth = 1
-            elif n_tables < self.n_bacth:
-                self.n_bacth = n_tables
+            if n_tables == 0:
+                continue
+            n_batch = self.n_bacth
+            if n_batch is None or n_batch < 1:
+                n_batch = 1
+            elif n_tables < n_batch:
+                n_batch = n_tables
 
             # Produce a list log_file path.
-            log_files = [path_batch / ('log_file_' + str(i) + '.txt') for i in range(self.n_bacth)]
-
-            # Initialize ray
-            if ray.is_initialized():
-                ray.shutdown()
-
-            ray.init(local_mode=True, include_dashboard=True, num_cpus=self.n_bacth)
+            log_files = [path_batch / ('log_file_' + str(i) + '.txt') for i in range(n_batch)]
 
             # Distribute the first tasks to all workers
-            ids = [self.__compute_radiomics_tables.remote(
-                                    self, 
-                                    [table_tags[i]], 
-                                    log_files[i],
-                                    im_params,
-                                    self.glcm_features[f_idx])
-                    for i in range(self.n_bacth)]
-
-            nb_job_left = n_tables - self.n_bacth
-
-            for _ in trange(n_tables):
-                ready, not_ready = ray.wait(ids, num_returns=1)
-                ids = not_ready
-
-                # We verify if error has occur during the process
-                log_file = ray.get(ready)[0]
+            with MEDimage.utils.get_executor(self.backend, n_batch, self.threads_per_worker) as executor:
+                futures = {executor.submit(
+                                self._compute_radiomics_tables,
+                                [table_tags[i]],
+                                log_files[i],
+                                im_params,
+                                self.glcm_features[f_idx]): log_files[i]
+                    for i in range(n_batch)}
 
                 # Distribute the remaining tasks
-                if nb_job_left > 0:
-                    idx = n_tables - nb_job_left
-                    ids.extend([self.__compute_radiomics_tables.remote(
-                                    self,
-                                    [table_tags[idx]], 
-                                    log_file,
-                                    im_params,
-                                    self.glcm_features[f_idx])])
-                    nb_job_left -= 1
+                nb_job_left = n_tables - n_batch
+                with tqdm(total=n_tables) as pbar:
+                    while futures:
+                        done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            log_file = futures.pop(future)
+                            if future.exception() is not None:
+                                logging.error(f'PROBLEM WITH THE CREATION OF A RADIOMICS TABLE: {future.exception()}')
+                            pbar.update()
+                            if nb_job_left > 0:
+                                idx = n_tables - nb_job_left
+                                futures[executor.submit(
+                                            self._compute_radiomics_tables,
+                                            [table_tags[idx]],
+                                            log_file,
+                                            im_params,
+                                            self.glcm_features[f_idx])] = log_file
+                                nb_job_left -= 1
 
         print('DONE')
 
@@ -8,13 +8,15 @@ from typing import Dict, List, Union, List
 import numpy as np
 import pandas as pd
 
-from ..utils.textureTools import (coord2index, get_neighbour_direction,
-                                  get_value, is_list_all_none)
+from ..utils.textureTools import (get_level_codes, get_neighbour_direction,
+                                  get_shifted_views, is_list_all_none)
+from .jit_kernels import NUMBA_AVAILABLE, glcm_kernel, warn_no_numba
 
 
 def get_matrix(roi_only: np.ndarray,
                     levels: Union[np.ndarray, List],
-                    dist_correction=True) -> np.ndarray:
+                    dist_correction=True,
+                    use_jit: bool=True) -> np.ndarray:
     r"""
     This function computes the Gray-Level Co-occurence Matrix (GLCM) of the
     region of interest (ROI) of an input volume. The input volume is assumed
@@ -39,6 +41,9 @@ def get_matrix(roi_only: np.ndarray,
                                 discretization length difference corrections as used by the `Institute of Physics and
                                 Engineering in Medicine <https://doi.org/10.1088/0031-9155/60/14/5471>`_.
                                 Set this variable to false to replicate IBSI results.
+        use_jit (bool, optional): If True and `numba <https://numba.pydata.org/>`_ is installed,
+                                the neighbourhood loop runs in compiled code, which gives the same matrix.
+                                Falls back to the Python loop otherwise.
 
     Returns:
         ndarray: Gray-Level Co-occurence Matrix of ``roi_only``.
@@ -81,31 +86,37 @@ def get_matrix(roi_only: np.ndarray,
         q3[q2 == qs[k]] = k
 
     q3 = np.reshape(q3, dim).astype(int)
-    GLCM = np.zeros((lqs, lqs))
-
-    for i in range(1, dim[0]+1):
-        i_min = max(1, i-1)
-        i_max = min(i+1, dim[0])
-        for j in range(1, dim[1]+1):
-            j_min = max(1, j-1)
-            j_max = min(j+1, dim[1])
-            for k in range(1, dim[2]+1):
-                k_min = max(1, k-1)
-                k_max = min(k+1, dim[2])
-                val_q3 = q3[i-1, j-1, k-1]
-                for I2 in range(i_min, i_max+1):
-                    for J2 in range(j_min, j_max+1):
-                        for K2 in range(k_min, k_max+1):
-                            if (I2 == i) & (J2 == j) & (K2 == k):
-                                continue
-                            else:
-                                val_neighbor = q3[I2-1, J2-1, K2-1]
-                                if dist_correction:
-                                    # Discretization length correction
-                                    GLCM[val_q3, val_neighbor] += \
-                                        np.sqrt(abs(I2-i)+abs(J2-j)+abs(K2-k))
+
+    if use_jit and not NUMBA_AVAILABLE:
+        warn_no_numba("GLCM")
+    if use_jit and NUMBA_AVAILABLE:
+        GLCM = glcm_kernel(q3, lqs, dist_correction)
+    else:
+        GLCM = np.zeros((lqs, lqs))
+
+        for i in range(1, dim[0]+1):
+            i_min = max(1, i-1)
+            i_max = min(i+1, dim[0])
+            for j in range(1, dim[1]+1):
+                j_min = max(1, j-1)
+                j_max = min(j+1, dim[1])
+                for k in range(1, dim[2]+1):
+                    k_min = max(1, k-1)
+                    k_max = min(k+1, dim[2])
+                    val_q3 = q3[i-1, j-1, k-1]
+                    for I2 in range(i_min, i_max+1):
+                        for J2 in range(j_min, j_max+1):
+                            for K2 in range(k_min, k_max+1):
+                                if (I2 == i) & (J2 == j) & (K2 == k):
+                                    continue
                                 else:
-                                    GLCM[val_q3, val_neighbor] += 1
+                                    val_neighbor = q3[I2-1, J2-1, K2-1]
+                                    if dist_correction:
+                                        # Discretization length correction
+                                        GLCM[val_q3, val_neighbor] += \
+                                            np.sqrt(abs(I2-i)+abs(J2-j)+abs(K2-k))
+                                    else:
+                                        GLCM[val_q3, val_neighbor] += 1
 
     GLCM = GLCM[0:-1, 0:-1]
 
@@ -831,16 +842,8 @@ def get_glcm_matrices(vol,
         if dist_weight_norm:
             dist_weight_norm = "euclidean"
 
-    # Get the roi in tabular format
-    img_dims = vol.shape
-    index_id = np.arange(start=0, stop=vol.size)
-    coords = np.unravel_index(indices=index_id, shape=img_dims)
-    df_img = pd.DataFrame({"index_id": index_id,
-                           "g": np.ravel(vol),
-                           "x": coords[0],
-                           "y": coords[1],
-                           "z": coords[2],
-                           "roi_int_mask": np.ravel(np.isfinite(vol))})
+    # Get the roi as an array of grey level indexes
+    levels, img_codes = get_level_codes(vol)
 
     # Iterate over spatial arrangements
     for ii_spatial in glcm_spatial_method:
@@ -851,7 +854,7 @@ def get_glcm_matrices(vol,
             # Perform 2D analysis
             if ii_spatial.lower() in ["2d", "2.5d"]:
                 # Iterate over slices
-                for ii_slice in np.arange(0, img_dims[2]):
+                for ii_slice in np.arange(0, vol.shape[2]):
                     # Get neighbour direction and iterate over neighbours
                     nbrs = get_neighbour_direction(
                         d=1,
@@ -891,7 +894,7 @@ def get_glcm_matrices(vol,
             # Calculate glcm matrices
             for glcm in glcm_list:
                 glcm.calculate_cm_matrix(
-                    df_img=df_img, img_dims=img_dims, dist_weight_norm=dist_weight_norm)
+                    img_codes=img_codes, levels=levels, dist_weight_norm=dist_weight_norm)
 
             # Merge matrices according to the given method
             upd_list = {}
@@ -953,16 +956,8 @@ def get_cm_features(vol,
         if dist_weight_norm:
             dist_weight_norm = "euclidean"
 
-    # Get the roi in tabular format
-    img_dims = vol.shape
-    index_id = np.arange(start=0, stop=vol.size)
-    coords = np.unravel_index(indices=index_id, shape=img_dims)
-    df_img = pd.DataFrame({"index_id": index_id,
-                           "g": np.ravel(vol),
-                           "x": coords[0],
-                           "y": coords[1],
-                           "z": coords[2],
-                           "roi_int_mask": np.ravel(np.isfinite(vol))})
+    # Get the roi as an array of grey level indexes
+    levels, img_codes = get_level_codes(vol)
 
     # Generate an empty feature list
     feat_list = []
@@ -976,7 +971,7 @@ def get_cm_features(vol,
             # Perform 2D analysis
             if ii_spatial.lower() in ["2d", "2.5d"]:
                 # Iterate over slices
-                for ii_slice in np.arange(0, img_dims[2]):
+                for ii_slice in np.arange(0, vol.shape[2]):
                     # Get neighbour direction and iterate over neighbours
                     nbrs = get_neighbour_direction(
                         d=1,
@@ -1016,7 +1011,7 @@ def get_cm_features(vol,
             # Calculate glcm matrices
             for glcm in glcm_list:
                 glcm.calculate_cm_matrix(
-                    df_img=df_img, img_dims=img_dims, dist_weight_norm=dist_weight_norm)
+                    img_codes=img_codes, levels=levels, dist_weight_norm=dist_weight_norm)
 
             # Merge matrices according to the given method
             for merge_method in merge_method:
@@ -1078,11 +1073,12 @@ def combine_matrices(glcm_list: List, merge_method: str, spatial_method: str) ->
         # Find slice_ids
         slice_id = []
         for glcm in glcm_list:
-            slice_id += [glcm.slice]
+            slice_id += [glcm.img_slice]
+        slice_id = np.array(slice_id)
 
         # Iterate over unique slice_ids
         for ii_slice in np.unique(slice_id):
-            slice_glcm_id = np.squeeze(np.where(slice_id == ii_slice))
+            slice_glcm_id = np.flatnonzero(slice_id == ii_slice)
 
             # Select all matrices within the slice
             sel_matrix_list = []
@@ -1102,8 +1098,7 @@ def combine_matrices(glcm_list: List, merge_method: str, spatial_method: str) ->
                                                 n_v=0.0)]
             else:
                 # Merge matrices within the slice
-                merge_cm = pd.concat(sel_matrix_list, axis=0)
-                merge_cm = merge_cm.groupby(by=["i", "j"]).sum().reset_index()
+                merge_cm = np.sum([matrix for matrix in sel_matrix_list if matrix is not None], axis=0)
 
                 # Update the number of voxels within the merged slice
                 merge_n_v = 0.0
@@ -1118,7 +1113,8 @@ def combine_matrices(glcm_list: List, merge_method: str, spatial_method: str) ->
                                                 img_slice=ii_slice,
                                                 merge_method=merge_method,
                                                 matrix=merge_cm,
-                                                n_v=merge_n_v)]
+                                                n_v=merge_n_v,
+                                                levels=glcm_list[0].levels)]
 
     # Merge glcms by direction
     elif merge_method == "dir_merge" and spatial_method == "2.5d":
@@ -1126,10 +1122,11 @@ def combine_matrices(glcm_list: List, merge_method: str, spatial_method: str) ->
         dir_id = []
         for glcm in glcm_list:
             dir_id += [glcm.direction_id]
+        dir_id = np.array(dir_id)
 
         # Iterate over unique directions
         for ii_dir in np.unique(dir_id):
-            dir_glcm_id = np.squeeze(np.where(dir_id == ii_dir))
+            dir_glcm_id = np.flatnonzero(dir_id == ii_dir)
 
             # Select all matrices with the same direction
             sel_matrix_list = []
@@ -1148,8 +1145,7 @@ def combine_matrices(glcm_list: List, merge_method: str, spatial_method: str) ->
                                                 matrix=None, n_v=0.0)]
             else:
                 # Merge matrices with the same direction
-                merge_cm = pd.concat(sel_matrix_list, axis=0)
-                merge_cm = merge_cm.groupby(by=["i", "j"]).sum().reset_index()
+                merge_cm = np.sum([matrix for matrix in sel_matrix_list if matrix is not None], axis=0)
 
                 # Update the number of voxels for the merged matrices with the same direction
                 merge_n_v = 0.0
@@ -1164,7 +1160,8 @@ def combine_matrices(glcm_list: List, merge_method: str, spatial_method: str) ->
                                                 img_slice=None,
                                                 merge_method=merge_method,
                                                 matrix=merge_cm,
-                                                n_v=merge_n_v)]
+                                                n_v=merge_n_v,
+                                                levels=glcm_list[0].levels)]
 
     # Merge all glcms into a single representation
     elif merge_method == "vol_merge" and spatial_method in ["2.5d", "3d"]:
@@ -1186,8 +1183,7 @@ def combine_matrices(glcm_list: List, merge_method: str, spatial_method: str) ->
                                             n_v=0.0)]
         else:
             # Merge co-occurrence matrices
-            merge_cm = pd.concat(sel_matrix_list, axis=0)
-            merge_cm = merge_cm.groupby(by=["i", "j"]).sum().reset_index()
+            merge_cm = np.sum([matrix for matrix in sel_matrix_list if matrix is not None], axis=0)
 
             # Update the number of voxels
             merge_n_v = 0.0
@@ -1202,7 +1198,8 @@ def combine_matrices(glcm_list: List, merge_method: str, spatial_method: str) ->
                                             img_slice=None,
                                             merge_method=merge_method,
                                             matrix=merge_cm,
-                                            n_v=merge_n_v)]
+                                            n_v=merge_n_v,
+                                            levels=glcm_list[0].levels)]
     else:
         use_list = None
 
@@ -1226,9 +1223,10 @@ class CooccurrenceMatrix:
                              ``matrix`` corresponds to a 2d image slice).
         merge_method (str): Method for merging the co-occurrence ``matrix`` with other
                             co-occurrence matrices.
-        matrix (pandas.DataFrame): The actual co-occurrence ``matrix`` in sparse format
-                                   (row, column, count).
+        matrix (ndarray): The actual co-occurrence ``matrix`` in dense format, rows and
+                          columns corresponding to ``levels``.
         n_v (int): The number of voxels in the volume.
+        levels (ndarray): Grey levels corresponding to the rows and columns of the ``matrix``.
     """
 
     def __init__(self,
@@ -1238,8 +1236,9 @@ class CooccurrenceMatrix:
                 spatial_method: str,
                 img_slice: np.ndarray=None,
                 merge_method: str=None,
-                matrix: pd.DataFrame=None,
-                n_v: int=None) -> None:
+                matrix: np.ndarray=None,
+                n_v: int=None,
+                levels: np.ndarray=None) -> None:
         """Constructor of the CooccurrenceMatrix class
 
         Args:
@@ -1252,9 +1251,11 @@ class CooccurrenceMatrix:
                                         co-occurrence ``matrix`` corresponds to a 2d image slice).
             merge_method (str, optional): Method for merging the co-occurrence ``matrix``
                                         with other co-occurrence matrices.
-            matrix (pandas.DataFrame, optional): The actual co-occurrence ``matrix`` in
-                                                sparse format (row, column, count).
+            matrix (ndarray, optional): The actual co-occurrence ``matrix`` in dense
+                                        format (n_g x n_g).
             n_v (int, optional): The number of voxels in the volume.
+            levels (ndarray, optional): Grey levels corresponding to the rows and columns
+                                        of the ``matrix``.
         
         Returns:
             None.
@@ -1274,6 +1275,7 @@ class CooccurrenceMatrix:
         # Place holders
         self.matrix = matrix
         self.n_v = n_v
+        self.levels = levels
 
     def _copy(self):
         """
@@ -1281,76 +1283,66 @@ class CooccurrenceMatrix:
         """
         return deepcopy(self)
 
-    def calculate_cm_matrix(self, df_img: pd.DataFrame, img_dims: np.ndarray, dist_weight_norm: str) -> None:
+    def calculate_cm_matrix(self, img_codes: np.ndarray, levels: np.ndarray, dist_weight_norm: str) -> None:
         """Function that calculates a co-occurrence matrix for the settings provided during
         initialisation and the input image.
 
+        The grey level transitions are read from two shifted views of the image along the
+        direction of the matrix and counted with a single ``np.bincount`` on the ``i*n_g+j`` codes.
+
         Args:
-            df_img (pandas.DataFrame): Data table containing image intensities, x, y and z coordinates,
-                and mask labels corresponding to voxels in the volume.
-            img_dims (ndarray, List[float]): Dimensions of the image volume.
+            img_codes (ndarray): Array of the grey level indexes of the voxels in ``levels``, with -1
+                outside the ROI, as returned by :func:`MEDimage.utils.textureTools.get_level_codes`.
+            levels (ndarray): Grey levels present in the ROI.
             dist_weight_norm (str): Norm for distance weighting. Weighting is only
                 performed if this parameter is either "manhattan", "euclidean" or "chebyshev".
 
         Returns:
-            None. Assigns the created image table (cm matrix) to the `matrix` attribute.
+            None. Assigns the created co-occurrence matrix to the `matrix` attribute.
 
         Raises:
             ValueError:
                 If `self.spatial_method` is not "2d", "2.5d" or "3d".
-                Also, if ``dist_weight_norm`` is not "manhattan", "euclidean" or "chebyshev".
 
         """
+        self.levels = levels
+
         # Check if the roi contains any masked voxels. If this is not the case, don't construct the glcm.
-        if not np.any(df_img.roi_int_mask):
+        if not np.any(img_codes >= 0):
             self.n_v = 0
             self.matrix = None
 
             return None
 
-        # Create local copies of the image table
+        # Select the image and direction
         if self.spatial_method == "3d":
-            df_cm = deepcopy(df_img)
+            codes = img_codes
+            direction = self.direction
         elif self.spatial_method in ["2d", "2.5d"]:
-            df_cm = deepcopy(df_img[df_img.z == self.img_slice])
-            df_cm["index_id"] = np.arange(0, len(df_cm))
-            df_cm["z"] = 0
-            df_cm = df_cm.reset_index(drop=True)
+            codes = img_codes[:, :, self.img_slice]
+            direction = self.direction[0:2]
         else:
             raise ValueError(
                 "The spatial method for grey level co-occurrence matrices should be one of \"2d\", \"2.5d\" or \"3d\".")
 
-        # Set grey level of voxels outside ROI to NaN
-        df_cm.loc[df_cm.roi_int_mask == False, "g"] = np.nan
-
-        # Determine potential transitions
-        df_cm["to_index"] = coord2index(x=df_cm.x.values + self.direction[0],
-                                        y=df_cm.y.values + self.direction[1],
-                                        z=df_cm.z.values + self.direction[2],
-                                        dims=img_dims)
-
-        # Get grey levels from transitions
-        df_cm["to_g"] = get_value(x=df_cm.g.values, index=df_cm.to_index.values)
+        # Determine transitions between voxels of the ROI
+        from_codes, to_codes = get_shifted_views(codes, direction)
+        valid = np.logical_and(from_codes >= 0, to_codes >= 0)
 
         # Check if any transitions exist.
-        if np.all(np.isnan(df_cm[["to_g"]])):
+        if not np.any(valid):
             self.n_v = 0
             self.matrix = None
 
             return None
 
         # Count occurrences of grey level transitions
-        df_cm = df_cm.groupby(by=["g", "to_g"]).size().reset_index(name="n")
-
-        # Append grey level transitions in opposite direction
-        df_cm_inv = pd.DataFrame({"g": df_cm.to_g, "to_g": df_cm.g, "n": df_cm.n})
-        df_cm = df_cm.append(df_cm_inv, ignore_index=True)
-
-        # Sum occurrences of grey level transitions
-        df_cm = df_cm.groupby(by=["g", "to_g"]).sum().reset_index()
+        n_g = np.size(levels)
+        cm = np.bincount(from_codes[valid].astype(np.int64) * n_g + to_codes[valid], minlength=n_g * n_g)
+        cm = np.reshape(cm, (n_g, n_g)).astype(np.float64)
 
-        # Rename columns
-        df_cm.columns = ["i", "j", "n"]
+        # Add grey level transitions in opposite direction
+        cm = cm + cm.T
 
         if dist_weight_norm in ["manhattan", "euclidean", "chebyshev"]:
             if dist_weight_norm == "manhattan":
@@ -1359,13 +1351,69 @@ class CooccurrenceMatrix:
                 weight = np.sqrt(sum(np.power(self.direction, 2.0)))
             elif dist_weight_norm == "chebyshev":
                 weight = np.max(abs(self.direction))
-            df_cm.n /= weight
+            cm /= weight
 
         # Set the number of voxels
-        self.n_v = np.sum(df_cm.n)
+        self.n_v = np.sum(cm)
 
         # Add matrix and number of voxels to object
-        self.matrix = df_cm
+        self.matrix = cm
+
+    def get_cm_arrays(self, intensity_range: np.ndarray) -> Dict:
+        """Computes the probability distributions of the GLCM (joint, marginal, diagonal and
+        cross-diagonal probabilities) and number of gray-levels from the dense ``matrix``.
+
+        Args:
+            intensity_range (ndarray): Range of potential discretised intensities, provided as a list:
+                [minimal discretised intensity, maximal discretised intensity].
+                If one or both values are unknown,replace the respective values with np.nan.
+
+        Returns:
+            Dict: Dict of arrays:
+            - "i", "j", "pij": Grey levels and joint probability of the non-zero elements.
+            - "pi_ij", "pj_ij": Marginal probabilities of the grey levels of each non-zero element.
+            - "gi", "pi", "gj", "pj": Grey levels present in rows (columns) and marginal probabilities.
+            - "k_imj", "pimj": Diagonal probabilities p(i-j).
+            - "k_ipj", "pipj": Cross-diagonal probabilities p(i+j).
+            - "n_g": Number of grey levels.
+        """
+        # Joint probabilities of the non-zero elements
+        p_ij = self.matrix / np.sum(self.matrix)
+        i_idx, j_idx = np.nonzero(p_ij)
+        i = self.levels[i_idx]
+        j = self.levels[j_idx]
+        pij = p_ij[i_idx, j_idx]
+
+        # Marginal probabilities
+        p_i = np.sum(p_ij, axis=1)
+        p_j = np.sum(p_ij, axis=0)
+        sel_i = p_i > 0.0
+        sel_j = p_j > 0.0
+
+        # Diagonal probabilities p(i-j)
+        k_imj, inv_imj = np.unique(np.abs(i - j), return_inverse=True)
+        pimj = np.bincount(inv_imj, weights=pij)
+
+        # Cross-diagonal probabilities p(i+j)
+        k_ipj, inv_ipj = np.unique(i + j, return_inverse=True)
+        pipj = np.bincount(inv_ipj, weights=pij)
+
+        # Constant definitions
+        intensity_range_loc = deepcopy(intensity_range)
+        if np.isnan(intensity_range[0]):
+            intensity_range_loc[0] = np.min(self.levels[sel_i]) * 1.0
+        if np.isnan(intensity_range[1]):
+            intensity_range_loc[1] = np.max(self.levels[sel_i]) * 1.0
+        # Number of grey levels
+        n_g = intensity_range_loc[1] - intensity_range_loc[0] + 1.0
+
+        return {"i": i, "j": j, "pij": pij, "n": self.matrix[i_idx, j_idx],
+                "pi_ij": p_i[i_idx], "pj_ij": p_j[j_idx],
+                "gi": self.levels[sel_i], "pi": p_i[sel_i],
+                "gj": self.levels[sel_j], "pj": p_j[sel_j],
+                "k_imj": k_imj, "pimj": pimj,
+                "k_ipj": k_ipj, "pipj": pipj,
+                "n_g": n_g}
 
     def get_cm_data(self, intensity_range: np.ndarray):
         """Computes the probability distribution for the elements of the GLCM
@@ -1383,39 +1431,24 @@ class CooccurrenceMatrix:
             - Cross-diagonal probabilty
             - Number of gray levels
         """
+        cm = self.get_cm_arrays(intensity_range)
+
         # Occurrence data frames
-        df_pij = deepcopy(self.matrix)
-        df_pij["pij"] = df_pij.n / sum(df_pij.n)
-        df_pi = df_pij.groupby(by="i")["pij"].agg(np.sum).reset_index().rename(columns={"pij": "pi"})
-        df_pj = df_pij.groupby(by="j")["pij"].agg(np.sum).reset_index().rename(columns={"pij": "pj"})
+        df_pij = pd.DataFrame({"i": cm["i"], "j": cm["j"], "n": cm["n"], "pij": cm["pij"],
+                               "pi": cm["pi_ij"], "pj": cm["pj_ij"]})
+        df_pi = pd.DataFrame({"i": cm["gi"], "pi": cm["pi"]})
+        df_pj = pd.DataFrame({"j": cm["gj"], "pj": cm["pj"]})
 
         # Diagonal probilities p(i-j)
-        df_pimj = deepcopy(df_pij)
-        df_pimj["k"] = np.abs(df_pimj.i - df_pimj.j)
-        df_pimj = df_pimj.groupby(by="k")["pij"].agg(np.sum).reset_index().rename(columns={"pij": "pimj"})
+        df_pimj = pd.DataFrame({"k": cm["k_imj"], "pimj": cm["pimj"]})
 
         # Cross-diagonal probabilities p(i+j)
-        df_pipj = deepcopy(df_pij)
-        df_pipj["k"] = df_pipj.i + df_pipj.j
-        df_pipj = df_pipj.groupby(by="k")["pij"].agg(np.sum).reset_index().rename(columns={"pij": "pipj"})
+        df_pipj = pd.DataFrame({"k": cm["k_ipj"], "pipj": cm["pipj"]})
 
-        # Merger of df.p_ij, df.p_i and df.p_j
-        df_pij = pd.merge(df_pij, df_pi, on="i")
-        df_pij = pd.merge(df_pij, df_pj, on="j")
-
-        # Constant definitions
-        intensity_range_loc = deepcopy(intensity_range)
-        if np.isnan(intensity_range[0]):
-            intensity_range_loc[0] = np.min(df_pi.i) * 1.0
-        if np.isnan(intensity_range[1]):
-            intensity_range_loc[1] = np.max(df_pi.i) * 1.0
-        # Number of grey levels
-        n_g = intensity_range_loc[1] - intensity_range_loc[0] + 1.0
-
-        return df_pij, df_pi, df_pj, df_pimj, df_pipj, n_g
+        return df_pij, df_pi, df_pj, df_pimj, df_pipj, cm["n_g"]
 
     def calculate_cm_features(self, intensity_range: np.ndarray) -> pd.DataFrame:
-        """Wrapper to json.dump function.
+        """Computes the co-occurrence matrix features.
 
         Args:
             intensity_range (np.ndarray): Range of potential discretised intensities, 
@@ -1443,128 +1476,130 @@ class CooccurrenceMatrix:
             # Update names
             #df_feat.columns += self._parse_names()
             return df_feat
-        elif len(self.matrix) == 0:
+        elif np.sum(self.matrix) == 0:
             # Update names
             #df_feat.columns += self._parse_names()
             return df_feat
 
-        df_pij, df_pi, df_pj, df_pimj, df_pipj, n_g = self.get_cm_data(intensity_range)
+        cm = self.get_cm_arrays(intensity_range)
+        i, j, pij = cm["i"], cm["j"], cm["pij"]
+        gi, pi, pj = cm["gi"], cm["pi"], cm["pj"]
+        k_imj, pimj = cm["k_imj"], cm["pimj"]
+        k_ipj, pipj = cm["k_ipj"], cm["pipj"]
+        n_g = cm["n_g"]
 
         ###############################################
         ######           glcm features           ######
         ###############################################
         # Joint maximum
-        df_feat.loc[0, "Fcm_joint_max"] = np.max(df_pij.pij)
+        df_feat.loc[0, "Fcm_joint_max"] = np.max(pij)
 
         # Joint average
-        df_feat.loc[0, "Fcm_joint_avg"] = np.sum(df_pij.i * df_pij.pij)
+        df_feat.loc[0, "Fcm_joint_avg"] = np.sum(i * pij)
 
         # Joint variance
-        m_u = np.sum(df_pij.i * df_pij.pij)
-        df_feat.loc[0, "Fcm_joint_var"] = np.sum((df_pij.i - m_u) ** 2.0 * df_pij.pij)
+        m_u = np.sum(i * pij)
+        df_feat.loc[0, "Fcm_joint_var"] = np.sum((i - m_u) ** 2.0 * pij)
 
         # Joint entropy
-        df_feat.loc[0, "Fcm_joint_entr"] = -np.sum(df_pij.pij * np.log2(df_pij.pij))
+        df_feat.loc[0, "Fcm_joint_entr"] = -np.sum(pij * np.log2(pij))
 
         # Difference average
-        df_feat.loc[0, "Fcm_diff_avg"] = np.sum(df_pimj.k * df_pimj.pimj)
+        df_feat.loc[0, "Fcm_diff_avg"] = np.sum(k_imj * pimj)
 
         # Difference variance
-        m_u = np.sum(df_pimj.k * df_pimj.pimj)
-        df_feat.loc[0, "Fcm_diff_var"] = np.sum((df_pimj.k - m_u) ** 2.0 * df_pimj.pimj)
+        m_u = np.sum(k_imj * pimj)
+        df_feat.loc[0, "Fcm_diff_var"] = np.sum((k_imj - m_u) ** 2.0 * pimj)
 
         # Difference entropy
-        df_feat.loc[0, "Fcm_diff_entr"] = -np.sum(df_pimj.pimj * np.log2(df_pimj.pimj))
+        df_feat.loc[0, "Fcm_diff_entr"] = -np.sum(pimj * np.log2(pimj))
 
         # Sum average
-        df_feat.loc[0, "Fcm_sum_avg"] = np.sum(df_pipj.k * df_pipj.pipj)
+        df_feat.loc[0, "Fcm_sum_avg"] = np.sum(k_ipj * pipj)
 
         # Sum variance
-        m_u = np.sum(df_pipj.k * df_pipj.pipj)
-        df_feat.loc[0, "Fcm_sum_var"] = np.sum((df_pipj.k - m_u) ** 2.0 * df_pipj.pipj)
+        m_u = np.sum(k_ipj * pipj)
+        df_feat.loc[0, "Fcm_sum_var"] = np.sum((k_ipj - m_u) ** 2.0 * pipj)
 
         # Sum entropy
-        df_feat.loc[0, "Fcm_sum_entr"] = -np.sum(df_pipj.pipj * np.log2(df_pipj.pipj))
+        df_feat.loc[0, "Fcm_sum_entr"] = -np.sum(pipj * np.log2(pipj))
 
         # Angular second moment
-        df_feat.loc[0, "Fcm_energy"] = np.sum(df_pij.pij ** 2.0)
+        df_feat.loc[0, "Fcm_energy"] = np.sum(pij ** 2.0)
 
         # Contrast
-        df_feat.loc[0, "Fcm_contrast"] = np.sum((df_pij.i - df_pij.j) ** 2.0 * df_pij.pij)
+        df_feat.loc[0, "Fcm_contrast"] = np.sum((i - j) ** 2.0 * pij)
 
         # Dissimilarity
-        df_feat.loc[0, "Fcm_dissimilarity"] = np.sum(np.abs(df_pij.i - df_pij.j) * df_pij.pij)
+        df_feat.loc[0, "Fcm_dissimilarity"] = np.sum(np.abs(i - j) * pij)
 
         # Inverse difference
-        df_feat.loc[0, "Fcm_inv_diff"] = np.sum(df_pij.pij / (1.0 + np.abs(df_pij.i - df_pij.j)))
+        df_feat.loc[0, "Fcm_inv_diff"] = np.sum(pij / (1.0 + np.abs(i - j)))
 
         # Inverse difference normalised
-        df_feat.loc[0, "Fcm_inv_diff_norm"] = np.sum(df_pij.pij / (1.0 + np.abs(df_pij.i - df_pij.j) / n_g))
+        df_feat.loc[0, "Fcm_inv_diff_norm"] = np.sum(pij / (1.0 + np.abs(i - j) / n_g))
 
         # Inverse difference moment
-        df_feat.loc[0, "Fcm_inv_diff_mom"] = np.sum(df_pij.pij / (1.0 + (df_pij.i - df_pij.j) ** 2.0))
+        df_feat.loc[0, "Fcm_inv_diff_mom"] = np.sum(pij / (1.0 + (i - j) ** 2.0))
 
         # Inverse difference moment normalised
-        df_feat.loc[0, "Fcm_inv_diff_mom_norm"] = np.sum(df_pij.pij / (1.0 + (df_pij.i - df_pij.j)
-                                                  ** 2.0 / n_g ** 2.0))
+        df_feat.loc[0, "Fcm_inv_diff_mom_norm"] = np.sum(pij / (1.0 + (i - j) ** 2.0 / n_g ** 2.0))
 
         # Inverse variance
-        df_sel = df_pij[df_pij.i != df_pij.j]
-        df_feat.loc[0, "Fcm_inv_var"] = np.sum(df_sel.pij / (df_sel.i - df_sel.j) ** 2.0)
-        del df_sel
+        sel = i != j
+        df_feat.loc[0, "Fcm_inv_var"] = np.sum(pij[sel] / (i[sel] - j[sel]) ** 2.0)
+        del sel
 
         # Correlation
-        mu_marg = np.sum(df_pi.i * df_pi.pi)
-        var_marg = np.sum((df_pi.i - mu_marg) ** 2.0 * df_pi.pi)
+        mu_marg = np.sum(gi * pi)
+        var_marg = np.sum((gi - mu_marg) ** 2.0 * pi)
 
         if var_marg == 0.0:
             df_feat.loc[0, "Fcm_corr"] = 1.0
         else:
-            df_feat.loc[0, "Fcm_corr"] = 1.0 / var_marg * (np.sum(df_pij.i * df_pij.j * df_pij.pij) - mu_marg ** 2.0)
+            df_feat.loc[0, "Fcm_corr"] = 1.0 / var_marg * (np.sum(i * j * pij) - mu_marg ** 2.0)
 
         del mu_marg, var_marg
 
         # Autocorrelation
-        df_feat.loc[0, "Fcm_auto_corr"] = np.sum(df_pij.i * df_pij.j * df_pij.pij)
+        df_feat.loc[0, "Fcm_auto_corr"] = np.sum(i * j * pij)
 
         # Information correlation 1
-        hxy = -np.sum(df_pij.pij * np.log2(df_pij.pij))
-        hxy_1 = -np.sum(df_pij.pij * np.log2(df_pij.pi * df_pij.pj))
-        hx = -np.sum(df_pi.pi * np.log2(df_pi.pi))
-        if len(df_pij) == 1 or hx == 0.0:
+        hxy = -np.sum(pij * np.log2(pij))
+        hxy_1 = -np.sum(pij * np.log2(cm["pi_ij"] * cm["pj_ij"]))
+        hx = -np.sum(pi * np.log2(pi))
+        if np.size(pij) == 1 or hx == 0.0:
             df_feat.loc[0, "Fcm_info_corr1"] = 1.0
         else:
             df_feat.loc[0, "Fcm_info_corr1"] = (hxy - hxy_1) / hx
         del hxy, hxy_1, hx
 
         # Information correlation 2 - Note: iteration over combinations of i and j
-        hxy = - np.sum(df_pij.pij * np.log2(df_pij.pij))
-        hxy_2 = - np.sum(
-                        np.tile(df_pi.pi, len(df_pj)) * np.repeat(df_pj.pj, len(df_pi)) * \
-                        np.log2(np.tile(df_pi.pi, len(df_pj)) * np.repeat(df_pj.pj, len(df_pi)))
-                        )
+        hxy = - np.sum(pij * np.log2(pij))
+        pi_pj = np.outer(pj, pi)
+        hxy_2 = - np.sum(pi_pj * np.log2(pi_pj))
 
         if hxy_2 < hxy:
             df_feat.loc[0, "Fcm_info_corr2"] = 0
         else:
             df_feat.loc[0, "Fcm_info_corr2"] = np.sqrt(1 - np.exp(-2.0 * (hxy_2 - hxy)))
-        del hxy, hxy_2
+        del hxy, hxy_2, pi_pj
 
         # Cluster tendency
-        m_u = np.sum(df_pi.i * df_pi.pi)
-        df_feat.loc[0, "Fcm_clust_tend"] = np.sum((df_pij.i + df_pij.j - 2 * m_u) ** 2.0 * df_pij.pij)
+        m_u = np.sum(gi * pi)
+        df_feat.loc[0, "Fcm_clust_tend"] = np.sum((i + j - 2 * m_u) ** 2.0 * pij)
         del m_u
 
         # Cluster shade
-        m_u = np.sum(df_pi.i * df_pi.pi)
-        df_feat.loc[0, "Fcm_clust_shade"] = np.sum((df_pij.i + df_pij.j - 2 * m_u) ** 3.0 * df_pij.pij)
+        m_u = np.sum(gi * pi)
+        df_feat.loc[0, "Fcm_clust_shade"] = np.sum((i + j - 2 * m_u) ** 3.0 * pij)
         del m_u
 
         # Cluster prominence
-        m_u = np.sum(df_pi.i * df_pi.pi)
-        df_feat.loc[0, "Fcm_clust_prom"] = np.sum((df_pij.i + df_pij.j - 2 * m_u) ** 4.0 * df_pij.pij)
+        m_u = np.sum(gi * pi)
+        df_feat.loc[0, "Fcm_clust_prom"] = np.sum((i + j - 2 * m_u) ** 4.0 * pij)
 
-        del df_pi, df_pj, df_pij, df_pimj, df_pipj, n_g
+        del cm, i, j, pij, gi, pi, pj, k_imj, pimj, k_ipj, pipj, n_g
 
         # Update names
         # df_feat.columns += self._parse_names()
@@ -2,16 +2,18 @@
 # -*- coding: utf-8 -*-
 
 
-from typing import Dict, List, Union
+from typing import Dict, List, Tuple, Union
 
 import numpy as np
 import scipy.ndimage as sc
-import skimage.measure as skim
+
+from ..biomarkers.utils import get_zones
 
 
 def get_matrix(roi_only_int: np.ndarray,
                      mask: np.ndarray,
-                     levels: Union[np.ndarray, List]) -> np.ndarray:
+                     levels: Union[np.ndarray, List],
+                     zones: Tuple[np.ndarray, np.ndarray] = None) -> np.ndarray:
     r"""
     Computes Grey level distance zone matrix.
     This matrix refers to "Grey level distance zone based features" (ID = VMDZ)  
@@ -24,6 +26,9 @@ def get_matrix(roi_only_int: np.ndarray,
         mask (ndarray): Morphological ROI ``mask``.
         levels (ndarray or List): Vector containing the quantized gray-levels
                                   in the tumor region (or reconstruction ``levels`` of quantization).
+        zones (Tuple[np.ndarray, np.ndarray], optional): Zone labels and zone gray-levels of
+            ``roi_only_int``, as returned by :func:`MEDimage.biomarkers.utils.get_zones`. Allows to share
+            a single labelling pass with the GLSZM. Computed if not given.
 
     Returns:
         ndarray: Grey level distance zone Matrix.
@@ -36,8 +41,7 @@ def get_matrix(roi_only_int: np.ndarray,
 
     """
 
-    roi_only_int = roi_only_int.copy()
-    levels = levels.copy().astype("int")
+    levels = np.asarray(levels).astype("int")
     morph_voxel_grid = mask.copy().astype(np.uint8)
 
     # COMPUTATION OF DISTANCE MAP
@@ -59,23 +63,24 @@ def get_matrix(roi_only_int: np.ndarray,
     # INITIALIZATION
     # Since levels is always defined as 1,2,3,4,...,max(quantized Volume)
     n_g = np.size(levels)
-    level_temp = np.max(levels) + 1
-    roi_only_int[np.isnan(roi_only_int)] = level_temp
     # Since the ROI morph always encompasses ROI int,
     # using the mask as defined from ROI morph does not matter since
     # we want to find the maximal possible distance.
     dist_init = np.max(dist_map[morph_voxel_grid == 1])
-    gldzm = np.zeros((n_g,dist_init))
+
+    # SINGLE-PASS LABELLING OF THE ZONES OF ALL GRAY-LEVELS
+    if zones is None:
+        zones = get_zones(roi_only_int, levels)
+    conn_objects, zone_levels = zones
+    n_zone = np.size(zone_levels)
 
     # COMPUTATION OF gldzm
-    temp = roi_only_int.copy().astype('int')
-    for i in range(1,n_g+1):
-        temp[roi_only_int!=levels[i-1]] = 0
-        temp[roi_only_int==levels[i-1]] = 1
-        conn_objects, n_zone = skim.label(temp,return_num = True)
-        for j in range(1,n_zone+1):
-            col = np.min(dist_map[conn_objects==j]).astype("int")
-            gldzm[i-1,col-1] = gldzm[i-1,col-1] + 1
+    # Minimal distance to the ROI edge of each zone, in a single reduction
+    zone_dists = sc.minimum(dist_map, labels=conn_objects, index=np.arange(1, n_zone+1))
+    zone_dists = np.asarray(zone_dists).astype("int")
+    gldzm = np.bincount(zone_levels * dist_init + zone_dists - 1,
+                        minlength=n_g * dist_init).astype(np.float64)
+    gldzm = np.reshape(gldzm, (n_g, dist_init))
 
     # REMOVE UNECESSARY COLUMNS
     stop = np.nonzero(np.sum(gldzm,0))[0][-1]
@@ -85,7 +90,8 @@ def get_matrix(roi_only_int: np.ndarray,
 
 def extract_all(vol_int: np.ndarray,
                 mask_morph: np.ndarray,
-                gldzm: np.ndarray = None) -> Dict:
+                gldzm: np.ndarray = None,
+                zones: Tuple[np.ndarray, np.ndarray] = None) -> Dict:
     """Computes gldzm features.
     This feature refers to "Grey level distance zone based features" (ID = VMDZ)  
     in the `IBSI1 reference manual <https://arxiv.org/pdf/1612.07003.pdf>`__.
@@ -95,6 +101,8 @@ def extract_all(vol_int: np.ndarray,
         with NaNs outside the region of interest.
         mask_morph (np.ndarray): Morphological ROI mask.
         gldzm (np.ndarray, optional): array of the gray level distance zone matrix. Defaults to None.
+        zones (Tuple[np.ndarray, np.ndarray], optional): Zone labels and zone gray-levels of ``vol_int``,
+            as returned by :func:`MEDimage.biomarkers.utils.get_zones`. Defaults to None.
 
     Returns:
         Dict: dict of ``gldzm`` features
@@ -121,7 +129,7 @@ def extract_all(vol_int: np.ndarray,
 
     # GET THE gldzm MATRIX
     if gldzm is None:
-        gldzm = get_matrix(vol_int, mask_morph, levels)
+        gldzm = get_matrix(vol_int, mask_morph, levels, zones)
     n_s = np.sum(gldzm)
     gldzm = gldzm / np.sum(gldzm)  # Normalization of gldzm
     s_z = np.shape(gldzm)  # Size of gldzm
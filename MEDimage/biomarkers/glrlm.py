@@ -8,8 +8,8 @@ from typing import Dict, List, Union
 import numpy as np
 import pandas as pd
 
-from ..utils.textureTools import (coord2index, get_neighbour_direction,
-                                  is_list_all_none)
+from ..utils.textureTools import (get_level_codes, get_neighbour_direction,
+                                  get_runs, is_list_all_none)
 
 
 def extract_all(vol: np.ndarray,
@@ -92,16 +92,8 @@ def get_rlm_features(vol: np.ndarray,
         if dist_weight_norm:
             dist_weight_norm = "euclidean"
 
-    # Get the roi in tabular format
-    img_dims = vol.shape
-    index_id = np.arange(start=0, stop=vol.size)
-    coords = np.unravel_index(indices=index_id, shape=img_dims)  # Convert flat index into coordinate
-    df_img = pd.DataFrame({"index_id": index_id,
-                           "g": np.ravel(vol),
-                           "x": coords[0],
-                           "y": coords[1],
-                           "z": coords[2],
-                           "roi_int_mask": np.ravel(np.isfinite(vol))})
+    # Get the grey level index of each voxel of the roi
+    levels, img_codes = get_level_codes(vol)
 
     # Generate an empty feature list
     feat_list = []
@@ -114,7 +106,7 @@ def get_rlm_features(vol: np.ndarray,
         # Perform 2D analysis
         if ii_spatial.lower() in ["2d", "2.5d"]:
             # Iterate over slices
-            for ii_slice in np.arange(0, img_dims[2]):
+            for ii_slice in np.arange(0, vol.shape[2]):
                 # Get neighbour direction and iterate over neighbours
                 nbrs = get_neighbour_direction(d=1, 
                                                distance="chebyshev",
@@ -146,8 +138,8 @@ def get_rlm_features(vol: np.ndarray,
 
         # Calculate run length matrices
         for rlm in rlm_list:
-            rlm.calculate_rlm_matrix(df_img=df_img, 
-                                     img_dims=img_dims, 
+            rlm.calculate_rlm_matrix(img_codes=img_codes,
+                                     levels=levels,
                                      dist_weight_norm=dist_weight_norm)
 
         # Merge matrices according to the given method
@@ -208,16 +200,8 @@ def get_matrix(vol: np.ndarray,
         if dist_weight_norm:
             dist_weight_norm = "euclidean"
 
-    # Get the roi in tabular format
-    img_dims = vol.shape
-    index_id = np.arange(start=0, stop=vol.size)
-    coords = np.unravel_index(indices=index_id, shape=img_dims)  # Convert flat index into coordinate
-    df_img = pd.DataFrame({"index_id": index_id,
-                           "g": np.ravel(vol),
-                           "x": coords[0],
-                           "y": coords[1],
-                           "z": coords[2],
-                           "roi_int_mask": np.ravel(np.isfinite(vol))})
+    # Get the grey level index of each voxel of the roi
+    levels, img_codes = get_level_codes(vol)
 
     # Iterate over spatial arrangements
     for ii_spatial in glrlm_spatial_method:
@@ -227,7 +211,7 @@ def get_matrix(vol: np.ndarray,
         # Perform 2D analysis
         if ii_spatial.lower() in ["2d", "2.5d"]:
             # Iterate over slices
-            for ii_slice in np.arange(0, img_dims[2]):
+            for ii_slice in np.arange(0, vol.shape[2]):
                 # Get neighbour direction and iterate over neighbours
                 nbrs = get_neighbour_direction(d=1,
                                                distance="chebyshev",
@@ -259,8 +243,8 @@ def get_matrix(vol: np.ndarray,
 
         # Calculate run length matrices
         for rlm in rlm_list:
-            rlm.calculate_rlm_matrix(df_img=df_img,
-                                     img_dims=img_dims,
+            rlm.calculate_rlm_matrix(img_codes=img_codes,
+                                     levels=levels,
                                      dist_weight_norm=dist_weight_norm)
 
         # Merge matrices according to the given method
@@ -310,11 +294,11 @@ def combine_rlm_matrices(rlm_list: list,
         # Find slice_ids
         slice_id = []
         for rlm in rlm_list:
-            slice_id += [rlm.slice]
+            slice_id += [rlm.img_slice]
 
         # Iterate over unique slice_ids
         for ii_slice in np.unique(slice_id):
-            slice_rlm_id = np.squeeze(np.where(slice_id == ii_slice))
+            slice_rlm_id = np.flatnonzero(np.array(slice_id) == ii_slice)
 
             # Select all matrices within the slice
             sel_matrix_list = []
@@ -333,8 +317,7 @@ def combine_rlm_matrices(rlm_list: list,
                                              n_v=0.0)]
             else:
                 # Merge matrices within the slice
-                merge_rlm = pd.concat(sel_matrix_list, axis=0)
-                merge_rlm = merge_rlm.groupby(by=["i", "r"]).sum().reset_index()
+                merge_rlm = sum_rlm_matrices(sel_matrix_list)
 
                 # Update the number of voxels within the merged slice
                 merge_n_v = 0.0
@@ -348,7 +331,8 @@ def combine_rlm_matrices(rlm_list: list,
                                              img_slice=ii_slice,
                                              merge_method=merge_method,
                                              matrix=merge_rlm,
-                                             n_v=merge_n_v)]
+                                             n_v=merge_n_v,
+                                             levels=rlm_list[0].levels)]
 
     # Merge rlms within each slice
     elif merge_method == "dir_merge" and spatial_method == "2.5d":
@@ -359,7 +343,7 @@ def combine_rlm_matrices(rlm_list: list,
 
         # Iterate over unique dir_ids
         for ii_dir in np.unique(dir_id):
-            dir_rlm_id = np.squeeze(np.where(dir_id == ii_dir))
+            dir_rlm_id = np.flatnonzero(np.array(dir_id) == ii_dir)
 
             # Select all matrices with the same direction
             sel_matrix_list = []
@@ -378,8 +362,7 @@ def combine_rlm_matrices(rlm_list: list,
                                              n_v=0.0)]
             else:
                 # Merge matrices with the same direction
-                merge_rlm = pd.concat(sel_matrix_list, axis=0)
-                merge_rlm = merge_rlm.groupby(by=["i", "r"]).sum().reset_index()
+                merge_rlm = sum_rlm_matrices(sel_matrix_list)
 
                 # Update the number of voxels within the merged slice
                 merge_n_v = 0.0
@@ -393,7 +376,8 @@ def combine_rlm_matrices(rlm_list: list,
                                              img_slice=None,
                                              merge_method=merge_method,
                                              matrix=merge_rlm,
-                                             n_v=merge_n_v)]
+                                             n_v=merge_n_v,
+                                             levels=rlm_list[0].levels)]
 
     # Merge all rlms into a single representation
     elif merge_method == "vol_merge" and spatial_method in ["2.5d", "3d"]:
@@ -414,8 +398,7 @@ def combine_rlm_matrices(rlm_list: list,
                                          n_v=0.0)]
         else:
             # Merge run length matrices
-            merge_rlm = pd.concat(sel_matrix_list, axis=0)
-            merge_rlm = merge_rlm.groupby(by=["i", "r"]).sum().reset_index()
+            merge_rlm = sum_rlm_matrices(sel_matrix_list)
 
             # Update the number of voxels
             merge_n_v = 0.0
@@ -429,7 +412,8 @@ def combine_rlm_matrices(rlm_list: list,
                                          img_slice=None,
                                          merge_method=merge_method,
                                          matrix=merge_rlm,
-                                         n_v=merge_n_v)]
+                                         n_v=merge_n_v,
+                                         levels=rlm_list[0].levels)]
 
     else:
         use_list = None
@@ -437,6 +421,24 @@ def combine_rlm_matrices(rlm_list: list,
     # Return to new rlm list to calling function
     return use_list
 
+def sum_rlm_matrices(matrix_list: List) -> np.ndarray:
+    """Sums dense run length matrices, which may be truncated at different maximal run lengths.
+
+    Args:
+        matrix_list (List): List of run length matrices (ndarray of shape (n_g, max run length)).
+            None elements are ignored.
+
+    Returns:
+        ndarray: Sum of the run length matrices, padded to the longest maximal run length.
+    """
+    matrix_list = [matrix for matrix in matrix_list if matrix is not None]
+    n_r = max(np.shape(matrix)[1] for matrix in matrix_list)
+    merge_rlm = np.zeros((np.shape(matrix_list[0])[0], n_r))
+    for matrix in matrix_list:
+        merge_rlm[:, 0:np.shape(matrix)[1]] += matrix
+
+    return merge_rlm
+
 class RunLengthMatrix:
     """Class that contains a single run length matrix.
 
@@ -453,9 +455,10 @@ class RunLengthMatrix:
                                        co-occurrence matrix corresponds to a 2d image slice).
         merge_method (str, optional): Method for merging the co-occurrence matrix
                                       with other co-occurrence matrices.
-        matrix (pandas.DataFrame, optional): The actual co-occurrence matrix in
-                                             sparse format (row, column, count).
+        matrix (ndarray, optional): The actual run length matrix in dense format, with rows
+                                    corresponding to ``levels`` and columns to run lengths 1, 2, ...
         n_v (int, optional): The number of voxels in the volume.
+        levels (ndarray, optional): Grey levels corresponding to the rows of the ``matrix``.
 
     Attributes:
         direction (ndarray): Direction along which neighbouring voxels are found.
@@ -466,9 +469,10 @@ class RunLengthMatrix:
                              matrix corresponds to a 2d image slice).
         merge_method (str): Method for merging the co-occurrence matrix with other
                             co-occurrence matrices.
-        matrix (pandas.DataFrame): The actual co-occurrence matrix in sparse format
-                                   (row, column, count).
+        matrix (ndarray): The actual run length matrix in dense format, with rows
+                          corresponding to ``levels`` and columns to run lengths 1, 2, ...
         n_v (int): The number of voxels in the volume.
+        levels (ndarray): Grey levels corresponding to the rows of the ``matrix``.
     """
 
     def __init__(self,
@@ -477,8 +481,9 @@ class RunLengthMatrix:
                  spatial_method: str,
                  img_slice: np.ndarray=None,
                  merge_method: str=None,
-                 matrix: pd.DataFrame=None,
-                 n_v: int=None) -> None:
+                 matrix: np.ndarray=None,
+                 n_v: int=None,
+                 levels: np.ndarray=None) -> None:
         """
         Initialising function for a new run length matrix
         """
@@ -495,6 +500,7 @@ class RunLengthMatrix:
         self.merge_method = merge_method
         self.matrix = matrix
         self.n_v = n_v
+        self.levels = levels
 
     def _copy(self):
         """Returns a copy of the RunLengthMatrix object."""
@@ -507,103 +513,63 @@ class RunLengthMatrix:
         self.matrix = None
 
     def calculate_rlm_matrix(self,
-                             df_img: pd.DataFrame,
-                             img_dims: np.ndarray,
+                             img_codes: np.ndarray,
+                             levels: np.ndarray,
                              dist_weight_norm: str) -> None:
         """Function that calculates a run length matrix for the settings provided
         during initialisation and the input image.
 
+        The runs are found along every line of the image in the direction of the matrix at once
+        (see :func:`MEDimage.utils.textureTools.get_runs`) and counted with a single ``np.bincount``.
+
         Args:
-            df_img (pandas.DataFrame): Data table containing image intensities, x, y and z coordinates,
-                                       and mask labels corresponding to voxels in the volume.
-            img_dims (ndarray, List[float]): Dimensions of the image volume.
+            img_codes (ndarray): Array of the grey level indexes of the voxels in ``levels``, with -1
+                outside the ROI, as returned by :func:`MEDimage.utils.textureTools.get_level_codes`.
+            levels (ndarray): Grey levels present in the ROI.
             dist_weight_norm (str): Norm for distance weighting. Weighting is only
                                     performed if this parameter is either "manhattan", "euclidean" or "chebyshev".
 
         Returns:
-            None. Assigns the created image table (rlm matrix) to the `matrix` attribute.
-        
+            None. Assigns the created run length matrix to the `matrix` attribute.
+
         Raises:
             ValueError:
                 If `self.spatial_method` is not "2d", "2.5d" or "3d".
-                Also, if ``dist_weight_norm`` is not "manhattan", "euclidean" or "chebyshev".
         """
-        # Check if the df_img actually exists
-        if df_img is None:
-            self._set_empty()
-            return
+        self.levels = levels
 
         # Check if the roi contains any masked voxels. If this is not the case, don't construct the glrlm.
-        if not np.any(df_img.roi_int_mask):
+        if img_codes is None or not np.any(img_codes >= 0):
             self._set_empty()
             return
 
-        # Create local copies of the image table
+        # Select the image and direction
         if self.spatial_method == "3d":
-            df_rlm = deepcopy(df_img)
+            codes = img_codes
+            direction = self.direction
         elif self.spatial_method in ["2d", "2.5d"]:
-            df_rlm = deepcopy(df_img[df_img.z == self.img_slice])
-            df_rlm["index_id"] = np.arange(0, len(df_rlm))
-            df_rlm["z"] = 0
-            df_rlm = df_rlm.reset_index(drop=True)
+            codes = img_codes[:, :, self.img_slice]
+            direction = self.direction[0:2]
         else:
             raise ValueError("The spatial method for grey level run length matrices \
                               should be one of \"2d\", \"2.5d\" or \"3d\".")
 
-        # Set grey level of voxels outside ROI to NaN
-        df_rlm.loc[df_rlm.roi_int_mask == False, "g"] = np.nan
-
         # Set the number of voxels
-        self.n_v = np.sum(df_rlm.roi_int_mask.values)
+        self.n_v = np.sum(codes >= 0)
 
-        # Determine update index number for direction
-        if (self.direction[2] + self.direction[1] * img_dims[2] + self.direction[0] * img_dims[2] * img_dims[1]) >= 0:
-            curr_dir = self.direction
-        else:
-            curr_dir = - self.direction
-
-        # Step size
-        ind_update = curr_dir[2] + curr_dir[1] * img_dims[2] + curr_dir[0] * img_dims[2] * img_dims[1]
-
-        # Generate information concerning segments
-        n_seg = ind_update  # Number of segments
-
-        # Check if the number of segments is greater than one
-        if n_seg == 0:
+        # Check if the image and direction contain any run
+        if self.n_v == 0 or not np.any(direction):
             self._set_empty()
             return
 
-        seg_len = (len(df_rlm) - 1) // ind_update + 1  # Nominal segment length
-        trans_seg_len = np.tile([seg_len - 1], reps=n_seg)  # Initial segment length for transitions (nominal length-1)
-        full_len_trans = n_seg - n_seg*seg_len + len(df_rlm)  # Number of full segments
-        trans_seg_len[0:full_len_trans] += 1  # Update full segments
-
-        # Create transition vector
-        trans_vec = np.tile(np.arange(start=0, stop=len(df_rlm), step=ind_update), reps=ind_update)
-        trans_vec += np.repeat(np.arange(start=0, stop=n_seg), repeats=seg_len)
-        trans_vec = trans_vec[trans_vec < len(df_rlm)]
-
-        # Determine valid transitions
-        to_index = coord2index(x=df_rlm.x.values + curr_dir[0],
-                               y=df_rlm.y.values + curr_dir[1],
-                               z=df_rlm.z.values + curr_dir[2],
-                               dims=img_dims)
-
-        # Determine which transitions are valid
-        end_ind = np.nonzero(to_index[trans_vec] < 0)[0]  # Find transitions that form an endpoints
+        # Run-length encode the lines of the image along the direction
+        run_codes, run_lengths = get_runs(codes, direction)
 
-        # Get an interspersed array of intensities. Runs are broken up by np.nan
-        intensities = np.insert(df_rlm.g.values[trans_vec], end_ind + 1, np.nan)
-
-        # Determine run length start and end indices
-        rle_end = np.array(np.append(np.where(intensities[1:] != intensities[:-1]), len(intensities) - 1))
-        rle_start = np.cumsum(np.append(0, np.diff(np.append(-1, rle_end))))[:-1]
-
-        # Generate dataframe
-        df_rltable = pd.DataFrame({"i": intensities[rle_start],
-                                   "r": rle_end - rle_start + 1})
-        df_rltable = df_rltable.loc[~np.isnan(df_rltable.i), :]
-        df_rltable = df_rltable.groupby(by=["i", "r"]).size().reset_index(name="n")
+        # Count the runs of each grey level and length
+        n_g = np.size(levels)
+        n_r = np.max(run_lengths)
+        rlm = np.bincount(run_codes * n_r + run_lengths - 1, minlength=n_g * n_r)
+        rlm = np.reshape(rlm, (n_g, n_r)).astype(np.float64)
 
         if dist_weight_norm in ["manhattan", "euclidean", "chebyshev"]:
             if dist_weight_norm == "manhattan":
@@ -612,10 +578,32 @@ class RunLengthMatrix:
                 weight = np.sqrt(sum(np.power(self.direction, 2.0)))
             elif dist_weight_norm == "chebyshev":
                 weight = np.max(abs(self.direction))
-            df_rltable.n /= weight
+            rlm /= weight
 
         # Add matrix to object
-        self.matrix = df_rltable
+        self.matrix = rlm
+
+    def get_rlm_arrays(self) -> Dict:
+        """Gets the non-zero elements of the dense run length matrix and its marginal sums.
+
+        Returns:
+            Dict: Dict of arrays with keys:
+            - "i", "j", "rij": Grey level, run length and count of the non-zero elements.
+            - "i_r", "ri": Grey levels with at least one run and number of runs of each.
+            - "j_r", "rj": Run lengths with at least one run and number of runs of each.
+            - "n_s": Number of runs.
+        """
+        i_idx, j_idx = np.nonzero(self.matrix)
+        ri = np.sum(self.matrix, axis=1)
+        rj = np.sum(self.matrix, axis=0)
+        sel_i = ri > 0.0
+        sel_j = rj > 0.0
+        run_lengths = np.arange(1, np.shape(self.matrix)[1] + 1, dtype=np.float64)
+
+        return {"i": self.levels[i_idx], "j": run_lengths[j_idx], "rij": self.matrix[i_idx, j_idx],
+                "i_r": self.levels[sel_i], "ri": ri[sel_i],
+                "j_r": run_lengths[sel_j], "rj": rj[sel_j],
+                "n_s": np.sum(self.matrix) * 1.0}
 
     def calculate_rlm_features(self) -> pd.DataFrame:
         """Computes run length matrix features for the current run length matrix.
@@ -646,170 +634,108 @@ class RunLengthMatrix:
 
         # Don't return data for empty slices or slices without a good matrix
         if self.matrix is None:
-            # Update names
-            # df_feat.columns += self._parse_feature_names()
             return df_feat
-        elif len(self.matrix) == 0:
-            # Update names
-            # df_feat.columns += self._parse_feature_names()
+        elif not np.any(self.matrix):
             return df_feat
 
-        # Create local copy of the run length matrix and set column names
-        df_rij = deepcopy(self.matrix)
-        df_rij.columns = ["i", "j", "rij"]
-
-        # Sum over grey levels
-        df_ri = df_rij.groupby(by="i")["rij"].agg(np.sum).reset_index().rename(columns={"rij": "ri"})
-
-        # Sum over run lengths
-        df_rj = df_rij.groupby(by="j")["rij"].agg(np.sum).reset_index().rename(columns={"rij": "rj"})
-
-        # Constant definitions
-        n_s = np.sum(df_rij.rij) * 1.0  # Number of runs
-        n_v = self.n_v * 1.0  # Number of voxels
-
-        ##############################################
-        ######          glrlm features          ######
-        ##############################################
-        # Short runs emphasis
-        df_feat.loc[0, "Frlm_sre"] = np.sum(df_rj.rj / df_rj.j ** 2.0) / n_s
-
-        # Long runs emphasis
-        df_feat.loc[0, "Frlm_lre"] = np.sum(df_rj.rj * df_rj.j ** 2.0) / n_s
-
-        # Grey level non-uniformity
-        df_feat.loc[0, "Frlm_glnu"] = np.sum(df_ri.ri ** 2.0) / n_s
-
-        # Grey level non-uniformity, normalised
-        df_feat.loc[0, "Frlm_glnu_norm"] = np.sum(df_ri.ri ** 2.0) / n_s ** 2.0
-
-        # Run length non-uniformity
-        df_feat.loc[0, "Frlm_rlnu"] = np.sum(df_rj.rj ** 2.0) / n_s
-
-        # Run length non-uniformity, normalised
-        df_feat.loc[0, "Frlm_rlnu_norm"] = np.sum(df_rj.rj ** 2.0) / n_s ** 2.0
-
-        # Run percentage
-        df_feat.loc[0, "Frlm_r_perc"] = n_s / n_v
-
-        # Low grey level run emphasis
-        df_feat.loc[0, "Frlm_lgre"] = np.sum(df_ri.ri / df_ri.i ** 2.0) / n_s
-
-        # High grey level run emphasis
-        df_feat.loc[0, "Frlm_hgre"] = np.sum(df_ri.ri * df_ri.i ** 2.0) / n_s
-
-        # Short run low grey level emphasis
-        df_feat.loc[0, "Frlm_srlge"] = np.sum(df_rij.rij / (df_rij.i * df_rij.j) ** 2.0) / n_s
-
-        # Short run high grey level emphasis
-        df_feat.loc[0, "Frlm_srhge"] = np.sum(df_rij.rij * df_rij.i ** 2.0 / df_rij.j ** 2.0) / n_s
-
-        # Long run low grey level emphasis
-        df_feat.loc[0, "Frlm_lrlge"] = np.sum(df_rij.rij * df_rij.j ** 2.0 / df_rij.i ** 2.0) / n_s
-
-        # Long run high grey level emphasis
-        df_feat.loc[0, "Frlm_lrhge"] = np.sum(df_rij.rij * df_rij.i ** 2.0 * df_rij.j ** 2.0) / n_s
-
-        # Grey level variance
-        mu = np.sum(df_rij.rij * df_rij.i) / n_s
-        df_feat.loc[0, "Frlm_gl_var"] = np.sum((df_rij.i - mu) ** 2.0 * df_rij.rij) / n_s
-
-        # Run length variance
-        mu = np.sum(df_rij.rij * df_rij.j) / n_s
-        df_feat.loc[0, "Frlm_rl_var"] = np.sum((df_rij.j - mu) ** 2.0 * df_rij.rij) / n_s
-
-        # Zone size entropy
-        df_feat.loc[0, "Frlm_rl_entr"] = - np.sum(df_rij.rij * np.log2(df_rij.rij / n_s)) / n_s
+        # Compute all features from the same arrays of the matrix
+        rlm_arrays = self.get_rlm_arrays()
+        for name in feat_names:
+            df_feat.loc[0, name] = self._get_feature_value(name[len("Frlm_"):], rlm_arrays)
 
         return df_feat
 
-    def calculate_feature(self,
-                          name: str) -> pd.DataFrame:
-        """Computes run length matrix features for the current run length matrix.
-
-            Returns:
-                ndarray: Value of feature given as parameter
-        """
-        df_feat = pd.DataFrame(np.full(shape=(0, 0), fill_value=np.nan))
-
-        # Don't return data for empty slices or slices without a good matrix
-        if self.matrix is None:
-            # Update names
-            # df_feat.columns += self._parse_feature_names()
-            return df_feat
-        elif len(self.matrix) == 0:
-            # Update names
-            # df_feat.columns += self._parse_feature_names()
-            return df_feat
-
-        # Create local copy of the run length matrix and set column names
-        df_rij = deepcopy(self.matrix)
-        df_rij.columns = ["i", "j", "rij"]
+    def _get_feature_value(self, name: str, rlm_arrays: Dict) -> float:
+        """Computes a single run length matrix feature from the arrays of the matrix.
 
-        # Sum over grey levels
-        df_ri = df_rij.groupby(by="i")["rij"].agg(np.sum).reset_index().rename(columns={"rij": "ri"})
-
-        # Sum over run lengths
-        df_rj = df_rij.groupby(by="j")["rij"].agg(np.sum).reset_index().rename(columns={"rij": "rj"})
+        Args:
+            name (str): Name of the feature (e.g. "sre").
+            rlm_arrays (Dict): Arrays of the matrix, as returned by :meth:`get_rlm_arrays`.
 
-        # Constant definitions
-        n_s = np.sum(df_rij.rij) * 1.0  # Number of runs
+        Returns:
+            float: Value of the feature, None if the name is unknown.
+        """
+        i, j, rij = rlm_arrays["i"], rlm_arrays["j"], rlm_arrays["rij"]
+        i_r, ri = rlm_arrays["i_r"], rlm_arrays["ri"]
+        j_r, rj = rlm_arrays["j_r"], rlm_arrays["rj"]
+        n_s = rlm_arrays["n_s"]  # Number of runs
         n_v = self.n_v * 1.0  # Number of voxels
 
-        # Calculation glrlm feature
         # Short runs emphasis
         if name == "sre":
-            df_feat.loc["value", "sre"] = np.sum(df_rj.rj / df_rj.j ** 2.0) / n_s
+            return np.sum(rj / j_r ** 2.0) / n_s
         # Long runs emphasis
         elif name == "lre":
-            df_feat.loc["value", "lre"] = np.sum(df_rj.rj * df_rj.j ** 2.0) / n_s
+            return np.sum(rj * j_r ** 2.0) / n_s
         # Grey level non-uniformity
         elif name == "glnu":
-            df_feat.loc["value", "glnu"] = np.sum(df_ri.ri ** 2.0) / n_s
+            return np.sum(ri ** 2.0) / n_s
         # Grey level non-uniformity, normalised
         elif name == "glnu_norm":
-            df_feat.loc["value", "glnu_norm"] = np.sum(df_ri.ri ** 2.0) / n_s ** 2.0
+            return np.sum(ri ** 2.0) / n_s ** 2.0
         # Run length non-uniformity
         elif name == "rlnu":
-            df_feat.loc["value", "rlnu"] = np.sum(df_rj.rj ** 2.0) / n_s
+            return np.sum(rj ** 2.0) / n_s
         # Run length non-uniformity, normalised
         elif name == "rlnu_norm":
-            df_feat.loc["value", "rlnu_norm"] = np.sum(df_rj.rj ** 2.0) / n_s ** 2.0
+            return np.sum(rj ** 2.0) / n_s ** 2.0
         # Run percentage
         elif name == "r_perc":
-            df_feat.loc["value", "r_perc"] = n_s / n_v
+            return n_s / n_v
         # Low grey level run emphasis
         elif name == "lgre":
-            df_feat.loc["value", "lgre"] = np.sum(df_ri.ri / df_ri.i ** 2.0) / n_s
+            return np.sum(ri / i_r ** 2.0) / n_s
         # High grey level run emphasis
         elif name == "hgre":
-            df_feat.loc["value", "hgre"] = np.sum(df_ri.ri * df_ri.i ** 2.0) / n_s
+            return np.sum(ri * i_r ** 2.0) / n_s
         # Short run low grey level emphasis
         elif name == "srlge":
-            df_feat.loc["value", "srlge"] = np.sum(df_rij.rij / (df_rij.i * df_rij.j) ** 2.0) / n_s
+            return np.sum(rij / (i * j) ** 2.0) / n_s
         # Short run high grey level emphasis
         elif name == "srhge":
-            df_feat.loc["value", "srhge"] = np.sum(df_rij.rij * df_rij.i ** 2.0 / df_rij.j ** 2.0) / n_s
+            return np.sum(rij * i ** 2.0 / j ** 2.0) / n_s
         # Long run low grey level emphasis
         elif name == "lrlge":
-            df_feat.loc["value", "lrlge"] = np.sum(df_rij.rij * df_rij.j ** 2.0 / df_rij.i ** 2.0) / n_s
+            return np.sum(rij * j ** 2.0 / i ** 2.0) / n_s
         # Long run high grey level emphasis
         elif name == "lrhge":
-            df_feat.loc["value", "lrhge"] = np.sum(df_rij.rij * df_rij.i ** 2.0 * df_rij.j ** 2.0) / n_s
+            return np.sum(rij * i ** 2.0 * j ** 2.0) / n_s
         # Grey level variance
         elif name == "gl_var":
-            mu = np.sum(df_rij.rij * df_rij.i) / n_s
-            df_feat.loc["value", "gl_var"] = np.sum((df_rij.i - mu) ** 2.0 * df_rij.rij) / n_s 
+            mu = np.sum(rij * i) / n_s
+            return np.sum((i - mu) ** 2.0 * rij) / n_s
         # Run length variance
         elif name == "rl_var":
-            mu = np.sum(df_rij.rij * df_rij.j) / n_s
-            df_feat.loc["value", "rl_var"] = np.sum((df_rij.j - mu) ** 2.0 * df_rij.rij) / n_s
+            mu = np.sum(rij * j) / n_s
+            return np.sum((j - mu) ** 2.0 * rij) / n_s
         # Zone size entropy
         elif name == "rl_entr":
-            df_feat.loc["value", "rl_entr"] = - np.sum(df_rij.rij * np.log2(df_rij.rij / n_s)) / n_s
-        else:
+            return - np.sum(rij * np.log2(rij / n_s)) / n_s
+
+        return None
+
+    def calculate_feature(self,
+                          name: str) -> pd.DataFrame:
+        """Computes run length matrix features for the current run length matrix.
+
+            Returns:
+                ndarray: Value of feature given as parameter
+        """
+        df_feat = pd.DataFrame(np.full(shape=(0, 0), fill_value=np.nan))
+
+        # Don't return data for empty slices or slices without a good matrix
+        if self.matrix is None:
+            return df_feat
+        elif not np.any(self.matrix):
+            return df_feat
+
+        # Calculation glrlm feature
+        value = self._get_feature_value(name, self.get_rlm_arrays())
+        if value is None:
             print("ERROR: Wrong arg. Use ones from list : (sre, lre, glnu, glnu_normn, rlnu \
                   rlnu_norm, r_perc, lgre, hgre, srlge, srhge, lrlge, lrhge, gl_var, rl_var, rl_entr)")
+        else:
+            df_feat.loc["value", name] = value
 
         return df_feat
 
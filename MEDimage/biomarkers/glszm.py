@@ -1,19 +1,21 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
-from typing import Dict, List, Union
+from typing import Dict, List, Tuple, Union
 
 import numpy as np
-import skimage.measure as skim
+
+from ..biomarkers.utils import get_zones
 
 
 def get_matrix(roi_only: np.ndarray, 
-                     levels: Union[np.ndarray, List]) -> Dict:
+                     levels: Union[np.ndarray, List],
+                     zones: Tuple[np.ndarray, np.ndarray] = None) -> np.ndarray:
     r"""
     This function computes the Gray-Level Size Zone Matrix (GLSZM) of the
     region of interest (ROI) of an input volume. The input volume is assumed
     to be isotropically resampled. The zones of different sizes are computed
-    using 26-voxel connectivity.
+    using 26-voxel connectivity, for all the gray-levels in a single labelling pass.
     This matrix refers to "Grey level size zone based features" (ID = 9SAK)  
     in the `IBSI1 reference manual <https://arxiv.org/pdf/1612.07003.pdf>`_. 
 
@@ -26,6 +28,9 @@ def get_matrix(roi_only: np.ndarray,
             set to NaNs.
         levels (ndarray or List): Vector containing the quantized gray-levels
             in the tumor region (or reconstruction ``levels`` of quantization).
+        zones (Tuple[np.ndarray, np.ndarray], optional): Zone labels and zone gray-levels of
+            ``roi_only``, as returned by :func:`MEDimage.biomarkers.utils.get_zones`. Allows to share
+            a single labelling pass with the GLDZM. Computed if not given.
 
     Returns:
         ndarray: Array of Gray-Level Size Zone Matrix of ``roi_only``.
@@ -37,41 +42,29 @@ def get_matrix(roi_only: np.ndarray,
         Recognition and Information Processing (PRIP) (pp. 140–145).
     """
 
-    # PRELIMINARY
-    roi_only = roi_only.copy()
-    n_max = np.sum(~np.isnan(roi_only))
-    level_temp = np.max(levels) + 1
-    roi_only[np.isnan(roi_only)] = level_temp
-    levels = np.append(levels, level_temp)
-
-    # QUANTIZATION EFFECTS CORRECTION
-    # In case (for example) we initially wanted to have 64 levels, but due to
-    # quantization, only 60 resulted.
-    unique_vect = levels
-    n_l = np.size(levels) - 1
+    # SINGLE-PASS LABELLING OF THE ZONES OF ALL GRAY-LEVELS
+    n_l = np.size(levels)
+    if zones is None:
+        zones = get_zones(roi_only, levels)
+    zones, zone_levels = zones
 
-    # INITIALIZATION
-    # THIS NEEDS TO BE CHANGED. THE ARRAY INITIALIZED COULD BE TOO BIG!
-    glszm = np.zeros((n_l, n_max))
+    # ZONE SIZES
+    zone_sizes = np.bincount(zones.ravel())[1:]
+    if zone_sizes.size == 0:
+        return np.zeros((n_l, 0))
 
     # COMPUTATION OF glszm
-    temp = roi_only.copy().astype('int')
-    for i in range(1, n_l+1):
-        temp[roi_only != unique_vect[i-1]] = 0
-        temp[roi_only == unique_vect[i-1]] = 1
-        conn_objects, n_zone = skim.label(temp, return_num=True)
-        for j in range(1, n_zone+1):
-            col = np.sum(conn_objects == j)
-            glszm[i-1, col-1] = glszm[i-1, col-1] + 1
-
-    # REMOVE UNECESSARY COLUMNS
-    stop = np.nonzero(np.sum(glszm, 0))[0][-1]
-    glszm = np.delete(glszm, range(stop+1, np.shape(glszm)[1]), 1)
+    # Only the columns up to the largest zone size are allocated
+    n_max = np.max(zone_sizes)
+    glszm = np.bincount(zone_levels * n_max + zone_sizes - 1,
+                        minlength=n_l * n_max).astype(np.float64)
+    glszm = np.reshape(glszm, (n_l, n_max))
 
     return glszm
 
 def extract_all(vol: np.ndarray,
-                glszm: np.ndarray = None) -> Dict:
+                glszm: np.ndarray = None,
+                zones: Tuple[np.ndarray, np.ndarray] = None) -> Dict:
     """Computes glszm features.
     These features refer to "Grey level size zone based features" (ID = 9SAK)  
     in the `IBSI1 reference manual <https://arxiv.org/pdf/1612.07003.pdf>`__. 
@@ -80,6 +73,9 @@ def extract_all(vol: np.ndarray,
         vol (ndarray): 3D volume, isotropically resampled, quantized
             (e.g. n_g = 32, levels = [1, ..., n_g]),
             with NaNs outside the region of interest.
+        glszm (ndarray, optional): array of the gray level size zone matrix. Defaults to None.
+        zones (Tuple[np.ndarray, np.ndarray], optional): Zone labels and zone gray-levels of ``vol``,
+            as returned by :func:`MEDimage.biomarkers.utils.get_zones`. Defaults to None.
     
     Returns:
         Dict: Dict of glszm features.
@@ -107,7 +103,7 @@ def extract_all(vol: np.ndarray,
     vol = vol.copy()
     levels = np.arange(1, np.max(vol[~np.isnan(vol[:])])+1)
     if glszm is None:
-        glszm = get_matrix(vol, levels)
+        glszm = get_matrix(vol, levels, zones)
     n_s = np.sum(glszm)
     glszm = glszm/np.sum(glszm)  # Normalization of glszm
     sz = np.shape(glszm)  # Size of glszm
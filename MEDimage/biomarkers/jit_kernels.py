@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+
+import logging
+import math
+
+import numpy as np
+
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+    prange = range
+
+    def njit(*args, **kwargs):
+        """Replaces the numba decorator when numba is not installed: the kernels are then left as
+        plain Python functions, which give the same results but are much slower. The feature
+        computations fall back on their NumPy code instead (see :data:`NUMBA_AVAILABLE`)."""
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return lambda func: func
+
+# Computations already warned about running without numba
+_warned_no_numba = set()
+
+
+def warn_no_numba(computation: str) -> None:
+    """Logs a warning, once per computation, that numba is not installed and the computation
+    runs without its compiled kernels.
+
+    Args:
+        computation (str): Name of the computation, e.g. "GLCM".
+
+    Returns:
+        None.
+    """
+    if computation not in _warned_no_numba:
+        _warned_no_numba.add(computation)
+        logging.warning(f"numba is not installed, the {computation} computation runs without its compiled "
+                        "kernels and is much slower. Install numba (pip install numba) to speed it up.")
+
+
+@njit(cache=True)
+def glcm_kernel(q3: np.ndarray, lqs: int, dist_correction: bool) -> np.ndarray:
+    """Compiled version of the neighbourhood loop of :func:`MEDimage.biomarkers.glcm.get_matrix`.
+
+    The voxels and their 26-connected neighbours are visited in the same order as in the
+    Python loop, so the matrix is bit-identical.
+
+    Args:
+        q3 (ndarray): 3D array of the indexes of the grey levels (the last index is used
+            for voxels outside the ROI).
+        lqs (int): Number of grey levels, including the level of voxels outside the ROI.
+        dist_correction (bool): If True, neighbours increment the matrix by the square root of
+            their manhattan distance to the centre voxel, else by 1.
+
+    Returns:
+        ndarray: Gray-Level Co-occurence Matrix of size ``lqs`` x ``lqs``.
+    """
+    dim_0, dim_1, dim_2 = q3.shape
+    glcm = np.zeros((lqs, lqs))
+    for i in range(dim_0):
+        for j in range(dim_1):
+            for k in range(dim_2):
+                val_q3 = q3[i, j, k]
+                for i2 in range(max(0, i - 1), min(i + 1, dim_0 - 1) + 1):
+                    for j2 in range(max(0, j - 1), min(j + 1, dim_1 - 1) + 1):
+                        for k2 in range(max(0, k - 1), min(k + 1, dim_2 - 1) + 1):
+                            if i2 == i and j2 == j and k2 == k:
+                                continue
+                            val_neighbor = q3[i2, j2, k2]
+                            if dist_correction:
+                                # Discretization length correction
+                                glcm[val_q3, val_neighbor] += math.sqrt(abs(i2 - i) + abs(j2 - j) + abs(k2 - k))
+                            else:
+                                glcm[val_q3, val_neighbor] += 1
+
+    return glcm
+
+
+@njit(cache=True)
+def ngldm_kernel(q_3: np.ndarray, lqs: int) -> np.ndarray:
+    """Compiled version of the neighbourhood loop of :func:`MEDimage.biomarkers.ngldm.get_matrix`.
+
+    Args:
+        q_3 (ndarray): 3D array of the 1-based indexes of the grey levels (the last index is
+            used for voxels outside the ROI).
+        lqs (int): Number of grey levels, including the level of voxels outside the ROI.
+
+    Returns:
+        ndarray: Neighbouring grey level dependence matrix of size ``lqs`` x 27.
+    """
+    dim_0, dim_1, dim_2 = q_3.shape
+    ngldm = np.zeros((lqs, 27))
+    for i in range(dim_0):
+        for j in range(dim_1):
+            for k in range(dim_2):
+                val_q3 = q_3[i, j, k]
+                count = 0
+                for i2 in range(max(0, i - 1), min(i + 1, dim_0 - 1) + 1):
+                    for j2 in range(max(0, j - 1), min(j + 1, dim_1 - 1) + 1):
+                        for k2 in range(max(0, k - 1), min(k + 1, dim_2 - 1) + 1):
+                            if i2 == i and j2 == j and k2 == k:
+                                continue
+                            if val_q3 == q_3[i2, j2, k2]:
+                                count += 1
+                ngldm[val_q3 - 1, count] += 1
+
+    return ngldm
@@ -8,6 +8,7 @@ from typing import Dict, List, Tuple, Union
 import numpy as np
 import pandas as pd
 import scipy.spatial as sc
+from scipy.signal import fftconvolve
 from scipy.spatial import ConvexHull
 from skimage.measure import marching_cubes
 
@@ -378,6 +379,143 @@ def min_oriented_bound_box(pos_mat: np.ndarray) -> np.ndarray:
 
     return ombb_dims
 
+def get_inv_dist_weights(shape: Tuple[int, int, int],
+                         res: List[float]) -> np.ndarray:
+    """Computes the inverse distance weights between a voxel and all the voxels it can be paired
+    with in a volume of the given shape, as used by Moran's Index and Geary's C measure.
+
+    Args:
+        shape (Tuple[int, int, int]): Shape of the volume.
+        res (List[float]): [a,b,c] vector specfying the resolution of the volume in mm.
+
+    Returns:
+        ndarray: Array of shape ``2*shape-1`` of the inverse distances to the central element,
+        which is set to 0.
+    """
+    grid = np.meshgrid(*[res[axis] * np.arange(-(shape[axis]-1), shape[axis]) for axis in range(3)],
+                       indexing='ij')
+    dist = np.sqrt(grid[0]**2 + grid[1]**2 + grid[2]**2)
+    weights = np.zeros(np.shape(dist))
+    weights[dist > 0] = 1 / dist[dist > 0]
+
+    return weights
+
+def get_weighted_sums(vol: np.ndarray,
+                      res: List[float]) -> Tuple[float, float, float, float, int]:
+    """Computes the sums over all pairs of voxels of the ROI that define Moran's Index and
+    Geary's C measure. The inverse distance weights are computed once and the sums over the
+    neighbours of every voxel are evaluated by FFT convolution over the bounding box of the ROI.
+
+    Args:
+        vol (ndarray): 3D volume, NON-QUANTIZED, continous imaging intensity distribution,
+            with NaNs outside the ROI.
+        res (List[float]): [a,b,c] vector specfying the resolution of the volume in mm.
+
+    Returns:
+        Tuple[float, float, float, float, int]:
+            - Sum of the weights w_ij over all pairs i != j.
+            - Sum of w_ij*(x_gl,i - u)*(x_gl,j - u) over all pairs.
+            - Sum of w_ij*(x_gl,i - x_gl,j)^2 over all pairs.
+            - Sum of (x_gl,i - u)^2 over all voxels.
+            - Number of voxels in the ROI.
+    """
+    # Crop to the bounding box of the ROI
+    roi = ~np.isnan(vol)
+    bounds = [np.flatnonzero(np.any(roi, axis=axes)) for axes in [(1, 2), (0, 2), (0, 1)]]
+    box = tuple(slice(bound[0], bound[-1]+1) for bound in bounds)
+    roi = roi[box].astype(np.float64)
+    n_vox = int(np.sum(roi))
+
+    # Deviations from the mean, 0 outside the ROI
+    vol_mean = vol[box].astype(np.float64)
+    vol_mean = vol_mean - np.nanmean(vol_mean)
+    vol_mean[roi == 0] = 0.0
+    sum_s = np.sum(vol_mean**2)
+
+    # Sums of the weights (and of the weighted deviations) of the neighbours of every voxel
+    weights = get_inv_dist_weights(np.shape(roi), res)
+    w_roi = fftconvolve(roi, weights, mode='same')
+    w_mean = fftconvolve(vol_mean, weights, mode='same')
+
+    sum_w = np.sum(roi * w_roi)
+    sum_moran = np.sum(vol_mean * w_mean)
+    # (x_gl,i - x_gl,j)^2 = (x_gl,i - u)^2 + (x_gl,j - u)^2 - 2*(x_gl,i - u)*(x_gl,j - u)
+    sum_geary = 2 * np.sum(vol_mean**2 * w_roi) - 2 * sum_moran
+
+    return sum_w, sum_moran, sum_geary, sum_s, n_vox
+
+def get_sampled_sums(vol: np.ndarray,
+                     res: List[float],
+                     n_samples: int,
+                     seed: int=None) -> Tuple[np.ndarray, np.ndarray, np.ndarray, float, int]:
+    """Computes the exact sums over all neighbours j of a random subset of voxels i of the ROI,
+    for the subsampled estimation of Moran's Index and Geary's C measure.
+
+    Args:
+        vol (ndarray): 3D volume, NON-QUANTIZED, continous imaging intensity distribution,
+            with NaNs outside the ROI.
+        res (List[float]): [a,b,c] vector specfying the resolution of the volume in mm.
+        n_samples (int): Number of voxels i to sample (without replacement).
+        seed (int, optional): Seed of the random generator.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray, np.ndarray, float, int]:
+            - Sum of the weights w_ij over all j, for each sampled voxel.
+            - Sum of w_ij*(x_gl,i - u)*(x_gl,j - u) over all j, for each sampled voxel.
+            - Sum of w_ij*(x_gl,i - x_gl,j)^2 over all j, for each sampled voxel.
+            - Sum of (x_gl,i - u)^2 over all voxels.
+            - Number of voxels in the ROI.
+    """
+    # Positions (in mm) and deviations from the mean of the voxels of the ROI
+    roi = ~np.isnan(vol)
+    pos = np.transpose(np.nonzero(roi)) * np.asarray(res, dtype=np.float64)
+    vol_mean = vol[roi].astype(np.float64)
+    vol_mean = vol_mean - np.mean(vol_mean)
+    n_vox = np.size(vol_mean)
+    sum_s = np.sum(vol_mean**2)
+
+    rng = np.random.default_rng(seed)
+    samples = rng.choice(n_vox, size=min(n_samples, n_vox), replace=False)
+
+    # Process the samples by chunks to bound the size of the distance arrays
+    chunk_size = max(1, 2**22 // n_vox)
+    w_row, moran_row, geary_row = [], [], []
+    for start in range(0, np.size(samples), chunk_size):
+        sel = samples[start:start+chunk_size]
+        dist = np.zeros((np.size(sel), n_vox))
+        for axis in range(3):
+            dist += (pos[sel, axis, np.newaxis] - pos[np.newaxis, :, axis])**2
+        dist[dist == 0] = np.inf
+        weights = 1 / np.sqrt(dist)
+        sums = weights @ np.stack([np.ones(n_vox), vol_mean, vol_mean**2], axis=1)
+        w_row += [sums[:, 0]]
+        moran_row += [vol_mean[sel] * sums[:, 1]]
+        # (x_gl,i - x_gl,j)^2 = (x_gl,i - u)^2 + (x_gl,j - u)^2 - 2*(x_gl,i - u)*(x_gl,j - u)
+        geary_row += [vol_mean[sel]**2 * sums[:, 0] + sums[:, 2] - 2 * vol_mean[sel] * sums[:, 1]]
+
+    return np.concatenate(w_row), np.concatenate(moran_row), np.concatenate(geary_row), sum_s, n_vox
+
+def get_ratio_estimate(num_row: np.ndarray,
+                       den_row: np.ndarray) -> Tuple[float, float]:
+    """Estimates the ratio of the sums of two quantities over all voxels from their values
+    for a random subset of voxels, with the half-width of the approximate 95% confidence
+    interval of the ratio (delta method).
+
+    Args:
+        num_row (ndarray): Values of the numerator for the sampled voxels.
+        den_row (ndarray): Values of the denominator for the sampled voxels.
+
+    Returns:
+        Tuple[float, float]: Estimated ratio and its error bound.
+    """
+    ratio = np.sum(num_row) / np.sum(den_row)
+    n_samples = np.size(num_row)
+    if n_samples < 2:
+        return ratio, np.inf
+    std_err = np.std(num_row - ratio*den_row, ddof=1) / np.sqrt(n_samples) / np.mean(den_row)
+
+    return ratio, 1.96 * std_err
+
 def get_moran_i(vol: np.ndarray,
                 res: List[float]) -> float:
     """Computes Moran's Index.
@@ -393,57 +531,35 @@ def get_moran_i(vol: np.ndarray,
         float: Value of Moran's Index.
 
     """
-    vol = vol.copy()
-    res = res.copy()
+    sum_w, sum_moran, _, sum_s, n_vox = get_weighted_sums(vol, res)
+    moran_i = sum_moran*n_vox/sum_s/sum_w
 
-    # Find the location(s) of all non NaNs voxels
-    I, J, K = np.nonzero(~np.isnan(vol))
-    n_vox = np.size(I)
-
-    # Get the mean
-    u = np.mean(vol[~np.isnan(vol[:])])
-    vol_mean = vol.copy() - u  # (x_gl,i - u)
-    vol_m_mean_s = np.power((vol.copy() - u), 2)  # (x_gl,i - u).^2
-    # Sum of (x_gl,i - u).^2 over all i
-    sum_s = np.sum(vol_m_mean_s[~np.isnan(vol_m_mean_s[:])])
-
-    # Get a meshgrid first
-    x = res[0]*((np.arange(1, np.shape(vol)[0]+1))-0.5)
-    y = res[1]*((np.arange(1, np.shape(vol)[1]+1))-0.5)
-    z = res[2]*((np.arange(1, np.shape(vol)[2]+1))-0.5)
-    X, Y, Z = np.meshgrid(x, y, z, indexing='ij')
+    return moran_i
 
-    temp = 0
-    sum_w = 0
-    for i in range(1, n_vox+1):
-        # Distance mesh
-        temp_x = X - X[I[i-1], J[i-1], K[i-1]]
-        temp_y = Y - Y[I[i-1], J[i-1], K[i-1]]
-        temp_z = Z - Z[I[i-1], J[i-1], K[i-1]]
-
-        # meshgrid of weigths
-        temp_dist_mesh = 1 / np.sqrt(temp_x**2 + temp_y**2 + temp_z**2)
-
-        # Removing NaNs
-        temp_dist_mesh[np.isnan(vol)] = np.NaN
-        temp_dist_mesh[I[i-1], J[i-1], K[i-1]] = np.NaN
-        # Running sum of weights
-        w_sum = np.sum(temp_dist_mesh[~np.isnan(temp_dist_mesh[:])])
-        sum_w = sum_w + w_sum
-
-        # Inside sum calculation
-        # Removing NaNs
-        temp_vol = vol_mean.copy()
-        temp_vol[I[i-1], J[i-1], K[i-1]] = np.NaN
-        temp_vol = temp_dist_mesh * temp_vol  # (wij .* (x_gl,j - u))
-        # Summing (wij .* (x_gl,j - u)) over all j
-        sum_val = np.sum(temp_vol[~np.isnan(temp_vol[:])])
-        # Running sum of (x_gl,i - u)*(wij .* (x_gl,j - u)) over all i
-        temp = temp + vol_mean[I[i-1], J[i-1], K[i-1]] * sum_val
-
-    moran_i = temp*n_vox/sum_s/sum_w
+def get_moran_i_approx(vol: np.ndarray,
+                       res: List[float],
+                       n_samples: int=1000,
+                       seed: int=None) -> Tuple[float, float]:
+    """Estimates Moran's Index from the exact neighbourhood sums of ``n_samples`` voxels
+    drawn at random in the ROI, for ROIs too large for :func:`get_moran_i`.
 
-    return moran_i
+    Args:
+        vol (ndarray): 3D volume, NON-QUANTIZED, continous imaging intensity distribution.
+        res (List[float]): [a,b,c] vector specfying the resolution of the volume in mm.
+        n_samples (int, optional): Number of sampled voxels. The estimate is exact if it is
+            larger than the number of voxels in the ROI.
+        seed (int, optional): Seed of the random generator.
+
+    Returns:
+        Tuple[float, float]: Estimated Moran's Index and the half-width of its approximate
+        95% confidence interval.
+    """
+    w_row, moran_row, _, sum_s, n_vox = get_sampled_sums(vol, res, n_samples, seed)
+    ratio, error = get_ratio_estimate(moran_row, w_row)
+    if np.size(w_row) == n_vox:
+        error = 0.0
+
+    return ratio*n_vox/sum_s, error*n_vox/sum_s
 
 def get_mesh_volume(faces: np.ndarray,
                     vertices:np.ndarray) -> float:
@@ -528,63 +644,35 @@ def get_geary_c(vol: np.ndarray,
     Returns:
         float: computes value of Geary'C measure.
     """
-    vol = vol.copy()
-    res = res.copy()
-
-    # Find the location(s) of all non NaNs voxels
-    I, J, K = np.nonzero(~np.isnan(vol))
-    n_vox = np.size(I)
-
-    # Get the mean
-    u = np.mean(vol[~np.isnan(vol[:])])
-    vol_m_mean_s = np.power((vol.copy() - u), 2)  # (x_gl,i - u).^2
-
-    # Sum of (x_gl,i - u).^2 over all i
-    sum_s = np.sum(vol_m_mean_s[~np.isnan(vol_m_mean_s[:])])
-
-    # Get a meshgrid first
-    x = res[0]*((np.arange(1, np.shape(vol)[0]+1))-0.5)
-    y = res[1]*((np.arange(1, np.shape(vol)[1]+1))-0.5)
-    z = res[2]*((np.arange(1, np.shape(vol)[2]+1))-0.5)
-    X, Y, Z = np.meshgrid(x, y, z, indexing='ij')
+    sum_w, _, sum_geary, sum_s, n_vox = get_weighted_sums(vol, res)
+    geary_c = sum_geary * (n_vox-1) / sum_s / (2*sum_w)
 
-    temp = 0
-    sum_w = 0
-
-    for i in range(1, n_vox+1):
-        # Distance mesh
-        temp_x = X - X[I[i-1], J[i-1], K[i-1]]
-        temp_y = Y - Y[I[i-1], J[i-1], K[i-1]]
-        temp_z = Z - Z[I[i-1], J[i-1], K[i-1]]
-
-        # meshgrid of weigths
-        temp_dist_mesh = 1/np.sqrt(temp_x**2 + temp_y**2 + temp_z**2)
-
-        # Removing NaNs
-        temp_dist_mesh[np.isnan(vol)] = np.NaN
-        temp_dist_mesh[I[i-1], J[i-1], K[i-1]] = np.NaN
-
-        # Running sum of weights
-        w_sum = np.sum(temp_dist_mesh[~np.isnan(temp_dist_mesh[:])])
-        sum_w = sum_w + w_sum
-
-        # Inside sum calculation
-        val = vol[I[i-1], J[i-1], K[i-1]].copy()  # x_gl,i
-        # wij.*(x_gl,i - x_gl,j).^2
-        temp_vol = temp_dist_mesh*(vol - val)**2
-
-        # Removing i voxel to be sure;
-        temp_vol[I[i-1], J[i-1], K[i-1]] = np.NaN
+    return geary_c
 
-        # Sum of wij.*(x_gl,i - x_gl,j).^2 over all j
-        sum_val = np.sum(temp_vol[~np.isnan(temp_vol[:])])
+def get_geary_c_approx(vol: np.ndarray,
+                       res: np.ndarray,
+                       n_samples: int=1000,
+                       seed: int=None) -> Tuple[float, float]:
+    """Estimates Geary's C measure from the exact neighbourhood sums of ``n_samples`` voxels
+    drawn at random in the ROI, for ROIs too large for :func:`get_geary_c`.
 
-        # Running sum of (sum of wij.*(x_gl,i - x_gl,j).^2 over all j) over all i
-        temp = temp + sum_val
+    Args:
+        vol (ndarray): 3D volume, NON-QUANTIZED, continous imaging intensity distribution.
+        res (ndarray): [a,b,c] vector specfying the resolution of the volume in mm.
+        n_samples (int, optional): Number of sampled voxels. The estimate is exact if it is
+            larger than the number of voxels in the ROI.
+        seed (int, optional): Seed of the random generator.
 
-    geary_c = temp * (n_vox-1) / sum_s / (2*sum_w)
+    Returns:
+        Tuple[float, float]: Estimated Geary's C measure and the half-width of its approximate
+        95% confidence interval.
+    """
+    w_row, _, geary_row, sum_s, n_vox = get_sampled_sums(vol, res, n_samples, seed)
+    ratio, error = get_ratio_estimate(geary_row, w_row)
+    if np.size(w_row) == n_vox:
+        error = 0.0
 
-    return geary_c
+    return ratio*(n_vox-1)/sum_s/2, error*(n_vox-1)/sum_s/2
 
 def min_vol_ellipse(P: np.ndarray,
                     tolerance: np.ndarray) -> Tuple[np.ndarray,
@@ -759,8 +847,9 @@ def extract_all(vol: np.ndarray,
     the `IBSI1 reference manual <https://arxiv.org/pdf/1612.07003.pdf>`__.
     
     Note:
-        Moran's Index and Geary's C measure takes so much computation time. Please
-        use `compute_moran_i` `compute_geary_c` carefully.
+        Moran's Index and Geary's C measure are computed by FFT convolution over the bounding
+        box of the ROI, which needs about 27 times the memory of the box. For very large ROIs,
+        use :func:`get_moran_i_approx` and :func:`get_geary_c_approx` instead.
 
     Args:
         vol (ndarray): 3D volume, NON-QUANTIZED, continous imaging intensity distribution.
@@ -948,9 +1037,10 @@ def extract_all(vol: np.ndarray,
         morph['Fmorph_integ_int'] = np.mean(xgl_int) * volume
 
     # Moran's I index
-    if compute_moran_i:
+    if compute_moran_i or compute_geary_c:
         vol_mor = vol.copy()
         vol_mor[mask_int == 0] = np.NaN
+    if compute_moran_i:
         morph['Fmorph_moran_i'] = get_moran_i(vol_mor, res)
 
     # Geary's C measure
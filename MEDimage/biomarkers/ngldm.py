@@ -10,10 +10,12 @@ import pandas as pd
 
 from ..utils.textureTools import (coord2index, get_neighbour_direction,
                                   get_value, is_list_all_none)
+from .jit_kernels import NUMBA_AVAILABLE, ngldm_kernel, warn_no_numba
 
 
 def get_matrix(roi_only: np.array,
-                     levels: np.ndarray) -> float:
+                     levels: np.ndarray,
+                     use_jit: bool=True) -> float:
     """Computes Neighbouring grey level dependence matrix.
     This matrix refers to "Neighbouring grey level dependence based features" (ID = REK0)  
     in the `IBSI1 reference manual <https://arxiv.org/pdf/1612.07003.pdf>`_.
@@ -24,6 +26,9 @@ def get_matrix(roi_only: np.array,
             set to NaNs.
         levels (ndarray or List): Vector containing the quantized gray-levels
             in the tumor region (or reconstruction ``levels`` of quantization).
+        use_jit (bool, optional): If True and `numba <https://numba.pydata.org/>`_ is installed,
+            the neighbourhood loop runs in compiled code, which gives the same matrix.
+            Falls back to the Python loop otherwise.
 
     Returns:
         ndarray: Array of neighbouring grey level dependence matrix of ``roi_only``.
@@ -57,34 +62,39 @@ def get_matrix(roi_only: np.array,
     q_3 = np.reshape(q_3, dim, order='F')
 
     # Min dependence = 0, Max dependence = 26; So 27 columns
-    ngldm = np.zeros((lqs, 27))
-    for i in range(1, dim[0]+1):
-        i_min = max(1, i-1)
-        i_max = min(i+1, dim[0])
-        for j in range(1, dim[1]+1):
-            j_min = max(1, j-1)
-            j_max = min(j+1, dim[1])
-            for k in range(1, dim[2]+1):
-                k_min = max(1, k-1)
-                k_max = min(k+1, dim[2])
-                val_q3 = q_3[i-1, j-1, k-1]
-                count = 0
-                for I2 in range(i_min, i_max+1):
-                    for J2 in range(j_min, j_max+1):
-                        for K2 in range(k_min, k_max+1):
-                            if (I2 == i) & (J2 == j) & (K2 == k):
-                                continue
-                            else:
-                                # a = 0
-                                if (val_q3 - q_3[I2-1, J2-1, K2-1] == 0):
-                                    count += 1
-
-                ngldm[val_q3-1, count] = ngldm[val_q3-1, count] + 1
+    if use_jit and not NUMBA_AVAILABLE:
+        warn_no_numba("NGLDM")
+    if use_jit and NUMBA_AVAILABLE:
+        ngldm = ngldm_kernel(q_3, lqs)
+    else:
+        ngldm = np.zeros((lqs, 27))
+        for i in range(1, dim[0]+1):
+            i_min = max(1, i-1)
+            i_max = min(i+1, dim[0])
+            for j in range(1, dim[1]+1):
+                j_min = max(1, j-1)
+                j_max = min(j+1, dim[1])
+                for k in range(1, dim[2]+1):
+                    k_min = max(1, k-1)
+                    k_max = min(k+1, dim[2])
+                    val_q3 = q_3[i-1, j-1, k-1]
+                    count = 0
+                    for I2 in range(i_min, i_max+1):
+                        for J2 in range(j_min, j_max+1):
+                            for K2 in range(k_min, k_max+1):
+                                if (I2 == i) & (J2 == j) & (K2 == k):
+                                    continue
+                                else:
+                                    # a = 0
+                                    if (val_q3 - q_3[I2-1, J2-1, K2-1] == 0):
+                                        count += 1
+
+                    ngldm[val_q3-1, count] = ngldm[val_q3-1, count] + 1
 
     # Last column was for the NaN voxels, to be removed
     ngldm = np.delete(ngldm, -1, 0)
     stop = np.nonzero(np.sum(ngldm, 0))[0][-1]
-    ngldm = np.delete(ngldm, range(stop+1, np.shape(ngldm)[1]+1), 1)
+    ngldm = np.delete(ngldm, range(stop+1, np.shape(ngldm)[1]), 1)
 
     return ngldm
 
@@ -5,7 +5,8 @@ import math
 from typing import List, Tuple, Union
 
 import numpy as np
-from skimage.measure import marching_cubes
+from scipy.signal import fftconvolve
+from skimage.measure import label, marching_cubes
 
 
 def find_i_x(levels: np.ndarray,
@@ -26,7 +27,8 @@ def find_i_x(levels: np.ndarray,
     ix = levels[ind]
 
     return ix
-    
+
+
 def find_v_x(fract_int: np.ndarray,
              fract_vol: np.ndarray,
              x: float) -> np.ndarray:
@@ -47,6 +49,7 @@ def find_v_x(fract_int: np.ndarray,
 
     return vx
 
+
 def get_area_dens_approx(a: float,
                          b: float,
                          c: float,
@@ -78,6 +81,7 @@ def get_area_dens_approx(a: float,
 
     return a_ell
 
+
 def get_axis_lengths(xyz: np.ndarray) -> Tuple[float, float, float]:
     """Computes AxisLengths.
     
@@ -113,6 +117,7 @@ def get_axis_lengths(xyz: np.ndarray) -> Tuple[float, float, float]:
 
     return major, minor, least
 
+
 def get_glcm_cross_diag_prob(p_ij: np.ndarray) -> np.ndarray:
     """Computes cross diagonal probabilities.
 
@@ -143,6 +148,7 @@ def get_glcm_cross_diag_prob(p_ij: np.ndarray) -> np.ndarray:
 
     return p_iplusj
 
+
 def get_glcm_diag_prob(p_ij: np.ndarray) -> np.ndarray:
     """Computes diagonal probabilities.
 
@@ -174,6 +180,7 @@ def get_glcm_diag_prob(p_ij: np.ndarray) -> np.ndarray:
 
     return p_iminusj
 
+
 def get_com(xgl_int: np.ndarray,
             xgl_morph: np.ndarray,
             xyz_int: np.ndarray,
@@ -217,9 +224,71 @@ def get_com(xgl_int: np.ndarray,
 
     return com
 
+
+def get_peak_map(img_obj: np.ndarray,
+                 roi_obj: np.ndarray,
+                 res: np.ndarray) -> np.ndarray:
+    """Computes the mean intensity in a sphere of 1 cm^3 (radius of about 6.2 mm) centred on
+    every voxel of the ROI, from which the local and global intensity peaks are read.
+
+    The spherical averaging kernel is built once from the voxel spacing and the sums of the
+    intensities (and the number of voxels) within the sphere are computed with a single FFT
+    convolution over the bounding box of the ROI, enlarged by the radius of the sphere.
+
+    Note:
+        This works only in 3D for now.
+
+    Args:
+        img_obj (ndarray): Continuos image intensity distribution, with no NaNs
+            outside the ROI.
+        roi_obj (ndarray): Array of the mask defining the ROI.
+        res (List[float]): [a,b,c] vector specifying the resolution of the volume in mm.
+            xyz resolution (world), or JIK resolution (intrinsic matlab).
+
+    Returns:
+        ndarray: Array of the shape of ``img_obj`` with the mean intensity in the sphere centred
+        on each voxel of the ROI, NaNs elsewhere.
+    """
+    # About 6.2 mm, as defined in document
+    dist_thresh = (3/(4*math.pi))**(1/3)*10
+
+    # Spacing along each axis of the array (x runs along the columns, y along the rows)
+    spacing = np.array([res[1], res[0], res[2]], dtype=np.float64)
+
+    # Spherical kernel
+    radius = np.floor(dist_thresh / spacing).astype(int)
+    grid = np.meshgrid(*[spacing[axis] * np.arange(-radius[axis], radius[axis]+1) for axis in range(3)],
+                       indexing='ij')
+    kernel = (np.sqrt(grid[0]**2 + grid[1]**2 + grid[2]**2) <= dist_thresh).astype(np.float64)
+
+    # Bounding box of the ROI, enlarged by the radius of the sphere
+    roi = roi_obj == 1
+    peak_map = np.full(np.shape(img_obj), np.nan)
+    if not np.any(roi):
+        return peak_map
+    box = []
+    for axis, axes in enumerate([(1, 2), (0, 2), (0, 1)]):
+        bound = np.flatnonzero(np.any(roi, axis=axes))
+        box += [slice(max(bound[0] - radius[axis], 0), bound[-1] + radius[axis] + 1)]
+    box = tuple(box)
+
+    # Sum and number of the (non-NaN) intensities within the sphere centred on each voxel
+    img_box = np.asarray(img_obj[box], dtype=np.float64)
+    valid = ~np.isnan(img_box)
+    sum_int = fftconvolve(np.where(valid, img_box, 0.0), kernel, mode='same')
+    n_int = np.round(fftconvolve(valid.astype(np.float64), kernel, mode='same'))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mean_int = np.where(n_int > 0, sum_int / n_int, img_box)
+
+    peak_map[box] = np.where(roi[box], mean_int, np.nan)
+
+    return peak_map
+
+
 def get_loc_peak(img_obj: np.ndarray,
                  roi_obj: np.ndarray,
-                 res: np.ndarray) -> float:
+                 res: np.ndarray,
+                 peak_map: np.ndarray=None) -> float:
     """Computes Local intensity peak.
 
     Note:
@@ -231,58 +300,25 @@ def get_loc_peak(img_obj: np.ndarray,
         roi_obj (ndarray): Array of the mask defining the ROI.
         res (List[float]): [a,b,c] vector specifying the resolution of the volume in mm.
             xyz resolution (world), or JIK resolution (intrinsic matlab).
+        peak_map (ndarray, optional): Mean intensities in the sphere centred on each voxel,
+            as returned by :func:`get_peak_map`. Computed if not given.
 
     Returns:
         float: Value of the local intensity peak.
     
     """
-    # INITIALIZATION
-    # About 6.2 mm, as defined in document
-    dist_thresh = (3/(4*math.pi))**(1/3)*10
+    if peak_map is None:
+        peak_map = get_peak_map(img_obj, roi_obj, res)
 
     # Insert -inf outside ROI
-    temp = img_obj.copy()
-    img_obj = img_obj.copy()
-    img_obj[roi_obj == 0] = -np.inf
-
-    # Find the location(s) of the maximal voxel
-    max_val = np.max(img_obj)
-    I, J, K = np.nonzero(img_obj == max_val)
-    n_max = np.size(I)
-
-    # Reconverting to full object without -Inf
-    img_obj = temp
-
-    # Get a meshgrid first
-    x = res[0]*(np.arange(img_obj.shape[1])+0.5)
-    y = res[1]*(np.arange(img_obj.shape[0])+0.5)
-    z = res[2]*(np.arange(img_obj.shape[2])+0.5)
-    X, Y, Z = np.meshgrid(x, y, z)  # In mm
-
-    # Calculate the local peak
-    max_val = -np.inf
-
-    for n in range(n_max):
-        temp_x = X - X[I[n], J[n], K[n]]
-        temp_y = Y - Y[I[n], J[n], K[n]]
-        temp_z = Z - Z[I[n], J[n], K[n]]
-        temp_dist_mesh = (np.sqrt(np.power(temp_x, 2) + 
-                                np.power(temp_y, 2) +
-                                np.power(temp_z, 2)))
-        val = img_obj[temp_dist_mesh <= dist_thresh]
-        val[np.isnan(val)] = []
-
-        if np.size(val) == 0:
-            temp_local_peak = img_obj[I[n], J[n], K[n]]
-        else:
-            temp_local_peak = np.mean(val)
-        if temp_local_peak > max_val:
-            max_val = temp_local_peak
-
-    local_peak = max_val
+    img_obj = np.where(roi_obj == 0, -np.inf, img_obj)
+
+    # Highest mean intensity around the location(s) of the maximal voxel
+    local_peak = np.max(peak_map[img_obj == np.max(img_obj)])
 
     return local_peak
 
+
 def get_mesh(mask: np.ndarray,
              res: Union[np.ndarray, List]) -> Tuple[np.ndarray,
                                                     np.ndarray,
@@ -329,9 +365,11 @@ def get_mesh(mask: np.ndarray,
 
     return xyz, faces, vertices
 
+
 def get_glob_peak(img_obj: np.ndarray,
                   roi_obj: np.ndarray,
-                  res: np.ndarray) -> float:
+                  res: np.ndarray,
+                  peak_map: np.ndarray=None) -> float:
     """Computes Global intensity peak.
 
     Note:
@@ -343,47 +381,61 @@ def get_glob_peak(img_obj: np.ndarray,
         roi_obj (ndarray): Array of the mask defining the ROI.
         res (List[float]): [a,b,c] vector specifying the resolution of the volume in mm.
             xyz resolution (world), or JIK resolution (intrinsic matlab).
+        peak_map (ndarray, optional): Mean intensities in the sphere centred on each voxel,
+            as returned by :func:`get_peak_map`. Computed if not given.
 
     Returns:
         float: Value of the global intensity peak.
 
     """
-    # INITIALIZATION
-    # About 6.2 mm, as defined in document
-    dist_thresh = (3/(4*math.pi))**(1/3)*10
+    if peak_map is None:
+        peak_map = get_peak_map(img_obj, roi_obj, res)
 
-    # Find the location(s) of all voxels within the ROI
-    indices = np.nonzero(np.reshape(roi_obj, np.size(roi_obj), order='F') == 1)[0]
-    I, J, K = np.unravel_index(indices, np.shape(img_obj), order='F')
-    n_max = np.size(I)
-
-    # Get a meshgrid first
-    x = res[0]*(np.arange(img_obj.shape[1])+0.5)
-    y = res[1]*(np.arange(img_obj.shape[0])+0.5)
-    z = res[2]*(np.arange(img_obj.shape[2])+0.5)
-    X, Y, Z = np.meshgrid(x, y, z)  # In mm
-
-    # Calculate the local peak
-    max_val = -np.inf
-
-    for n in range(n_max):
-        temp_x = X - X[I[n], J[n], K[n]]
-        temp_y = Y - Y[I[n], J[n], K[n]]
-        temp_z = Z - Z[I[n], J[n], K[n]]
-        temp_dist_mesh = (np.sqrt(np.power(temp_x, 2) + 
-                                np.power(temp_y, 2) +
-                                np.power(temp_z, 2)))
-        val = img_obj[temp_dist_mesh <= dist_thresh]
-        val[np.isnan(val)] = []
-
-        if np.size(val) == 0:
-            temp_local_peak = img_obj[I[n], J[n], K[n]]
-        else:
-            temp_local_peak = np.mean(val)
-        if temp_local_peak > max_val:
-            max_val = temp_local_peak
-
-    global_peak = max_val
+    # Highest mean intensity around any voxel of the ROI
+    global_peak = np.max(peak_map[roi_obj == 1])
 
     return global_peak
-    
\ No newline at end of file
+
+
+def get_zones(vol: np.ndarray,
+              levels: Union[np.ndarray, List]) -> Tuple[np.ndarray,
+                                                        np.ndarray]:
+    """Labels the zones of all grey levels of a quantized volume in a single pass.
+
+    A zone is a group of connected voxels sharing the same grey level (26-voxel
+    connectivity in 3D, 8-voxel connectivity in 2D). All the grey levels are labelled
+    at once, so the zones can be shared by every zone-based texture matrix
+    (GLSZM, GLDZM).
+
+    Args:
+        vol (ndarray): Quantized volume, with NaNs outside the region of interest.
+        levels (ndarray or List): Vector containing the quantized gray-levels
+            in the tumor region (or reconstruction ``levels`` of quantization).
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: 
+            - Array of the zone labels of ``vol`` (0 outside the ROI and for voxels
+              whose intensity is not in ``levels``, zones are labelled from 1).
+            - Vector of the index in ``levels`` of the grey level of each zone.
+    """
+    levels = np.asarray(levels).ravel()
+    sorter = np.argsort(levels)
+
+    # Position (starting at 1) of each voxel grey level in levels, 0 elsewhere
+    vol_levels = np.zeros(np.shape(vol), dtype=np.int32)
+    roi = ~np.isnan(vol)
+    values = vol[roi]
+    pos = np.searchsorted(levels, values, sorter=sorter)
+    pos = np.minimum(pos, np.size(levels) - 1)
+    pos = sorter[pos]
+    vol_levels[roi] = np.where(levels[pos] == values, pos + 1, 0)
+
+    # Labelling of the connected zones of all the grey levels at once
+    zones, n_zones = label(vol_levels, background=0, return_num=True)
+
+    # Grey level of each zone (all voxels of a zone share the same level)
+    zone_levels = np.zeros(n_zones + 1, dtype=np.int32)
+    zone_levels[zones] = vol_levels
+    zone_levels = zone_levels[1:] - 1
+
+    return zones, zone_levels
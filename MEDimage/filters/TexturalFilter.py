@@ -7,17 +7,23 @@ try:
     import pycuda.driver as cuda
     from pycuda.autoinit import context
     from pycuda.compiler import SourceModule
+    import_failed = False
 except Exception as e:
-    print("PyCUDA is not installed. Please install it to use the textural filters.", e)
+    print("PyCUDA is not installed or no GPU is available, the textural filters will run on the CPU.", e)
     import_failed = True
 
 from ..processing.discretisation import discretize
+from ..biomarkers.jit_kernels import warn_no_numba
+from .textural_filters_cpu import (NUMBA_AVAILABLE, glcm_filter_kernel, glrlm_filter,
+                                   glszm_filter, ngtdm_filter)
 from .textural_filters_kernels import glcm_kernel, single_glcm_kernel
 
 
 class TexturalFilter():
     """The Textural filter class. This class is used to apply textural filters to an image. The textural filters are
-    chosen from the following families: GLCM, NGTDM, GLDZM, GLSZM, NGLDM, GLRLM. The computation is done using CUDA."""
+    chosen from the following families: GLCM, NGTDM, GLDZM, GLSZM, NGLDM, GLRLM. The GLCM computation is done using CUDA,
+    or on the CPU cores when PyCUDA or a GPU is not available. The GLRLM, GLSZM and NGTDM computations are done on the
+    CPU cores."""
 
     def __init__(
                 self,
@@ -72,6 +78,49 @@ class TexturalFilter():
             "Fcm_info_corr1",
             "Fcm_info_corr2"
         ]
+        self.glrlm_features = [
+            "Frlm_sre",
+            "Frlm_lre",
+            "Frlm_lgre",
+            "Frlm_hgre",
+            "Frlm_srlge",
+            "Frlm_srhge",
+            "Frlm_lrlge",
+            "Frlm_lrhge",
+            "Frlm_glnu",
+            "Frlm_glnu_norm",
+            "Frlm_rlnu",
+            "Frlm_rlnu_norm",
+            "Frlm_r_perc",
+            "Frlm_gl_var",
+            "Frlm_rl_var",
+            "Frlm_rl_entr"
+        ]
+        self.glszm_features = [
+            "Fszm_sze",
+            "Fszm_lze",
+            "Fszm_lgze",
+            "Fszm_hgze",
+            "Fszm_szlge",
+            "Fszm_szhge",
+            "Fszm_lzlge",
+            "Fszm_lzhge",
+            "Fszm_glnu",
+            "Fszm_glnu_norm",
+            "Fszm_zsnu",
+            "Fszm_zsnu_norm",
+            "Fszm_z_perc",
+            "Fszm_gl_var",
+            "Fszm_zs_var",
+            "Fszm_zs_entr"
+        ]
+        self.ngtdm_features = [
+            "Fngt_coarseness",
+            "Fngt_contrast",
+            "Fngt_busyness",
+            "Fngt_complexity",
+            "Fngt_strength"
+        ]
 
     def __glcm_filter(
             self,
@@ -246,7 +295,7 @@ class TexturalFilter():
             del volume_copy
 
             # unpad the volume
-            if feature: # 3D (single-feature)
+            if feature is not None: # 3D (single-feature)
                 input_images = input_images[padding_size:-padding_size, padding_size:-padding_size, padding_size:-padding_size]
             else: # 4D (all features)
                 input_images = input_images[padding_size:-padding_size, padding_size:-padding_size, padding_size:-padding_size, :]
@@ -254,14 +303,101 @@ class TexturalFilter():
             return input_images
 
         else:
-            return None
+            # Same computation on the CPU cores
+            if not NUMBA_AVAILABLE:
+                warn_no_numba("GLCM textural filter")
+            input_images = glcm_filter_kernel(
+                volume_copy,
+                self.size,
+                self.local,
+                discretization['type'] == "FBN",
+                float(n_q),
+                float(user_set_min_val)
+            )
+            if feature is not None:
+                input_images = input_images[..., feature]
+
+            # unpad the volume
+            return input_images[padding_size:-padding_size, padding_size:-padding_size, padding_size:-padding_size]
     
+    def __sliding_window_filter(
+            self,
+            input_images: np.ndarray,
+            discretization : dict,
+            user_set_min_val: float,
+            feature = None
+        ) -> np.ndarray:
+        """
+        Apply a GLRLM, GLSZM or NGTDM textural filter to the input image, on the CPU.
+
+        The runs, zones and neighbourhoods of a window are cut at its border, so that the features of a voxel are those
+        of its window taken as the whole ROI. The matrices are updated incrementally while the window slides: only the
+        runs, zones and neighbourhoods crossing the slabs at the two ends of the window are counted again.
+
+        Args:
+            input_images (ndarray): The images to filter.
+            discretization (dict): The discretization parameters.
+            user_set_min_val (float): The minimum value to use for the discretization.
+            feature (str, optional): The feature to extract from the family. if not specified, all the features of the
+                family will be extracted.
+        
+        Returns:
+            ndarray: The filtered image.
+        """
+        features = getattr(self, self.family.lower() + "_features")
+        if feature is not None:
+            if isinstance(feature, str):
+                assert feature in features,\
+                    "feature should be a string or an integer and should be one of the following: " + ", ".join(features) + "."
+            elif isinstance(feature, int):
+                assert feature in range(len(features)),\
+                    "feature's index should be an integer between 0 and " + str(len(features) - 1) + "."
+            else:
+                raise TypeError("feature should be an integer or a string from the following list: " + ", ".join(features) + ".")
+            feature = features.index(feature) if isinstance(feature, str) else feature
+
+        # Discretization
+        if discretization['type'] == "FBS":
+            if self.local:
+                print("Warning: FBS local discretization is equivalent to global discretization.")
+            n_q = discretization['bw']
+        elif discretization['type'] == "FBN":
+            if self.local:
+                raise NotImplementedError("Local FBN discretization is only implemented for the GLCM family.")
+            n_q = discretization['bn']
+            user_set_min_val = np.nanmin(input_images)
+        else:
+            raise ValueError("Discretization should be either FBS or FBN.")
+
+        input_images, _ = discretize(
+            vol_re=input_images,
+            discr_type=discretization['type'],
+            n_q=n_q,
+            user_set_min_val=user_set_min_val,
+            ivh=False
+        )
+
+        # Filtering
+        if not NUMBA_AVAILABLE:
+            warn_no_numba(self.family.upper() + " textural filter")
+        if self.family.lower() == "glrlm":
+            input_images = glrlm_filter(input_images, self.size)
+        elif self.family.lower() == "glszm":
+            input_images = glszm_filter(input_images, self.size)
+        else:
+            input_images = ngtdm_filter(input_images, self.size)
+
+        if feature is not None:
+            input_images = input_images[..., feature]
+
+        return input_images
+
     def __call__(
             self,
             input_images: np.ndarray,
             discretization : dict,
             user_set_min_val: float,
-            family: str = "GLCM",
+            family: str = None,
             feature : str = None,
             size: int = None,
             local: bool = False
@@ -273,7 +409,8 @@ class TexturalFilter():
             input_images (ndarray): The images to filter.
             discretization (dict): The discretization parameters.
             user_set_min_val (float): The minimum value to use for the discretization.
-            family (str, optional): The family of the textural filter.
+            family (str, optional): The family of the textural filter. If not specified, the family of the
+                constructor is used.
             feature (str, optional): The feature to extract from the family. if not specified, all the features of the
                 family will be extracted.
             size (int, optional): The filter size.
@@ -293,7 +430,9 @@ class TexturalFilter():
         # Filtering
         if self.family.lower() == "glcm":
             filtered_images = self.__glcm_filter(input_images, discretization, user_set_min_val, feature)
+        elif self.family.lower() in ["glrlm", "glszm", "ngtdm"]:
+            filtered_images = self.__sliding_window_filter(input_images, discretization, user_set_min_val, feature)
         else:
-            raise NotImplementedError("Only GLCM is implemented for now.")
+            raise NotImplementedError("Only GLCM, GLRLM, GLSZM and NGTDM are implemented for now.")
 
         return filtered_images
@@ -1,5 +1,6 @@
 from . import *
 from .apply_filter import *
+from .filter_bank import *
 from .gabor import *
 from .laws import *
 from .log import *
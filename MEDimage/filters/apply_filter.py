@@ -2,12 +2,14 @@ import numpy as np
 
 from ..MEDscan import MEDscan
 from ..utils.image_volume_obj import image_volume_obj
+from .filter_bank import FILTER_BANK_TYPES, get_linear_filter
 from .gabor import *
 from .laws import *
 from .log import *
 from .mean import *
 try:
     from .TexturalFilter import TexturalFilter
+    import_failed = False
 except ImportError:
     import_failed = True
 from .wavelet import *
@@ -33,65 +35,21 @@ def apply_filter(
     """
     filter_type = medscan.params.filter.filter_type
 
-    if filter_type.lower() == "mean":
+    if filter_type.lower() in FILTER_BANK_TYPES:
         input = np.expand_dims(vol_obj.data.astype(np.float64), axis=0)   # Convert to shape : (B, W, H, D)
         # Initialize filter class instance
-        _filter = Mean(
-                    ndims=medscan.params.filter.mean.ndims,
-                    size=medscan.params.filter.mean.size,
-                    padding=medscan.params.filter.mean.padding
-                )
-        # Run convolution
-        result = _filter.convolve(input, orthogonal_rot=medscan.params.filter.mean.orthogonal_rot)
-
-    elif filter_type.lower() == "log":
-        # Initialize filter class params & instance
-        input = np.expand_dims(vol_obj.data.astype(np.float64), axis=0)   # Convert to shape : (B, W, H, D)
         voxel_length = medscan.params.process.scale_non_text[0]
-        sigma = medscan.params.filter.log.sigma / voxel_length
-        length = 2 * int(4 * sigma + 0.5) + 1
-        _filter = LaplacianOfGaussian(
-                    ndims=medscan.params.filter.log.ndims,
-                    size=length,
-                    sigma=sigma,
-                    padding=medscan.params.filter.log.padding
-                )
+        _filter, _ = get_linear_filter(filter_type, medscan.params.filter, voxel_length)
+        params = getattr(medscan.params.filter, filter_type.lower())
         # Run convolution
-        result = _filter.convolve(input, orthogonal_rot=medscan.params.filter.log.orthogonal_rot)
-
-    elif filter_type.lower() == "laws":
-        # Initialize filter class instance
-        input = np.expand_dims(vol_obj.data.astype(np.float64), axis=0)   # Convert to shape : (B, W, H, D)
-        _filter = Laws(
-                    config=medscan.params.filter.laws.config, 
-                    energy_distance=medscan.params.filter.laws.energy_distance,
-                    rot_invariance=medscan.params.filter.laws.rot_invariance,
-                    padding=medscan.params.filter.laws.padding
-                )
-        # Run convolution
-        result = _filter.convolve(
-                    input, 
-                    orthogonal_rot=medscan.params.filter.laws.orthogonal_rot,
-                    energy_image=medscan.params.filter.laws.energy_image
-                )
-
-    elif filter_type.lower() == "gabor":
-        # Initialize filter class params & instance
-        input = np.expand_dims(vol_obj.data.astype(np.float64), axis=0)   # Convert to shape : (B, W, H, D)
-        voxel_length = medscan.params.process.scale_non_text[0]
-        sigma = medscan.params.filter.gabor.sigma / voxel_length
-        lamb = medscan.params.filter.gabor._lambda / voxel_length
-        size = 2 * int(7 * sigma + 0.5) + 1
-        _filter = Gabor(size=size,
-                        sigma=sigma,
-                        lamb=lamb,
-                        gamma=medscan.params.filter.gabor.gamma,
-                        theta=-medscan.params.filter.gabor.theta,
-                        rot_invariance=medscan.params.filter.gabor.rot_invariance,
-                        padding=medscan.params.filter.gabor.padding
-                        )
-        # Run convolution
-        result = _filter.convolve(input, orthogonal_rot=medscan.params.filter.gabor.orthogonal_rot)
+        if filter_type.lower() == "laws":
+            result = _filter.convolve(
+                        input,
+                        orthogonal_rot=params.orthogonal_rot,
+                        energy_image=params.energy_image
+                    )
+        else:
+            result = _filter.convolve(input, orthogonal_rot=params.orthogonal_rot)
 
     elif filter_type.lower().startswith("wavelet"):
         # Initialize filter class instance
@@ -104,7 +62,7 @@ def apply_filter(
                     )
         # Run convolution
         result = _filter.convolve(
-                        input, 
+                        input,
                         _filter=medscan.params.filter.wavelet.subband, 
                         level=medscan.params.filter.wavelet.level
                     )
@@ -0,0 +1,327 @@
+from collections import OrderedDict
+from typing import Dict, Generator, List, Tuple, Union
+
+import numpy as np
+from scipy.fft import fft, irfftn, next_fast_len, rfft, rfftn
+
+from ..MEDscan import MEDscan
+from ..utils.image_volume_obj import image_volume_obj
+from .gabor import Gabor
+from .laws import Laws
+from .log import LaplacianOfGaussian
+from .mean import Mean
+from .utils import convolve_valid, pad_imgs
+
+# Filters supported by the filter bank
+FILTER_BANK_TYPES = ['mean', 'log', 'laws', 'gabor']
+
+# Memory of the cached kernel spectra, in bytes
+KERNEL_SPECTRA_MEMORY = 2**30
+
+
+def get_linear_filter(
+        filter_type: str,
+        params: Union[Dict, MEDscan.Params.Filter],
+        voxel_length: float
+    ) -> Tuple[Union[Mean, LaplacianOfGaussian, Laws, Gabor], MEDscan.Params.Filter]:
+    """Creates a linear filter from its parameters, used by :func:`apply_filter` and by the filter bank.
+
+    Args:
+        filter_type (str): Type of the filter: 'mean', 'log', 'laws' or 'gabor'.
+        params (Union[Dict, MEDscan.Params.Filter]): Parameters of the filter, as in ``imParamFilter[filter_type]``,
+            or already parsed (e.g. ``medscan.params.filter``).
+        voxel_length (float): Voxel length of the images, in mm.
+
+    Returns:
+        Tuple[Union[Mean, LaplacianOfGaussian, Laws, Gabor], MEDscan.Params.Filter]: The filter and its parsed
+        parameters.
+    """
+    filter_type = filter_type.lower()
+    if filter_type not in FILTER_BANK_TYPES:
+        raise ValueError(f'Filter name should either be: {", ".join(FILTER_BANK_TYPES)}, not {filter_type}.')
+    if isinstance(params, MEDscan.Params.Filter):
+        filter_params = params
+    else:
+        filter_params = MEDscan.Params.Filter(filter_type)
+        getattr(filter_params, filter_type).init_from_json(params)
+
+    if filter_type == 'mean':
+        _filter = Mean(
+                    ndims=filter_params.mean.ndims,
+                    size=filter_params.mean.size,
+                    padding=filter_params.mean.padding
+                )
+    elif filter_type == 'log':
+        sigma = filter_params.log.sigma / voxel_length
+        _filter = LaplacianOfGaussian(
+                    ndims=filter_params.log.ndims,
+                    size=2 * int(4 * sigma + 0.5) + 1,
+                    sigma=sigma,
+                    padding=filter_params.log.padding
+                )
+    elif filter_type == 'laws':
+        _filter = Laws(
+                    config=filter_params.laws.config,
+                    energy_distance=filter_params.laws.energy_distance,
+                    rot_invariance=filter_params.laws.rot_invariance,
+                    padding=filter_params.laws.padding
+                )
+    else:
+        sigma = filter_params.gabor.sigma / voxel_length
+        _filter = Gabor(
+                    size=2 * int(7 * sigma + 0.5) + 1,
+                    sigma=sigma,
+                    lamb=filter_params.gabor._lambda / voxel_length,
+                    gamma=filter_params.gabor.gamma,
+                    theta=-filter_params.gabor.theta,
+                    rot_invariance=filter_params.gabor.rot_invariance,
+                    padding=filter_params.gabor.padding
+                )
+
+    return _filter, filter_params
+
+def get_kernel_axes(kernel: np.ndarray) -> Tuple[int, ...]:
+    """Gets the axes along which a 3D kernel is not a single voxel, i.e. the axes of its convolution.
+
+    Args:
+        kernel (ndarray): The 3D kernel.
+
+    Returns:
+        Tuple[int, ...]: The axes of the kernel.
+    """
+    return tuple(axis for axis, size_kernel in enumerate(kernel.shape) if size_kernel > 1) or (0, 1, 2)
+
+def get_kernel_spectrum(kernel: np.ndarray, fft_shape: Dict[int, int]) -> np.ndarray:
+    """Computes the real FFT of a 3D kernel zero-padded to a given size along its axes, one axis at a time
+    so that the transforms along the first axes only run over the support of the kernel.
+
+    Args:
+        kernel (ndarray): The 3D kernel.
+        fft_shape (Dict[int, int]): Size of the FFT along each axis of the kernel.
+
+    Returns:
+        ndarray: The spectrum of the kernel, as returned by ``rfftn(kernel, s, axes)``.
+    """
+    *axes, last_axis = fft_shape
+    spectrum = rfft(kernel, n=fft_shape[last_axis], axis=last_axis)
+    for axis in axes:
+        spectrum = fft(spectrum, n=fft_shape[axis], axis=axis)
+
+    return spectrum
+
+def get_orthogonal_kernels(kernel: np.ndarray, orthogonal_rot: bool) -> List[np.ndarray]:
+    """Gets the 3D kernels that filter the (D, H, W) images like :func:`convolve` does with a 2D or 3D kernel,
+    over the coronal, axial and sagittal planes if ``orthogonal_rot`` is True.
+
+    Args:
+        kernel (ndarray): The 2D or 3D kernel.
+        orthogonal_rot (bool): If True, the kernel is also rotated over the axial and sagittal planes.
+
+    Returns:
+        List[ndarray]: The 3D kernels of the coronal, axial and sagittal planes, or only the first one.
+    """
+    # A 2D kernel filters each slice of the images
+    kernel = kernel[np.newaxis] if kernel.ndim == 2 else kernel
+    if not orthogonal_rot:
+        return [kernel]
+
+    # Filtering the rotated images with the kernel is filtering the images with the inversely rotated kernel
+    return [kernel, np.rot90(kernel, 1, (1, 0)), np.rot90(kernel, 1, (2, 0))]
+
+
+class FilterBank():
+    """Applies a bank of linear filters (Mean, LoG, Laws and Gabor) to the same images, with one FFT of the padded
+    images per padding mode shared by all the kernels of the bank.
+
+    The filtered images are generated one filter at a time, so that they can be passed to the feature extraction
+    without holding the responses of the whole bank in memory. The spectra of the kernels are cached for the next
+    images of the same size (e.g. scans of a cohort resampled to the same grid).
+    """
+
+    def __init__(
+                self,
+                configs: List[Dict],
+                voxel_length: float,
+                kernel_spectra_memory: int = KERNEL_SPECTRA_MEMORY
+            ) -> None:
+        """The constructor of the filter bank.
+
+        Args:
+            configs (List[Dict]): Parameters of each filter, in the format of the ``imParamFilter`` settings
+                with the type of the filter under ``'filter_type'``, e.g. ``{'filter_type': 'log', 'ndims': 3,
+                'sigma': 1.5, 'padding': 'symmetric', 'orthogonal_rot': False, 'name_save': 'log_1.5'}``.
+            voxel_length (float): Voxel length of the images, in mm.
+            kernel_spectra_memory (int, optional): Memory of the cached kernel spectra, in bytes.
+
+        Returns:
+            None
+        """
+        self.configs = configs
+        self.filters = []
+        for config in configs:
+            _filter, filter_params = get_linear_filter(config['filter_type'], config, voxel_length)
+            params = getattr(filter_params, config['filter_type'].lower())
+            if config['filter_type'].lower() == 'laws' and params.orthogonal_rot:
+                raise NotImplementedError('The orthogonal rotation of the Laws filter is not implemented.')
+            kernels = [
+                get_orthogonal_kernels(kernel, getattr(params, 'orthogonal_rot', False))
+                for kernel in _filter.kernel[:, 0]
+            ]
+            self.filters.append({
+                'filter': _filter,
+                'params': params,
+                'kernels': kernels,
+                # The images are padded and transformed once per padding mode and per axes of the kernels, as a
+                # 2D kernel only needs the FFT of its plane
+                'spectra': {
+                    (_filter.padding, get_kernel_axes(kernel))
+                    for plane_kernels in kernels for kernel in plane_kernels
+                }
+            })
+
+        # Padding of the images for each spectrum, the largest half-size of the kernels using it, and last filter
+        # using it, after which it is freed
+        self.padding = {}
+        self.last_use = {}
+        for f, _filter in enumerate(self.filters):
+            for plane_kernels in _filter['kernels']:
+                for kernel in plane_kernels:
+                    key = (_filter['filter'].padding, get_kernel_axes(kernel))
+                    self.padding[key] = max(self.padding.get(key, 0), (max(kernel.shape) - 1) // 2)
+                    self.last_use[key] = f
+
+        self.kernel_spectra_memory = kernel_spectra_memory
+        self.__kernel_spectra = OrderedDict()
+        self.__kernel_spectra_size = 0
+
+    def __get_kernel_spectrum(self, key: Tuple, kernel: np.ndarray, fft_shape: Dict[int, int]) -> np.ndarray:
+        """Gets the spectrum of a kernel from the cache, or computes and caches it. The least recently used
+        spectra are dropped when the cache is full.
+        """
+        key = key + tuple(fft_shape.items())
+        if key in self.__kernel_spectra:
+            self.__kernel_spectra.move_to_end(key)
+            return self.__kernel_spectra[key]
+
+        spectrum = get_kernel_spectrum(kernel, fft_shape)
+        if spectrum.nbytes <= self.kernel_spectra_memory:
+            self.__kernel_spectra[key] = spectrum
+            self.__kernel_spectra_size += spectrum.nbytes
+            while self.__kernel_spectra_size > self.kernel_spectra_memory:
+                self.__kernel_spectra_size -= self.__kernel_spectra.popitem(last=False)[1].nbytes
+
+        return spectrum
+
+    def __get_spectrum(self, images: np.ndarray, key: Tuple[str, Tuple[int, ...]]) -> Tuple[np.ndarray, Dict[int, int]]:
+        """Pads the images along the given axes and computes their spectrum along these axes."""
+        mode, axes = key
+        pad = self.padding[key]
+        fft_shape = {axis: next_fast_len(images.shape[axis] + 2 * pad, True) for axis in axes}
+        padded_imgs = pad_imgs(images, [pad] * len(axes), list(axes), mode)
+
+        return rfftn(padded_imgs, list(fft_shape.values()), axes=axes), fft_shape
+
+    def __get_responses(
+                self,
+                f: int,
+                channels: List[int],
+                spectra: Dict,
+                in_shape: Tuple[int, ...]
+            ) -> Generator[List[np.ndarray], None, None]:
+        """Generates the responses of some kernels of a filter, over each orthogonal plane."""
+        mode = self.filters[f]['filter'].padding
+        for c in channels:
+            responses = []
+            for r, kernel in enumerate(self.filters[f]['kernels'][c]):
+                key = (mode, get_kernel_axes(kernel))
+                spectrum, fft_shape = spectra[key]
+                response = irfftn(
+                    spectrum * self.__get_kernel_spectrum((f, c, r), kernel, fft_shape),
+                    list(fft_shape.values()),
+                    axes=key[1]
+                )
+                # The circular convolution equals the linear one over the valid region of the padded images
+                start = [
+                    (self.padding[key] if axis in fft_shape else 0) + (size_kernel - 1) // 2
+                    for axis, size_kernel in enumerate(kernel.shape)
+                ]
+                responses.append(response[tuple(
+                    slice(start_axis, start_axis + size) for start_axis, size in zip(start, in_shape)
+                )])
+                del response
+            yield responses
+
+    def __filter(self, f: int, spectra: Dict, in_shape: Tuple[int, ...]) -> np.ndarray:
+        """Filters the images with one filter of the bank, from the spectra of the padded images."""
+        _filter = self.filters[f]['filter']
+        params = self.filters[f]['params']
+        channels = list(range(len(self.filters[f]['kernels'])))
+
+        if isinstance(_filter, Gabor):
+            # Modulus of the complex response, averaged over the orientations then over the orthogonal planes
+            nb_rot = len(channels) // 2
+            result = 0
+            for i in range(nb_rot):
+                real_response, im_response = self.__get_responses(f, [i, i + nb_rot], spectra, in_shape)
+                result = result + np.mean([np.hypot(real, im) for real, im in zip(real_response, im_response)], axis=0)
+
+            return result / nb_rot
+
+        elif isinstance(_filter, Laws):
+            # Maximum response over the rotated kernels
+            result = None
+            for response, in self.__get_responses(f, channels, spectra, in_shape):
+                result = response if result is None else np.maximum(result, response)
+            if params.energy_image:
+                # Average of the absolute response in the energy distance
+                padded = pad_imgs(
+                    np.abs(result)[np.newaxis],
+                    [_filter.energy_dist] * _filter.dim,
+                    list(range(4 - _filter.dim, 4)),
+                    _filter.padding
+                )
+                result = convolve_valid(padded, _filter.energy_kernel[:, 0])[0, 0]
+
+            return result
+
+        # Mean and LoG responses, averaged over the orthogonal planes
+        return np.mean(next(self.__get_responses(f, channels, spectra, in_shape)), axis=0)
+
+    def __call__(
+                self,
+                input_images: Union[np.ndarray, image_volume_obj]
+            ) -> Generator[Tuple[Dict, Union[np.ndarray, image_volume_obj]], None, None]:
+        """Filters the images with each filter of the bank, in the order of the configurations.
+
+        Args:
+            input_images (Union[ndarray, image_volume_obj]): The 3D images to filter.
+
+        Yields:
+            Tuple[Dict, Union[ndarray, image_volume_obj]]: The configuration of the filter and the filtered images,
+            of the same type as ``input_images``.
+        """
+        # Check if the input is a numpy array or a Image volume object
+        spatial_ref = None
+        if type(input_images) == image_volume_obj:
+            spatial_ref = input_images.spatialRef
+            input_images = input_images.data
+
+        # Swap the first axis with the last, to convert image W, H, D --> D, H, W
+        images = np.swapaxes(input_images.astype(np.float64), 0, 2)
+
+        # Spectra of the padded images, shared by the filters of the bank
+        spectra = {}
+        for f, config in enumerate(self.configs):
+            for key in self.filters[f]['spectra']:
+                if key not in spectra:
+                    spectra[key] = self.__get_spectrum(images, key)
+
+            result = np.swapaxes(self.__filter(f, spectra, images.shape), 0, 2)
+            for key in self.filters[f]['spectra']:
+                if self.last_use[key] == f:
+                    del spectra[key]
+
+            if spatial_ref:
+                yield config, image_volume_obj(result, spatial_ref)
+            else:
+                yield config, result
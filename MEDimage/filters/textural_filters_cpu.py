@@ -0,0 +1,804 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+
+import math
+from typing import Tuple
+
+import numpy as np
+
+from ..biomarkers.jit_kernels import NUMBA_AVAILABLE, njit, prange
+from ..utils.textureTools import get_neighbour_direction
+
+# Number of GLCM features computed by the textural filter (see ``TexturalFilter.glcm_features``)
+N_GLCM_FEATURES = 25
+
+
+@njit(cache=True)
+def discretize_window(window: np.ndarray, fbn: bool, n_q: float, min_val: float) -> None:
+    """Discretizes the intensities of a filter window in place, like the ``discretize`` function of the
+    CUDA kernels: with the bin number and the range of the window for FBN, with the bin width and the
+    global minimum for FBS.
+
+    Args:
+        window (ndarray): 3D window of intensities, NaN outside the ROI.
+        fbn (bool): True for a fixed bin number, False for a fixed bin size.
+        n_q (float): Number of bins (FBN) or bin width (FBS).
+        min_val (float): Minimum value of the discretization, only used with FBS.
+
+    Returns:
+        None.
+    """
+    if fbn:
+        min_val = np.nanmin(window)
+        max_val = np.nanmax(window)
+    for i in range(window.shape[0]):
+        for j in range(window.shape[1]):
+            for k in range(window.shape[2]):
+                value = window[i, j, k]
+                if math.isnan(value):
+                    continue
+                if not fbn:
+                    window[i, j, k] = math.floor((value - min_val) / n_q) + 1.0
+                elif value == max_val:
+                    window[i, j, k] = n_q
+                else:
+                    window[i, j, k] = math.floor(n_q * ((value - min_val) / (max_val - min_val))) + 1.0
+
+
+@njit(cache=True)
+def glcm_window_features(window: np.ndarray, features: np.ndarray) -> None:
+    """Computes the GLCM features of a discretized filter window, with the same definitions as the
+    ``computeGLCMFeatures`` function of the CUDA kernels.
+
+    The co-occurrence matrix merges the 26 directions of the window without distance correction, and
+    its grey levels go from 1 to the maximum level of the window.
+
+    Args:
+        window (ndarray): 3D window of grey levels, NaN outside the ROI.
+        features (ndarray): Array of size :data:`N_GLCM_FEATURES` filled with the features, in the order
+            of ``TexturalFilter.glcm_features``.
+
+    Returns:
+        None.
+    """
+    dim_0, dim_1, dim_2 = window.shape
+    n_g = int(np.nanmax(window))
+
+    # Co-occurrence matrix. Levels below 1 are counted as level 1, as in the CUDA kernels.
+    glcm = np.zeros((n_g, n_g))
+    for i in range(dim_0):
+        for j in range(dim_1):
+            for k in range(dim_2):
+                if math.isnan(window[i, j, k]):
+                    continue
+                level = max(int(window[i, j, k]) - 1, 0)
+                for i2 in range(max(0, i - 1), min(i + 1, dim_0 - 1) + 1):
+                    for j2 in range(max(0, j - 1), min(j + 1, dim_1 - 1) + 1):
+                        for k2 in range(max(0, k - 1), min(k + 1, dim_2 - 1) + 1):
+                            if (i2 == i and j2 == j and k2 == k) or math.isnan(window[i2, j2, k2]):
+                                continue
+                            glcm[level, max(int(window[i2, j2, k2]) - 1, 0)] += 1
+    sum_glcm = glcm.sum()
+    if sum_glcm == 0:
+        # Isolated voxel
+        features[:] = np.nan
+        return
+    p_ij = glcm / sum_glcm
+
+    # Marginal, diagonal and cross-diagonal probabilities
+    p_i = np.zeros(n_g)
+    p_j = np.zeros(n_g)
+    p_iminusj = np.zeros(n_g)
+    p_iplusj = np.zeros(2 * n_g - 1)
+    for i in range(n_g):
+        for j in range(n_g):
+            p_i[i] += p_ij[i, j]
+            p_j[j] += p_ij[i, j]
+            p_iminusj[abs(i - j)] += p_ij[i, j]
+            p_iplusj[i + j] += p_ij[i, j]
+
+    u_i = 0.0
+    u_j = 0.0
+    for i in range(n_g):
+        u_i += (i + 1) * p_i[i]
+        u_j += (i + 1) * p_j[i]
+    var_i = 0.0
+    var_j = 0.0
+    h_x = 0.0
+    for i in range(n_g):
+        var_i += (i + 1 - u_i)**2 * p_i[i]
+        var_j += (i + 1 - u_j)**2 * p_j[i]
+        if p_i[i] > 0:
+            h_x -= p_i[i] * math.log2(p_i[i])
+
+    joint_max = 0.0
+    joint_var = 0.0
+    energy = 0.0
+    contrast = 0.0
+    dissimilarity = 0.0
+    inv_diff = 0.0
+    inv_diff_norm = 0.0
+    inv_diff_mom = 0.0
+    inv_diff_mom_norm = 0.0
+    inv_var = 0.0
+    auto_corr = 0.0
+    clust_tend = 0.0
+    clust_shade = 0.0
+    clust_prom = 0.0
+    h_xy = 0.0
+    h_xy1 = 0.0
+    h_xy2 = 0.0
+    for i in range(n_g):
+        for j in range(n_g):
+            p = p_ij[i, j]
+            diff = abs(i - j)
+            clust = i + j + 2 - u_i - u_j
+            joint_max = max(joint_max, p)
+            joint_var += p * (i + 1 - u_i)**2
+            energy += p**2
+            contrast += p * diff**2
+            dissimilarity += p * diff
+            inv_diff += p / (1 + diff)
+            inv_diff_norm += p / (1 + diff / n_g)
+            inv_diff_mom += p / (1 + diff**2)
+            inv_diff_mom_norm += p / (1 + diff**2 / n_g**2)
+            if j > i:
+                inv_var += 2 * p / diff**2
+            auto_corr += p * (i + 1) * (j + 1)
+            clust_tend += p * clust**2
+            clust_shade += p * clust**3
+            clust_prom += p * clust**4
+            if p > 0:
+                h_xy -= p * math.log2(p)
+            p_ind = p_i[i] * p_j[j]
+            if p_ind > 0:
+                h_xy1 -= p * math.log2(p_ind)
+                h_xy2 -= p_ind * math.log2(p_ind)
+
+    diff_avg = 0.0
+    diff_var = 0.0
+    diff_entr = 0.0
+    for k in range(n_g):
+        diff_avg += k * p_iminusj[k]
+    for k in range(n_g):
+        diff_var += (k - diff_avg)**2 * p_iminusj[k]
+        if p_iminusj[k] > 0:
+            diff_entr -= p_iminusj[k] * math.log2(p_iminusj[k])
+
+    sum_avg = 0.0
+    sum_var = 0.0
+    sum_entr = 0.0
+    for k in range(2 * n_g - 1):
+        sum_avg += (k + 2) * p_iplusj[k]
+    for k in range(2 * n_g - 1):
+        sum_var += (k + 2 - sum_avg)**2 * p_iplusj[k]
+        if p_iplusj[k] > 0:
+            sum_entr -= p_iplusj[k] * math.log2(p_iplusj[k])
+
+    features[0] = joint_max
+    features[1] = u_i
+    features[2] = joint_var
+    features[3] = h_xy
+    features[4] = diff_avg
+    features[5] = diff_var
+    features[6] = diff_entr
+    features[7] = sum_avg
+    features[8] = sum_var
+    features[9] = sum_entr
+    features[10] = energy
+    features[11] = contrast
+    features[12] = dissimilarity
+    features[13] = inv_diff
+    features[14] = inv_diff_norm
+    features[15] = inv_diff_mom
+    features[16] = inv_diff_mom_norm
+    features[17] = inv_var
+    features[18] = (auto_corr - u_i * u_j) / math.sqrt(var_i * var_j) if var_i * var_j > 0 else np.nan
+    features[19] = auto_corr
+    features[20] = clust_tend
+    features[21] = clust_shade
+    features[22] = clust_prom
+    features[23] = (h_xy - h_xy1) / h_x if h_x > 0 else np.nan
+    features[24] = 0.0 if h_xy > h_xy2 else math.sqrt(1 - math.exp(-2 * (h_xy2 - h_xy)))
+
+
+@njit(cache=True, parallel=True)
+def glcm_filter_kernel(
+        vol: np.ndarray,
+        filter_size: int,
+        local: bool,
+        fbn: bool,
+        n_q: float,
+        min_val: float
+    ) -> np.ndarray:
+    """CPU version of the ``glcm_filter_global`` and ``glcm_filter_local`` CUDA kernels: computes the
+    GLCM features of the window centred on each voxel of the volume, the voxels being spread over the
+    available cores.
+
+    Args:
+        vol (ndarray): 3D volume, NaN outside the ROI. Grey levels if ``local`` is False, else
+            intensities discretized in each window.
+        filter_size (int): Size of the filter window, an odd number.
+        local (bool): If True, each window is discretized on its own (see :func:`discretize_window`).
+        fbn (bool): True for a fixed bin number, False for a fixed bin size. Only used if ``local``.
+        n_q (float): Number of bins (FBN) or bin width (FBS). Only used if ``local``.
+        min_val (float): Minimum value of the FBS discretization. Only used if ``local``.
+
+    Returns:
+        ndarray: 4D volume of the :data:`N_GLCM_FEATURES` features of each voxel, NaN outside the ROI.
+    """
+    dim_0, dim_1, dim_2 = vol.shape
+    pad = (filter_size - 1) // 2
+    filtered = np.empty((dim_0, dim_1, dim_2, N_GLCM_FEATURES), dtype=np.float32)
+    filtered[:] = np.nan
+    for index in prange(dim_0 * dim_1 * dim_2):
+        i = index // (dim_1 * dim_2)
+        j = (index // dim_2) % dim_1
+        k = index % dim_2
+        if math.isnan(vol[i, j, k]):
+            continue
+        window = np.empty((filter_size, filter_size, filter_size))
+        window[:] = np.nan
+        for i2 in range(max(0, i - pad), min(i + pad, dim_0 - 1) + 1):
+            for j2 in range(max(0, j - pad), min(j + pad, dim_1 - 1) + 1):
+                for k2 in range(max(0, k - pad), min(k + pad, dim_2 - 1) + 1):
+                    window[i2 - i + pad, j2 - j + pad, k2 - k + pad] = vol[i2, j2, k2]
+        if local:
+            discretize_window(window, fbn, n_q, min_val)
+        features = np.empty(N_GLCM_FEATURES)
+        glcm_window_features(window, features)
+        for idx in range(N_GLCM_FEATURES):
+            filtered[i, j, k, idx] = features[idx]
+
+    return filtered
+
+
+# Number of GLRLM and GLSZM features computed by the textural filter (see ``TexturalFilter.glrlm_features``)
+N_SIZE_FEATURES = 16
+
+# Number of NGTDM features computed by the textural filter (see ``TexturalFilter.ngtdm_features``)
+N_NGTDM_FEATURES = 5
+
+
+def get_level_indexes(vol: np.ndarray) -> Tuple[np.ndarray, int]:
+    """Gets the 0-based grey level index of each voxel of a discretized volume.
+
+    Args:
+        vol (ndarray): 3D volume of grey levels starting at 1, NaN outside the ROI.
+
+    Returns:
+        Tuple[ndarray, int]:
+            - 3D array of the grey level indexes, -1 outside the ROI. Levels below 1 are counted as
+              level 1, as in the GLCM filter.
+            - Number of grey levels.
+    """
+    roi = ~np.isnan(vol)
+    levels = np.full(vol.shape, -1, dtype=np.int32)
+    levels[roi] = np.maximum(vol[roi].astype(np.int32) - 1, 0)
+    n_levels = int(levels.max()) + 1 if roi.any() else 0
+
+    return levels, n_levels
+
+@njit(cache=True)
+def get_slab_ranges(k: int, pad: int, dim_2: int) -> Tuple[int, int, int, int, int, int, int, int]:
+    """Gets the bounds along the last axis of the windows centred on ``k`` and ``k + 1``, and the slabs
+    whose matrix entries can differ between the two windows: the slabs from the first slab of the first
+    window to the first slab of the second one, and from the last slab of the first window to the last
+    slab of the second one. Entries lying only between these slabs are the same in both windows.
+
+    Args:
+        k (int): Index of the centre of the first window along the last axis.
+        pad (int): Half size of the window.
+        dim_2 (int): Size of the volume along the last axis.
+
+    Returns:
+        Tuple[int, int, int, int, int, int, int, int]: First and last slabs of the first window, of the
+        second window, and of the two ranges of slabs. The second range starts after the first one.
+    """
+    k_lo, k_hi = max(0, k - pad), min(k + pad, dim_2 - 1)
+    k_lo_next, k_hi_next = max(0, k + 1 - pad), min(k + 1 + pad, dim_2 - 1)
+
+    return k_lo, k_hi, k_lo_next, k_hi_next, k_lo, k_lo_next, max(k_hi, k_lo_next + 1), k_hi_next
+
+@njit(cache=True)
+def update_run_histogram(
+        histogram: np.ndarray,
+        levels: np.ndarray,
+        directions: np.ndarray,
+        window: np.ndarray,
+        slabs: np.ndarray,
+        sign: int
+    ) -> None:
+    """Adds (or removes) the runs of a window that cross the given slabs to the run counts of its GLRLM.
+
+    The runs are those of the window only: a run crossing the window border is cut at the border.
+    Each run is counted once, from its first voxel lying in the slabs.
+
+    Args:
+        histogram (ndarray): Number of runs of each grey level and run length (from 1) in the window.
+        levels (ndarray): 3D array of the grey level indexes, -1 outside the ROI.
+        directions (ndarray): Array of the directions of the runs, of shape (number of directions, 3).
+        window (ndarray): First and last indexes of the window along each axis, of shape (3, 2).
+        slabs (ndarray): First and last indexes of the two ranges of slabs (see :func:`get_slab_ranges`).
+        sign (int): 1 to add the runs, -1 to remove them.
+
+    Returns:
+        None.
+    """
+    for d in range(directions.shape[0]):
+        d_i, d_j, d_k = directions[d, 0], directions[d, 1], directions[d, 2]
+        for r in range(2):
+            for k in range(max(slabs[2 * r], window[2, 0]), min(slabs[2 * r + 1], window[2, 1]) + 1):
+                for i in range(window[0, 0], window[0, 1] + 1):
+                    for j in range(window[1, 0], window[1, 1] + 1):
+                        level = levels[i, j, k]
+                        if level < 0:
+                            continue
+                        # Walk back to the first voxel of the run in the window
+                        length = 1
+                        i2, j2, k2 = i - d_i, j - d_j, k - d_k
+                        counted = False
+                        while window[0, 0] <= i2 <= window[0, 1] and window[1, 0] <= j2 <= window[1, 1] \
+                                and window[2, 0] <= k2 <= window[2, 1] and levels[i2, j2, k2] == level:
+                            if slabs[0] <= k2 <= slabs[1] or slabs[2] <= k2 <= slabs[3]:
+                                counted = True
+                                break
+                            length += 1
+                            i2, j2, k2 = i2 - d_i, j2 - d_j, k2 - d_k
+                        if counted:
+                            continue
+                        i2, j2, k2 = i + d_i, j + d_j, k + d_k
+                        while window[0, 0] <= i2 <= window[0, 1] and window[1, 0] <= j2 <= window[1, 1] \
+                                and window[2, 0] <= k2 <= window[2, 1] and levels[i2, j2, k2] == level:
+                            length += 1
+                            i2, j2, k2 = i2 + d_i, j2 + d_j, k2 + d_k
+                        histogram[level, length - 1] += sign
+
+@njit(cache=True)
+def update_zone_histogram(
+        histogram: np.ndarray,
+        levels: np.ndarray,
+        window: np.ndarray,
+        slabs: np.ndarray,
+        visited: np.ndarray,
+        stamp: int,
+        stack: np.ndarray,
+        sign: int
+    ) -> None:
+    """Adds (or removes) the zones of a window that cross the given slabs to the zone counts of its GLSZM.
+
+    The zones are the 26-connected voxels of a grey level in the window only: a zone crossing the window
+    border is cut at the border, and may be split in several zones.
+
+    Args:
+        histogram (ndarray): Number of zones of each grey level and zone size (from 1) in the window.
+        levels (ndarray): 3D array of the grey level indexes, -1 outside the ROI.
+        window (ndarray): First and last indexes of the window along each axis, of shape (3, 2).
+        slabs (ndarray): First and last indexes of the two ranges of slabs (see :func:`get_slab_ranges`).
+        visited (ndarray): Stamp of the last visit of each voxel of the line of windows, relative to the
+            first indexes of the window along the first two axes.
+        stamp (int): Stamp of this visit, different from the stamps of the previous visits.
+        stack (ndarray): Array of shape (number of voxels of a window, 3) used to explore the zones.
+        sign (int): 1 to add the zones, -1 to remove them.
+
+    Returns:
+        None.
+    """
+    i_0, j_0 = window[0, 0], window[1, 0]
+    for r in range(2):
+        for k in range(max(slabs[2 * r], window[2, 0]), min(slabs[2 * r + 1], window[2, 1]) + 1):
+            for i in range(window[0, 0], window[0, 1] + 1):
+                for j in range(window[1, 0], window[1, 1] + 1):
+                    level = levels[i, j, k]
+                    if level < 0 or visited[i - i_0, j - j_0, k] == stamp:
+                        continue
+                    # Explore the zone of the voxel
+                    visited[i - i_0, j - j_0, k] = stamp
+                    stack[0, 0], stack[0, 1], stack[0, 2] = i, j, k
+                    n_stack = 1
+                    size = 0
+                    while n_stack > 0:
+                        n_stack -= 1
+                        size += 1
+                        i2, j2, k2 = stack[n_stack, 0], stack[n_stack, 1], stack[n_stack, 2]
+                        for i3 in range(max(window[0, 0], i2 - 1), min(i2 + 1, window[0, 1]) + 1):
+                            for j3 in range(max(window[1, 0], j2 - 1), min(j2 + 1, window[1, 1]) + 1):
+                                for k3 in range(max(window[2, 0], k2 - 1), min(k2 + 1, window[2, 1]) + 1):
+                                    if levels[i3, j3, k3] != level or visited[i3 - i_0, j3 - j_0, k3] == stamp:
+                                        continue
+                                    visited[i3 - i_0, j3 - j_0, k3] = stamp
+                                    stack[n_stack, 0], stack[n_stack, 1], stack[n_stack, 2] = i3, j3, k3
+                                    n_stack += 1
+                    histogram[level, size - 1] += sign
+
+@njit(cache=True)
+def size_matrix_features(histogram: np.ndarray, n_v: float, features: np.ndarray) -> None:
+    """Computes the GLRLM or GLSZM features of a window (see :func:`size_matrix_filter_kernel`).
+
+    Args:
+        histogram (ndarray): Number of runs (or zones) of each grey level and size (from 1) in the window.
+        n_v (float): Number of voxels of the matrices, i.e. the voxels of the window times the number of
+            merged matrices.
+        features (ndarray): Array of size :data:`N_SIZE_FEATURES` filled with the features, in the order
+            of ``TexturalFilter.glrlm_features`` (or ``glszm_features``).
+
+    Returns:
+        None.
+    """
+    n_levels, n_cols = histogram.shape
+    r_i = np.zeros(n_levels)
+    r_j = np.zeros(n_cols)
+    for i in range(n_levels):
+        for j in range(n_cols):
+            r_i[i] += histogram[i, j]
+            r_j[j] += histogram[i, j]
+    n_s = r_i.sum()
+    if n_s == 0:
+        features[:] = np.nan
+        return
+
+    srlge = 0.0
+    srhge = 0.0
+    lrlge = 0.0
+    lrhge = 0.0
+    mu_i = 0.0
+    mu_j = 0.0
+    entr = 0.0
+    for i in range(n_levels):
+        for j in range(n_cols):
+            if histogram[i, j] == 0:
+                continue
+            p_ij = histogram[i, j] / n_s
+            level = i + 1.0
+            size = j + 1.0
+            srlge += p_ij / (level * size)**2
+            srhge += p_ij * level**2 / size**2
+            lrlge += p_ij * size**2 / level**2
+            lrhge += p_ij * level**2 * size**2
+            mu_i += p_ij * level
+            mu_j += p_ij * size
+            entr -= p_ij * math.log2(p_ij)
+    gl_var = 0.0
+    rl_var = 0.0
+    for i in range(n_levels):
+        for j in range(n_cols):
+            if histogram[i, j] > 0:
+                p_ij = histogram[i, j] / n_s
+                gl_var += p_ij * (i + 1.0 - mu_i)**2
+                rl_var += p_ij * (j + 1.0 - mu_j)**2
+
+    sre = 0.0
+    lre = 0.0
+    rlnu = 0.0
+    for j in range(n_cols):
+        sre += r_j[j] / (j + 1.0)**2
+        lre += r_j[j] * (j + 1.0)**2
+        rlnu += r_j[j]**2
+    lgre = 0.0
+    hgre = 0.0
+    glnu = 0.0
+    for i in range(n_levels):
+        lgre += r_i[i] / (i + 1.0)**2
+        hgre += r_i[i] * (i + 1.0)**2
+        glnu += r_i[i]**2
+
+    features[0] = sre / n_s
+    features[1] = lre / n_s
+    features[2] = lgre / n_s
+    features[3] = hgre / n_s
+    features[4] = srlge
+    features[5] = srhge
+    features[6] = lrlge
+    features[7] = lrhge
+    features[8] = glnu / n_s
+    features[9] = glnu / n_s**2
+    features[10] = rlnu / n_s
+    features[11] = rlnu / n_s**2
+    features[12] = n_s / n_v
+    features[13] = gl_var
+    features[14] = rl_var
+    features[15] = entr
+
+@njit(cache=True)
+def count_window_voxels(levels: np.ndarray, window: np.ndarray, k: int) -> int:
+    """Counts the voxels of the ROI in the slab ``k`` of a window.
+
+    Args:
+        levels (ndarray): 3D array of the grey level indexes, -1 outside the ROI.
+        window (ndarray): First and last indexes of the window along each axis, of shape (3, 2).
+        k (int): Index of the slab along the last axis.
+
+    Returns:
+        int: Number of voxels.
+    """
+    n_voxels = 0
+    for i in range(window[0, 0], window[0, 1] + 1):
+        for j in range(window[1, 0], window[1, 1] + 1):
+            if levels[i, j, k] >= 0:
+                n_voxels += 1
+
+    return n_voxels
+
+@njit(cache=True, parallel=True)
+def size_matrix_filter_kernel(
+        levels: np.ndarray,
+        n_levels: int,
+        directions: np.ndarray,
+        filter_size: int,
+        zones: bool
+    ) -> np.ndarray:
+    """Computes the GLRLM or GLSZM features of the window centred on each voxel of the volume.
+
+    The runs (or zones) of a window are cut at its border, as if the window were the whole ROI. While the
+    window slides along the last axis, only the runs (or zones) crossing the slabs at its two ends are
+    removed and counted again (see :func:`get_slab_ranges`): the others stay the same. The lines of
+    windows are spread over the available cores.
+
+    Args:
+        levels (ndarray): 3D array of the grey level indexes, -1 outside the ROI.
+        n_levels (int): Number of grey levels.
+        directions (ndarray): Array of the directions of the runs merged in the GLRLM, of shape (number
+            of directions, 3). Only used if ``zones`` is False.
+        filter_size (int): Size of the filter window, an odd number.
+        zones (bool): True for the GLSZM, with 26-connected zones, False for the GLRLM.
+
+    Returns:
+        ndarray: 4D volume of the :data:`N_SIZE_FEATURES` features of each voxel, NaN outside the ROI.
+    """
+    dim_0, dim_1, dim_2 = levels.shape
+    pad = (filter_size - 1) // 2
+    n_matrices = 1 if zones else directions.shape[0]
+    n_cols = filter_size**3 if zones else filter_size
+    filtered = np.empty((dim_0, dim_1, dim_2, N_SIZE_FEATURES), dtype=np.float32)
+    filtered[:] = np.nan
+    for line in prange(dim_0 * dim_1):
+        i = line // dim_1
+        j = line % dim_1
+        if levels[i, j].max() < 0:
+            continue
+        histogram = np.zeros((n_levels, n_cols), dtype=np.int64)
+        features = np.empty(N_SIZE_FEATURES)
+        window = np.empty((3, 2), dtype=np.int64)
+        window[0, 0], window[0, 1] = max(0, i - pad), min(i + pad, dim_0 - 1)
+        window[1, 0], window[1, 1] = max(0, j - pad), min(j + pad, dim_1 - 1)
+        slabs = np.empty(4, dtype=np.int64)
+        visited = np.zeros((window[0, 1] - window[0, 0] + 1, window[1, 1] - window[1, 0] + 1, dim_2), dtype=np.int64)
+        stack = np.empty((filter_size**3, 3), dtype=np.int64)
+        stamp = 0
+
+        # First window of the line
+        window[2, 0], window[2, 1] = 0, min(pad, dim_2 - 1)
+        slabs[0], slabs[1], slabs[2], slabs[3] = window[2, 0], window[2, 1], dim_2, -1
+        if zones:
+            stamp += 1
+            update_zone_histogram(histogram, levels, window, slabs, visited, stamp, stack, 1)
+        else:
+            update_run_histogram(histogram, levels, directions, window, slabs, 1)
+        n_voxels = 0
+        for k in range(window[2, 0], window[2, 1] + 1):
+            n_voxels += count_window_voxels(levels, window, k)
+        for k in range(dim_2):
+            if k > 0:
+                k_lo, k_hi, k_lo_next, k_hi_next, slabs[0], slabs[1], slabs[2], slabs[3] = \
+                    get_slab_ranges(k - 1, pad, dim_2)
+                window[2, 0], window[2, 1] = k_lo, k_hi
+                if zones:
+                    stamp += 1
+                    update_zone_histogram(histogram, levels, window, slabs, visited, stamp, stack, -1)
+                else:
+                    update_run_histogram(histogram, levels, directions, window, slabs, -1)
+                if k_lo_next > k_lo:
+                    n_voxels -= count_window_voxels(levels, window, k_lo)
+                window[2, 0], window[2, 1] = k_lo_next, k_hi_next
+                if zones:
+                    stamp += 1
+                    update_zone_histogram(histogram, levels, window, slabs, visited, stamp, stack, 1)
+                else:
+                    update_run_histogram(histogram, levels, directions, window, slabs, 1)
+                if k_hi_next > k_hi:
+                    n_voxels += count_window_voxels(levels, window, k_hi_next)
+            if levels[i, j, k] < 0:
+                continue
+            size_matrix_features(histogram, n_voxels * n_matrices, features)
+            for idx in range(N_SIZE_FEATURES):
+                filtered[i, j, k, idx] = features[idx]
+
+    return filtered
+
+@njit(cache=True)
+def update_ngtdm_histogram(
+        counts: np.ndarray,
+        sums: np.ndarray,
+        levels: np.ndarray,
+        window: np.ndarray,
+        slabs: np.ndarray,
+        sign: int
+    ) -> None:
+    """Adds (or removes) the voxels of a window lying in the given slabs to the NGTDM of the window.
+
+    The neighbourhood difference of a voxel is the absolute difference between its grey level and the
+    average grey level of its 26-connected neighbours in the ROI and in the window, without distance
+    correction. Voxels without neighbours are left out.
+
+    Args:
+        counts (ndarray): Number of voxels of each grey level with neighbours in the window.
+        sums (ndarray): Sum of the neighbourhood differences of each grey level in the window.
+        levels (ndarray): 3D array of the grey level indexes, -1 outside the ROI.
+        window (ndarray): First and last indexes of the window along each axis, of shape (3, 2).
+        slabs (ndarray): First and last indexes of the two ranges of slabs (see :func:`get_slab_ranges`).
+        sign (int): 1 to add the voxels, -1 to remove them.
+
+    Returns:
+        None.
+    """
+    for r in range(2):
+        for k in range(max(slabs[2 * r], window[2, 0]), min(slabs[2 * r + 1], window[2, 1]) + 1):
+            for i in range(window[0, 0], window[0, 1] + 1):
+                for j in range(window[1, 0], window[1, 1] + 1):
+                    level = levels[i, j, k]
+                    if level < 0:
+                        continue
+                    total = 0.0
+                    count = 0
+                    for i2 in range(max(window[0, 0], i - 1), min(i + 1, window[0, 1]) + 1):
+                        for j2 in range(max(window[1, 0], j - 1), min(j + 1, window[1, 1]) + 1):
+                            for k2 in range(max(window[2, 0], k - 1), min(k + 1, window[2, 1]) + 1):
+                                if (i2 == i and j2 == j and k2 == k) or levels[i2, j2, k2] < 0:
+                                    continue
+                                total += levels[i2, j2, k2]
+                                count += 1
+                    if count > 0:
+                        counts[level] += sign
+                        sums[level] += sign * abs(level - total / count)
+
+@njit(cache=True)
+def ngtdm_features(counts: np.ndarray, sums: np.ndarray, features: np.ndarray) -> None:
+    """Computes the NGTDM features of a window, with the definitions of :mod:`MEDimage.biomarkers.ngtdm`.
+
+    Args:
+        counts (ndarray): Number of voxels of each grey level with neighbours in the window.
+        sums (ndarray): Sum of the neighbourhood differences of each grey level in the window.
+        features (ndarray): Array of size :data:`N_NGTDM_FEATURES` filled with the features, in the order
+            of ``TexturalFilter.ngtdm_features``.
+
+    Returns:
+        None.
+    """
+    n_levels = counts.size
+    n_tot = counts.sum()
+    if n_tot == 0:
+        features[:] = np.nan
+        return
+    p = counts / n_tot
+    # The sums of absent levels are reset, so that the rounding errors of the updates do not add up
+    s = np.where(counts > 0, sums, 0.0)
+    n_g = 0
+    p_s = 0.0
+    for i in range(n_levels):
+        if counts[i] > 0:
+            n_g += 1
+        p_s += p[i] * s[i]
+    s_tot = s.sum()
+
+    p_ij = 0.0
+    denom_busyness = 0.0
+    complexity = 0.0
+    strength = 0.0
+    for i in range(n_levels):
+        for j in range(n_levels):
+            p_ij += p[i] * p[j] * (i - j)**2
+            if counts[i] > 0 and counts[j] > 0:
+                denom_busyness += abs((i + 1) * p[i] - (j + 1) * p[j])
+                complexity += abs(i - j) / (n_tot * (p[i] + p[j])) * (p[i] * s[i] + p[j] * s[j])
+                strength += (p[i] + p[j]) * (i - j)**2
+
+    features[0] = min(1 / p_s, 10**6) if p_s > 0 else 10**6
+    features[1] = 0.0 if n_g == 1 else p_ij * s_tot / (n_g * (n_g - 1) * n_tot)
+    if n_g == 1:
+        features[2] = 0.0
+    else:
+        # Infinite when the weighted probabilities of the levels are all equal, as in the biomarkers
+        features[2] = p_s / denom_busyness if denom_busyness > 0 else np.inf
+    features[3] = complexity
+    features[4] = 0.0 if s_tot == 0 else strength / s_tot
+
+@njit(cache=True, parallel=True)
+def ngtdm_filter_kernel(levels: np.ndarray, filter_size: int) -> np.ndarray:
+    """Computes the NGTDM features of the window centred on each voxel of the volume.
+
+    The neighbourhoods are cut at the border of the window, as if the window were the whole ROI. While
+    the window slides along the last axis, only the voxels of the slabs at its two ends are removed and
+    counted again, like in :func:`size_matrix_filter_kernel`.
+
+    Args:
+        levels (ndarray): 3D array of the grey level indexes, -1 outside the ROI.
+        filter_size (int): Size of the filter window, an odd number.
+
+    Returns:
+        ndarray: 4D volume of the :data:`N_NGTDM_FEATURES` features of each voxel, NaN outside the ROI.
+    """
+    dim_0, dim_1, dim_2 = levels.shape
+    n_levels = levels.max() + 1
+    pad = (filter_size - 1) // 2
+    filtered = np.empty((dim_0, dim_1, dim_2, N_NGTDM_FEATURES), dtype=np.float32)
+    filtered[:] = np.nan
+    for line in prange(dim_0 * dim_1):
+        i = line // dim_1
+        j = line % dim_1
+        if levels[i, j].max() < 0:
+            continue
+        counts = np.zeros(n_levels, dtype=np.int64)
+        sums = np.zeros(n_levels)
+        features = np.empty(N_NGTDM_FEATURES)
+        window = np.empty((3, 2), dtype=np.int64)
+        window[0, 0], window[0, 1] = max(0, i - pad), min(i + pad, dim_0 - 1)
+        window[1, 0], window[1, 1] = max(0, j - pad), min(j + pad, dim_1 - 1)
+        slabs = np.empty(4, dtype=np.int64)
+
+        # First window of the line
+        window[2, 0], window[2, 1] = 0, min(pad, dim_2 - 1)
+        slabs[0], slabs[1], slabs[2], slabs[3] = window[2, 0], window[2, 1], dim_2, -1
+        update_ngtdm_histogram(counts, sums, levels, window, slabs, 1)
+        for k in range(dim_2):
+            if k > 0:
+                k_lo, k_hi, k_lo_next, k_hi_next, slabs[0], slabs[1], slabs[2], slabs[3] = \
+                    get_slab_ranges(k - 1, pad, dim_2)
+                window[2, 0], window[2, 1] = k_lo, k_hi
+                update_ngtdm_histogram(counts, sums, levels, window, slabs, -1)
+                window[2, 0], window[2, 1] = k_lo_next, k_hi_next
+                update_ngtdm_histogram(counts, sums, levels, window, slabs, 1)
+            if levels[i, j, k] < 0:
+                continue
+            ngtdm_features(counts, sums, features)
+            for idx in range(N_NGTDM_FEATURES):
+                filtered[i, j, k, idx] = features[idx]
+
+    return filtered
+
+def glrlm_filter(vol: np.ndarray, filter_size: int) -> np.ndarray:
+    """Computes the GLRLM feature maps of a discretized volume, with the 13 directions of the runs merged
+    in a single matrix (see :func:`size_matrix_filter_kernel`).
+
+    Args:
+        vol (ndarray): 3D volume of grey levels starting at 1, NaN outside the ROI.
+        filter_size (int): Size of the filter window, an odd number.
+
+    Returns:
+        ndarray: 4D volume of the :data:`N_SIZE_FEATURES` GLRLM features of each voxel, NaN outside the ROI.
+    """
+    levels, n_levels = get_level_indexes(vol)
+    directions = np.ascontiguousarray(
+        get_neighbour_direction(d=1, distance="chebyshev", centre=False, complete=False, dim3=True).T
+    ).astype(np.int64)
+
+    return size_matrix_filter_kernel(levels, n_levels, directions, filter_size, False)
+
+def glszm_filter(vol: np.ndarray, filter_size: int) -> np.ndarray:
+    """Computes the GLSZM feature maps of a discretized volume, with 26-connected zones (see
+    :func:`size_matrix_filter_kernel`).
+
+    Args:
+        vol (ndarray): 3D volume of grey levels starting at 1, NaN outside the ROI.
+        filter_size (int): Size of the filter window, an odd number.
+
+    Returns:
+        ndarray: 4D volume of the :data:`N_SIZE_FEATURES` GLSZM features of each voxel, NaN outside the ROI.
+    """
+    levels, n_levels = get_level_indexes(vol)
+
+    return size_matrix_filter_kernel(levels, n_levels, np.zeros((0, 3), dtype=np.int64), filter_size, True)
+
+def ngtdm_filter(vol: np.ndarray, filter_size: int) -> np.ndarray:
+    """Computes the NGTDM feature maps of a discretized volume (see :func:`ngtdm_filter_kernel`).
+
+    Args:
+        vol (ndarray): 3D volume of grey levels starting at 1, NaN outside the ROI.
+        filter_size (int): Size of the filter window, an odd number.
+
+    Returns:
+        ndarray: 4D volume of the :data:`N_NGTDM_FEATURES` NGTDM features of each voxel, NaN outside the ROI.
+    """
+    levels, _ = get_level_indexes(vol)
+
+    return ngtdm_filter_kernel(levels, filter_size)
@@ -1,8 +1,21 @@
-from typing import List
+from typing import Dict, List, Sequence, Union
 
 import numpy as np
+from scipy.fft import next_fast_len
+from scipy.ndimage import convolve1d
 from scipy.signal import fftconvolve
 
+# Relative tolerance of the singular values kept in the separable decomposition of a kernel
+SEPARABLE_TOLERANCE = 1e-10
+
+# Estimated costs of the convolution methods, in multiply-adds of a 1D convolution pass per voxel: per voxel
+# and axis for a box kernel (cumulative sum and difference), and per voxel and log2 of the FFT size for FFT
+BOX_COST = 8.0
+FFT_COST = 3.0
+
+# Memory above which the FFT convolution is avoided if the kernel is separable, in bytes
+FFT_MEMORY_LIMIT = 2**31
+
 
 def pad_imgs(
             images: np.ndarray,
@@ -34,6 +47,151 @@ def pad_imgs(
 
     return np.pad(images, pad_tuple, mode=mode)
 
+def get_separable_factors(kernel: np.ndarray, tol: float = SEPARABLE_TOLERANCE) -> Union[np.ndarray, List]:
+    """Decomposes a kernel into sums of 1D factors, by successive singular value decompositions along its axes.
+
+    Args:
+        kernel (ndarray): The N-D kernel.
+        tol (float, optional): Singular values below ``tol`` times the largest one are dropped.
+
+    Returns:
+        Union[ndarray, List]: The kernel itself if it is 1D, else a list of ``(factor, sub_factors)`` tuples, where
+        ``factor`` is a 1D factor along the first axis and ``sub_factors`` the decomposition of the remaining axes.
+    """
+    if kernel.ndim == 1:
+        return kernel
+    u, s, vt = np.linalg.svd(kernel.reshape(kernel.shape[0], -1), full_matrices=False)
+    rank = max(int(np.sum(s > tol * s[0])), 1)
+
+    return [(u[:, r] * s[r], get_separable_factors(vt[r].reshape(kernel.shape[1:]), tol)) for r in range(rank)]
+
+def get_separable_taps(factors: Union[np.ndarray, List]) -> int:
+    """Counts the taps of the 1D convolution passes of a separable decomposition.
+
+    Args:
+        factors (Union[ndarray, List]): Decomposition of the kernel (see :func:`get_separable_factors`).
+
+    Returns:
+        int: Number of taps per voxel.
+    """
+    if isinstance(factors, np.ndarray):
+        return factors.size
+
+    return sum(factor.size + get_separable_taps(sub_factors) for factor, sub_factors in factors)
+
+def plan_convolution(kernel: np.ndarray, shape: Sequence[int]) -> Dict:
+    """Chooses the fastest way to convolve padded images of a given shape with a kernel (valid convolution):
+
+        - ``box``: the kernel is constant, the images are summed along each axis with cumulative sums.
+        - ``separable``: the kernel is a sum of few products of 1D factors (e.g. Laws, LoG or Gabor kernels
+          with an isotropic envelope), the images are convolved with the 1D factors along each axis.
+        - ``fft``: the images are convolved with the full kernel in the Fourier domain.
+
+    The choice is made from the estimated cost of each method, separable kernels also avoid the FFT when its
+    buffers would take more than :data:`FFT_MEMORY_LIMIT`.
+
+    Args:
+        kernel (ndarray): The N-D kernel.
+        shape (Sequence[int]): The shape of the padded images along the axes of the kernel.
+
+    Returns:
+        Dict: The plan, with its ``method`` and the ``value`` of the box kernel or the ``factors`` of the separable
+        kernel (see :func:`get_separable_factors`).
+    """
+    n_voxels = np.prod(shape)
+    n_fft = np.prod([next_fast_len(size + size_kernel - 1) for size, size_kernel in zip(shape, kernel.shape)])
+    fft_cost = FFT_COST * n_fft * np.log2(n_fft)
+
+    # Cropping the padding only gives the valid convolution for odd kernel sizes
+    if any(size_kernel % 2 == 0 for size_kernel in kernel.shape):
+        return {'method': 'fft'}
+    if np.all(kernel == kernel.flat[0]) and BOX_COST * kernel.ndim * n_voxels < fft_cost:
+        return {'method': 'box', 'value': kernel.flat[0]}
+
+    factors = get_separable_factors(kernel)
+    taps = get_separable_taps(factors)
+    # Separable only pays if it needs fewer taps than the dense kernel
+    if taps < kernel.size:
+        # Rfft buffers of the images, the kernel and their product
+        fft_memory = 3 * 8 * n_fft
+        if taps * n_voxels < fft_cost or fft_memory > FFT_MEMORY_LIMIT:
+            return {'method': 'separable', 'factors': factors}
+
+    return {'method': 'fft'}
+
+def _crop(images: np.ndarray, axis: int, pad: int) -> np.ndarray:
+    """Removes the padding of the images along one axis."""
+    index = [slice(None)] * images.ndim
+    index[axis] = slice(pad, images.shape[axis] - pad)
+
+    return images[tuple(index)]
+
+def _convolve_separable(images: np.ndarray, factors: Union[np.ndarray, List], axis: int) -> np.ndarray:
+    """Valid convolution of the images with a separable decomposition, starting at the given axis."""
+    if isinstance(factors, np.ndarray):
+        return _crop(convolve1d(images, factors, axis=axis, mode='constant'), axis, factors.size // 2)
+
+    result = 0
+    for factor, sub_factors in factors:
+        partial = _crop(convolve1d(images, factor, axis=axis, mode='constant'), axis, factor.size // 2)
+        result = result + _convolve_separable(partial, sub_factors, axis + 1)
+
+    return result
+
+def _convolve_box(images: np.ndarray, kernel_shape: Sequence[int], value: float) -> np.ndarray:
+    """Valid convolution of the images with a constant kernel, by cumulative sums along the last axes."""
+    first_axis = images.ndim - len(kernel_shape)
+    for axis, size_kernel in enumerate(kernel_shape, start=first_axis):
+        zeros_shape = list(images.shape)
+        zeros_shape[axis] = 1
+        # Summed in double precision, the differences of large sums would lose the precision of float32 images
+        cumsum = np.concatenate((np.zeros(zeros_shape), np.cumsum(images, axis=axis, dtype=np.float64)), axis=axis)
+        upper = [slice(None)] * images.ndim
+        lower = [slice(None)] * images.ndim
+        upper[axis] = slice(size_kernel, None)
+        lower[axis] = slice(None, -size_kernel)
+        images = cumsum[tuple(upper)] - cumsum[tuple(lower)]
+
+    return images * value
+
+def convolve_valid(images: np.ndarray, kernels: np.ndarray) -> np.ndarray:
+    """Valid convolution of a batch of padded images with several kernels, with the method chosen by
+    :func:`plan_convolution` for each kernel.
+
+    Args:
+        images (ndarray): The padded images, of shape (N, ...) where the last axes are the axes of the kernels.
+        kernels (ndarray): The kernels, of shape (C, ...).
+
+    Returns:
+        ndarray: The filtered images, of shape (N, C, ...).
+    """
+    dim = kernels.ndim - 1
+    axes = list(range(1, dim + 1))
+    in_shape = images.shape[-dim:]
+    out_shape = tuple(size - size_kernel + 1 for size, size_kernel in zip(in_shape, kernels.shape[1:]))
+    result = np.empty(
+        (images.shape[0], kernels.shape[0]) + images.shape[1:-dim] + out_shape,
+        dtype=np.result_type(images, kernels, np.float32)
+    )
+
+    plans = [plan_convolution(kernel, in_shape) for kernel in kernels]
+    fft_kernels = [c for c, plan in enumerate(plans) if plan['method'] == 'fft']
+    if fft_kernels:
+        # One image at a time, so that the FFT buffers only hold a single image
+        kernels_fft = kernels[fft_kernels].reshape((len(fft_kernels),) + (1,) * (images.ndim - 1 - dim)
+                                                   + kernels.shape[1:])
+        for n in range(images.shape[0]):
+            result[n, fft_kernels] = fftconvolve(
+                images[n][np.newaxis], kernels_fft, mode='valid', axes=[axis - dim - 1 for axis in axes]
+            )
+    for c, plan in enumerate(plans):
+        if plan['method'] == 'box':
+            result[:, c] = _convolve_box(images, kernels.shape[1:], plan['value'])
+        elif plan['method'] == 'separable':
+            result[:, c] = _convolve_separable(images.astype(result.dtype), plan['factors'], images.ndim - dim)
+
+    return result
+
 def convolve(
         dim: int,
         kernel: np.ndarray,
@@ -70,18 +228,16 @@ def convolve(
         padding = [int((kernel.shape[-1] - 1) / 2) for _ in range(dim)]
         pad_axis_list = [i for i in range(1, dim+1)]
 
-        # We pad the images and we add the channel axis.
+        # We pad the images.
         padded_imgs = pad_imgs(images, padding, pad_axis_list, mode)
-        new_imgs = np.expand_dims(padded_imgs, axis=1)
 
-        # Operate the convolution
-        if dim < len(in_size) - 1:
-            # If we have a 2D kernel but a 3D images, we convolve slice by slice
-            result_list = [fftconvolve(np.expand_dims(new_imgs[i], axis=0), kernel, mode='valid') for i in range(len(images))]
-            result = np.squeeze(np.stack(result_list), axis=2)
+        # Operate the convolution, with a separable, cumulative sum or FFT method depending on the kernel
+        # (see plan_convolution). If we have a 2D kernel but a 3D images, we convolve slice by slice.
+        result = convolve_valid(padded_imgs, kernel[:, 0])
 
-        else :
-            result = fftconvolve(new_imgs, kernel, mode='valid')
+        # Each kernel gives a channel of the single image, or the single kernel gives a channel of each image
+        if dim == len(in_size) - 1:
+            result = result.reshape((-1, 1) + result.shape[2:])
 
         # Reshape the data to retrieve the following format: (B, C, D, H, W)
         if dim < len(in_size) - 1:
@@ -1,6 +1,6 @@
 import math
-from itertools import combinations, permutations
-from typing import List, Union
+from itertools import combinations, permutations, product
+from typing import Dict, Generator, List, Tuple, Union
 
 import numpy as np
 import pywt
@@ -121,6 +121,138 @@ class Wavelet():
         return np.pad(images, pad_tuple, mode=self.padding)
         
 
+    def __swt_axes(self,
+                   image: np.ndarray,
+                   level: int,
+                   index: str,
+                   indexes: List[str]) -> Generator[Tuple[str, np.ndarray], None, None]:
+        """Generates the subbands of one level of the stationary wavelet transform, by filtering the image one axis
+        at a time and depth first. Only the branches leading to the given subbands are computed.
+
+        Args:
+            image (ndarray): The image, or its partial decomposition along the first axes.
+            level (int): The level of the decomposition.
+            index (str): The pywavelet index of the partial decomposition along the first axes (e.g. 'ad').
+            indexes (List[str]): The pywavelet indexes of the subbands to generate (e.g. 'ada').
+
+        Yields:
+            Tuple[str, ndarray]: The pywavelet index and the coefficients of each subband.
+        """
+        axis = len(index)
+        if axis == self.dim:
+            yield index, image
+            return
+
+        (approx, detail), = pywt.swt(image, self.wavelet, level=1, start_level=level-1, axis=axis)
+        for key, coeffs in (('a', approx), ('d', detail)):
+            if any(_index.startswith(index + key) for _index in indexes):
+                yield from self.__swt_axes(coeffs, level, index + key, indexes)
+
+    def __swt_subbands(self,
+                       image: np.ndarray,
+                       indexes: Dict[int, List[str]]) -> Generator[Tuple[str, int, np.ndarray], None, None]:
+        """Generates the subbands of the stationary wavelet transform of an image, level by level. Equivalent to
+        ``pywt.swtn``, but only the branches of the decomposition leading to the given subbands are computed and
+        held in memory.
+
+        Args:
+            image (ndarray): The padded image.
+            indexes (Dict[int, List[str]]): The pywavelet indexes of the subbands to generate at each level.
+
+        Yields:
+            Tuple[str, int, ndarray]: The pywavelet index, the level and the coefficients of each subband.
+        """
+        max_level = max(indexes)
+        approx_index = 'a' * self.dim
+        for level in range(1, max_level + 1):
+            # The approximation is also needed for the next levels
+            level_indexes = indexes.get(level, []) + ([approx_index] if level < max_level else [])
+            for index, coeffs in self.__swt_axes(image, level, '', level_indexes):
+                if index == approx_index and level < max_level:
+                    next_image = coeffs
+                if index in indexes.get(level, []):
+                    yield index, level, coeffs
+            if level < max_level:
+                image = next_image
+
+    def __decompose(self,
+                    images: np.ndarray,
+                    subbands: List[str],
+                    levels: List[int],
+                    lazy: bool) -> Generator[Tuple[Tuple[str, int], np.ndarray], None, None]:
+        """Generates the requested subbands and levels (see :meth:`decompose`)."""
+        # We pad the images for the deepest level
+        padding = self.__get_pad_length(np.shape(images[0]), max(levels))
+        axis_list = [i for i in range(0, self.dim)]
+        image = self._pad_imgs(images[0], padding, axis_list)
+
+        # We generate the indexes to collect the result from pywavelet dictionary
+        indexes = {subband: str().join(['a' if subband[i] == 'L' else 'd' for i in range(len(subband))])
+                   for subband in subbands}
+
+        if not self.rot:
+            names = {index: subband for subband, index in indexes.items()}
+            wanted = {level: list(names) for level in levels}
+            for index, level, coeffs in self.__swt_subbands(image, wanted):
+                yield (names[index], level), self.__unpad(np.expand_dims(coeffs, axis=0), padding)
+            return
+
+        # The response of a subband is averaged over its permutations, so the subbands with the same numbers of
+        # low and high-pass filters are grouped.
+        groups = {}
+        for level in levels:
+            for subband, index in indexes.items():
+                groups.setdefault((''.join(sorted(index)), level), []).append(subband)
+        # Lazily, each group is computed in its own pass over the flipped images, to only hold one response
+        passes = [[group] for group in groups] if lazy else [list(groups)]
+
+        axis_rot = [comb for j in range(self.dim+1) for comb in combinations(np.arange(self.dim), j)]
+        for groups_pass in passes:
+            wanted = {}
+            for index, level in groups_pass:
+                wanted.setdefault(level, []).extend(
+                    np.unique([str().join(perm) for perm in permutations(index, self.dim)])
+                )
+            # For each image, we flip each axis.
+            sums = {}
+            for axis in axis_rot:
+                for index, level, coeffs in self.__swt_subbands(np.flip(image, axis), wanted):
+                    group = (''.join(sorted(index)), level)
+                    sums[group] = sums.get(group, 0) + np.flip(coeffs, axis=axis)
+
+            for group in groups_pass:
+                index, level = group
+                n_perm = len(np.unique([str().join(perm) for perm in permutations(index, self.dim)]))
+                result = self.__unpad(np.expand_dims(sums.pop(group) / (len(axis_rot) * n_perm), axis=0), padding)
+                for subband in groups[group]:
+                    yield (subband, level), result
+
+    def decompose(self,
+                  images: np.ndarray,
+                  subbands: List[str] = None,
+                  levels: List[int] = [1],
+                  lazy: bool = False) -> Union[Dict[Tuple[str, int], np.ndarray],
+                                               Generator[Tuple[Tuple[str, int], np.ndarray], None, None]]:
+        """Filter a given batch of images with several subbands and levels, from a single stationary wavelet
+        decomposition of the images (of each flipped image with rotation invariance).
+
+        Args:
+            images (ndarray): A n-dimensional numpy array that represent the images to filter
+            subbands (List[str], optional): The filters to use, e.g. ["LHL", "HHH"]. Defaults to every subband.
+            levels (List[int], optional): The decomposition levels of the subbands.
+            lazy (bool, optional): If True, the subbands are generated as they are computed and consumed,
+                instead of being returned together, to keep the memory low.
+
+        Returns:
+            Union[Dict[Tuple[str, int], ndarray], Generator[Tuple[Tuple[str, int], ndarray], None, None]]: The
+            filtered images as numpy nd-arrays, keyed by subband and level, or a generator of both if ``lazy``.
+        """
+        if subbands is None:
+            subbands = [str().join(subband) for subband in product('LH', repeat=self.dim)]
+        generator = self.__decompose(images, subbands, levels, lazy)
+
+        return generator if lazy else dict(generator)
+
     def convolve(self,
                  images: np.ndarray,
                  _filter="LHL",
@@ -135,36 +267,7 @@ class Wavelet():
         Returns:
             ndarray: The filtered image as numpy nd-array
         """
-
-        # We pad the images
-        padding = self.__get_pad_length(np.shape(images[0]), level)
-        axis_list = [i for i in range(0, self.dim)]
-        images = np.expand_dims(self._pad_imgs(images[0], padding, axis_list), axis=0)
-
-        # We generate the to collect the result from pywavelet dictionary
-        _index = str().join(['a' if _filter[i] == 'L' else 'd' for i in range(len(_filter))])
-
-        if self.rot:
-            result = []
-            _index_list = np.unique([str().join(perm) for perm in permutations(_index, self.dim)])
-
-            # For each images, we flip each axis.
-            for image in images:
-                axis_rot = [comb for j in range(self.dim+1) for comb in combinations(np.arange(self.dim), j)]
-                images_rot = [np.flip(image, axis) for axis in axis_rot]
-
-                res_rot = []
-                for i in range(len(images_rot)):
-                    filtered_image = pywt.swtn(images_rot[i], self.wavelet, level=level)[0]
-                    res_rot.extend([np.flip(filtered_image[j], axis=axis_rot[i]) for j in _index_list])
-
-                result.extend([np.mean(res_rot, axis=0)])
-        else:
-            result = []
-            for i in range(len(images)):
-                result.extend([pywt.swtn(images[i], self.wavelet, level=level)[level-1][_index]])
-
-        return self.__unpad(np.array(result), padding)
+        return self.decompose(images, [_filter], [level])[(_filter, level)]
 
 def apply_wavelet(
         input_images: Union[np.ndarray, image_volume_obj],
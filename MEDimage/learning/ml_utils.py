@@ -17,6 +17,7 @@ from numpyencoder import NumpyEncoder
 from sklearn.model_selection import StratifiedKFold
 
 from MEDimage.utils import get_institutions_from_ids
+from MEDimage.utils.feature_store import STORE_SUFFIX, FeatureStore
 from MEDimage.utils.get_full_rad_names import get_full_rad_names
 from MEDimage.utils.json_utils import load_json, save_json
 
@@ -658,10 +659,13 @@ def get_radiomics_table(
         path_radiomics_csv: Path, 
         path_radiomics_txt: Path, 
         image_type: str, 
-        patients_ids: List = None
+        patients_ids: List = None,
+        variables: List = None
     ) -> pd.DataFrame:
     """
-    Loads the radiomics table from the .csv file and the associated metadata.
+    Loads the radiomics table from the .csv file and the associated metadata. If the feature store of
+    the table (see :class:`MEDimage.utils.FeatureStore`) was saved next to the .csv file, only the
+    selected variables are read from it.
     
     Args:
         path_radiomics_csv (Path): full path to the csv file of radiomics table.
@@ -677,12 +681,31 @@ def get_radiomics_table(
             patients to fetch from the radiomics table. If this
             argument is not present, all patients are fetched.
             --> Ex: {'Cervix-UCSF-001';Cervix-McGill-004}
+        variables (list, optional): List of the variables to fetch from the radiomics table. If this
+            argument is not present, all variables are fetched.
+            --> Ex: ['radVar1', 'radVar12']
 
     Returns:
         pd.DataFrame: radiomics table
     """
-    # Read CSV table
-    radiomics_table = pd.read_csv(path_radiomics_csv, index_col=0)
+    path_store = Path(path_radiomics_csv).with_suffix(STORE_SUFFIX)
+    if path_store.exists():
+        # Read the selected columns of the feature store, named as in the definitions
+        with open(path_radiomics_txt, 'r') as f:
+            var_defs = dict(var_def.split(':', 1) for var_def in f.read().split('||') if var_def)
+        if variables is None:
+            variables = list(var_defs.keys())
+        store = FeatureStore(path_store)
+        radiomics_table = store.read(columns=[var_defs[var] for var in variables])
+        radiomics_table.columns = variables
+        radiomics_table.index.name = 'PatientID'
+    else:
+        # Read CSV table
+        radiomics_table = pd.read_csv(path_radiomics_csv, index_col=0)
+        if variables is not None:
+            radiomics_table = radiomics_table[variables]
+    # Same row order whatever the source of the table
+    radiomics_table = radiomics_table.sort_index()
     if patients_ids is not None:
         patients_ids = intersect(patients_ids, list(radiomics_table.index))
         radiomics_table = radiomics_table.loc[patients_ids]
@@ -1,7 +1,11 @@
 from . import *
 from .batch_patients import *
+from .convert_MEDscan import *
 from .create_radiomics_table import *
 from .data_frame_export import *
+from .executors import *
+from .feature_fingerprints import *
+from .feature_store import *
 from .find_process_names import *
 from .get_file_paths import *
 from .get_full_rad_names import *
@@ -9,6 +13,7 @@ from .get_institutions_from_ids import *
 from .get_patient_id_from_scan_name import *
 from .get_patient_names import *
 from .get_radiomic_names import *
+from .get_scan_info import *
 from .get_scan_name_from_rad_name import *
 from .image_reader_SITK import *
 from .image_volume_obj import *
@@ -17,9 +22,15 @@ from .initialize_features_names import *
 from .inpolygon import *
 from .interp3 import *
 from .json_utils import *
+from .load_MEDscan import *
 from .mode import *
 from .parse_contour_string import *
+from .profiler import *
 from .save_MEDscan import *
+from .scan_index import *
+from .schedule_tasks import *
 from .strfind import *
+from .task_ledger import *
 from .textureTools import *
+from .volume_cache import *
 from .write_radiomics_csv import *
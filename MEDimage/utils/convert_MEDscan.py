@@ -0,0 +1,39 @@
+import logging
+from pathlib import Path
+from typing import List, Union
+
+from .load_MEDscan import is_MEDscan_store, load_MEDscan
+from .save_MEDscan import write_MEDscan_store
+
+
+def convert_MEDscan(path_data: Union[Path, str],
+                    wildcard: str = '*.npy',
+                    compress: bool = False) -> List[Path]:
+    """Converts pickled MEDscan instances to MEDscan stores (see
+    :func:`MEDimage.utils.save_MEDscan`). Files are converted in place and keep their name,
+    files that already are MEDscan stores are left untouched.
+
+    Args:
+        path_data (Union[Path, str]): Path to a saved MEDscan or to a folder of saved MEDscans.
+        wildcard (str, optional): Wildcard of the files to convert when ``path_data`` is a folder.
+        compress (bool, optional): If True, members of the stores are deflate-compressed.
+
+    Returns:
+        List[Path]: Paths of the converted files.
+    """
+    path_data = Path(path_data)
+    file_paths = [path_data] if path_data.is_file() else sorted(path_data.glob(wildcard))
+
+    converted = []
+    for path_file in file_paths:
+        if is_MEDscan_store(path_file):
+            continue
+        try:
+            medscan = load_MEDscan(path_file)
+        except Exception as e:
+            logging.warning(f"Could not convert {path_file}: {e}")
+            continue
+        write_MEDscan_store(medscan, path_file, compress)
+        converted.append(path_file)
+
+    return converted
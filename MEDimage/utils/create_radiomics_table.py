@@ -1,23 +1,97 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
+import csv
 import logging
-import random
+import os
 from json import load
 from pathlib import Path
-from typing import Dict, List, Union
+from typing import Dict, Iterator, List, Tuple, Union
 
 import numpy as np
 import pandas as pd
 
+from ..utils.feature_store import flatten_radiomics
 from ..utils.get_patient_id_from_scan_name import get_patient_id_from_scan_name
 from ..utils.initialize_features_names import initialize_features_names
 
 
+def get_radiomics_table_names(image_space_struct: Dict) -> List[str]:
+    """
+    Gets the real names of the variables of a radiomics table ($family$__$feature$__$parameters$),
+    non-texture features first then texture features.
+
+    Args:
+        image_space_struct(Dict): Dictionary of the extracted features (Texture & Non-texture)
+
+    Returns:
+        List[str]: Real names of the variables.
+    """
+    non_text_cell, text_cell = initialize_features_names(image_space_struct)
+    names = []
+    for cell in [non_text_cell, text_cell]:
+        for im_type in range(len(cell[0])):
+            for param in range(len(cell[2][im_type])):
+                for feat in range(len(cell[1][im_type])):
+                    names.append(cell[0][im_type] + '__' + cell[1][im_type][feat] + '__' + cell[2][im_type][param])
+
+    return names
+
+def _iter_radiomics_files(
+        radiomics_files_paths: List,
+        image_space: str
+    ) -> Iterator[Tuple[str, Union[Dict, None], Union[List[str], None]]]:
+    """
+    Reads the radiomics JSON files one at a time.
+
+    Args:
+        radiomics_files_paths(List): List of paths to the radiomics JSON files.
+        image_space(str): String of the image space that contains the extracted features
+
+    Yields:
+        Tuple[str, Union[Dict, None], Union[List[str], None]]: Patient ID of the file, its variables
+        (None if the file could not be read) and the names of the variables of the first readable file
+        (None until a file could be read).
+    """
+    real_names = None
+    for path_file in radiomics_files_paths:
+        patient_id = get_patient_id_from_scan_name(Path(path_file).stem)
+        try:
+            with open(path_file, "r") as fp:
+                image_space_struct = load(fp)[image_space]
+            # IMAGE SPACE STRUCTURE --> .morph, .locInt, ...,  .texture
+            if real_names is None:
+                real_names = get_radiomics_table_names(image_space_struct)
+            variables = flatten_radiomics(image_space_struct)
+        except Exception as e:
+            logging.warning(f"Could not read the features of {path_file}: {e}")
+            variables = None
+        yield patient_id, variables, real_names
+
+def _get_user_data(real_names: List[str]) -> Tuple[List[str], str]:
+    """
+    Gets the variable names of a radiomics table and the string that defines them.
+
+    Args:
+        real_names(List[str]): Real names of the variables.
+
+    Returns:
+        Tuple[List[str], str]: Variable names ('radVar1', ...) and their definitions ('||radVar1:name||...').
+    """
+    variable_names = ['radVar' + str(i + 1) for i in range(len(real_names))]
+    str_names = '||' + ''.join(var + ':' + name + '||' for var, name in zip(variable_names, real_names))
+
+    return variable_names, str_names
+
 def create_radiomics_table(radiomics_files_paths: List, image_space: str, log_file: Union[str, Path]) -> Dict:
     """
     Creates a dictionary with a csv and other information
 
+    The radiomics JSON files are read once, one at a time, and only their values are kept, so the
+    memory used is that of the table itself (see :func:`write_radiomics_table_csv` to write a table
+    without holding it in memory). The variables are those of the first file that can be read: all
+    the files of a table are extracted with the same parameters, hence have the same features.
+
     Args:
         radiomics_files_paths(List): List of paths to the radiomics JSON files.
         image_space(str): String of the image space that contains the extracted features
@@ -29,103 +103,82 @@ def create_radiomics_table(radiomics_files_paths: List, image_space: str, log_fi
     if log_file:
         # Setting up logging settings
         logging.basicConfig(filename=log_file, level=logging.DEBUG)
-    
-    # INITIALIZATIONS OF RADIOMICS STRUCTURES
+
     n_files = len(radiomics_files_paths)
-    patientID = [0] * n_files
-    rad_structs = [0] * n_files
-    file_open = [False] * n_files
-
-    for f in range(n_files):
-        with open(radiomics_files_paths[f], "r") as fp: 
-            radStruct = load(fp)
-        rad_structs[f] = radStruct
-        file_open[f] = True
-        patientID[f] = get_patient_id_from_scan_name(radiomics_files_paths[f].stem)
-
-    # INITIALIZE FEATURE NAMES
     logging.info(f"\nnFiles: {n_files}")
-    non_text_cell = []
-    text_cell = []
-    while len(non_text_cell) == 0 and len(text_cell) == 0:
-        try:
-            rand_patient = np.floor(n_files * random.uniform(0, 1)).astype(int)
-            with open(radiomics_files_paths[rand_patient], "r") as fp: 
-                radiomics_struct = load(fp)
+    patientID = []
+    real_names = None
+    values = None
 
-            # IMAGE SPACE STRUCTURE --> .morph, .locInt, ...,  .texture
-            image_space_struct = radiomics_struct[image_space]
-            non_text_cell, text_cell = initialize_features_names(image_space_struct)
-        except:
-            pass
+    for f, (patient_id, variables, real_names) in enumerate(_iter_radiomics_files(radiomics_files_paths, image_space)):
+        patientID.append(patient_id)
+        if variables is None:
+            continue
+        if values is None:
+            values = np.full((n_files, len(real_names)), np.NaN)
+        values[f] = [variables.get(name, np.NaN) for name in real_names]
+
+    if real_names is None:
+        raise ValueError(f"None of the {n_files} radiomics files has readable '{image_space}' features.")
 
     # CREATE TABLE DATA
-    features_name_dict = {}
-    str_table = ''
-    str_names = '||'
-    count_var = 0
-
-    # Non-texture features
-    for im_type in range(len(non_text_cell[0])):
-        for param in range(len(non_text_cell[2][im_type])):
-            for feat in range(len(non_text_cell[1][im_type])):
-                count_var = count_var + 1
-                feature_name = 'radVar' + str(count_var)
-                features_name_dict.update({feature_name: [0] * n_files})
-                real_name_feature = non_text_cell[0][im_type] + '__' + \
-                    non_text_cell[1][im_type][feat] + '__' + \
-                    non_text_cell[2][im_type][param]
-                str_table = str_table + feature_name + ','
-                str_names = str_names + feature_name + ':' + real_name_feature + '||'
-
-                for f in range(n_files):
-                    if file_open[f]:
-                        try:
-                            val = rad_structs[f][image_space][
-                                non_text_cell[0][im_type]][
-                                non_text_cell[2][im_type][param]][
-                                non_text_cell[1][im_type][feat]]
-                        except:
-                            val = np.NaN
-                        if type(val) in [str, list]:
-                            val = np.NaN
-                    else:
-                        val = np.NaN
-                    features_name_dict[feature_name][f] = val
-
-    # Texture features
-    for im_type in range(len(text_cell[0])):
-        for param in range(len(text_cell[2][im_type])):
-            for feat in range(len(text_cell[1][im_type])):
-                count_var = count_var + 1
-                feature_name = 'radVar' + str(count_var)
-                features_name_dict.update({feature_name: [0] * n_files})
-                real_name_feature = text_cell[0][im_type] + '__' + \
-                    text_cell[1][im_type][feat] + '__' + \
-                    text_cell[2][im_type][param]
-                str_table = str_table + feature_name + ','
-                str_names = str_names + feature_name + ':' + real_name_feature + '||'
-                for f in range(n_files):
-                    if file_open[f]:
-                        try:
-                            val = rad_structs[f][image_space]['texture'][
-                                text_cell[0][im_type]][
-                                text_cell[2][im_type][param]][
-                                text_cell[1][im_type][feat]]
-                        except:
-                            val = np.NaN
-                        if type(val) in [str, list]:
-                            val = np.NaN
-                    else:
-                        val = np.NaN
-                    features_name_dict[feature_name][f] = val
+    variable_names, str_names = _get_user_data(real_names)
 
     radiomics_table_dict = {
-        'Table': pd.DataFrame(features_name_dict, index=patientID),
+        'Table': pd.DataFrame(values, index=patientID, columns=variable_names),
         'Properties': {'UserData': str_names,
                        'RowNames': patientID,
                        'DimensionNames': ['PatientID', 'Variables'],
-                       'VariableNames': [key for key in features_name_dict.keys()]
+                       'VariableNames': variable_names
                        }}
 
     return radiomics_table_dict
+
+def write_radiomics_table_csv(radiomics_files_paths: List, image_space: str, path_csv: Union[str, Path]) -> None:
+    """
+    Writes a radiomics table in CSV format (see :func:`MEDimage.utils.write_radiomics_csv`) straight
+    from the radiomics JSON files, one row per file as the files are read, so that the memory used
+    does not grow with the number of files. The definitions of the variables are written in a TXT
+    file next to the CSV file.
+
+    Args:
+        radiomics_files_paths(List): List of paths to the radiomics JSON files.
+        image_space(str): String of the image space that contains the extracted features
+        path_csv(Union[str, Path]): Path to the CSV file.
+
+    Returns:
+        None.
+
+    Raises:
+        ValueError: If none of the files can be read.
+    """
+    path_csv = Path(path_csv)
+    path_tmp = path_csv.with_suffix('.tmp')
+    real_names = None
+    unread_ids = []
+    with open(path_tmp, 'w', newline='', encoding='utf-8') as fp:
+        writer = csv.writer(fp)
+        for patient_id, variables, names in _iter_radiomics_files(radiomics_files_paths, image_space):
+            if names is None:
+                # The number of variables is not known yet, the row is written with the first readable file
+                unread_ids.append(patient_id)
+                continue
+            if real_names is None:
+                real_names = names
+                writer.writerow(['PatientID'] + _get_user_data(real_names)[0])
+                writer.writerows([unread_id] + ['NaN'] * len(real_names) for unread_id in unread_ids)
+            if variables is None:
+                row = ['NaN'] * len(real_names)
+            else:
+                row = [variables.get(name, np.NaN) for name in real_names]
+                row = ['NaN' if np.isnan(value) else value for value in row]
+            writer.writerow([patient_id] + row)
+
+    if real_names is None:
+        os.remove(path_tmp)
+        raise ValueError(f"None of the {len(radiomics_files_paths)} radiomics files has readable '{image_space}' features.")
+    os.replace(path_tmp, path_csv)
+
+    # WRITE DEFINITIONS.TXT
+    with open(path_csv.with_suffix('.txt'), 'w') as fp:
+        fp.write(_get_user_data(real_names)[1])
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+
+import multiprocessing
+import os
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable
+
+import ray
+
+try:
+    from threadpoolctl import threadpool_limits
+except ImportError:
+    threadpool_limits = None
+
+# Backends of :func:`get_executor`
+EXECUTOR_BACKENDS = ['serial', 'thread', 'process', 'ray']
+
+# Environment variables read by the BLAS, OpenMP and numexpr thread pools at import time
+THREAD_ENV_VARS = [
+    'OMP_NUM_THREADS',
+    'OPENBLAS_NUM_THREADS',
+    'MKL_NUM_THREADS',
+    'VECLIB_MAXIMUM_THREADS',
+    'NUMEXPR_NUM_THREADS'
+]
+
+
+def limit_threads(n_threads: int) -> None:
+    """Limits the number of threads used by BLAS, OpenMP and numexpr in the current process, so that
+    workers running side by side do not oversubscribe the cores.
+
+    Args:
+        n_threads (int): Maximum number of threads per pool.
+
+    Returns:
+        None.
+    """
+    for env_var in THREAD_ENV_VARS:
+        os.environ[env_var] = str(n_threads)
+    # Libraries that are already loaded do not read the environment again
+    if threadpool_limits is not None:
+        threadpool_limits(limits=n_threads)
+
+def call_with_thread_limit(n_threads: int, fn: Callable, *args, **kwargs) -> Any:
+    """Calls ``fn`` after limiting the number of threads of the process (see :func:`limit_threads`).
+
+    Args:
+        n_threads (int): Maximum number of threads per pool.
+        fn (Callable): Function to call.
+        *args: Positional arguments of ``fn``.
+        **kwargs: Keyword arguments of ``fn``.
+
+    Returns:
+        Any: Value returned by ``fn``.
+    """
+    limit_threads(n_threads)
+    return fn(*args, **kwargs)
+
+
+class SerialExecutor(Executor):
+    """Executor running each task in the calling process as soon as it is submitted."""
+
+    def submit(self, fn: Callable, *args, **kwargs) -> Future:
+        """Runs ``fn(*args, **kwargs)`` and returns its completed future."""
+        future = Future()
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except Exception as e:
+            future.set_exception(e)
+
+        return future
+
+
+class RayExecutor(Executor):
+    """Executor running each task as a Ray task, on the local machine or on the cluster Ray is
+    connected to (see ``ray.init``)."""
+
+    def __init__(self, threads_per_worker: int = 1) -> None:
+        """Constructor of the RayExecutor class. Initializes Ray if needed.
+
+        Args:
+            threads_per_worker (int, optional): Number of CPUs reserved by each task, which is also
+                the thread limit of the task.
+
+        Returns:
+            None.
+        """
+        if not ray.is_initialized():
+            ray.init()
+        self._task = ray.remote(call_with_thread_limit).options(num_cpus=threads_per_worker)
+        self.threads_per_worker = threads_per_worker
+
+    def submit(self, fn: Callable, *args, **kwargs) -> Future:
+        """Submits ``fn(*args, **kwargs)`` as a Ray task and returns its future."""
+        return self._task.remote(self.threads_per_worker, fn, *args, **kwargs).future()
+
+
+def get_executor(backend: str = 'process', n_workers: int = None, threads_per_worker: int = 1) -> Executor:
+    """Returns an executor to run independent tasks (e.g. one task per scan).
+
+    Only the arguments of the submitted functions are sent to the workers, so tasks should
+    be given paths to the data rather than loaded volumes.
+
+    Args:
+        backend (str, optional): Execution backend. One of:
+
+            - 'serial': Tasks are run one after the other in the calling process.
+            - 'thread': Tasks are run in a pool of ``n_workers`` threads of the calling process, which
+              share its memory (e.g. volumes) without copying it.
+            - 'process': Tasks are run in a pool of ``n_workers`` processes. The processes are spawned
+              rather than forked, as forking a process whose thread pools (e.g. numba, OpenMP) were
+              started can deadlock the workers.
+            - 'ray': Tasks are run as Ray tasks, which allows distributing them over a Ray cluster.
+
+        n_workers (int, optional): Number of workers of the 'thread' and 'process' backends. If None,
+            uses the number of CPUs divided by ``threads_per_worker``.
+        threads_per_worker (int, optional): Number of BLAS/OpenMP threads of each worker.
+
+    Returns:
+        Executor: ``concurrent.futures`` executor.
+
+    Raises:
+        ValueError: If ``backend`` is not supported.
+    """
+    if n_workers is None:
+        n_workers = max(1, (os.cpu_count() or 1) // threads_per_worker)
+    if backend == 'serial':
+        return SerialExecutor()
+    elif backend == 'thread':
+        return ThreadPoolExecutor(max_workers=n_workers)
+    elif backend == 'process':
+        return ProcessPoolExecutor(
+            max_workers=n_workers,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=limit_threads,
+            initargs=(threads_per_worker,)
+        )
+    elif backend == 'ray':
+        return RayExecutor(threads_per_worker)
+    else:
+        raise ValueError(f"Executor backend {backend} is not supported, use one of {EXECUTOR_BACKENDS}.")
@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+
+import hashlib
+import json
+from typing import Dict, List, Union
+
+from ..MEDscan import MEDscan
+
+# Arguments of :func:`MEDimage.MEDscan.update_radiomics` of each feature family
+NON_TEXTURE_FEATURES = {
+    'Morph': 'morph_features',
+    'LocalIntensity': 'loc_int_features',
+    'Stats': 'stats_features',
+    'IntensityHistogram': 'int_hist_features',
+    'IntensityVolumeHistogram': 'int_vol_hist_features'
+}
+TEXTURE_FEATURES = {
+    'GLCM': 'glcm_features',
+    'GLRLM': 'glrlm_features',
+    'GLSZM': 'glszm_features',
+    'GLDZM': 'gldzm_features',
+    'NGTDM': 'ngtdm_features',
+    'NGLDM': 'ngldm_features'
+}
+
+
+def get_fingerprint(content: Dict) -> str:
+    """Hashes the parameters a computation depends on.
+
+    Args:
+        content (Dict): Parameters of the computation.
+
+    Returns:
+        str: Fingerprint of the computation.
+    """
+    return hashlib.sha1(json.dumps(content, sort_keys=True, default=str).encode()).hexdigest()
+
+def get_process_content(medscan: MEDscan, scan_fingerprint: str, roi_name: str) -> Dict:
+    """Gathers the parameters that all the features of a scan depend on: the scan content, the ROI,
+    the interpolation, re-segmentation and filtering parameters.
+
+    Args:
+        medscan (MEDscan): MEDscan instance with initialized parameters.
+        scan_fingerprint (str): Fingerprint of the scan (see :func:`MEDimage.utils.get_scan_fingerprint`).
+        roi_name (str): Name of the ROI.
+
+    Returns:
+        Dict: Parameters of the features.
+    """
+    process = medscan.params.process
+    filter_type = medscan.params.filter.filter_type
+    filter_params = {}
+    if filter_type and hasattr(medscan.params.filter, filter_type.lower()):
+        filter_params = vars(getattr(medscan.params.filter, filter_type.lower()))
+
+    return {
+        'scan': scan_fingerprint,
+        'roi_name': roi_name,
+        'vol_interp': process.vol_interp,
+        'gl_round': process.gl_round,
+        'roi_interp': process.roi_interp,
+        'roi_pv': process.roi_pv,
+        'box_string': process.box_string,
+        'im_range': process.im_range,
+        'outliers': process.outliers,
+        'intensity_type': process.intensity_type,
+        'filter_type': filter_type,
+        'filter': filter_params
+    }
+
+def get_non_texture_fingerprints(medscan: MEDscan, scan_fingerprint: str, roi_name: str) -> Dict[str, str]:
+    """Gets the fingerprint of each non-texture feature family of a scan.
+
+    Args:
+        medscan (MEDscan): MEDscan instance with initialized parameters.
+        scan_fingerprint (str): Fingerprint of the scan (see :func:`MEDimage.utils.get_scan_fingerprint`).
+        roi_name (str): Name of the ROI.
+
+    Returns:
+        Dict[str, str]: Fingerprint of each family, keyed by argument of
+        :func:`MEDimage.MEDscan.update_radiomics`.
+    """
+    process = medscan.params.process
+    content = get_process_content(medscan, scan_fingerprint, roi_name)
+    content['scale'] = process.scale_non_text
+    family_content = {
+        'IntensityHistogram': {'ih': process.ih, 'user_set_min_value': process.user_set_min_value},
+        'IntensityVolumeHistogram': {'ivh': process.ivh, 'user_set_min_value': process.user_set_min_value}
+    }
+
+    return {
+        name: get_fingerprint({**content, 'family': family, **family_content.get(family, {})})
+        for family, name in NON_TEXTURE_FEATURES.items()
+    }
+
+def get_texture_fingerprints(
+        medscan: MEDscan,
+        scan_fingerprint: str,
+        roi_name: str,
+        algo: int,
+        gl: int,
+        scale: int
+    ) -> Dict[str, str]:
+    """Gets the fingerprint of each texture feature family of a texture experiment of a scan.
+
+    Args:
+        medscan (MEDscan): MEDscan instance with initialized parameters.
+        scan_fingerprint (str): Fingerprint of the scan (see :func:`MEDimage.utils.get_scan_fingerprint`).
+        roi_name (str): Name of the ROI.
+        algo (int): Discretisation algorithm index.
+        gl (int): Grey level index.
+        scale (int): Texture scale index.
+
+    Returns:
+        Dict[str, str]: Fingerprint of each family, keyed by argument of
+        :func:`MEDimage.MEDscan.update_radiomics`.
+    """
+    process = medscan.params.process
+    radiomics = medscan.params.radiomics
+    content = get_process_content(medscan, scan_fingerprint, roi_name)
+    content.update({
+        'scale': process.scale_text[scale],
+        'algo': process.algo[algo],
+        'gray_levels': process.gray_levels[algo][gl],
+        'user_set_min_value': process.user_set_min_value
+    })
+    family_content = {
+        'GLCM': {'dist_correction': radiomics.glcm.dist_correction, 'merge_method': radiomics.glcm.merge_method},
+        'GLRLM': {'dist_correction': radiomics.glrlm.dist_correction, 'merge_method': radiomics.glrlm.merge_method},
+        'NGTDM': {'dist_correction': radiomics.ngtdm.dist_correction}
+    }
+
+    return {
+        name: get_fingerprint({**content, 'family': family, **family_content.get(family, {})})
+        for family, name in TEXTURE_FEATURES.items()
+    }
+
+def find_saved_features(saved: Dict, path: List[str], fingerprint: str) -> Union[Dict, None]:
+    """Finds features with the given fingerprint in a saved radiomics JSON.
+
+    Args:
+        saved (Dict): Saved radiomics JSON (see :func:`MEDimage.MEDscan.save_radiomics`).
+        path (List[str]): Keys of the features in the radiomics structure, e.g.
+            ``['texture', 'glszm_3D', 'scale1_algoFBN_bin8']``. If the path leads to a family of
+            entries, e.g. ``['morph_3D']``, any entry of the family with the fingerprint is returned.
+        fingerprint (str): Fingerprint of the features.
+
+    Returns:
+        Union[Dict, None]: Saved features, None if there are no up-to-date saved features.
+    """
+    features = saved.get('image', {})
+    fingerprints = saved.get('fingerprints', {})
+    for key in path:
+        features = features.get(key, {}) if isinstance(features, dict) else {}
+        fingerprints = fingerprints.get(key, {}) if isinstance(fingerprints, dict) else {}
+
+    if isinstance(fingerprints, str):
+        return features if fingerprints == fingerprint and features else None
+    for name, entry_fingerprint in fingerprints.items():
+        if entry_fingerprint == fingerprint and isinstance(features, dict) and features.get(name):
+            return features[name]
+
+    return None
+
+def get_saved_features(
+        medscan: MEDscan,
+        saved: Dict,
+        fingerprints: Dict[str, str],
+        families: Dict[str, str],
+        any_entry: bool = False
+    ) -> Dict[str, Dict]:
+    """Gets the saved features of the extracted families whose parameters did not change.
+
+    Args:
+        medscan (MEDscan): MEDscan instance, with the scale, discretisation and texture names of the
+            features (see :func:`MEDimage.MEDscan.init_tf_calculation`).
+        saved (Dict): Saved radiomics JSON (see :func:`MEDimage.MEDscan.save_radiomics`).
+        fingerprints (Dict[str, str]): Fingerprint of each family (see :func:`get_non_texture_fingerprints`
+            and :func:`get_texture_fingerprints`).
+        families (Dict[str, str]): Families to look for, e.g. :data:`NON_TEXTURE_FEATURES`.
+        any_entry (bool, optional): If True, the features can be found under any name of their family.
+            Non-texture features are computed once but saved under the name of each texture scale.
+
+    Returns:
+        Dict[str, Dict]: Saved features, keyed by argument of :func:`MEDimage.MEDscan.update_radiomics`.
+    """
+    paths = medscan.get_radiomics_paths()
+    saved_features = {}
+    for family, name in families.items():
+        if medscan.params.radiomics.extract[family]:
+            path = paths[name][:1] if any_entry else paths[name]
+            features = find_saved_features(saved, path, fingerprints[name])
+            if features:
+                saved_features[name] = features
+
+    return saved_features
+
+def merge_entries(current: Union[Dict, str], saved: Union[Dict, str], depth: int) -> Union[Dict, str]:
+    """Merges saved radiomics entries in the current ones. Current entries that are missing or empty
+    are taken from the saved ones.
+
+    Args:
+        current (Union[Dict, str]): Current entries.
+        saved (Union[Dict, str]): Saved entries.
+        depth (int): Number of levels of the structure above the entries (e.g. 1 for ``morph_3D``
+            whose entries are scales, 2 for ``texture``).
+
+    Returns:
+        Union[Dict, str]: Merged entries.
+    """
+    if depth == 0 or not (isinstance(current, dict) and isinstance(saved, dict)):
+        return current if current or saved is None else saved
+    merged = dict(saved)
+    for key, value in current.items():
+        merged[key] = merge_entries(value, saved.get(key), depth - 1)
+
+    return merged
+
+def merge_radiomics(current: Dict, saved: Dict) -> Dict:
+    """Merges the entries of a saved radiomics structure (``image`` or ``fingerprints``) that were not
+    computed again in the current one.
+
+    Args:
+        current (Dict): Current radiomics structure.
+        saved (Dict): Saved radiomics structure.
+
+    Returns:
+        Dict: Merged radiomics structure.
+    """
+    merged = dict(saved)
+    for key, value in current.items():
+        merged[key] = merge_entries(value, saved.get(key), 2 if key == 'texture' else 1)
+
+    return merged
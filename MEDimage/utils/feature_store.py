@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+
+import json
+import os
+import uuid
+from pathlib import Path
+from typing import Dict, List, Union
+
+import numpy as np
+import pandas as pd
+
+from .get_patient_id_from_scan_name import get_patient_id_from_scan_name
+from .json_utils import load_json
+
+# Suffix of the feature store folder of a radiomics table
+STORE_SUFFIX = '.store'
+
+
+def flatten_radiomics(image_space_struct: Dict) -> Dict[str, float]:
+    """Flattens the features of an image space (e.g. ``radiomics['image']``) into the variables of a
+    radiomics table, named ``$family$__$feature$__$parameters$`` (see
+    :func:`MEDimage.utils.create_radiomics_table`).
+
+    Args:
+        image_space_struct (Dict): Dictionary of the extracted features (Texture & Non-texture).
+
+    Returns:
+        Dict[str, float]: Value of each variable. Features that are not numbers are set to NaN.
+    """
+    families = [(family, entries) for family, entries in image_space_struct.items() if family != 'texture']
+    families += list(image_space_struct.get('texture', {}).items())
+
+    variables = {}
+    for family, entries in families:
+        if not isinstance(entries, dict):
+            continue
+        for param, features in entries.items():
+            if not isinstance(features, dict):
+                continue
+            for feature, value in features.items():
+                if value is None or isinstance(value, (str, list, dict)):
+                    value = np.NaN
+                variables[f'{family}__{feature}__{param}'] = float(value)
+
+    return variables
+
+
+class FeatureStore:
+    """Columnar store of a radiomics table (one row per scan, one column per variable).
+
+    Extraction workers append rows as they finish, each row in its own file so that workers never
+    write the same file. :func:`compact` then gathers the rows in a column-major array, in which each
+    column is contiguous, so that selected columns are read from the memory-mapped array without
+    reading the whole table. The variables each compacted row has are kept in a mask of the same shape,
+    so that a later compaction drops the columns that none of the kept rows has.
+    """
+
+    def __init__(self, path_store: Union[Path, str]) -> None:
+        """Constructor of the FeatureStore class.
+
+        Args:
+            path_store (Union[Path, str]): Path to the folder of the store.
+
+        Returns:
+            None.
+        """
+        self.path_store = Path(path_store)
+        self.path_rows = self.path_store / 'rows'
+        self.path_index = self.path_store / 'index.json'
+        self.path_values = self.path_store / 'values.npy'
+        self.path_mask = self.path_store / 'mask.npy'
+
+    def exists(self) -> bool:
+        """Checks whether the store has any row.
+
+        Returns:
+            bool: True if the store has compacted or appended rows.
+        """
+        return self.path_index.exists() or any(self.path_rows.glob('*.npz'))
+
+    def append(self, row: str, variables: Dict[str, float]) -> None:
+        """Appends (or replaces) a row of the table.
+
+        Args:
+            row (str): Name of the row, e.g. the patient ID.
+            variables (Dict[str, float]): Value of each variable of the row
+                (see :func:`flatten_radiomics`).
+
+        Returns:
+            None.
+        """
+        self.path_rows.mkdir(parents=True, exist_ok=True)
+        # Written under a temporary name then renamed, so that compact() never reads a partial row
+        path_tmp = self.path_rows / f'{uuid.uuid4().hex}.tmp'
+        with open(path_tmp, 'wb') as f:
+            np.savez(
+                f,
+                row=np.array(row),
+                columns=np.array(list(variables.keys()), dtype=str),
+                values=np.array(list(variables.values()), dtype=np.float64)
+            )
+        os.replace(path_tmp, self.path_rows / f'{row}.npz')
+
+    def __read_index(self) -> Dict:
+        """Reads the rows and columns of the compacted array."""
+        if not self.path_index.exists():
+            return {'rows': [], 'columns': []}
+        with open(self.path_index, 'r') as f:
+            return json.load(f)
+
+    def __get_appended_paths(self) -> List[Path]:
+        """Lists the files of the rows appended since the last compaction."""
+        return sorted(self.path_rows.glob('*.npz')) if self.path_rows.exists() else []
+
+    def __read_appended_rows(self) -> Dict[str, pd.Series]:
+        """Reads the rows appended since the last compaction."""
+        rows = {}
+        for path_row in self.__get_appended_paths():
+            with np.load(path_row) as data:
+                rows[str(data['row'])] = pd.Series(data['values'], index=data['columns'].tolist())
+
+        return rows
+
+    def get_rows(self) -> Dict[str, float]:
+        """Gets the rows of the table and the time they were last written.
+
+        Returns:
+            Dict[str, float]: Modification time of each row, keyed by row name.
+        """
+        rows = {}
+        if self.path_index.exists():
+            mtime = self.path_index.stat().st_mtime
+            rows = {row: mtime for row in self.__read_index()['rows']}
+        for path_row in self.__get_appended_paths():
+            rows[path_row.stem] = path_row.stat().st_mtime
+
+        return rows
+
+    def __read_row_columns(self, index: Dict, appended: Dict[str, pd.Series]) -> Dict[str, List[str]]:
+        """Gets the variables of each row, in the order of the row."""
+        row_columns = {}
+        if index['rows']:
+            mask = np.load(self.path_mask, mmap_mode='r') if self.path_mask.exists() else None
+            if mask is None or mask.shape != (len(index['rows']), len(index['columns'])):
+                # Stores compacted before the mask was saved
+                mask = ~np.isnan(np.load(self.path_values, mmap_mode='r'))
+            for r, row in enumerate(index['rows']):
+                row_columns[row] = [column for column, has in zip(index['columns'], mask[r]) if has]
+        for row, row_values in appended.items():
+            row_columns[row] = row_values.index.tolist()
+
+        return row_columns
+
+    @staticmethod
+    def __merge_columns(columns: List[str], appended: Dict[str, pd.Series]) -> List[str]:
+        """Adds the columns of the appended rows that are not in ``columns``."""
+        columns = list(columns)
+        known = set(columns)
+        for row_values in appended.values():
+            new_columns = [column for column in row_values.index if column not in known]
+            columns += new_columns
+            known.update(new_columns)
+
+        return columns
+
+    def get_columns(self) -> List[str]:
+        """Gets the names of the columns (variables) of the table.
+
+        Returns:
+            List[str]: Names of the columns.
+        """
+        return self.__merge_columns(self.__read_index()['columns'], self.__read_appended_rows())
+
+    def compact(self, rows: List[str] = None) -> None:
+        """Gathers the appended rows with the compacted ones in the column-major array.
+
+        The columns are rebuilt from the variables of the kept rows, in the order of the first kept row
+        (i.e. the order of :func:`MEDimage.utils.get_radiomics_table_names`), followed by the variables
+        of the other rows it does not have. Columns that none of the kept rows has are removed.
+
+        Args:
+            rows (List[str], optional): Names of the rows to keep, in order, the others are removed from
+                the store. If None, all rows are kept.
+
+        Returns:
+            None.
+        """
+        # Rows appended again during the compaction are kept for the next one
+        appended = {path_row: path_row.stat().st_mtime_ns for path_row in self.__get_appended_paths()}
+        if not appended and (rows is None or set(rows) >= set(self.__read_index()['rows'])):
+            return
+        index = self.__read_index()
+        row_columns = self.__read_row_columns(index, self.__read_appended_rows())
+        table = self.read()
+        if rows is not None:
+            table = table.loc[[row for row in dict.fromkeys(rows) if row in table.index]]
+        table = table[list(dict.fromkeys(column for row in table.index for column in row_columns[row]))]
+        mask = np.array([table.columns.isin(row_columns[row]) for row in table.index], dtype=bool)
+
+        self.path_store.mkdir(parents=True, exist_ok=True)
+        path_tmp = self.path_store / f'.{uuid.uuid4().hex}.npy'
+        np.save(path_tmp, np.asfortranarray(table.to_numpy(dtype=np.float64)))
+        os.replace(path_tmp, self.path_values)
+        path_tmp = self.path_store / f'.{uuid.uuid4().hex}.npy'
+        np.save(path_tmp, np.asfortranarray(mask.reshape(table.shape)))
+        os.replace(path_tmp, self.path_mask)
+        path_tmp = self.path_store / f'.{uuid.uuid4().hex}.json'
+        with open(path_tmp, 'w') as f:
+            json.dump({'rows': table.index.tolist(), 'columns': table.columns.tolist()}, f)
+        os.replace(path_tmp, self.path_index)
+        for path_row, mtime in appended.items():
+            if path_row.stat().st_mtime_ns == mtime:
+                path_row.unlink()
+
+    def read(self, columns: List[str] = None, rows: List[str] = None) -> pd.DataFrame:
+        """Reads the table, or some of its columns and rows.
+
+        Args:
+            columns (List[str], optional): Names of the columns to read. If None, all columns are read.
+            rows (List[str], optional): Names of the rows to read. If None, all rows are read.
+
+        Returns:
+            pd.DataFrame: Table, indexed by row name. Missing values are NaN.
+        """
+        index = self.__read_index()
+        appended = self.__read_appended_rows()
+        if columns is None:
+            columns = self.__merge_columns(index['columns'], appended)
+
+        # Compacted rows, only the selected columns are read from the disk
+        positions = {column: i for i, column in enumerate(index['columns'])}
+        table = pd.DataFrame(np.nan, index=index['rows'], columns=columns)
+        if index['rows']:
+            values = np.load(self.path_values, mmap_mode='r')
+            selected = [column for column in columns if column in positions]
+            table[selected] = values[:, [positions[column] for column in selected]]
+
+        # Appended rows replace the compacted ones
+        if appended:
+            appended_table = pd.DataFrame(
+                [row_values.reindex(columns).to_numpy() for row_values in appended.values()],
+                index=list(appended.keys()),
+                columns=columns
+            )
+            table = pd.concat([table.drop(index=[row for row in appended if row in table.index]), appended_table])
+
+        if rows is not None:
+            table = table.reindex(rows)
+
+        return table
+
+
+def create_store_radiomics_table(
+        radiomics_files_paths: List[Path],
+        image_space: str,
+        path_store: Union[Path, str]
+    ) -> Dict:
+    """Creates a radiomics table (see :func:`MEDimage.utils.create_radiomics_table`) from a feature
+    store. The scans whose radiomics JSON file is missing from the store, or was saved after its row,
+    are first added to the store. The store is then compacted to the rows of ``radiomics_files_paths``.
+
+    Args:
+        radiomics_files_paths (List[Path]): List of paths to the radiomics JSON files.
+        image_space (str): Image space that contains the extracted features.
+        path_store (Union[Path, str]): Path to the feature store of the table.
+
+    Returns:
+        Dict: Dictionary containing the extracted radiomics and other info (patientID, feature names...)
+    """
+    store = FeatureStore(path_store)
+    rows = store.get_rows()
+    patient_ids = []
+    for path_file in radiomics_files_paths:
+        patient_id = get_patient_id_from_scan_name(Path(path_file).stem)
+        patient_ids.append(patient_id)
+        if patient_id not in rows or Path(path_file).stat().st_mtime > rows[patient_id]:
+            store.append(patient_id, flatten_radiomics(load_json(path_file).get(image_space, {})))
+    store.compact(rows=patient_ids)
+
+    table = store.read(rows=patient_ids)
+    variable_names = [f'radVar{i + 1}' for i in range(table.shape[1])]
+    str_names = '||' + ''.join(f'{var}:{name}||' for var, name in zip(variable_names, table.columns))
+    table.columns = variable_names
+
+    return {
+        'Table': table,
+        'Properties': {'UserData': str_names,
+                       'RowNames': patient_ids,
+                       'DimensionNames': ['PatientID', 'Variables'],
+                       'VariableNames': variable_names
+                       }}
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+
+from typing import Any, Dict
+
+import numpy as np
+
+from ..MEDscan import MEDscan
+
+# DICOM tags used by the imaging summaries (see
+# :func:`MEDimage.wrangling.DataManager.perform_imaging_summary`)
+DICOM_INFO_TAGS = [
+    'AcquisitionDate',
+    'StudyDate',
+    'Manufacturer',
+    'ScanningSequence',
+    'MagneticFieldStrength',
+    'RepetitionTime',
+    'EchoTime',
+    'InversionTime',
+    'EchoTrainLength',
+    'FlipAngle',
+    'NumberOfAverages',
+    'KVP',
+    'Exposure',
+    'ConvolutionKernel'
+]
+
+
+def to_info_value(value: Any) -> Any:
+    """Converts a DICOM attribute value (e.g. ``DSfloat``, ``MultiValue``) to a JSON-serializable value.
+
+    Args:
+        value (Any): DICOM attribute value.
+
+    Returns:
+        Any: JSON-serializable value.
+    """
+    if value is None or isinstance(value, bool):
+        return value
+    if isinstance(value, (int, np.integer)):
+        return int(value)
+    if isinstance(value, (float, np.floating)):
+        return float(value)
+    if isinstance(value, (str, bytes)):
+        return str(value)
+    try:
+        return [to_info_value(x) for x in value]
+    except TypeError:
+        return str(value)
+
+def get_scan_info(medscan: MEDscan) -> Dict:
+    """Gathers the attributes of a MEDscan instance used by the pre-radiomics checks and the
+    imaging summaries: voxel spacing, volume size, ROI names and sizes and some DICOM header tags.
+
+    Args:
+        medscan (MEDscan): MEDscan instance.
+
+    Returns:
+        Dict: JSON-serializable dictionary of the scan attributes.
+    """
+    spatial_ref = medscan.data.volume.spatialRef
+    if spatial_ref is not None:
+        spacing = [
+            float(spatial_ref.PixelExtentInWorldX),
+            float(spatial_ref.PixelExtentInWorldY),
+            float(spatial_ref.PixelExtentInWorldZ)
+        ]
+    else:
+        spacing = None
+    array = medscan.data.volume.array
+
+    # Example of DICOM header (the summaries have always used the second one)
+    dicom_info = {}
+    if medscan.dicomH:
+        info = medscan.dicomH[1] if len(medscan.dicomH) > 1 else medscan.dicomH[0]
+        for tag in DICOM_INFO_TAGS:
+            if tag in info:
+                dicom_info[tag] = to_info_value(info.get(tag))
+
+    scan_info = {
+        'patientID': medscan.patientID,
+        'type': medscan.type,
+        'format': medscan.format,
+        'spacing': spacing,
+        'size': list(np.shape(array)) if array is not None else None,
+        'roi_names': {str(key): str(name) for key, name in medscan.data.ROI.roi_names.items()},
+        'roi_sizes': {str(key): int(np.size(indexes[0])) if isinstance(indexes, tuple) else 0
+                      for key, indexes in medscan.data.ROI.indexes.items()},
+        'dicom': dicom_info
+    }
+
+    return scan_info
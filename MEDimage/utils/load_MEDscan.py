@@ -0,0 +1,175 @@
+import json
+import pickle
+import struct
+import zipfile
+from pathlib import Path
+from typing import Any, Dict, Union
+
+import numpy as np
+
+from ..MEDscan import MEDscan
+from .imref import imref3d
+from .save_MEDscan import HEADER_MEMBER
+
+
+def decode_header_value(value: Any) -> Any:
+    """Restores a value of the MEDscan attributes converted by
+    :func:`MEDimage.utils.save_MEDscan.encode_header_value`.
+
+    Args:
+        value (Any): Value read from the JSON header.
+
+    Returns:
+        Any: Restored value.
+    """
+    if isinstance(value, list):
+        return [decode_header_value(x) for x in value]
+    if isinstance(value, dict):
+        if "__ndarray__" in value:
+            return np.array(value["__ndarray__"], dtype=value["dtype"])
+        if "__tuple__" in value:
+            return tuple(decode_header_value(x) for x in value["__tuple__"])
+        if "__imref3d__" in value:
+            spatial_ref = imref3d.__new__(imref3d)
+            spatial_ref.__dict__.update(decode_header_value(value["__imref3d__"]))
+            return spatial_ref
+        return {key: decode_header_value(x) for key, x in value.items()}
+
+    return value
+
+def is_MEDscan_store(path_file: Union[Path, str]) -> bool:
+    """Checks whether a saved MEDscan is a MEDscan store (see
+    :func:`MEDimage.utils.save_MEDscan`) rather than a pickled MEDscan instance.
+
+    Args:
+        path_file (Union[Path, str]): Path of the saved MEDscan.
+
+    Returns:
+        bool: True if the file is a MEDscan store.
+    """
+    if not zipfile.is_zipfile(path_file):
+        return False
+    with zipfile.ZipFile(path_file) as zf:
+        return HEADER_MEMBER in zf.namelist()
+
+def read_MEDscan_header(path_file: Union[Path, str]) -> Dict:
+    """Reads the header of a MEDscan store without reading the volume, the ROIs or the
+    DICOM headers.
+
+    Args:
+        path_file (Union[Path, str]): Path of the MEDscan store.
+
+    Returns:
+        Dict: Header of the store, with the volume attributes (e.g. ``spatialRef``) restored
+        under ``header["volume"]["attributes"]``.
+    """
+    with zipfile.ZipFile(path_file) as zf:
+        header = json.loads(zf.read(HEADER_MEMBER))
+    header["volume"]["attributes"] = decode_header_value(header["volume"]["attributes"])
+
+    return header
+
+def read_store_array(path_file: Union[Path, str],
+                     zf: zipfile.ZipFile,
+                     member: str,
+                     mmap_mode: str = 'c') -> np.ndarray:
+    """Reads an array of a MEDscan store. Uncompressed members are memory-mapped, so that
+    only the parts of the array that are accessed are read from the disk.
+
+    Args:
+        path_file (Union[Path, str]): Path of the MEDscan store.
+        zf (zipfile.ZipFile): Opened MEDscan store.
+        member (str): Name of the array member.
+        mmap_mode (str, optional): Memory-map mode (see ``numpy.memmap``). The default
+            copy-on-write mode allows in-memory changes of the array that are never written
+            to the disk. If None, the array is read in memory.
+
+    Returns:
+        ndarray: Array of the member.
+    """
+    info = zf.getinfo(member)
+    if mmap_mode is None or info.compress_type != zipfile.ZIP_STORED:
+        with zf.open(member) as f:
+            return np.lib.format.read_array(f, allow_pickle=False)
+
+    with open(path_file, 'rb') as f:
+        # The data of the member starts after its local file header
+        f.seek(info.header_offset)
+        local_header = f.read(30)
+        name_length, extra_length = struct.unpack('<HH', local_header[26:30])
+        f.seek(info.header_offset + 30 + name_length + extra_length)
+
+        # Header of the .npy member
+        version = np.lib.format.read_magic(f)
+        if version == (1, 0):
+            shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(f)
+        else:
+            shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(f)
+        offset = f.tell()
+
+    if int(np.prod(shape)) == 0:
+        return np.zeros(shape, dtype=dtype)
+
+    array = np.memmap(path_file, dtype=dtype, mode=mmap_mode, offset=offset, shape=shape,
+                      order='F' if fortran_order else 'C')
+
+    return array.view(np.ndarray)
+
+def load_MEDscan(path_file: Union[Path, str],
+                 mmap_mode: str = 'c') -> MEDscan:
+    """Loads a saved MEDscan instance, either from a MEDscan store (see
+    :func:`MEDimage.utils.save_MEDscan`) or from a pickled MEDscan instance.
+
+    Args:
+        path_file (Union[Path, str]): Path of the saved MEDscan.
+        mmap_mode (str, optional): Memory-map mode of the volume and ROI arrays of a MEDscan
+            store (see :func:`read_store_array`). If None, the arrays are read in memory.
+
+    Returns:
+        MEDscan: Loaded MEDscan instance.
+    """
+    path_file = Path(path_file)
+
+    if not is_MEDscan_store(path_file):
+        with open(path_file, 'rb') as f:
+            return MEDscan(pickle.load(f))
+
+    header = read_MEDscan_header(path_file)
+    medscan = MEDscan()
+    medscan.patientID = header["patientID"]
+    medscan.type = header["type"]
+    medscan.series_description = header["series_description"]
+    medscan.format = header["format"]
+    medscan.data.set_orientation(header["orientation"])
+    medscan.data.set_patient_position(header["patient_position"])
+
+    with zipfile.ZipFile(path_file) as zf:
+        # Volume
+        for key, value in header["volume"]["attributes"].items():
+            setattr(medscan.data.volume, key, value)
+        if header["volume"]["member"] is not None:
+            medscan.data.volume.array = read_store_array(path_file, zf, header["volume"]["member"], mmap_mode)
+
+        # Processed volume
+        volume_process = header["volume_process"]
+        medscan.data.volume_process.scan_rot = decode_header_value(volume_process["scan_rot"])
+        medscan.data.volume_process.spatialRef = decode_header_value(volume_process["spatialRef"])
+        medscan.data.volume_process.user_string = volume_process["user_string"]
+        if volume_process["member"] is not None:
+            medscan.data.volume_process.array = read_store_array(path_file, zf, volume_process["member"], mmap_mode)
+
+        # ROIs
+        medscan.data.ROI.roi_names = decode_header_value(header["ROI"]["roi_names"])
+        medscan.data.ROI.nameSet = decode_header_value(header["ROI"]["nameSet"])
+        medscan.data.ROI.nameSetInfo = decode_header_value(header["ROI"]["nameSetInfo"])
+        for key, member in header["ROI"]["indexes"].items():
+            if member is None:
+                medscan.data.ROI.update_indexes(key=key, indexes=np.NaN)
+            else:
+                medscan.data.ROI.update_indexes(key=key, indexes=(read_store_array(path_file, zf, member, mmap_mode),))
+
+        # DICOM headers
+        if header["dicomH"] is not None:
+            medscan.dicomH = pickle.loads(zf.read(header["dicomH"]))
+
+    return medscan
@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+
+import json
+import math
+import os
+import sys
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from time import perf_counter, thread_time, time
+from typing import Dict, Iterator, List, Union
+
+import pandas as pd
+
+try:
+    import resource
+except ImportError:
+    # Not available on Windows
+    resource = None
+
+# Stage of the span holding the whole extraction of a scan
+TOTAL_STAGE = 'total'
+
+
+def get_peak_rss() -> Union[float, None]:
+    """Gets the peak resident set size of the current process.
+
+    Returns:
+        Union[float, None]: Peak resident set size in MB, None if it is not available on the platform.
+    """
+    if resource is None:
+        return None
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Bytes on macOS, kilobytes on Linux
+    return peak_rss / 2**20 if sys.platform == 'darwin' else peak_rss / 2**10
+
+
+class StageProfiler:
+    """Records the wall time, CPU time and peak memory of the stages of an extraction (loading,
+    interpolation, each feature family...) as JSON lines appended to a profile file.
+
+    Each span is written as one line as soon as it ends, so that the workers of a batch, processes or
+    threads, can share the profile file. The profiler only holds the path of the file and the context
+    of its spans (e.g. the scan name), so it can be sent to the workers. Without profile file, spans
+    are not measured.
+    """
+
+    def __init__(self, path_profile: Union[Path, str] = None, **context) -> None:
+        """Constructor of the StageProfiler class.
+
+        Args:
+            path_profile (Union[Path, str], optional): Path to the JSONL profile file. If None, nothing is
+                recorded.
+            **context: Attributes written in every span, e.g. ``scan='Patient-001__CT.CTscan.npy'``.
+
+        Returns:
+            None.
+        """
+        self.path_profile = Path(path_profile) if path_profile else None
+        self.context = context
+
+    def child(self, **context) -> 'StageProfiler':
+        """Creates a profiler writing to the same file, with more context attributes.
+
+        Args:
+            **context: Attributes added to the context, e.g. ``scale=2``.
+
+        Returns:
+            StageProfiler: Profiler of the sub-stages.
+        """
+        return StageProfiler(self.path_profile, **{**self.context, **context})
+
+    def record(self, stage: str, wall_time: float, cpu_time: float = None, **attrs) -> None:
+        """Appends a span to the profile file.
+
+        Args:
+            stage (str): Name of the stage, e.g. ``'interpolation'``.
+            wall_time (float): Wall time of the stage in seconds.
+            cpu_time (float, optional): CPU time of the stage in seconds.
+            **attrs: Other attributes of the span.
+
+        Returns:
+            None.
+        """
+        if self.path_profile is None:
+            return
+        span = {
+            **self.context,
+            **attrs,
+            'stage': stage,
+            'start': time() - wall_time,
+            'wall_time': wall_time,
+            'cpu_time': cpu_time,
+            'peak_rss': get_peak_rss(),
+            'pid': os.getpid(),
+            'tid': threading.get_ident()
+        }
+        # A single write per line, in append mode, so that the lines of the workers do not interleave
+        with open(self.path_profile, 'a') as f:
+            f.write(json.dumps(span, default=str) + '\n')
+
+    @contextmanager
+    def span(self, stage: str, **attrs) -> Iterator[None]:
+        """Measures a stage and appends its span to the profile file.
+
+        The CPU time is the one of the calling thread, so that the stages of concurrent threads are
+        not counted in each other. The peak RSS is the peak of the process at the end of the stage.
+
+        Args:
+            stage (str): Name of the stage, e.g. ``'interpolation'``.
+            **attrs: Other attributes of the span.
+
+        Returns:
+            Iterator[None]: Context of the stage.
+        """
+        if self.path_profile is None:
+            yield
+            return
+        start, cpu_start = perf_counter(), thread_time()
+        try:
+            yield
+        finally:
+            self.record(stage, perf_counter() - start, thread_time() - cpu_start, **attrs)
+
+
+def read_profile(path_profile: Union[Path, str]) -> pd.DataFrame:
+    """Reads the spans of a profile file (see :class:`StageProfiler`).
+
+    Args:
+        path_profile (Union[Path, str]): Path to the JSONL profile file.
+
+    Returns:
+        pd.DataFrame: One row per span. Incomplete lines (e.g. of a killed worker) are skipped.
+    """
+    spans = []
+    with open(path_profile, 'r') as f:
+        for line in f:
+            try:
+                spans.append(json.loads(line))
+            except ValueError:
+                continue
+
+    return pd.DataFrame(spans)
+
+def summarize_profile(path_profile: Union[Path, str], top: int = 10) -> Dict[str, pd.DataFrame]:
+    """Ranks the hottest stages and scans of a profile file (see :class:`StageProfiler`).
+
+    Args:
+        path_profile (Union[Path, str]): Path to the JSONL profile file.
+        top (int, optional): Number of scans and spans to keep in the rankings.
+
+    Returns:
+        Dict[str, pd.DataFrame]: Rankings by total wall time:
+
+            - ``stages``: count, total, mean and max wall time, total CPU time and max peak RSS of each stage.
+            - ``scans``: wall time and peak RSS of the extraction of the slowest scans.
+            - ``spans``: slowest spans of any stage and scan.
+    """
+    spans = read_profile(path_profile)
+    stage_spans = spans[spans['stage'] != TOTAL_STAGE]
+    stages = stage_spans.groupby('stage').agg(
+        count=('wall_time', 'size'),
+        wall_time=('wall_time', 'sum'),
+        mean_wall_time=('wall_time', 'mean'),
+        max_wall_time=('wall_time', 'max'),
+        cpu_time=('cpu_time', 'sum'),
+        peak_rss=('peak_rss', 'max')
+    ).sort_values('wall_time', ascending=False)
+    stages['wall_time_share'] = stages['wall_time'] / stages['wall_time'].sum()
+
+    columns = [column for column in ['scan', 'roi', 'wall_time', 'cpu_time', 'peak_rss'] if column in spans]
+    scans = spans[spans['stage'] == TOTAL_STAGE][columns].sort_values('wall_time', ascending=False).head(top)
+
+    columns = [column for column in spans.columns if column not in ['start', 'pid', 'tid']]
+    hottest = stage_spans[columns].sort_values('wall_time', ascending=False).head(top)
+
+    return {
+        'stages': stages,
+        'scans': scans.reset_index(drop=True),
+        'spans': hottest.reset_index(drop=True)
+    }
+
+def write_trace_events(path_profile: Union[Path, str], path_trace: Union[Path, str]) -> None:
+    """Converts a profile file (see :class:`StageProfiler`) to the trace event format, which can be
+    opened in chrome://tracing or Perfetto.
+
+    Args:
+        path_profile (Union[Path, str]): Path to the JSONL profile file.
+        path_trace (Union[Path, str]): Path to the JSON trace file.
+
+    Returns:
+        None.
+    """
+    events: List[Dict] = []
+    for span in read_profile(path_profile).to_dict('records'):
+        args = {
+            key: value for key, value in span.items()
+            if key not in ['stage', 'start', 'pid', 'tid'] and not (isinstance(value, float) and math.isnan(value))
+        }
+        events.append({
+            'name': span['stage'],
+            'ph': 'X',
+            'ts': span['start'] * 1e6,
+            'dur': span['wall_time'] * 1e6,
+            'pid': span['pid'],
+            'tid': span['tid'],
+            'args': args
+        })
+    with open(path_trace, 'w') as f:
+        json.dump({'traceEvents': events}, f, default=str)
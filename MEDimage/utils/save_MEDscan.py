@@ -1,19 +1,85 @@
+import json
+import os
 import pickle
+import zipfile
 from pathlib import Path
+from typing import Any
+
+import numpy as np
 
 from ..MEDscan import MEDscan
+from .get_scan_info import get_scan_info
+from .imref import imref3d
+
+# Version of the MEDscan store format, written in the header
+STORE_VERSION = 1
+
+# Names of the members of a MEDscan store
+HEADER_MEMBER = "header.json"
+VOLUME_MEMBER = "volume.npy"
+VOLUME_PROCESS_MEMBER = "volume_process.npy"
+DICOM_HEADERS_MEMBER = "dicomH.pkl"
+ROI_MEMBER = "roi_{}.npy"
+
+
+def encode_header_value(value: Any) -> Any:
+    """Converts a value of the MEDscan attributes to a JSON-serializable object, keeping the
+    information needed to restore numpy arrays and :class:`imref3d` objects.
+
+    Args:
+        value (Any): Value to convert.
+
+    Returns:
+        Any: JSON-serializable object.
+
+    Raises:
+        TypeError: If the type of ``value`` is not supported.
+    """
+    if value is None or isinstance(value, (bool, str)):
+        return value
+    if isinstance(value, np.bool_):
+        return bool(value)
+    if isinstance(value, (np.integer, int)):
+        return int(value)
+    if isinstance(value, (np.floating, float)):
+        return float(value)
+    if isinstance(value, np.ndarray):
+        return {"__ndarray__": value.tolist(), "dtype": str(value.dtype)}
+    if isinstance(value, tuple):
+        return {"__tuple__": [encode_header_value(x) for x in value]}
+    if isinstance(value, list):
+        return [encode_header_value(x) for x in value]
+    if isinstance(value, dict):
+        return {str(key): encode_header_value(x) for key, x in value.items()}
+    if isinstance(value, imref3d):
+        return {"__imref3d__": encode_header_value(value.__dict__)}
 
+    raise TypeError(f"Unsupported type in the MEDscan header: {type(value)}")
 
 def save_MEDscan(medscan: MEDscan,
-                  path_save: Path) -> str:
-    """Saves MEDscan class instance in a pickle object
-    
+                 path_save: Path,
+                 compress: bool = False) -> str:
+    """Saves a MEDscan class instance in a MEDscan store.
+
+    The store is an uncompressed zip archive (readable with ``np.load``) holding:
+
+        - ``header.json``: patient ID, scan type, spatial reference, orientation, ROI names and
+          the scan information of :func:`MEDimage.utils.get_scan_info`.
+        - ``volume.npy``: the imaging volume.
+        - ``roi_<key>.npy``: the flat indexes of each ROI.
+        - ``dicomH.pkl``: the DICOM headers, if any.
+
+    Since the arrays are stored raw, :func:`MEDimage.utils.load_MEDscan` memory-maps them
+    and only reads the parts of the volume that are used.
+
     Args:
         medscan (MEDscan): MEDscan instance
         path_save (Path): MEDscan instance saving paths
-    
+        compress (bool, optional): If True, members are deflate-compressed. The store is
+            smaller but the arrays can no longer be memory-mapped.
+
     Returns:
-        None.
+        str: Name of the saved file.
     """
 
     series_description = medscan.series_description.translate({ord(ch): '-' for ch in '/\\ ()&:*'})
@@ -22,9 +88,88 @@ def save_MEDscan(medscan: MEDscan,
 
     # final saving name
     name_complete = name_id + '__' + series_description + '.' + medscan.type + '.npy'
-    
+
     # save
-    with open(path_save / name_complete,'wb') as f: 
-        pickle.dump(medscan, f)
+    write_MEDscan_store(medscan, Path(path_save) / name_complete, compress)
 
     return name_complete
+
+def write_MEDscan_store(medscan: MEDscan,
+                        path_file: Path,
+                        compress: bool = False) -> None:
+    """Writes a MEDscan class instance in a MEDscan store (see :func:`save_MEDscan`).
+    The store is first written to a temporary file, which then replaces ``path_file``.
+
+    Args:
+        medscan (MEDscan): MEDscan instance.
+        path_file (Path): Path of the store.
+        compress (bool, optional): If True, members are deflate-compressed.
+
+    Returns:
+        None.
+    """
+    path_file = Path(path_file)
+    data = medscan.data
+    compression = zipfile.ZIP_DEFLATED if compress else zipfile.ZIP_STORED
+
+    # Volume attributes other than the array itself
+    volume_attrs = {key: value for key, value in data.volume.__dict__.items() if key != "array"}
+    volume_array = data.volume.array
+    volume_process = getattr(data, "volume_process", None)
+    volume_process_array = getattr(volume_process, "array", None)
+
+    header = {
+        "store_version": STORE_VERSION,
+        "patientID": medscan.patientID,
+        "type": medscan.type,
+        "series_description": medscan.series_description,
+        "format": medscan.format,
+        "orientation": data.orientation,
+        "patient_position": data.patient_position,
+        "volume": {
+            "attributes": encode_header_value(volume_attrs),
+            "member": VOLUME_MEMBER if volume_array is not None else None,
+            "shape": list(np.shape(volume_array)) if volume_array is not None else None,
+            "dtype": str(np.asarray(volume_array).dtype) if volume_array is not None else None
+        },
+        "volume_process": {
+            "member": VOLUME_PROCESS_MEMBER if volume_process_array is not None else None,
+            "scan_rot": encode_header_value(getattr(volume_process, "scan_rot", None)),
+            "spatialRef": encode_header_value(getattr(volume_process, "spatialRef", None)),
+            "user_string": getattr(volume_process, "user_string", "")
+        },
+        "ROI": {
+            "roi_names": encode_header_value(data.ROI.roi_names),
+            "nameSet": encode_header_value(data.ROI.nameSet),
+            "nameSetInfo": encode_header_value(data.ROI.nameSetInfo),
+            "indexes": {}
+        },
+        "dicomH": DICOM_HEADERS_MEMBER if medscan.dicomH else None,
+        "scan_info": get_scan_info(medscan)
+    }
+
+    path_tmp = path_file.with_name(path_file.name + ".tmp")
+    with zipfile.ZipFile(path_tmp, "w", compression=compression) as zf:
+        if volume_array is not None:
+            with zf.open(VOLUME_MEMBER, "w", force_zip64=True) as f:
+                np.lib.format.write_array(f, np.asarray(volume_array), allow_pickle=False)
+        if volume_process_array is not None:
+            with zf.open(VOLUME_PROCESS_MEMBER, "w", force_zip64=True) as f:
+                np.lib.format.write_array(f, np.asarray(volume_process_array), allow_pickle=False)
+
+        # ROI indexes are stored as flat arrays, NaN (ROI not found) as None
+        for key, indexes in data.ROI.indexes.items():
+            if isinstance(indexes, tuple):
+                member = ROI_MEMBER.format(key)
+                with zf.open(member, "w", force_zip64=True) as f:
+                    np.lib.format.write_array(f, np.asarray(indexes[0]), allow_pickle=False)
+                header["ROI"]["indexes"][str(key)] = member
+            else:
+                header["ROI"]["indexes"][str(key)] = None
+
+        if medscan.dicomH:
+            zf.writestr(DICOM_HEADERS_MEMBER, pickle.dumps(medscan.dicomH))
+
+        zf.writestr(HEADER_MEMBER, json.dumps(header, indent=1))
+
+    os.replace(path_tmp, path_file)
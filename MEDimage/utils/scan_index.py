@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+
+import logging
+from pathlib import Path
+from typing import Dict, List, Union
+
+from .get_scan_info import get_scan_info
+from .json_utils import load_json, save_json
+from .load_MEDscan import is_MEDscan_store, load_MEDscan, read_MEDscan_header
+
+# Name of the scan index sidecar, saved next to the MEDscan instances
+SCAN_INDEX_NAME = "scan_index.json"
+
+
+def get_scan_index_key(path_file: Path, path_data: Path) -> str:
+    """Returns the key of a saved MEDscan in the scan index: its path relative to ``path_data``.
+
+    Args:
+        path_file (Path): Path of the saved MEDscan.
+        path_data (Path): Path of the folder holding the scan index.
+
+    Returns:
+        str: Key of the scan in the index.
+    """
+    try:
+        return Path(path_file).relative_to(path_data).as_posix()
+    except ValueError:
+        return Path(path_file).name
+
+def read_scan_info(path_file: Union[Path, str]) -> Dict:
+    """Reads the scan information (see :func:`MEDimage.utils.get_scan_info`) of a saved MEDscan.
+    For MEDscan stores, only the header is read. Older stores and pickled MEDscan instances are
+    fully loaded.
+
+    Args:
+        path_file (Union[Path, str]): Path of the saved MEDscan.
+
+    Returns:
+        Dict: Scan information.
+    """
+    if is_MEDscan_store(path_file):
+        header = read_MEDscan_header(path_file)
+        if "scan_info" in header:
+            return header["scan_info"]
+
+    return get_scan_info(load_MEDscan(path_file))
+
+def get_scan_index(path_data: Union[Path, str],
+                   file_paths: List[Path] = None,
+                   update: bool = True) -> Dict[str, Dict]:
+    """Gets the scan information of saved MEDscan instances from the scan index sidecar
+    ``scan_index.json`` of ``path_data``. Scans that are missing from the index, or that were
+    modified since they were indexed, are read again with :func:`read_scan_info`.
+
+    Args:
+        path_data (Union[Path, str]): Path of the folder holding the saved MEDscan instances.
+        file_paths (List[Path], optional): Paths of the scans to get. If None, all the ``*.npy`` files
+            of ``path_data`` and its sub-folders are used.
+        update (bool, optional): If True, the index is saved again when scans were (re-)indexed.
+
+    Returns:
+        Dict[str, Dict]: Scan information of each scan, keyed by path relative to ``path_data``.
+    """
+    path_data = Path(path_data)
+    path_index = path_data / SCAN_INDEX_NAME
+    if file_paths is None:
+        file_paths = [path for path in path_data.rglob('*.npy') if path.is_file()]
+
+    index = {}
+    if path_index.exists():
+        try:
+            index = load_json(path_index)
+        except ValueError:
+            logging.warning(f"The scan index {path_index} is corrupted and will be rebuilt.")
+
+    scan_index = {}
+    modified = False
+    for path_file in file_paths:
+        path_file = Path(path_file)
+        key = get_scan_index_key(path_file, path_data)
+        stat = path_file.stat()
+        entry = index.get(key)
+        if entry is None or entry["mtime_ns"] != stat.st_mtime_ns or entry["file_size"] != stat.st_size:
+            try:
+                entry = {
+                    "mtime_ns": stat.st_mtime_ns,
+                    "file_size": stat.st_size,
+                    "scan_info": read_scan_info(path_file)
+                }
+            except Exception as e:
+                logging.warning(f"Could not index {path_file}: {e}")
+                continue
+            index[key] = entry
+            modified = True
+        scan_index[key] = entry["scan_info"]
+
+    if update and modified:
+        try:
+            save_json(path_index, index)
+        except OSError as e:
+            logging.warning(f"Could not save the scan index {path_index}: {e}")
+
+    return scan_index
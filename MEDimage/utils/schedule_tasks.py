@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+
+import logging
+import re
+from concurrent.futures import FIRST_COMPLETED, Executor, wait
+from time import time
+from typing import Any, Callable, Dict, List
+
+import numpy as np
+from tqdm import tqdm
+
+# Feature families computed once per scan, and once per texture experiment (scale, algo, gl)
+NON_TEXTURE_FAMILIES = ["Morph", "LocalIntensity", "Stats", "IntensityHistogram", "IntensityVolumeHistogram"]
+TEXTURE_FAMILIES = ["GLCM", "GLRLM", "GLSZM", "GLDZM", "NGTDM", "NGLDM"]
+
+
+def get_roi_voxel_count(scan_info: Dict, roi_name: str) -> int:
+    """Counts the voxels of the ROIs named in ``roi_name`` (e.g. ``"{GTV}+{GTV_2}"``) using the ROI
+    sizes of the scan information (see :func:`MEDimage.utils.get_scan_info`).
+
+    Args:
+        scan_info (Dict): Scan information.
+        roi_name (str): Name of the ROI, as written in the CSV files of ROI names.
+
+    Returns:
+        int: Number of voxels of the ROI. If the ROI sizes are unknown, the number of voxels of the volume.
+    """
+    roi_sizes = scan_info.get('roi_sizes', {})
+    names = re.findall(r'\{([^}]*)\}', roi_name) or [roi_name]
+    n_vox = sum(roi_sizes.get(key, 0) for key, name in scan_info.get('roi_names', {}).items() if name in names)
+    if n_vox == 0 and scan_info.get('size'):
+        n_vox = int(np.prod(scan_info['size']))
+
+    return n_vox
+
+def estimate_task_cost(scan_info: Dict, roi_name: str, im_params: Dict) -> float:
+    """Estimates the relative cost of the feature extraction of a scan, proportional to the number of
+    ROI voxels after each interpolation times the number of feature families computed at that scale.
+
+    Args:
+        scan_info (Dict): Scan information (see :func:`MEDimage.utils.get_scan_info`).
+        roi_name (str): Name of the ROI.
+        im_params (Dict): Extraction parameters of the scan modality (e.g. ``im_params['imParamCT']``).
+
+    Returns:
+        float: Estimated cost, only meaningful relative to the cost of other scans.
+    """
+    n_vox = get_roi_voxel_count(scan_info, roi_name)
+    spacing = scan_info.get('spacing') or [1.0, 1.0, 1.0]
+    roi_volume = n_vox * float(np.prod(spacing))
+    extract = im_params.get('extract', {})
+    n_non_texture = sum(extract.get(family, True) for family in NON_TEXTURE_FAMILIES)
+    n_texture = sum(extract.get(family, True) for family in TEXTURE_FAMILIES)
+
+    def n_vox_at_scale(scale):
+        # A null (or missing) voxel dimension keeps the original spacing
+        scale = list(scale) if scale else []
+        scale = [scale[i] if i < len(scale) and scale[i] else spacing[i] for i in range(3)]
+        return roi_volume / float(np.prod(scale))
+
+    interp = im_params.get('interp', {})
+    texture = im_params.get('discretisation', {}).get('texture', {})
+    n_discretisations = sum(len(val) for val in texture.get('val', [])) or 1
+    cost = n_vox_at_scale(interp.get('scale_non_text')) * n_non_texture
+    for scale in interp.get('scale_text', [spacing]):
+        cost += n_vox_at_scale(scale) * n_discretisations * n_texture
+
+    return cost
+
+def run_largest_first(
+        executor: Executor,
+        fn: Callable,
+        tasks: List[Dict],
+        costs: List[float],
+        slots: List[Dict],
+        desc: str = None
+    ) -> List[Any]:
+    """Runs ``fn(**task, **slot)`` for all the tasks, largest estimated cost first.
+
+    At most one task runs per slot (e.g. a log file per worker), and a slot is given the largest
+    remaining task as soon as its task is done, so long tasks do not end up alone at the end of the
+    run. The remaining time is predicted from the cost of the finished tasks.
+
+    Args:
+        executor (Executor): Executor running the tasks (see :func:`MEDimage.utils.get_executor`).
+        fn (Callable): Function to run.
+        tasks (List[Dict]): Keyword arguments of each task.
+        costs (List[float]): Estimated cost of each task (see :func:`estimate_task_cost`).
+        slots (List[Dict]): Keyword arguments of each slot.
+        desc (str, optional): Description of the progress bar.
+
+    Returns:
+        List[Any]: Result of each task, in the order of ``tasks`` (None if the task failed).
+    """
+    order = sorted(range(len(tasks)), key=lambda i: costs[i], reverse=True)
+    results = [None] * len(tasks)
+    total_cost = float(sum(costs))
+    done_cost = 0.0
+    t_start = time()
+
+    def submit(idx, slot):
+        return executor.submit(fn, **tasks[idx], **slot)
+
+    futures = {submit(idx, slot): (idx, slot) for idx, slot in zip(order, slots)}
+    next_task = len(futures)
+    with tqdm(total=len(tasks), desc=desc) as pbar:
+        while futures:
+            done, _ = wait(futures, return_when=FIRST_COMPLETED)
+            for future in done:
+                idx, slot = futures.pop(future)
+                if future.exception() is not None:
+                    logging.error(f'PROBLEM WITH TASK {idx}: {future.exception()}')
+                else:
+                    results[idx] = future.result()
+                done_cost += costs[idx]
+                if next_task < len(order):
+                    futures[submit(order[next_task], slot)] = (order[next_task], slot)
+                    next_task += 1
+
+                # Predicted time remaining
+                elapsed = time() - t_start
+                if done_cost > 0:
+                    eta = elapsed * (total_cost - done_cost) / done_cost
+                    pbar.set_postfix_str(f'predicted time remaining: {eta:.0f}s')
+                    logging.info(f'{pbar.n + 1}/{len(tasks)} tasks done, predicted time remaining: {eta:.0f}s')
+                pbar.update()
+
+    return results
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+
+import logging
+import os
+import sqlite3
+import traceback
+from contextlib import closing
+from pathlib import Path
+from time import time
+from typing import Any, Callable, Dict, List, Union
+
+try:
+    import resource
+except ImportError:
+    # Not available on Windows
+    resource = None
+
+# Name of the task ledger, saved in the folder of the extracted features
+TASK_LEDGER_NAME = 'task_ledger.sqlite'
+
+# States of the tasks
+PENDING = 'pending'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+
+
+class TaskLedger:
+    """Durable record of the tasks of a batch (e.g. the feature extraction of each scan): state,
+    number of attempts, duration and error of each task.
+
+    The ledger is a SQLite database updated by the workers themselves when a task starts and ends,
+    so it survives the crash of a worker or of the whole run. Tasks still ``running`` after a crash
+    are retried by a resumed run, like the ``failed`` ones.
+    """
+
+    def __init__(self, path_ledger: Union[Path, str]) -> None:
+        """Constructor of the TaskLedger class.
+
+        Args:
+            path_ledger (Union[Path, str]): Path to the SQLite database of the ledger.
+
+        Returns:
+            None.
+        """
+        self.path_ledger = Path(path_ledger)
+        with closing(self.__connect()) as connection, connection:
+            # Write-ahead logging, so that the workers do not block each other
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS tasks ('
+                'task_id TEXT PRIMARY KEY, state TEXT NOT NULL, attempts INTEGER NOT NULL DEFAULT 0, '
+                'started REAL, duration REAL, error TEXT, pid INTEGER)'
+            )
+
+    def __connect(self) -> sqlite3.Connection:
+        """Opens a connection to the ledger. Connections are not shared between workers."""
+        return sqlite3.connect(self.path_ledger, timeout=60)
+
+    def add(self, task_ids: List[str], reset: bool = False) -> None:
+        """Adds tasks to the ledger as ``pending``. Tasks already in the ledger are left unchanged,
+        unless ``reset`` is True.
+
+        Args:
+            task_ids (List[str]): IDs of the tasks.
+            reset (bool, optional): True to set the tasks already in the ledger back to ``pending``
+                with no attempts (e.g. for a new run that does not resume the previous one).
+
+        Returns:
+            None.
+        """
+        with closing(self.__connect()) as connection, connection:
+            connection.executemany(
+                'INSERT OR IGNORE INTO tasks (task_id, state) VALUES (?, ?)',
+                [(task_id, PENDING) for task_id in task_ids]
+            )
+            if reset:
+                connection.executemany(
+                    'UPDATE tasks SET state = ?, attempts = 0, started = NULL, duration = NULL, error = NULL, '
+                    'pid = NULL WHERE task_id = ?',
+                    [(PENDING, task_id) for task_id in task_ids]
+                )
+
+    def start(self, task_id: str) -> None:
+        """Marks a task as ``running`` and counts a new attempt.
+
+        Args:
+            task_id (str): ID of the task.
+
+        Returns:
+            None.
+        """
+        with closing(self.__connect()) as connection, connection:
+            connection.execute('INSERT OR IGNORE INTO tasks (task_id, state) VALUES (?, ?)', (task_id, PENDING))
+            connection.execute(
+                'UPDATE tasks SET state = ?, attempts = attempts + 1, started = ?, duration = NULL, '
+                'error = NULL, pid = ? WHERE task_id = ?',
+                (RUNNING, time(), os.getpid(), task_id)
+            )
+
+    def end(self, task_id: str, error: str = None) -> None:
+        """Marks a task as ``done``, or ``failed`` if an error is given, and records its duration.
+
+        Args:
+            task_id (str): ID of the task.
+            error (str, optional): Error of the task.
+
+        Returns:
+            None.
+        """
+        with closing(self.__connect()) as connection, connection:
+            connection.execute(
+                'UPDATE tasks SET state = ?, duration = ? - started, error = ? WHERE task_id = ?',
+                (FAILED if error else DONE, time(), error, task_id)
+            )
+
+    def get_tasks(self, states: List[str] = None) -> Dict[str, Dict]:
+        """Gets the tasks of the ledger.
+
+        Args:
+            states (List[str], optional): States of the tasks to get. If None, all the tasks are returned.
+
+        Returns:
+            Dict[str, Dict]: State, attempts, start time, duration, error and process ID of each task,
+            keyed by task ID.
+        """
+        with closing(self.__connect()) as connection:
+            connection.row_factory = sqlite3.Row
+            rows = connection.execute('SELECT * FROM tasks').fetchall()
+
+        return {row['task_id']: dict(row) for row in rows if states is None or row['state'] in states}
+
+    def get_summary(self) -> Dict[str, int]:
+        """Counts the tasks of each state.
+
+        Returns:
+            Dict[str, int]: Number of tasks of each state.
+        """
+        with closing(self.__connect()) as connection:
+            rows = connection.execute('SELECT state, COUNT(*) FROM tasks GROUP BY state').fetchall()
+
+        return dict(rows)
+
+
+def set_memory_limit(memory_limit: int) -> None:
+    """Limits the virtual memory of the current process, so that a task going over the limit fails
+    with a ``MemoryError`` instead of being killed by the system.
+
+    Args:
+        memory_limit (int): Limit in bytes.
+
+    Returns:
+        None.
+    """
+    if resource is None:
+        logging.warning("The memory limit of the tasks is not supported on this platform.")
+        return
+    _, hard_limit = resource.getrlimit(resource.RLIMIT_AS)
+    if hard_limit != resource.RLIM_INFINITY:
+        memory_limit = min(memory_limit, hard_limit)
+    resource.setrlimit(resource.RLIMIT_AS, (memory_limit, hard_limit))
+
+def run_ledger_task(
+        task_fn: Callable,
+        task_id: str,
+        path_ledger: Union[Path, str],
+        memory_limit: int = None,
+        **kwargs
+    ) -> Any:
+    """Runs ``task_fn(**kwargs)`` and records it in the task ledger: ``running`` when it starts, then
+    ``done``, or ``failed`` with the error if it raises.
+
+    Args:
+        task_fn (Callable): Function of the task.
+        task_id (str): ID of the task.
+        path_ledger (Union[Path, str]): Path to the task ledger (see :class:`TaskLedger`).
+        memory_limit (int, optional): Memory limit of the worker process in bytes (see
+            :func:`set_memory_limit`). Only use it with worker processes, as it limits the whole process.
+        **kwargs: Arguments of ``task_fn``.
+
+    Returns:
+        Any: Result of ``task_fn``.
+
+    Raises:
+        Exception: The error of ``task_fn``, after it was recorded.
+    """
+    ledger = TaskLedger(path_ledger)
+    ledger.start(task_id)
+    try:
+        if memory_limit:
+            set_memory_limit(memory_limit)
+        result = task_fn(**kwargs)
+    except BaseException as e:
+        error = ''.join(traceback.format_exception_only(type(e), e)).strip()
+        ledger.end(task_id, error or type(e).__name__)
+        raise
+    ledger.end(task_id)
+
+    return result
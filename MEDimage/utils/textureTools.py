@@ -2,7 +2,7 @@
 # -*- coding: utf-8 -*-
 
 
-from typing import List, Union
+from typing import List, Tuple, Union
 
 import numpy as np
 
@@ -186,3 +186,109 @@ def is_list_all_none(x: List) -> bool:
 
     """
     return all(y is None for y in x)
+
+
+def get_level_codes(vol: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Converts a quantized volume into grey level indexes used by the array-native
+    texture matrices builders.
+
+    Args:
+        vol (ndarray): Volume with discretised intensities, with NaNs outside the ROI.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]:
+            - Sorted vector of the grey levels present in the ROI.
+            - Array of the index of the grey level of each voxel in the levels vector, with -1
+              outside the ROI.
+    """
+    roi = np.isfinite(vol)
+    levels, codes = np.unique(vol[roi].astype(np.float64), return_inverse=True)
+
+    img_codes = np.full(np.shape(vol), -1, dtype=np.int32)
+    img_codes[roi] = codes
+
+    return levels, img_codes
+
+
+def get_shifted_views(x: np.ndarray,
+                      direction: Union[List, np.ndarray]) -> Tuple[np.ndarray, np.ndarray]:
+    """Gets the two overlapping views of an array pairing every element with its neighbour
+    along the given direction, without copying the array.
+
+    Args:
+        x (ndarray): Array of any dimension.
+        direction (ndarray or List): Integer offset along each dimension of ``x``.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]:
+            - View of the elements that have a neighbour in the array along ``direction``.
+            - View of these neighbours, element-wise aligned with the first view.
+    """
+    from_slices = []
+    to_slices = []
+    for offset, size in zip(direction, np.shape(x)):
+        offset = int(offset)
+        if offset >= 0:
+            from_slices += [slice(0, max(size - offset, 0))]
+            to_slices += [slice(min(offset, size), size)]
+        else:
+            from_slices += [slice(min(-offset, size), size)]
+            to_slices += [slice(0, max(size + offset, 0))]
+
+    return x[tuple(from_slices)], x[tuple(to_slices)]
+
+
+def get_runs(x: np.ndarray,
+             direction: Union[List, np.ndarray]) -> Tuple[np.ndarray, np.ndarray]:
+    """Run-length encodes an array of grey level indexes along the lines of the given direction.
+
+    The array is sheared so that every line along ``direction`` becomes a row of a 2D array,
+    padded with -1 on both ends, and all runs are then found at once from the positions where
+    consecutive values change.
+
+    Args:
+        x (ndarray): Array of any dimension of non-negative grey level indexes, with -1 outside the ROI.
+        direction (ndarray or List): Offset along each dimension of ``x``, with values in -1, 0 and 1.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]:
+            - Grey level index of each run.
+            - Length of each run.
+    """
+    direction = np.asarray(direction, dtype=int)
+    shape = np.shape(x)
+
+    # Runs are identical in both senses of a line: only use positive offsets
+    for axis in np.flatnonzero(direction < 0):
+        x = np.flip(x, axis)
+
+    active = np.flatnonzero(direction != 0)
+    if active.size == 0 or x.size == 0:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+
+    # Lines are read along the shortest active axis, which limits the padding added by the shear
+    axis_t = active[np.argmin(np.take(shape, active))]
+    n_t = shape[axis_t]
+    other_axes = [axis for axis in range(x.ndim) if axis != axis_t]
+
+    # Shear the other active axes so that each line is stored along the last axis
+    lines_shape = [shape[axis] + n_t - 1 if direction[axis] != 0 else shape[axis] for axis in other_axes]
+    lines = np.full(lines_shape + [n_t + 2], -1, dtype=x.dtype)
+    for t in range(n_t):
+        dst = []
+        for axis in other_axes:
+            if direction[axis] != 0:
+                dst += [slice(n_t - 1 - t, n_t - 1 - t + shape[axis])]
+            else:
+                dst += [slice(None)]
+        lines[tuple(dst + [t + 1])] = np.take(x, t, axis=axis_t)
+    lines = np.reshape(lines, (-1, n_t + 2))
+
+    # Runs start where the value changes and end where the next run starts. Since every line ends
+    # with -1, runs of the ROI never extend over two lines.
+    bounds = np.flatnonzero(lines[:, 1:] != lines[:, :-1])
+    run_codes = lines[:, 1:].ravel()[bounds[:-1]]
+    run_lengths = np.diff(bounds)
+    valid = run_codes >= 0
+
+    return run_codes[valid].astype(np.int64), run_lengths[valid]
@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+
+import hashlib
+import json
+import logging
+import os
+import pickle
+import shutil
+import uuid
+import zipfile
+from pathlib import Path
+from typing import Dict, List, Tuple, Union
+
+import numpy as np
+
+from .image_volume_obj import image_volume_obj
+from .load_MEDscan import is_MEDscan_store
+
+# Members of a cache entry
+CACHE_ARRAYS = ['vol', 'roi_morph', 'roi_int']
+CACHE_SPATIAL_REFS = 'spatial_refs.pkl'
+
+
+def get_scan_fingerprint(path_scan: Union[Path, str]) -> str:
+    """Gets a fingerprint of the content of a saved MEDscan.
+
+    For MEDscan stores, the fingerprint is computed from the CRC-32 of each member, which are read
+    from the zip directory without reading the arrays. For pickled MEDscan instances, it is computed
+    from the file size and modification time.
+
+    Args:
+        path_scan (Union[Path, str]): Path of the saved MEDscan.
+
+    Returns:
+        str: Fingerprint of the scan.
+    """
+    if is_MEDscan_store(path_scan):
+        with zipfile.ZipFile(path_scan) as zf:
+            content = sorted((info.filename, info.CRC, info.file_size) for info in zf.infolist())
+    else:
+        stat = os.stat(path_scan)
+        content = [Path(path_scan).name, stat.st_size, stat.st_mtime_ns]
+
+    return hashlib.sha1(json.dumps(content).encode()).hexdigest()
+
+
+class VolumeCache:
+    """Disk cache of interpolated and re-segmented volumes (imaging volume, morphological mask and
+    intensity mask), so that experiments that only change the features or the discretisation do not
+    interpolate the scans again.
+
+    Entries are keyed by a hash of the scan content, the ROI name and the processing parameters, and
+    their arrays are memory-mapped when read. When the cache grows over ``max_size``, the least
+    recently used entries are removed.
+    """
+
+    def __init__(self, path_cache: Union[Path, str], max_size: int = None) -> None:
+        """Constructor of the VolumeCache class.
+
+        Args:
+            path_cache (Union[Path, str]): Path to the folder of the cache.
+            max_size (int, optional): Maximum size of the cache in bytes. If None, the cache is not
+                limited.
+
+        Returns:
+            None.
+        """
+        self.path_cache = Path(path_cache)
+        self.path_cache.mkdir(parents=True, exist_ok=True)
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+
+    def get_key(
+            self,
+            path_scan: Union[Path, str],
+            roi_name: str,
+            vox_dim: List,
+            process_params: Dict
+        ) -> str:
+        """Gets the key of the volumes of a scan.
+
+        Args:
+            path_scan (Union[Path, str]): Path of the saved MEDscan.
+            roi_name (str): Name of the ROI.
+            vox_dim (List): Voxel dimension of the interpolation.
+            process_params (Dict): Parameters of the interpolation and re-segmentation (e.g.
+                ``vol_interp``, ``roi_pv``, ``im_range``).
+
+        Returns:
+            str: Key of the entry.
+        """
+        content = {
+            'scan': get_scan_fingerprint(path_scan),
+            'roi_name': roi_name,
+            'vox_dim': vox_dim,
+            'process': process_params
+        }
+
+        return hashlib.sha1(json.dumps(content, sort_keys=True, default=str).encode()).hexdigest()
+
+    def get(self, key: str) -> Union[Tuple[image_volume_obj, image_volume_obj, image_volume_obj], None]:
+        """Reads the volumes of an entry.
+
+        Args:
+            key (str): Key of the entry (see :func:`get_key`).
+
+        Returns:
+            Union[Tuple[image_volume_obj, image_volume_obj, image_volume_obj], None]: Imaging volume,
+            morphological mask and intensity mask, with memory-mapped copy-on-write arrays.
+            None if the entry is not in the cache.
+        """
+        path_entry = self.path_cache / key
+        try:
+            with open(path_entry / CACHE_SPATIAL_REFS, 'rb') as f:
+                spatial_refs = pickle.load(f)
+            arrays = [np.load(path_entry / f'{name}.npy', mmap_mode='c') for name in CACHE_ARRAYS]
+            # Last access time, used by the eviction
+            os.utime(path_entry)
+        except (OSError, EOFError, ValueError, pickle.UnpicklingError):
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return tuple(image_volume_obj(array, spatial_ref) for array, spatial_ref in zip(arrays, spatial_refs))
+
+    def put(
+            self,
+            key: str,
+            vol_obj: image_volume_obj,
+            roi_obj_morph: image_volume_obj,
+            roi_obj_int: image_volume_obj
+        ) -> None:
+        """Saves the volumes of an entry, then evicts the least recently used entries if needed.
+
+        Args:
+            key (str): Key of the entry (see :func:`get_key`).
+            vol_obj (image_volume_obj): Interpolated imaging volume.
+            roi_obj_morph (image_volume_obj): Interpolated morphological mask.
+            roi_obj_int (image_volume_obj): Re-segmented intensity mask.
+
+        Returns:
+            None.
+        """
+        path_entry = self.path_cache / key
+        # Entries are written in a temporary folder then renamed, so that workers sharing the cache
+        # never read an incomplete entry.
+        path_tmp = self.path_cache / f'.{key}.{uuid.uuid4().hex}'
+        path_tmp.mkdir()
+        try:
+            volumes = [vol_obj, roi_obj_morph, roi_obj_int]
+            for name, volume in zip(CACHE_ARRAYS, volumes):
+                np.save(path_tmp / f'{name}.npy', np.asarray(volume.data))
+            with open(path_tmp / CACHE_SPATIAL_REFS, 'wb') as f:
+                pickle.dump([volume.spatialRef for volume in volumes], f)
+            os.rename(path_tmp, path_entry)
+        except OSError as e:
+            # Another worker saved the same entry first, or the disk is full
+            if not path_entry.exists():
+                logging.warning(f"Could not save the volumes {key} in the cache: {e}")
+            shutil.rmtree(path_tmp, ignore_errors=True)
+            return
+
+        self.evict()
+
+    def get_entries(self) -> List[Tuple[Path, float, int]]:
+        """Lists the entries of the cache.
+
+        Returns:
+            List[Tuple[Path, float, int]]: Path, last access time and size in bytes of each entry.
+        """
+        entries = []
+        for path_entry in self.path_cache.iterdir():
+            if not path_entry.is_dir() or path_entry.name.startswith('.'):
+                continue
+            try:
+                size = sum(path.stat().st_size for path in path_entry.iterdir())
+                entries.append((path_entry, path_entry.stat().st_mtime, size))
+            except OSError:
+                # Entry removed by another worker
+                continue
+
+        return entries
+
+    def evict(self) -> None:
+        """Removes the least recently used entries until the cache is smaller than ``max_size``.
+
+        Returns:
+            None.
+        """
+        if self.max_size is None:
+            return
+        entries = sorted(self.get_entries(), key=lambda entry: entry[1])
+        size = sum(entry[2] for entry in entries)
+        for path_entry, _, entry_size in entries:
+            if size <= self.max_size:
+                break
+            shutil.rmtree(path_entry, ignore_errors=True)
+            size -= entry_size
+
+    def get_stats(self) -> Dict:
+        """Gets the statistics of the cache.
+
+        Returns:
+            Dict: Hits and misses of this instance, number of entries and size in bytes of the cache.
+        """
+        entries = self.get_entries()
+
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'n_entries': len(entries),
+            'size': sum(entry[2] for entry in entries)
+        }
@@ -1,21 +1,18 @@
 import json
 import logging
 import os
-import pickle
 import re
+from concurrent.futures import as_completed
 from dataclasses import dataclass
 from pathlib import Path
 from time import time
+from types import SimpleNamespace
 from typing import List, Union
 
 import matplotlib.pyplot as plt
 import nibabel as nib
 import numpy as np
 import pandas as pd
-import pydicom
-import pydicom.errors
-import pydicom.misc
-import ray
 from nilearn import image
 from numpyencoder import NumpyEncoder
 from tqdm import tqdm, trange
@@ -23,11 +20,15 @@ from tqdm import tqdm, trange
 from ..MEDscan import MEDscan
 from ..processing.compute_suv_map import compute_suv_map
 from ..processing.segmentation import get_roi_from_indexes
+from ..utils.executors import get_executor
 from ..utils.get_file_paths import get_file_paths
 from ..utils.get_patient_names import get_patient_names
 from ..utils.imref import imref3d
 from ..utils.json_utils import load_json, save_json
+from ..utils.load_MEDscan import load_MEDscan
 from ..utils.save_MEDscan import save_MEDscan
+from ..utils.scan_index import get_scan_index, get_scan_index_key
+from .crawl_dicoms import CRAWL_MANIFEST_NAME, crawl_dicoms
 from .ProcessDICOM import ProcessDICOM
 
 
@@ -75,7 +76,8 @@ class DataManager(object):
             path_save_checks: Union[Path, str] = None,
             path_pre_checks_settings: Union[Path, str] = None,
             save: bool = True,
-            n_batch: int = 2
+            n_batch: int = 2,
+            backend: str = 'process'
     ) -> None:
         """Constructor of the class DataManager.
 
@@ -93,6 +95,8 @@ class DataManager(object):
             save (bool, optional): True to save the MEDscan classes in `path_save`.
             n_batch (int, optional): Numerical value specifying the number of batch to use in the
                 parallel computations (use 0 for serial computation).
+            backend (str, optional): Execution backend of the parallel computations, 'serial', 'process'
+                or 'ray' (see :func:`MEDimage.utils.get_executor`).
         
         Returns:
             None
@@ -121,6 +125,7 @@ class DataManager(object):
         )
         self.save = save
         self.n_batch = n_batch
+        self.backend = backend
         self.__dicom = self.DICOM(
                 stack_series_rs=[],
                 stack_path_rs=[],
@@ -191,6 +196,41 @@ class DataManager(object):
         name_complete = name_id + '__' + series_description + '.' + medscan.type + '.npy'
         return name_complete
 
+    def __update_summary(self, name_save: str) -> None:
+        """Updates the path to the created instances and the processing summary with a saved MEDscan instance.
+
+        Args:
+            name_save (str): Name of the saved MEDscan instance.
+
+        Returns:
+            None.
+        """
+        # Update the path to the created instances
+        if self.paths._path_save:
+            self.path_to_objects.append(str(self.paths._path_save / name_save))
+
+        # Update processing summary
+        if name_save.split('_')[0].count('-') >= 2:
+            scan_type = name_save[name_save.find('__')+2 : name_save.find('.')]
+            if name_save.split('-')[0] not in self.__studies:
+                self.__studies.append(name_save.split('-')[0])  # add new study
+            if name_save.split('-')[1] not in self.__institutions:
+                self.__institutions.append(name_save.split('-')[1])  # add new institution
+            if name_save.split('-')[0] not in self.summary:
+                self.summary[name_save.split('-')[0]] = {}  # add new study to summary
+            if name_save.split('-')[1] not  in self.summary[name_save.split('-')[0]]:
+                self.summary[name_save.split('-')[0]][name_save.split('-')[1]] = {}  # add new institution
+            if scan_type not in self.__scans:
+                self.__scans.append(scan_type)
+            if scan_type not in self.summary[name_save.split('-')[0]][name_save.split('-')[1]]:
+                self.summary[name_save.split('-')[0]][name_save.split('-')[1]][scan_type] = []
+            if name_save not in self.summary[name_save.split('-')[0]][name_save.split('-')[1]][scan_type]:
+                self.summary[name_save.split('-')[0]][name_save.split('-')[1]][scan_type].append(name_save)
+        else:
+            if self.save:
+                logging.warning(f"The patient ID of the following file: {name_save} does not respect the MEDimage "\
+                    "naming convention 'study-institution-id' (Ex: Glioma-TCGA-001)")
+
     def __associate_rt_stuct(self) -> None:
         """Associates the imaging volumes to their mask using UIDs
 
@@ -243,42 +283,35 @@ class DataManager(object):
             stack_folder = self.__get_list_of_files(directory_name)
         else:
             raise ValueError("The given dicom folder path either doesn't exist or not a folder.")
-        # READ ALL DICOM FILES AND UPDATE ATTRIBUTES FOR FURTHER PROCESSING
-        for file in tqdm(stack_folder):
-            if pydicom.misc.is_dicom(file):
-                try:
-                    info = pydicom.dcmread(str(file))
-                    if info.Modality in ['MR', 'PT', 'CT']:
-                        ind_series_id = self.__find_uid_cell_index(
-                                                        info.SeriesInstanceUID, 
-                                                        self.__dicom.cell_series_id)[0]
-                        if ind_series_id == len(self.__dicom.cell_series_id):  # New volume
-                            self.__dicom.cell_series_id = self.__dicom.cell_series_id + [info.SeriesInstanceUID]
-                            self.__dicom.cell_frame_id += [info.FrameOfReferenceUID]
-                            self.__dicom.cell_path_images += [[]]
-                            self.__dicom.cell_path_rs = self.__dicom.cell_path_rs + [[]]
-                        self.__dicom.cell_path_images[ind_series_id] += [file]
-                    elif info.Modality == 'RTSTRUCT':
-                        self.__dicom.stack_path_rs += [file]
-                        try:
-                            series_uid = info.ReferencedFrameOfReferenceSequence[
-                                        0].RTReferencedStudySequence[
-                                        0].RTReferencedSeriesSequence[
-                                        0].SeriesInstanceUID
-                        except:
-                            series_uid = 'NotFound'
-                        self.__dicom.stack_series_rs += [series_uid]
-                        try:
-                            frame_uid = info.ReferencedFrameOfReferenceSequence[0].FrameOfReferenceUID
-                        except:
-                            frame_uid = info.FrameOfReferenceUID
-                        self.__dicom.stack_frame_rs += [frame_uid]
-                    else:
-                        print("Modality not supported: ", info.Modality)
-
-                except Exception as e:
-                    print(f'Error while reading: {file}, error: {e}\n')
-                    continue
+        # READ THE HEADERS OF ALL DICOM FILES
+        if self.paths._path_save:
+            path_manifest = Path(self.paths._path_save) / CRAWL_MANIFEST_NAME
+        else:
+            path_manifest = None
+        headers = crawl_dicoms(stack_folder, path_manifest)
+
+        # UPDATE ATTRIBUTES FOR FURTHER PROCESSING
+        series_index = {uid: i for i, uid in enumerate(self.__dicom.cell_series_id)}
+        for file in stack_folder:
+            info = headers.get(str(file))
+            if info is None:
+                continue
+            if info['Modality'] in ['MR', 'PT', 'CT']:
+                ind_series_id = series_index.get(info['SeriesInstanceUID'])
+                if ind_series_id is None:  # New volume
+                    ind_series_id = len(self.__dicom.cell_series_id)
+                    series_index[info['SeriesInstanceUID']] = ind_series_id
+                    self.__dicom.cell_series_id = self.__dicom.cell_series_id + [info['SeriesInstanceUID']]
+                    self.__dicom.cell_frame_id += [info['FrameOfReferenceUID']]
+                    self.__dicom.cell_path_images += [[]]
+                    self.__dicom.cell_path_rs = self.__dicom.cell_path_rs + [[]]
+                self.__dicom.cell_path_images[ind_series_id] += [file]
+            elif info['Modality'] == 'RTSTRUCT':
+                self.__dicom.stack_path_rs += [file]
+                self.__dicom.stack_series_rs += [info['SeriesInstanceUID']]
+                self.__dicom.stack_frame_rs += [info['FrameOfReferenceUID']]
+            else:
+                print("Modality not supported: ", info['Modality'])
         print('DONE')
 
         # ASSOCIATE ALL VOLUMES TO THEIR MASK
@@ -294,8 +327,6 @@ class DataManager(object):
         Returns:
             List[MEDscan]: List of MEDscan instances.
         """
-        ray.init(local_mode=True, include_dashboard=True)
-
         print('--> Reading all DICOM objects to create MEDscan classes')
         self.__read_all_dicoms()
 
@@ -308,82 +339,23 @@ class DataManager(object):
         else:
             n_batch = self.n_batch
 
-        # Distribute the first tasks to all workers
-        pds = [ProcessDICOM(
-                        self.__dicom.cell_path_images[i], 
-                        self.__dicom.cell_path_rs[i], 
-                        self.paths._path_save,
-                        self.save)
-            for i in range(n_batch)]
-        
-        ids = [pd.process_files() for pd in pds]
-
-        # Update the path to the created instances
-        for name_save in ray.get(ids):
-            if self.paths._path_save:
-                self.path_to_objects.append(str(self.paths._path_save / name_save))
-            # Update processing summary
-            if name_save.split('_')[0].count('-') >= 2:
-                scan_type = name_save[name_save.find('__')+2 : name_save.find('.')]
-                if name_save.split('-')[0] not in self.__studies:
-                    self.__studies.append(name_save.split('-')[0])  # add new study
-                if name_save.split('-')[1] not in self.__institutions:
-                    self.__institutions.append(name_save.split('-')[1])  # add new study
-                if name_save.split('-')[0] not in self.summary:
-                    self.summary[name_save.split('-')[0]] = {}
-                if name_save.split('-')[1] not  in self.summary[name_save.split('-')[0]]:
-                    self.summary[name_save.split('-')[0]][name_save.split('-')[1]] = {}  # add new institution
-                if scan_type not in self.__scans:
-                    self.__scans.append(scan_type)
-                if scan_type not in self.summary[name_save.split('-')[0]][name_save.split('-')[1]]:
-                    self.summary[name_save.split('-')[0]][name_save.split('-')[1]][scan_type] = []
-                if name_save not in self.summary[name_save.split('-')[0]][name_save.split('-')[1]][scan_type]:
-                    self.summary[name_save.split('-')[0]][name_save.split('-')[1]][scan_type].append(name_save)
-            else:
-                if self.save:
-                    logging.warning(f"The patient ID of the following file: {name_save} does not respect the MEDimage "\
-                        "naming convention 'study-institution-id' (Ex: Glioma-TCGA-001)")
-
-        nb_job_left = n_scans - n_batch
-
-        # Distribute the remaining tasks
-        for _ in trange(n_scans):
-            _, ids = ray.wait(ids, num_returns=1)
-            if nb_job_left > 0:
-                idx = n_scans - nb_job_left
-                pd = ProcessDICOM(
-                        self.__dicom.cell_path_images[idx], 
-                        self.__dicom.cell_path_rs[idx], 
-                        self.paths._path_save,
-                        self.save)
-                ids.extend([pd.process_files()])
-                nb_job_left -= 1
-
-            # Update the path to the created instances
-            for name_save in ray.get(ids):
-                if self.paths._path_save:
-                    self.path_to_objects.extend(str(self.paths._path_save / name_save))
-                # Update processing summary
-                if name_save.split('_')[0].count('-') >= 2:
-                    scan_type = name_save[name_save.find('__')+2 : name_save.find('.')]
-                    if name_save.split('-')[0] not in self.__studies:
-                        self.__studies.append(name_save.split('-')[0])  # add new study
-                    if name_save.split('-')[1] not in self.__institutions:
-                        self.__institutions.append(name_save.split('-')[1])  # add new study
-                    if name_save.split('-')[0] not in self.summary:
-                        self.summary[name_save.split('-')[0]] = {}
-                    if name_save.split('-')[1] not  in self.summary[name_save.split('-')[0]]:
-                        self.summary[name_save.split('-')[0]][name_save.split('-')[1]] = {}  # add new institution
-                    if scan_type not in self.__scans:
-                        self.__scans.append(scan_type)
-                    if scan_type not in self.summary[name_save.split('-')[0]][name_save.split('-')[1]]:
-                        self.summary[name_save.split('-')[0]][name_save.split('-')[1]][scan_type] = []
-                    if name_save not in self.summary[name_save.split('-')[0]][name_save.split('-')[1]][scan_type]:
-                        self.summary[name_save.split('-')[0]][name_save.split('-')[1]][scan_type].append(name_save)
-                else:
-                    if self.save:
-                        logging.warning(f"The patient ID of the following file: {name_save} does not respect the MEDimage "\
-                            "naming convention 'study-institution-id' (Ex: Glioma-TCGA-001)")
+        # Only the paths of the files of each scan are sent to the workers
+        with get_executor(self.backend, max(n_batch, 1)) as executor:
+            futures = [executor.submit(ProcessDICOM(
+                                            self.__dicom.cell_path_images[i], 
+                                            self.__dicom.cell_path_rs[i], 
+                                            self.paths._path_save,
+                                            self.save).process_files)
+                for i in range(n_scans)]
+
+            for future in tqdm(as_completed(futures), total=n_scans):
+                name_save = future.result()
+                if name_save:
+                    self.__update_summary(name_save)
+
+        # Index the saved instances for the pre-radiomics checks and imaging summaries
+        if self.save and self.paths._path_save:
+            get_scan_index(self.paths._path_save)
         print('DONE')
 
     def __read_all_niftis(self) -> None:
@@ -595,31 +567,12 @@ class DataManager(object):
             # Clear memory
             del medscan
 
-            # Update the path to the created instances
-            if self.paths._path_save:
-                self.path_to_objects.append(str(self.paths._path_save / name_save))
-            
-            # Update processing summary
-            if name_save.split('_')[0].count('-') >= 2:
-                scan_type = name_save[name_save.find('__')+2 : name_save.find('.')]
-                if name_save.split('-')[0] not in self.__studies:
-                    self.__studies.append(name_save.split('-')[0])  # add new study
-                if name_save.split('-')[1] not in self.__institutions:
-                    self.__institutions.append(name_save.split('-')[1])  # add new institution
-                if name_save.split('-')[0] not in self.summary:
-                    self.summary[name_save.split('-')[0]] = {}  # add new study to summary
-                if name_save.split('-')[1] not  in self.summary[name_save.split('-')[0]]:
-                    self.summary[name_save.split('-')[0]][name_save.split('-')[1]] = {}  # add new institution
-                if scan_type not in self.__scans:
-                    self.__scans.append(scan_type)
-                if scan_type not in self.summary[name_save.split('-')[0]][name_save.split('-')[1]]:
-                    self.summary[name_save.split('-')[0]][name_save.split('-')[1]][scan_type] = []
-                if name_save not in self.summary[name_save.split('-')[0]][name_save.split('-')[1]][scan_type]:
-                    self.summary[name_save.split('-')[0]][name_save.split('-')[1]][scan_type].append(name_save)
-            else:
-                if self.save:
-                    logging.warning(f"The patient ID of the following file: {name_save} does not respect the MEDimage "\
-                        "naming convention 'study-institution-id' (Ex: Glioma-TCGA-001)")
+            # Update the path to the created instances and the processing summary
+            self.__update_summary(name_save)
+
+        # Index the saved instances for the pre-radiomics checks and imaging summaries
+        if self.save and self.paths._path_save:
+            get_scan_index(self.paths._path_save)
         print('DONE')
 
         if list_instances:
@@ -740,6 +693,10 @@ class DataManager(object):
         ) -> None:
         """Finds proper voxels dimension options for radiomics analyses for a group of scans
 
+        Note:
+            The voxel spacing of saved MEDscan instances is read from the scan index
+            (see :func:`MEDimage.utils.get_scan_index`), the volumes are not loaded.
+
         Args:
             path_data (Path, optional): Path to the MEDscan objects, if not specified will use ``path_save`` from the 
                 inner-class ``Paths`` in the current instance.
@@ -793,10 +750,12 @@ class DataManager(object):
             if path_data:
                 file_paths = get_file_paths(path_data, wildcard)
             elif self.paths._path_save:
+                path_data = self.paths._path_save
                 file_paths = get_file_paths(self.paths._path_save, wildcard)
             else:
                 raise ValueError("Path data is invalid.")
             n_files = len(file_paths)
+            scan_index = get_scan_index(path_data, [file for file in file_paths if file.name.endswith('.npy')])
             xy_dim["data"] = np.zeros((n_files, 1))
             xy_dim["data"] = np.multiply(xy_dim["data"], np.nan)
             z_dim["data"] = np.zeros((n_files, 1))
@@ -808,9 +767,9 @@ class DataManager(object):
                         xy_dim["data"][f] = medscan.header.get_zooms()[0]
                         z_dim["data"][f]  = medscan.header.get_zooms()[2]
                     else:
-                        medscan = np.load(file_paths[f], allow_pickle=True)
-                        xy_dim["data"][f] = medscan.data.volume.spatialRef.PixelExtentInWorldX
-                        z_dim["data"][f]  = medscan.data.volume.spatialRef.PixelExtentInWorldZ
+                        scan_info = scan_index[get_scan_index_key(file_paths[f], path_data)]
+                        xy_dim["data"][f] = scan_info["spacing"][0]
+                        z_dim["data"][f]  = scan_info["spacing"][2]
                 except Exception as e:
                     print(e)
 
@@ -980,7 +939,7 @@ class DataManager(object):
                     if file.name.endswith('nii.gz') or file.name.endswith('nii'):
                         medscan = self.__process_one_nifti(file, path_data)
                     else:
-                        medscan = np.load(file, allow_pickle=True)
+                        medscan = load_MEDscan(file)
                         if re.search('PTscan', wildcard) and medscan.format != 'nifti':
                             medscan.data.volume.array = compute_suv_map(
                                                         np.double(medscan.data.volume.array), 
@@ -1196,6 +1155,10 @@ class DataManager(object):
         Summarizes MRI imaging acquisition parameters. Plots summary histograms
         for different dimensions and saves all acquisition parameters locally in JSON files.
 
+        Note:
+            The acquisition parameters are read from the scan index (see :func:`MEDimage.utils.get_scan_index`),
+            the saved MEDscan instances are not loaded.
+
         Args:
             wildcards_scans (List[str]): List of wildcards that determines the scans 
                 that will be analyzed (Only MRI scans will be analyzed). You can learn more about wildcards in
@@ -1278,6 +1241,7 @@ class DataManager(object):
             wildcard = wildcards_scans[i]
             file_paths = get_file_paths(path_data, wildcard)
             n_files = len(file_paths)
+            scan_index = get_scan_index(path_data, file_paths)
             param.dates = np.zeros(n_files)
             param.years.data = np.zeros((n_files, 1))
             param.years.data = np.multiply(param.years.data, np.NaN)
@@ -1315,10 +1279,10 @@ class DataManager(object):
                 # Loading Data
                 try:
                     print(f'\nCurrently working on: {file}', file = warn_file)
-                    with open(path_data / file, 'rb') as fe: medscan = pickle.load(fe)
+                    scan_info = scan_index[get_scan_index_key(file, path_data)]
 
                     # Example of DICOM header
-                    info = medscan.dicomH[1]
+                    info = SimpleNamespace(**scan_info["dicom"])
                     # Recording dates (info.AcquistionDates)
                     try:
                         param.dates[f] = info.AcquisitionDate
@@ -1337,7 +1301,7 @@ class DataManager(object):
                         print(f'Cannot read manufacturer of: {file}. Error: {e}', file = warn_file)
                     # Recording scanning sequence
                     try:
-                        param.scanning_sequence[f] = info.scanning_sequence
+                        param.scanning_sequence[f] = info.ScanningSequence
                     except Exception as e:
                         print(f'Cannot read scanning sequence of: {file}. Error: {e}', file = warn_file)
                     # Recording field strength
@@ -1377,12 +1341,12 @@ class DataManager(object):
                         print(f'Cannot read number averages of: {file}. Error: {e}', file = warn_file)
                     # Recording xy spacing
                     try:
-                        param.xyDim.data[f] = medscan.data.volume.spatialRef.PixelExtentInWorldX
+                        param.xyDim.data[f] = scan_info["spacing"][0]
                     except Exception as e:
                         print(f'Cannot read x spacing of: {file}. Error: {e}', file = warn_file)
                     # Recording z spacing
                     try:
-                        param.zDim.data[f] = medscan.data.volume.spatialRef.PixelExtentInWorldZ
+                        param.zDim.data[f] = scan_info["spacing"][2]
                     except Exception as e:
                         print(f'Cannot read z spacing of: {file}', file = warn_file)
                 except Exception as e:
@@ -1477,6 +1441,10 @@ class DataManager(object):
         Summarizes CT imaging acquisition parameters. Plots summary histograms
         for different dimensions and saves all acquisition parameters locally in JSON files.
 
+        Note:
+            The acquisition parameters are read from the scan index (see :func:`MEDimage.utils.get_scan_index`),
+            the saved MEDscan instances are not loaded.
+
         Args:
             wildcards_scans (List[str]): List of wildcards that determines the scans 
                 that will be analyzed (Only MRI scans will be analyzed). You can learn more about wildcards in
@@ -1542,6 +1510,7 @@ class DataManager(object):
             wildcard = wildcards_scans[i]
             file_paths = get_file_paths(path_data, wildcard)
             n_files = len(file_paths)
+            scan_index = get_scan_index(path_data, file_paths)
             param.dates = np.zeros(n_files)
             param.years.data = np.zeros(n_files)
             param.years.data = np.multiply(param.years.data, np.NaN)
@@ -1568,11 +1537,11 @@ class DataManager(object):
 
                 # Loading Data
                 try:
-                    with open(path_data / file, 'rb') as fe: medscan = pickle.load(fe)
+                    scan_info = scan_index[get_scan_index_key(file, path_data)]
                     print(f'Currently working on: {file}', file=warn_file)
                     
                     # DICOM header
-                    info = medscan.dicomH[1]
+                    info = SimpleNamespace(**scan_info["dicom"])
 
                     # Recording dates
                     try:
@@ -1607,12 +1576,12 @@ class DataManager(object):
                         print(f'Cannot read Kernel of: {file}. Error: {e}', file=warn_file)
                         # Recording xy spacing
                     try:
-                        param.xyDim.data[f] = medscan.data.volume.spatialRef.PixelExtentInWorldX
+                        param.xyDim.data[f] = scan_info["spacing"][0]
                     except Exception as e:
                         print(f'Cannot read x spacing of: {file}. Error: {e}', file=warn_file)
                         # Recording z spacing
                     try:
-                        param.zDim.data[f] = medscan.data.volume.spatialRef.PixelExtentInWorldZ
+                        param.zDim.data[f] = scan_info["spacing"][2]
                     except Exception as e:
                         print(f'Cannot read z spacing of: {file}. Error: {e}', file=warn_file)
                 except Exception as e:
@@ -7,7 +7,6 @@ from typing import List, Union
 
 import numpy as np
 import pydicom
-import ray
 
 from ..utils.imref import imref3d
 
@@ -304,7 +303,7 @@ class ProcessDICOM():
 
         return voxels, transform, rotation, scaling
 
-    def process_files(self):
+    def process_files(self) -> str:
         """
         Reads DICOM files (imaging volume + ROIs) in the instance data path 
         and then organizes it in the MEDscan class.
@@ -313,15 +312,7 @@ class ProcessDICOM():
             None.
         
         Returns:
-            medscan (MEDscan): Instance of a MEDscan class.
-        """
-        
-        return self.process_files_wrapper.remote(self)
-    
-    @ray.remote
-    def process_files_wrapper(self) -> MEDscan:
-        """
-        Wrapper function to process the files.
+            str: Name of the saved MEDscan instance (empty if the processing failed).
         """
 
         # PARTIAL PARSING OF ARGUMENTS
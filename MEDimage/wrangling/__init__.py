@@ -1,3 +1,4 @@
 from . import *
+from .crawl_dicoms import *
 from .DataManager import *
 from .ProcessDICOM import *
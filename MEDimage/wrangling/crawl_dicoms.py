@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Union
+
+import pydicom
+import pydicom.misc
+from tqdm import tqdm
+
+# Name of the crawl manifest, saved in the folder of the MEDscan instances
+CRAWL_MANIFEST_NAME = 'dicom_crawl_manifest.json'
+
+# DICOM tags needed to group the files by series and to associate the RT structures
+CRAWL_TAGS = [
+    'Modality',
+    'SeriesInstanceUID',
+    'FrameOfReferenceUID',
+    'ReferencedFrameOfReferenceSequence'
+]
+
+
+def read_dicom_header_info(file: Union[Path, str]) -> Union[Dict, None]:
+    """Reads the header tags needed to organize a DICOM file, without reading the pixel data.
+
+    Args:
+        file (Union[Path, str]): Path to the file.
+
+    Returns:
+        Union[Dict, None]: Modality, series UID and frame of reference UID of the file. For RT
+        structures, the UIDs are the ones of the referenced series. None if the file is not a
+        DICOM file.
+    """
+    if not pydicom.misc.is_dicom(file):
+        return None
+
+    info = pydicom.dcmread(str(file), stop_before_pixels=True, specific_tags=CRAWL_TAGS)
+    header_info = {
+        'Modality': str(info.Modality),
+        'SeriesInstanceUID': str(info.get('SeriesInstanceUID', '')),
+        'FrameOfReferenceUID': str(info.get('FrameOfReferenceUID', ''))
+    }
+    if info.Modality == 'RTSTRUCT':
+        try:
+            header_info['SeriesInstanceUID'] = str(info.ReferencedFrameOfReferenceSequence[
+                                                0].RTReferencedStudySequence[
+                                                0].RTReferencedSeriesSequence[
+                                                0].SeriesInstanceUID)
+        except:
+            header_info['SeriesInstanceUID'] = 'NotFound'
+        try:
+            header_info['FrameOfReferenceUID'] = str(info.ReferencedFrameOfReferenceSequence[0].FrameOfReferenceUID)
+        except:
+            pass
+
+    return header_info
+
+def crawl_dicoms(
+        file_paths: List[Union[Path, str]],
+        path_manifest: Union[Path, str] = None,
+        n_workers: int = None
+    ) -> Dict[str, Union[Dict, None]]:
+    """Reads the header information (see :func:`read_dicom_header_info`) of all the given files.
+
+    Headers are read in a thread pool since the crawl is bound by the file system. If
+    ``path_manifest`` is given, the header information is saved in a JSON manifest along with the
+    modification time and size of each file, and files that did not change since the last crawl are
+    not read again. Entries of files that no longer exist are removed from the manifest.
+
+    Args:
+        file_paths (List[Union[Path, str]]): Paths to the files to crawl.
+        path_manifest (Union[Path, str], optional): Path to the JSON crawl manifest.
+        n_workers (int, optional): Number of threads. If None, uses the ``ThreadPoolExecutor`` default.
+
+    Returns:
+        Dict[str, Union[Dict, None]]: Header information of each file (None for non-DICOM files),
+        keyed by file path. Files that could not be read are left out.
+    """
+    manifest = {}
+    if path_manifest and Path(path_manifest).exists():
+        with open(path_manifest, 'r') as f:
+            manifest = json.load(f)
+
+    # Only read the files that are new or that changed since the last crawl
+    headers = {}
+    stats = {}
+    files_to_read = []
+    for file in file_paths:
+        key = str(file)
+        stat = os.stat(file)
+        stats[key] = [stat.st_mtime_ns, stat.st_size]
+        entry = manifest.get(key)
+        if entry is not None and entry['stat'] == stats[key]:
+            headers[key] = entry['info']
+        else:
+            files_to_read.append(file)
+
+    def read_file(file):
+        try:
+            return read_dicom_header_info(file)
+        except Exception as e:
+            print(f'Error while reading: {file}, error: {e}\n')
+            return False
+
+    with ThreadPoolExecutor(max_workers=n_workers) as executor:
+        for file, header_info in zip(files_to_read, tqdm(executor.map(read_file, files_to_read),
+                                                         total=len(files_to_read))):
+            if header_info is not False:
+                headers[str(file)] = header_info
+
+    if path_manifest:
+        manifest = {key: entry for key, entry in manifest.items() if key in stats or os.path.exists(key)}
+        manifest.update({key: {'stat': stats[key], 'info': header_info} for key, header_info in headers.items()})
+        # Written under a temporary name then renamed, so that an interrupted crawl never leaves a partial manifest
+        path_tmp = Path(path_manifest).with_suffix('.tmp')
+        with open(path_tmp, 'w') as f:
+            json.dump(manifest, f)
+        os.replace(path_tmp, path_manifest)
+
+    return headers
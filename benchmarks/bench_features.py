@@ -0,0 +1,269 @@
+import argparse
+import json
+import os
+import platform
+import sys
+from itertools import product
+from time import perf_counter
+from typing import Callable, Dict, List, Tuple
+
+import numpy as np
+
+MODULE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(MODULE_DIR)
+
+import MEDimage
+from MEDimage.utils.image_volume_obj import image_volume_obj
+from MEDimage.utils.imref import imref3d
+
+# Shapes of the synthetic ROIs
+SHAPES = ['sphere', 'cube', 'blob']
+
+
+def get_synthetic_case(size: int, n_g: int, shape: str = 'sphere', seed: int = 0) -> Dict:
+    """Creates a synthetic scan of shape ``size`` x ``size`` x ``size`` with a ROI.
+
+    Args:
+        size (int): Size of the volume along each axis.
+        n_g (int): Number of gray-levels of the quantized volume.
+        shape (str, optional): Shape of the ROI, 'sphere', 'cube' or 'blob' (irregular surface).
+        seed (int, optional): Seed of the random generator.
+
+    Returns:
+        Dict: Imaging volume ``vol``, ROI mask ``roi``, intensities of the ROI ``vol_int_re`` (NaNs
+        outside the ROI) and quantized intensities ``vol_quant_re`` (levels 1 to ``n_g``).
+    """
+    rng = np.random.default_rng(seed)
+    vol = rng.random((size, size, size))
+    # Smoothing to obtain zones of various sizes
+    for axis in range(3):
+        vol = (vol + np.roll(vol, 1, axis) + np.roll(vol, -1, axis)) / 3
+    vol = (vol - vol.min()) / (vol.max() - vol.min()) * 1000 - 200
+
+    grid = np.indices(vol.shape) - (size - 1) / 2
+    radius = np.sqrt(np.sum(grid**2, 0))
+    if shape == 'sphere':
+        roi = radius <= size * 0.4
+    elif shape == 'cube':
+        roi = np.all(np.abs(grid) <= size * 0.3, axis=0)
+    elif shape == 'blob':
+        noise = rng.random(vol.shape)
+        for axis in range(3):
+            noise = (noise + np.roll(noise, 2, axis) + np.roll(noise, -2, axis)) / 3
+        roi = radius <= size * (0.3 + 0.2 * noise)
+    else:
+        raise ValueError(f"Unknown shape {shape}, available shapes: {SHAPES}")
+    roi = roi.astype(int)
+
+    vol_int_re = MEDimage.processing.roi_extract(vol=vol, roi=roi)
+    vol_quant_re, _ = MEDimage.processing.discretize(vol_re=vol_int_re, discr_type='FBN', n_q=n_g)
+
+    return {'vol': vol, 'roi': roi, 'vol_int_re': vol_int_re, 'vol_quant_re': vol_quant_re}
+
+def get_volume_obj(data: np.ndarray) -> image_volume_obj:
+    """Wraps an array of 1 mm voxels in an image_volume_obj."""
+    return image_volume_obj(data, imref3d(data.shape, 1.0, 1.0, 1.0))
+
+# Function timed by each benchmark, given a synthetic case
+BENCHMARKS: Dict[str, Callable[[Dict], Callable]] = {
+    'glcm': lambda case: lambda: MEDimage.biomarkers.glcm.extract_all(vol=case['vol_quant_re']),
+    'glrlm': lambda case: lambda: MEDimage.biomarkers.glrlm.extract_all(vol=case['vol_quant_re']),
+    'glszm': lambda case: lambda: MEDimage.biomarkers.glszm.extract_all(vol=case['vol_quant_re']),
+    'gldzm': lambda case: lambda: MEDimage.biomarkers.gldzm.extract_all(
+        vol_int=case['vol_quant_re'], mask_morph=case['roi']),
+    'ngtdm': lambda case: lambda: MEDimage.biomarkers.ngtdm.extract_all(vol=case['vol_quant_re']),
+    'ngldm': lambda case: lambda: MEDimage.biomarkers.ngldm.extract_all(vol=case['vol_quant_re']),
+    'morph': lambda case: lambda: MEDimage.biomarkers.morph.extract_all(
+        vol=case['vol'], mask_int=case['roi'], mask_morph=case['roi'], res=[1.0, 1.0, 1.0],
+        intensity_type='definite'),
+    'stats': lambda case: lambda: MEDimage.biomarkers.stats.extract_all(
+        vol=case['vol_int_re'], intensity_type='definite'),
+    'intensity_histogram': lambda case: lambda: MEDimage.biomarkers.intensity_histogram.extract_all(
+        vol=case['vol_quant_re']),
+    'interp_volume': lambda case: lambda: MEDimage.processing.interp_volume(
+        vol_obj_s=get_volume_obj(case['vol']), vox_dim=[0.8, 0.8, 0.8], interp_met='linear',
+        round_val=1, image_type='image'),
+    'interp_roi': lambda case: lambda: MEDimage.processing.interp_volume(
+        vol_obj_s=get_volume_obj(case['roi']), vox_dim=[0.8, 0.8, 0.8], interp_met='linear',
+        round_val=0.5, image_type='roi'),
+    'discretize': lambda case: lambda: MEDimage.processing.discretize(
+        vol_re=case['vol_int_re'], discr_type='FBN', n_q=int(np.nanmax(case['vol_quant_re']))),
+}
+# Benchmarks that do not depend on the number of gray-levels
+INTENSITY_BENCHMARKS = ['morph', 'stats', 'interp_volume', 'interp_roi']
+
+
+def time_function(function: Callable, repeats: int) -> Tuple[float, float]:
+    """Times a function.
+
+    Args:
+        function (Callable): Function to time.
+        repeats (int): Number of runs.
+
+    Returns:
+        Tuple[float, float]: Minimum and median times of the runs in seconds.
+    """
+    times = []
+    for _ in range(repeats):
+        start = perf_counter()
+        function()
+        times.append(perf_counter() - start)
+
+    return min(times), float(np.median(times))
+
+def get_key(result: Dict) -> str:
+    """Gets the key of a result, used to compare it to the baseline."""
+    return f"{result['function']}|{result['shape']}|{result['size']}|{result['n_g']}"
+
+def get_scaling_exponents(results: List[Dict]) -> Dict[str, float]:
+    """Fits the exponent of the time as a power of the number of voxels of the ROI, for each function,
+    shape and number of gray-levels.
+
+    Args:
+        results (List[Dict]): Results of the benchmarks.
+
+    Returns:
+        Dict[str, float]: Exponent of each scaling curve with at least two sizes, e.g. 1.0 for a linear
+        scaling.
+    """
+    curves = {}
+    for result in results:
+        curves.setdefault(f"{result['function']}|{result['shape']}|{result['n_g']}", []).append(result)
+    exponents = {}
+    for name, curve in curves.items():
+        if len(curve) > 1:
+            n_voxels = np.log([result['n_voxels'] for result in curve])
+            times = np.log([max(result['min'], 1e-6) for result in curve])
+            exponents[name] = float(np.polyfit(n_voxels, times, 1)[0])
+
+    return exponents
+
+def compare(results: List[Dict], baseline: Dict, tolerance: float, min_time: float) -> List[str]:
+    """Compares the results to a baseline.
+
+    Args:
+        results (List[Dict]): Results of the benchmarks.
+        baseline (Dict): Saved results of a previous run.
+        tolerance (float): Relative slowdown above which a result is a regression, e.g. 0.25 for 25%.
+        min_time (float): Times below this value (in seconds) are too noisy to be compared.
+
+    Returns:
+        List[str]: Description of each regression.
+    """
+    baseline_results = {get_key(result): result for result in baseline['results']}
+    regressions = []
+    print(f"\n{'benchmark':<40} {'baseline (s)':>12} {'new (s)':>10} {'ratio':>7}")
+    for result in results:
+        reference = baseline_results.get(get_key(result))
+        if reference is None:
+            continue
+        ratio = result['min'] / max(reference['min'], 1e-9)
+        flag = ''
+        if ratio > 1 + tolerance and result['min'] > min_time:
+            flag = '  REGRESSION'
+            regressions.append(f"{get_key(result)}: {reference['min']:.4f}s -> {result['min']:.4f}s")
+        print(f"{get_key(result):<40} {reference['min']:>12.4f} {result['min']:>10.4f} {ratio:>6.2f}x{flag}")
+
+    return regressions
+
+def main(
+        functions: List[str],
+        sizes: List[int],
+        n_gs: List[int],
+        shapes: List[str],
+        repeats: int,
+        path_save: str = None,
+        path_baseline: str = None,
+        tolerance: float = 0.25,
+        min_time: float = 0.005
+    ) -> int:
+    """Times the feature families and the preprocessing functions on synthetic ROIs, prints their
+    scaling with the ROI size, then saves the results and compares them to a baseline.
+
+    Args:
+        functions (List[str]): Benchmarks to run, keys of ``BENCHMARKS``.
+        sizes (List[int]): Sizes of the synthetic volumes.
+        n_gs (List[int]): Numbers of gray-levels.
+        shapes (List[str]): Shapes of the synthetic ROIs.
+        repeats (int): Number of runs of each benchmark, the minimum time is kept.
+        path_save (str, optional): Path to the JSON file where the results are saved.
+        path_baseline (str, optional): Path to the JSON results of a previous run to compare to.
+        tolerance (float, optional): Relative slowdown above which a result is a regression.
+        min_time (float, optional): Times below this value (in seconds) are not compared.
+
+    Returns:
+        int: 1 if a regression was found, 0 otherwise.
+    """
+    results = []
+    print(f"{'function':<20} {'shape':<7} {'size':>5} {'n_g':>5} {'n_voxels':>10} {'min (s)':>10} {'median (s)':>11}")
+    for shape, size, n_g in product(shapes, sizes, n_gs):
+        case = get_synthetic_case(size, n_g, shape)
+        n_voxels = int(np.sum(case['roi']))
+        for function in functions:
+            # Intensity benchmarks are only run for the first number of gray-levels
+            if function in INTENSITY_BENCHMARKS and n_g != n_gs[0]:
+                continue
+            t_min, t_median = time_function(BENCHMARKS[function](case), repeats)
+            result_n_g = None if function in INTENSITY_BENCHMARKS else n_g
+            results.append({
+                'function': function, 'shape': shape, 'size': size, 'n_g': result_n_g,
+                'n_voxels': n_voxels, 'min': t_min, 'median': t_median, 'repeats': repeats
+            })
+            print(f"{function:<20} {shape:<7} {size:>5} {str(result_n_g):>5} {n_voxels:>10} "
+                  f"{t_min:>10.4f} {t_median:>11.4f}")
+
+    exponents = get_scaling_exponents(results)
+    if exponents:
+        print(f"\n{'scaling curve (function|shape|n_g)':<40} {'time ~ n_voxels^k':>18}")
+        for name, exponent in exponents.items():
+            print(f"{name:<40} {exponent:>18.2f}")
+
+    if path_save:
+        with open(path_save, 'w') as f:
+            json.dump({
+                'environment': {
+                    'python': platform.python_version(),
+                    'numpy': np.__version__,
+                    'platform': platform.platform(),
+                    'cpu_count': os.cpu_count()
+                },
+                'results': results,
+                'scaling_exponents': exponents
+            }, f, indent=4)
+        print(f"\nResults saved in {path_save}")
+
+    if path_baseline:
+        with open(path_baseline, 'r') as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, tolerance, min_time)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) above {tolerance:.0%}:")
+            for regression in regressions:
+                print(f"  {regression}")
+            return 1
+        print("\nNo regression.")
+
+    return 0
+
+if __name__ == "__main__":
+    # setting up arguments:
+    parser = argparse.ArgumentParser(description='Benchmark of the feature families and preprocessing functions.')
+    parser.add_argument("--functions", nargs='+', default=list(BENCHMARKS.keys()), choices=list(BENCHMARKS.keys()),
+                        help="Benchmarks to run.")
+    parser.add_argument("--sizes", type=int, nargs='+', default=[32, 64],
+                        help="Sizes of the synthetic volumes (e.g. 32 64 128 256).")
+    parser.add_argument("--n-gs", type=int, nargs='+', default=[8, 32],
+                        help="Numbers of gray-levels (e.g. 8 32 64 256).")
+    parser.add_argument("--shapes", nargs='+', default=['sphere'], choices=SHAPES, help="Shapes of the ROIs.")
+    parser.add_argument("--repeats", type=int, default=3, help="Number of runs of each benchmark.")
+    parser.add_argument("--save", default=None, help="Path to the JSON file where the results are saved.")
+    parser.add_argument("--baseline", default=None, help="Path to the JSON results of a previous run.")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="Relative slowdown above which a result is a regression.")
+    parser.add_argument("--min-time", type=float, default=0.005,
+                        help="Times below this value (in seconds) are not compared.")
+    args = parser.parse_args()
+
+    # main
+    sys.exit(main(args.functions, args.sizes, args.n_gs, args.shapes, args.repeats,
+                  args.save, args.baseline, args.tolerance, args.min_time))
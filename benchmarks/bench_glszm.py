@@ -0,0 +1,108 @@
+import argparse
+import os
+import sys
+from time import time
+from typing import List, Union
+
+import numpy as np
+import skimage.measure as skim
+
+MODULE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(MODULE_DIR)
+
+from MEDimage.biomarkers.glszm import get_matrix
+
+
+def get_matrix_legacy(roi_only: np.ndarray, levels: Union[np.ndarray, List]) -> np.ndarray:
+    """Previous implementation of the GLSZM (one labelling per gray-level and one mask per zone),
+    kept as the reference for the benchmark.
+
+    Args:
+        roi_only (ndarray): Quantized volume with NaNs outside the region of interest.
+        levels (ndarray or List): Vector containing the quantized gray-levels.
+
+    Returns:
+        ndarray: Array of Gray-Level Size Zone Matrix of ``roi_only``.
+    """
+    roi_only = roi_only.copy()
+    n_max = np.sum(~np.isnan(roi_only))
+    level_temp = np.max(levels) + 1
+    roi_only[np.isnan(roi_only)] = level_temp
+    levels = np.append(levels, level_temp)
+    unique_vect = levels
+    n_l = np.size(levels) - 1
+    glszm = np.zeros((n_l, n_max))
+    temp = roi_only.copy().astype('int')
+    for i in range(1, n_l+1):
+        temp[roi_only != unique_vect[i-1]] = 0
+        temp[roi_only == unique_vect[i-1]] = 1
+        conn_objects, n_zone = skim.label(temp, return_num=True)
+        for j in range(1, n_zone+1):
+            col = np.sum(conn_objects == j)
+            glszm[i-1, col-1] = glszm[i-1, col-1] + 1
+    stop = np.nonzero(np.sum(glszm, 0))[0][-1]
+    glszm = np.delete(glszm, range(stop+1, np.shape(glszm)[1]), 1)
+
+    return glszm
+
+def get_synthetic_roi(size: int, n_g: int, seed: int = 0) -> np.ndarray:
+    """Creates a smooth quantized spherical ROI of shape ``size`` x ``size`` x ``size``.
+
+    Args:
+        size (int): Size of the volume along each axis.
+        n_g (int): Number of gray-levels of the quantized volume.
+        seed (int, optional): Seed of the random generator.
+
+    Returns:
+        ndarray: Quantized volume (levels 1 to ``n_g``) with NaNs outside the ROI.
+    """
+    rng = np.random.default_rng(seed)
+    vol = rng.random((size, size, size))
+    # Smoothing to obtain zones of various sizes
+    for axis in range(3):
+        vol = (vol + np.roll(vol, 1, axis) + np.roll(vol, -1, axis)) / 3
+    vol = (vol - vol.min()) / (vol.max() - vol.min())
+    vol = np.minimum(np.floor(vol * n_g) + 1, n_g)
+    grid = np.indices(vol.shape) - (size - 1) / 2
+    vol[np.sqrt(np.sum(grid**2, 0)) > size / 2] = np.nan
+
+    return vol
+
+def main(sizes: List[int], n_gs: List[int]) -> None:
+    """Times the GLSZM computation against the previous implementation and checks that
+    both matrices are identical.
+
+    Args:
+        sizes (List[int]): Sizes of the synthetic volumes.
+        n_gs (List[int]): Numbers of gray-levels.
+
+    Returns:
+        None.
+    """
+    print(f"{'size':>6} {'n_g':>5} {'legacy (s)':>12} {'new (s)':>10} {'speedup':>9}")
+    for size in sizes:
+        for n_g in n_gs:
+            vol = get_synthetic_roi(size, n_g)
+            levels = np.arange(1, np.nanmax(vol) + 1)
+
+            start = time()
+            glszm_legacy = get_matrix_legacy(vol, levels)
+            t_legacy = time() - start
+
+            start = time()
+            glszm = get_matrix(vol, levels)
+            t_new = time() - start
+
+            if not np.array_equal(glszm, glszm_legacy):
+                raise ValueError(f"GLSZM mismatch for size={size} and n_g={n_g}")
+            print(f"{size:>6} {n_g:>5} {t_legacy:>12.3f} {t_new:>10.3f} {t_legacy / t_new:>8.1f}x")
+
+if __name__ == "__main__":
+    # setting up arguments:
+    parser = argparse.ArgumentParser(description='Benchmark of the GLSZM computation.')
+    parser.add_argument("--sizes", type=int, nargs='+', default=[32, 64], help="Sizes of the synthetic volumes.")
+    parser.add_argument("--n-gs", type=int, nargs='+', default=[8, 32, 64], help="Numbers of gray-levels.")
+    args = parser.parse_args()
+
+    # main
+    main(args.sizes, args.n_gs)
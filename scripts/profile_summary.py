@@ -0,0 +1,43 @@
+import argparse
+from pathlib import Path
+from typing import Union
+
+import pandas as pd
+
+from MEDimage.utils.profiler import summarize_profile, write_trace_events
+
+
+def main(path_profile: Union[str, Path], top: int = 10, path_trace: Union[str, Path] = None) -> None:
+    """Prints the hottest stages and scans of an extraction profile.
+    Args:
+        path_profile(Union[str, Path]): Path to the JSONL profile file of the extraction.
+        top(int, optional): Number of scans and spans to print.
+        path_trace(Union[str, Path], optional): Path to a trace event file to write, for chrome://tracing
+            or Perfetto.
+
+    Returns:
+        None.
+    """
+    summary = summarize_profile(path_profile, top)
+    with pd.option_context('display.max_columns', None, 'display.width', 200, 'display.precision', 3):
+        print('\n--> Stages (wall and CPU times in seconds, peak RSS in MB):')
+        print(summary['stages'].to_string())
+        print(f'\n--> Top {top} scans:')
+        print(summary['scans'].to_string())
+        print(f'\n--> Top {top} spans:')
+        print(summary['spans'].to_string())
+
+    if path_trace:
+        write_trace_events(path_profile, path_trace)
+        print(f'\nTrace events saved in {path_trace}')
+
+if __name__ == "__main__":
+    # setting up arguments:
+    parser = argparse.ArgumentParser(description='Rank the hottest stages and scans of an extraction profile.')
+    parser.add_argument("--path-profile", required=True, help="Path to the JSONL profile file of the extraction.")
+    parser.add_argument("--top", type=int, default=10, help="Number of scans and spans to print.")
+    parser.add_argument("--path-trace", default=None, help="Path to a trace event file to write.")
+    args = parser.parse_args()
+
+    # main
+    main(args.path_profile, args.top, args.path_trace)
@@ -0,0 +1,98 @@
+import json
+import os
+import sys
+
+import numpy as np
+
+MODULE_DIR = os.path.dirname(os.path.abspath('./MEDimage/'))
+sys.path.append(MODULE_DIR)
+
+import MEDimage
+from MEDimage.biomarkers.BatchExtractor import compute_radiomics_one_patient
+
+
+def save_scan(path_read):
+    rng = np.random.default_rng(0)
+    vol = rng.normal(0, 100, (16, 16, 8)).astype(np.float32)
+    x, y, z = np.meshgrid(np.arange(16), np.arange(16), np.arange(8), indexing='ij')
+    roi = ((x - 8)**2 + (y - 8)**2 + (z - 4)**2) < 25
+    medscan = MEDimage.MEDscan()
+    medscan.patientID = "Phantom-001"
+    medscan.type = "CTscan"
+    medscan.series_description = "CT"
+    medscan.format = "dicom"
+    medscan.data.volume.array = vol
+    medscan.data.volume.spatialRef = MEDimage.utils.imref3d(vol.shape, 1.0, 1.0, 2.0)
+    medscan.data.ROI.update_indexes(key=0, indexes=np.nonzero(roi.flatten()))
+    medscan.data.ROI.update_roi_name(key=0, roi_name="GTV")
+
+    return MEDimage.utils.save_MEDscan(medscan, path_read)
+
+
+def get_im_params():
+    path_params = os.path.join(MODULE_DIR, 'notebooks', 'tutorial', 'settings', 'MEDimage-Tutorial.json')
+    im_params = MEDimage.utils.json_utils.load_json(path_params)
+    # Two scales of four texture experiments each
+    im_params['imParamCT']['interp']['scale_text'] = [[1, 1, 1], [2, 2, 2]]
+    im_params['imParamCT']['discretisation']['texture'] = {'type': ['FBN', 'FBS'], 'val': [[8, 16], [25, 50]]}
+
+    return im_params
+
+
+def test_texture_backends(tmp_path):
+    name_patient = save_scan(tmp_path)
+    im_params = get_im_params()
+    features = {}
+    for texture_backend in ["serial", "thread", "process"]:
+        path_save = tmp_path / texture_backend
+        path_save.mkdir()
+        compute_radiomics_one_patient(
+            path_read=tmp_path,
+            path_save=path_save,
+            name_patient=name_patient,
+            roi_name="{GTV}",
+            im_params=im_params,
+            roi_type="GTV",
+            roi_type_label="GTV",
+            log_file=tmp_path / f"{texture_backend}.log",
+            texture_backend=texture_backend,
+            n_texture_workers=3
+        )
+        with open(path_save / "features(GTV)" / "Phantom-001__CT(GTV).CTscan.json") as f:
+            features[texture_backend] = json.load(f)
+
+    # The texture jobs are merged in the order of the experiments, whatever the order they complete in
+    texture = features["serial"]["image"]["texture"]
+    assert list(texture["glszm_3D"]) == [
+        "scale1_algoFBN_bin8", "scale1_algoFBN_bin16", "scale1_algoFBS_bin25", "scale1_algoFBS_bin50",
+        "scale2_algoFBN_bin8", "scale2_algoFBN_bin16", "scale2_algoFBS_bin25", "scale2_algoFBS_bin50"
+    ]
+    for texture_backend in ["thread", "process"]:
+        assert features[texture_backend]["image"] == features["serial"]["image"]
+        assert json.dumps(features[texture_backend]["image"]) == json.dumps(features["serial"]["image"])
+
+
+def test_relative_paths(tmp_path, monkeypatch):
+    # The working directory is changed to path_save during the run
+    monkeypatch.chdir(tmp_path)
+    os.mkdir("scans")
+    os.mkdir("csv")
+    os.mkdir("features")
+    save_scan(tmp_path / "scans")
+    with open("csv/roiNames_GTV.csv", "w") as f:
+        f.write("PatientID,ImagingScanName,ImagingModality,ROIname\nPhantom-001,CT,CTscan,{GTV}\n")
+    im_params = get_im_params()
+    im_params["roi_types"] = ["GTV"]
+    im_params["roi_type_labels"] = ["GTV"]
+    im_params["imParamCT"]["interp"]["scale_text"] = [[2, 2, 2]]
+    im_params["imParamCT"]["discretisation"]["texture"] = {"type": ["FBN"], "val": [[8]]}
+    with open("params.json", "w") as f:
+        json.dump(im_params, f)
+
+    batch_extractor = MEDimage.biomarkers.BatchExtractor(
+        "scans", "csv", "params.json", "features", n_batch=1, backend="serial"
+    )
+    batch_extractor.compute_radiomics(create_tables=False)
+    assert (tmp_path / "features" / "features(GTV)" / "Phantom-001__CT(GTV).CTscan.json").exists()
+    ledger = MEDimage.utils.TaskLedger(tmp_path / "features" / MEDimage.utils.TASK_LEDGER_NAME)
+    assert ledger.get_summary() == {"done": 1}
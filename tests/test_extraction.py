@@ -106,6 +106,42 @@ class TestExtraction:
         assert surface_area == morph["Fmorph_area"]
         assert abs(surface_area - 388) < 1
 
+    def test_moran_geary_features(self):
+        phantom = self.__get_phantom()
+        roi = self.__get_random_roi()
+        morph = MEDimage.biomarkers.morph.extract_all(
+            vol=phantom, 
+            mask_int=roi, 
+            mask_morph=roi,
+            res=[2, 2, 2],
+            intensity_type="arbitrary",
+            compute_moran_i=True,
+            compute_geary_c=True
+        )
+        assert abs(morph["Fmorph_moran_i"] - 0.0397) < 0.0001
+        assert abs(morph["Fmorph_geary_c"] - 0.974) < 0.001
+
+        # The subsampled estimators are exact when all voxels are sampled
+        vol_mor = phantom.astype(np.float64)
+        vol_mor[roi == 0] = np.nan
+        moran_i, error = MEDimage.biomarkers.morph.get_moran_i_approx(vol_mor, [2, 2, 2], n_samples=1000)
+        assert abs(moran_i - morph["Fmorph_moran_i"]) < 1e-10 and error == 0
+        geary_c, error = MEDimage.biomarkers.morph.get_geary_c_approx(vol_mor, [2, 2, 2], n_samples=1000)
+        assert abs(geary_c - morph["Fmorph_geary_c"]) < 1e-10 and error == 0
+
+    def test_local_intensity_features(self):
+        phantom = self.__get_phantom()
+        roi = self.__get_random_roi()
+        local_intensity = MEDimage.biomarkers.local_intensity.extract_all(
+            img_obj=phantom,
+            roi_obj=roi,
+            res=[2, 2, 2],
+            intensity_type="definite",
+            compute_global=True
+        )
+        assert abs(local_intensity["Floc_peak_local"] - 2.6) < 0.01
+        assert abs(local_intensity["Floc_peak_global"] - 3.1) < 0.01
+
     def test_stats_features(self):
         phantom = self.__get_phantom()
         roi = self.__get_random_roi()
@@ -127,3 +163,92 @@ class TestExtraction:
         assert abs(kurt + 0.355) < 0.01
         assert skewness == stats["Fstat_skew"]
         assert abs(skewness - 1.08) < 0.01
+
+    def test_glszm_features(self):
+        phantom = self.__get_phantom()
+        roi = self.__get_random_roi()
+        vol_int_re = MEDimage.processing.roi_extract(
+            vol=phantom, 
+            roi=roi
+        )
+        glszm = MEDimage.biomarkers.glszm.extract_all(
+            vol=vol_int_re
+        )
+        assert abs(glszm["Fszm_sze"] - 0.255) < 0.001
+        assert abs(glszm["Fszm_lze"] - 550) < 1
+        assert abs(glszm["Fszm_lzhge"] - 1495) < 1
+        assert abs(glszm["Fszm_zs_var"] - 331) < 1
+        assert abs(glszm["Fszm_zs_entr"] - 2.32) < 0.01
+
+    def test_gldzm_features(self):
+        phantom = self.__get_phantom()
+        roi = self.__get_random_roi()
+        vol_int_re = MEDimage.processing.roi_extract(
+            vol=phantom, 
+            roi=roi
+        )
+        zones = MEDimage.biomarkers.utils.get_zones(
+            vol=vol_int_re,
+            levels=np.arange(1, np.nanmax(vol_int_re)+1)
+        )
+        gldzm = MEDimage.biomarkers.gldzm.extract_all(
+            vol_int=vol_int_re,
+            mask_morph=roi,
+            zones=zones
+        )
+        assert gldzm == MEDimage.biomarkers.gldzm.extract_all(vol_int=vol_int_re, mask_morph=roi)
+        assert abs(gldzm["Fdzm_sde"] - 1) < 0.001
+        assert abs(gldzm["Fdzm_zdnu"] - 5) < 0.001
+        assert abs(gldzm["Fdzm_gl_var"] - 2.64) < 0.01
+        assert abs(gldzm["Fdzm_zd_entr"] - 1.92) < 0.01
+
+    def test_glcm_features(self):
+        phantom = self.__get_phantom()
+        roi = self.__get_random_roi()
+        vol_int_re = MEDimage.processing.roi_extract(
+            vol=phantom, 
+            roi=roi
+        )
+        glcm = MEDimage.biomarkers.glcm.extract_all(
+            vol=vol_int_re,
+            dist_correction=False
+        )
+        assert abs(glcm["Fcm_joint_max"] - 0.509) < 0.001
+        assert abs(glcm["Fcm_joint_avg"] - 2.15) < 0.01
+        assert abs(glcm["Fcm_contrast"] - 5.12) < 0.01
+        assert abs(glcm["Fcm_corr"] - 0.183) < 0.001
+        assert abs(glcm["Fcm_info_corr2"] - 0.269) < 0.001
+
+    def test_glrlm_features(self):
+        phantom = self.__get_phantom()
+        roi = self.__get_random_roi()
+        vol_int_re = MEDimage.processing.roi_extract(
+            vol=phantom, 
+            roi=roi
+        )
+        glrlm = MEDimage.biomarkers.glrlm.extract_all(
+            vol=vol_int_re,
+            dist_correction=False
+        )
+        assert abs(glrlm["Frlm_sre"] - 0.729) < 0.001
+        assert abs(glrlm["Frlm_lre"] - 2.76) < 0.01
+        assert abs(glrlm["Frlm_glnu"] - 281) < 1
+        assert abs(glrlm["Frlm_rlnu"] - 328) < 1
+        assert abs(glrlm["Frlm_r_perc"] - 0.68) < 0.01
+        assert abs(glrlm["Frlm_rl_entr"] - 2.62) < 0.01
+
+    def test_jit_kernels(self):
+        phantom = self.__get_phantom()
+        roi = self.__get_random_roi()
+        vol_int_re = MEDimage.processing.roi_extract(
+            vol=phantom, 
+            roi=roi
+        )
+        levels = np.unique(vol_int_re[~np.isnan(vol_int_re)])
+        for dist_correction in [True, False]:
+            glcm_jit = MEDimage.biomarkers.glcm.get_matrix(vol_int_re, levels, dist_correction, use_jit=True)
+            glcm = MEDimage.biomarkers.glcm.get_matrix(vol_int_re, levels, dist_correction, use_jit=False)
+            assert np.array_equal(glcm_jit, glcm)
+        ngldm_jit = MEDimage.biomarkers.ngldm.get_matrix(vol_int_re, levels, use_jit=True)
+        ngldm = MEDimage.biomarkers.ngldm.get_matrix(vol_int_re, levels, use_jit=False)
+        assert np.array_equal(ngldm_jit, ngldm)
@@ -2,11 +2,20 @@ import os
 import sys
 
 import numpy as np
+from scipy.signal import fftconvolve
 
 MODULE_DIR = os.path.dirname(os.path.abspath('./MEDimage/'))
 sys.path.append(MODULE_DIR)
 
+from MEDimage.biomarkers import glrlm, glszm, ngtdm
+from MEDimage.filters.filter_bank import FilterBank
 from MEDimage.filters.gabor import apply_gabor
+from MEDimage.filters.laws import Laws
+from MEDimage.filters.log import LaplacianOfGaussian, apply_log
+from MEDimage.filters.mean import Mean
+from MEDimage.filters.TexturalFilter import TexturalFilter
+from MEDimage.filters.utils import convolve_valid, plan_convolution
+from MEDimage.filters.wavelet import Wavelet
 
 
 def test_gabor():
@@ -34,3 +43,91 @@ def test_gabor():
                     )
 
     assert round(np.max(result), 3) == 255.0
+
+def test_textural_filter_cpu():
+    # 3D-Phantom of grey levels 1 to 5
+    phantom = (np.arange(125).reshape(5, 5, 5) * 7 % 5 + 1).astype(float)
+    phantom[0, 0, :] = np.nan
+    # Reference GLCM features of the 3x3x3 window at the centre of the phantom
+    reference = [
+        0.155063, 3.591772, 1.678287, 2.800254, 1.550633, 1.627183, 1.578116, 7.183544, 2.681501,
+        2.180001, 0.144248, 4.031646, 1.550633, 0.560654, 0.795095, 0.472785, 0.875132, 0.11199,
+        -0.201119, 12.563292, 2.681501, -1.299162, 21.353703, -0.195366, 0.674266
+    ]
+    # Apply the GLCM filter without GPU
+    _filter = TexturalFilter(family="GLCM", size=3)
+    result = _filter(phantom, discretization={'type': 'FBS', 'bw': 1}, user_set_min_val=1.0)
+
+    assert result.shape == (5, 5, 5, 25)
+    assert np.allclose(result[2, 2, 2], reference, atol=1e-5)
+    assert np.isnan(result[0, 0]).all()
+    # Single feature
+    result = _filter(phantom, discretization={'type': 'FBS', 'bw': 1}, user_set_min_val=1.0, feature="Fcm_contrast")
+    assert round(float(result[2, 2, 2]), 5) == 4.03165
+
+def test_textural_filter_sliding_window():
+    # 3D-Phantom of grey levels 1 to 5
+    phantom = (np.arange(125).reshape(5, 5, 5) * 7 % 5 + 1).astype(float)
+    phantom[0, 0, :] = np.nan
+    # Reference features of the 3x3x3 windows at the centre of the phantom and at its border
+    references = {
+        "GLRLM": glrlm.extract_all,
+        "GLSZM": glszm.extract_all,
+        "NGTDM": lambda vol: ngtdm.extract_all(vol, dist_correction=False)
+    }
+    for family, extract_all in references.items():
+        _filter = TexturalFilter(family=family, size=3)
+        result = _filter(phantom, discretization={'type': 'FBS', 'bw': 1}, user_set_min_val=1.0)
+        features = getattr(_filter, family.lower() + "_features")
+
+        assert result.shape == (5, 5, 5, len(features))
+        assert np.isnan(result[0, 0]).all()
+        for i, j, k in [(2, 2, 2), (1, 1, 0)]:
+            reference = extract_all(phantom[max(i - 1, 0):i + 2, max(j - 1, 0):j + 2, max(k - 1, 0):k + 2].copy())
+            assert np.allclose(result[i, j, k], [reference[feature] for feature in features])
+        # Single feature
+        result = _filter(phantom, discretization={'type': 'FBS', 'bw': 1}, user_set_min_val=1.0, feature=features[0])
+        assert result.shape == (5, 5, 5)
+
+def test_convolution_planner():
+    images = np.random.default_rng(0).random((2, 24, 24, 24))
+    kernels = {
+        'box': Mean(3, 5).kernel,
+        'separable': Laws(['L5', 'E5', 'S5']).kernel,
+        'fft': LaplacianOfGaussian(3, 9, sigma=1.5).kernel,
+    }
+    for method, kernel in kernels.items():
+        assert plan_convolution(kernel[0, 0], images.shape[1:])['method'] == method
+        # Same result as the FFT convolution
+        result = convolve_valid(images, kernel[:, 0])
+        expected = fftconvolve(images[:, np.newaxis], kernel[np.newaxis, :, 0], mode='valid', axes=[2, 3, 4])
+        assert np.allclose(result, expected)
+
+def test_filter_bank():
+    images = np.random.default_rng(0).random((20, 18, 16))
+    configs = [
+        {'filter_type': 'log', 'ndims': 3, 'sigma': 3.0, 'padding': 'constant', 'orthogonal_rot': False,
+         'name_save': 'log'},
+        {'filter_type': 'gabor', 'sigma': 3.0, 'lambda': 4.0, 'gamma': 0.5, 'theta': 'Pi/3', 'rot_invariance': False,
+         'padding': 'symmetric', 'orthogonal_rot': True, 'name_save': 'gabor'},
+    ]
+    expected = [
+        apply_log(images, ndims=3, voxel_length=2, sigma=3.0, padding='constant'),
+        apply_gabor(images, voxel_length=2, sigma=3.0, _lambda=4.0, gamma=0.5, theta=-np.pi/3, orthogonal_rot=True)
+    ]
+    # Same responses as the filters applied one by one
+    results = list(FilterBank(configs, voxel_length=2)(images))
+    assert [config for config, _ in results] == configs
+    for (_, result), expected_result in zip(results, expected):
+        assert np.allclose(result, expected_result)
+
+def test_wavelet_decompose():
+    images = np.random.default_rng(0).random((1, 20, 18, 16))
+    for rot_invariance in [False, True]:
+        wavelet = Wavelet(ndims=3, wavelet_name='db3', rot_invariance=rot_invariance)
+        subbands = wavelet.decompose(images, levels=[1, 2])
+        assert len(subbands) == 16
+        # Same subbands as the single decompositions, and when generated lazily
+        for (subband, level), result in wavelet.decompose(images, ['LHL', 'HHH'], [1, 2], lazy=True):
+            assert np.allclose(result, subbands[(subband, level)])
+            assert np.allclose(result, wavelet.convolve(images, subband, level))
@@ -0,0 +1,321 @@
+import json
+import os
+import pickle
+import sys
+import threading
+
+import numpy as np
+import pandas as pd
+
+MODULE_DIR = os.path.dirname(os.path.abspath('./MEDimage/'))
+sys.path.append(MODULE_DIR)
+
+import MEDimage
+
+
+def get_phantom():
+    # Random volume of grey levels 1 to 6
+    return np.random.default_rng(0).integers(1, 7, size=(5, 4, 4)).astype(np.float32)
+
+
+def get_roi():
+    roi = np.ones((5, 4, 4), dtype=np.int16)
+    roi[0, 2, 1] = roi[2, 2, 2] = 0
+    roi[3:, 0, 2:] = 0
+
+    return roi
+
+
+def test_medscan_store(tmp_path):
+    phantom = get_phantom()
+    roi = get_roi()
+    medscan = MEDimage.MEDscan()
+    medscan.patientID = "Phantom-001"
+    medscan.type = "CTscan"
+    medscan.series_description = "Phantom"
+    medscan.data.volume.array = phantom
+    medscan.data.volume.spatialRef = MEDimage.utils.imref3d(phantom.shape, 2, 2, 2)
+    medscan.data.ROI.update_indexes(key=0, indexes=np.nonzero(roi.flatten()))
+    medscan.data.ROI.update_roi_name(key=0, roi_name="GTV")
+    name_save = MEDimage.utils.save_MEDscan(medscan, tmp_path)
+
+    loaded = MEDimage.utils.load_MEDscan(tmp_path / name_save)
+    assert loaded.patientID == medscan.patientID
+    assert np.array_equal(loaded.data.volume.array, phantom)
+    assert np.array_equal(loaded.data.get_roi_from_indexes(0), roi)
+    assert loaded.data.ROI.get_roi_name(0) == "GTV"
+    assert loaded.data.volume.spatialRef.ImageSize.tolist() == list(phantom.shape)
+
+    # Pickled MEDscan instances are converted in place
+    with open(tmp_path / name_save, 'wb') as f:
+        pickle.dump(medscan, f)
+    assert MEDimage.utils.convert_MEDscan(tmp_path) == [tmp_path / name_save]
+    assert MEDimage.utils.is_MEDscan_store(tmp_path / name_save)
+    assert np.array_equal(MEDimage.utils.load_MEDscan(tmp_path / name_save).data.volume.array, phantom)
+
+
+def test_scan_index(tmp_path):
+    phantom = get_phantom()
+    roi = get_roi()
+    medscan = MEDimage.MEDscan()
+    medscan.patientID = "Phantom-001"
+    medscan.type = "CTscan"
+    medscan.data.volume.array = phantom
+    medscan.data.volume.spatialRef = MEDimage.utils.imref3d(phantom.shape, 2, 2, 2)
+    medscan.data.ROI.update_indexes(key=0, indexes=np.nonzero(roi.flatten()))
+    medscan.data.ROI.update_roi_name(key=0, roi_name="GTV")
+    name_save = MEDimage.utils.save_MEDscan(medscan, tmp_path)
+
+    # The scan index holds the attributes used by the pre-radiomics checks
+    scan_index = MEDimage.utils.get_scan_index(tmp_path)
+    assert scan_index[name_save]["spacing"] == [2, 2, 2]
+    assert scan_index[name_save]["roi_names"] == {"0": "GTV"}
+    assert scan_index[name_save]["roi_sizes"] == {"0": int(roi.sum())}
+    assert (tmp_path / MEDimage.utils.SCAN_INDEX_NAME).exists()
+
+
+def test_volume_cache(tmp_path):
+    phantom = get_phantom()
+    roi = get_roi()
+    medscan = MEDimage.MEDscan()
+    medscan.patientID = "Phantom-001"
+    medscan.type = "CTscan"
+    medscan.data.volume.array = phantom
+    medscan.data.volume.spatialRef = MEDimage.utils.imref3d(phantom.shape, 2, 2, 2)
+    name_save = MEDimage.utils.save_MEDscan(medscan, tmp_path)
+    spatial_ref = MEDimage.utils.imref3d(phantom.shape, 2, 2, 2)
+    volumes = [MEDimage.utils.image_volume_obj(data, spatial_ref) for data in [phantom, roi, roi]]
+
+    cache = MEDimage.utils.VolumeCache(tmp_path / "cache")
+    key = cache.get_key(tmp_path / name_save, "{GTV}", [2, 2, 2], {"vol_interp": "linear"})
+    assert key != cache.get_key(tmp_path / name_save, "{GTV}", [1, 1, 1], {"vol_interp": "linear"})
+    assert cache.get(key) is None
+    cache.put(key, *volumes)
+    cached = cache.get(key)
+    assert np.array_equal(cached[0].data, phantom)
+    assert np.array_equal(cached[2].data, roi)
+    assert cached[0].spatialRef.ImageSize.tolist() == list(phantom.shape)
+
+    # The least recently used entry is evicted above the maximum size
+    cache.max_size = cache.get_stats()["size"]
+    cache.put("other", *volumes)
+    assert cache.get(key) is None
+    assert cache.get_stats()["hits"] == 1
+    assert cache.get_stats()["n_entries"] == 1
+
+
+def test_incremental_features():
+    saved = {
+        "image": {
+            "morph_3D": {"scale1": {"Fmorph_vol": 1.0}, "scale2": {"Fmorph_vol": 1.0}},
+            "texture": {"glszm_3D": {"scale1_algoFBN_bin8": {"Fszm_sze": 0.5}}}
+        },
+        "fingerprints": {
+            "morph_3D": {"scale1": "a", "scale2": "a"},
+            "texture": {"glszm_3D": {"scale1_algoFBN_bin8": "b"}}
+        }
+    }
+    # Non-texture features can be found under any scale, texture features only under their own name
+    assert MEDimage.utils.find_saved_features(saved, ["morph_3D"], "a") == {"Fmorph_vol": 1.0}
+    assert MEDimage.utils.find_saved_features(saved, ["morph_3D"], "c") is None
+    path = ["texture", "glszm_3D", "scale1_algoFBN_bin8"]
+    assert MEDimage.utils.find_saved_features(saved, path, "b") == {"Fszm_sze": 0.5}
+    assert MEDimage.utils.find_saved_features(saved, path, "a") is None
+
+    # Saved entries that were not computed again are kept
+    current = {
+        "morph_3D": {"scale1": {"Fmorph_vol": 2.0}, "scale3": {}},
+        "texture": {"glszm_3D": {"scale1_algoFBN_bin16": {"Fszm_sze": 0.7}}}
+    }
+    merged = MEDimage.utils.merge_radiomics(current, saved["image"])
+    assert merged["morph_3D"] == {"scale1": {"Fmorph_vol": 2.0}, "scale2": {"Fmorph_vol": 1.0}, "scale3": {}}
+    assert set(merged["texture"]["glszm_3D"]) == {"scale1_algoFBN_bin8", "scale1_algoFBN_bin16"}
+
+
+def test_feature_store(tmp_path):
+    image = {
+        "morph_3D": {"scale1": {"Fmorph_vol": 1.0, "Fmorph_area": "NaN"}},
+        "texture": {"glszm_3D": {"scale1_algoFBN_bin8": {"Fszm_sze": 0.5}}}
+    }
+    variables = MEDimage.utils.flatten_radiomics(image)
+    assert list(variables) == ["morph_3D__Fmorph_vol__scale1", "morph_3D__Fmorph_area__scale1",
+                               "glszm_3D__Fszm_sze__scale1_algoFBN_bin8"]
+    assert np.isnan(variables["morph_3D__Fmorph_area__scale1"])
+
+    store = MEDimage.utils.FeatureStore(tmp_path / "radiomics__CT(GTV)__image.store")
+    store.append("Patient-1", variables)
+    store.compact()
+    # Appended rows replace the compacted ones, new variables are added as columns
+    store.append("Patient-1", {"morph_3D__Fmorph_vol__scale1": 2.0})
+    store.append("Patient-2", {"morph_3D__Fmorph_vol__scale1": 3.0, "glcm_3D__Fcm_joint_max__scale1": 4.0})
+    table = store.read(columns=["morph_3D__Fmorph_vol__scale1"])
+    assert table["morph_3D__Fmorph_vol__scale1"].to_dict() == {"Patient-1": 2.0, "Patient-2": 3.0}
+
+    store.compact(rows=["Patient-2"])
+    assert list(store.get_rows()) == ["Patient-2"]
+    table = store.read()
+    assert table.loc["Patient-2", "glcm_3D__Fcm_joint_max__scale1"] == 4.0
+    # The columns are those of the kept rows, in the order of the first one
+    assert store.get_columns() == ["morph_3D__Fmorph_vol__scale1", "glcm_3D__Fcm_joint_max__scale1"]
+
+    store.append("Patient-1", variables)
+    store.compact(rows=["Patient-1", "Patient-2"])
+    assert store.get_columns() == list(variables) + ["glcm_3D__Fcm_joint_max__scale1"]
+    store.compact(rows=["Patient-1"])
+    assert store.get_columns() == list(variables)
+
+
+def test_create_radiomics_table(tmp_path):
+    image = {
+        "morph_3D": {"scale1": {"Fmorph_vol": 1.0, "Fmorph_area": "NaN"}},
+        "texture": {"glszm_3D": {"scale1_algoFBN_bin8": {"Fszm_sze": 0.5}}}
+    }
+    (tmp_path / "Patient-1__CT(GTV).CTscan.json").write_text(json.dumps({"image": image}))
+    (tmp_path / "Patient-2__CT(GTV).CTscan.json").write_text("{")
+    paths = sorted(tmp_path.glob("*.json"))
+
+    # Unreadable files give rows of NaN
+    table_dict = MEDimage.utils.create_radiomics_table(paths, "image", None)
+    assert table_dict["Properties"]["UserData"] == "||radVar1:morph_3D__Fmorph_vol__scale1" \
+        "||radVar2:morph_3D__Fmorph_area__scale1||radVar3:glszm_3D__Fszm_sze__scale1_algoFBN_bin8||"
+    assert table_dict["Table"].loc["Patient-1"].tolist()[::2] == [1.0, 0.5]
+    assert table_dict["Table"].loc["Patient-2"].isna().all()
+
+    # Rows are streamed in a CSV file, the unreadable file before the first readable one included
+    paths = paths[::-1]
+    MEDimage.utils.write_radiomics_table_csv(paths, "image", tmp_path / "table.csv")
+    table = pd.read_csv(tmp_path / "table.csv", index_col="PatientID")
+    assert table.index.tolist() == ["Patient-2", "Patient-1"]
+    assert table.loc["Patient-1"].tolist()[::2] == [1.0, 0.5]
+    assert table.loc["Patient-2"].isna().all()
+    assert (tmp_path / "table.txt").read_text() == table_dict["Properties"]["UserData"]
+
+
+def test_stage_profiler(tmp_path):
+    path_profile = tmp_path / "profile.jsonl"
+    profiler = MEDimage.utils.StageProfiler(path_profile, scan="Patient-1__CT.CTscan.npy")
+    with profiler.span("interpolation"):
+        np.ones((64, 64, 64)).sum()
+    with profiler.child(scale=2).span("glcm"):
+        pass
+    profiler.record(MEDimage.utils.TOTAL_STAGE, 1.0)
+    # Spans are not recorded without profile file
+    with MEDimage.utils.StageProfiler(None).span("glcm"):
+        pass
+
+    summary = MEDimage.utils.summarize_profile(path_profile)
+    assert set(summary["stages"].index) == {"interpolation", "glcm"}
+    assert summary["scans"]["wall_time"].tolist() == [1.0]
+    assert summary["spans"].set_index("stage").loc["glcm", "scale"] == 2
+
+
+def test_task_ledger(tmp_path):
+    path_ledger = tmp_path / MEDimage.utils.TASK_LEDGER_NAME
+    ledger = MEDimage.utils.TaskLedger(path_ledger)
+    ledger.add(["GTV/Patient-1", "GTV/Patient-2", "GTV/Patient-3"])
+
+    def fail():
+        raise ValueError("The ROI is empty.")
+
+    assert MEDimage.utils.run_ledger_task(lambda x: x + 1, "GTV/Patient-1", path_ledger, x=1) == 2
+    for _ in range(2):
+        try:
+            MEDimage.utils.run_ledger_task(fail, "GTV/Patient-2", path_ledger)
+        except ValueError:
+            pass
+
+    tasks = ledger.get_tasks()
+    assert tasks["GTV/Patient-1"]["state"] == "done"
+    assert tasks["GTV/Patient-2"]["state"] == "failed"
+    assert tasks["GTV/Patient-2"]["attempts"] == 2
+    assert tasks["GTV/Patient-2"]["error"] == "ValueError: The ROI is empty."
+    assert ledger.get_summary() == {"done": 1, "failed": 1, "pending": 1}
+
+    # A new run that does not resume starts the tasks over
+    ledger.add(["GTV/Patient-1", "GTV/Patient-2"])
+    assert ledger.get_tasks()["GTV/Patient-2"]["attempts"] == 2
+    ledger.add(["GTV/Patient-1", "GTV/Patient-2"], reset=True)
+    tasks = ledger.get_tasks()
+    assert tasks["GTV/Patient-2"]["state"] == "pending"
+    assert tasks["GTV/Patient-2"]["attempts"] == 0
+    assert tasks["GTV/Patient-2"]["error"] is None
+    assert ledger.get_summary() == {"pending": 3}
+
+
+def test_task_scheduling():
+    scan_info = {
+        "size": [10, 10, 10],
+        "spacing": [1.0, 1.0, 1.0],
+        "roi_names": {"0": "GTV", "1": "GTV_2"},
+        "roi_sizes": {"0": 100, "1": 50}
+    }
+    im_params = {
+        "interp": {"scale_non_text": [1, 1, 1], "scale_text": [[1, 1, 1]]},
+        "discretisation": {"texture": {"val": [[8]]}},
+        "extract": {"GLCM": False, "GLRLM": False}
+    }
+    cost = MEDimage.utils.estimate_task_cost(scan_info, "{GTV}", im_params)
+    assert MEDimage.utils.estimate_task_cost(scan_info, "{GTV}+{GTV_2}", im_params) > cost
+    more_scales = dict(im_params, interp={"scale_non_text": [1, 1, 1], "scale_text": [[1, 1, 1], [2, 2, 2]]})
+    assert MEDimage.utils.estimate_task_cost(scan_info, "{GTV}", more_scales) > cost
+    more_families = dict(im_params, extract={})
+    assert MEDimage.utils.estimate_task_cost(scan_info, "{GTV}", more_families) > cost
+
+    # Unknown ROI sizes fall back to the size of the volume
+    scan_info_no_rois = dict(scan_info, roi_sizes={})
+    assert MEDimage.utils.get_roi_voxel_count(scan_info, "{GTV}") == 100
+    assert MEDimage.utils.get_roi_voxel_count(scan_info_no_rois, "{GTV}") == 1000
+
+    started = []
+    slot_locks = [threading.Lock(), threading.Lock()]
+
+    def run(idx, slot):
+        # A slot must never run two tasks at once
+        assert slot_locks[slot].acquire(blocking=False)
+        started.append(idx)
+        try:
+            if idx == 2:
+                raise ValueError("The ROI is empty.")
+            return idx * 10
+        finally:
+            slot_locks[slot].release()
+
+    tasks = [{"idx": idx} for idx in range(5)]
+    costs = [1, 5, 3, 4, 2]
+    with MEDimage.utils.get_executor("thread", n_workers=2) as executor:
+        results = MEDimage.utils.run_largest_first(executor, run, tasks, costs, [{"slot": 0}, {"slot": 1}])
+    assert set(started[:2]) == {1, 3}
+    assert sorted(started) == [0, 1, 2, 3, 4]
+    assert results == [0, 10, None, 30, 40]
+
+
+def get_thread_limits():
+    # Thread limits seen by a worker
+    from threadpoolctl import threadpool_info
+
+    return os.getenv("OMP_NUM_THREADS"), [pool["num_threads"] for pool in threadpool_info()]
+
+
+def test_executors():
+    vol = get_phantom()
+    vol[get_roi() == 0] = np.nan
+    features = {}
+    for backend in ["serial", "thread", "process"]:
+        with MEDimage.utils.get_executor(backend, n_workers=2) as executor:
+            futures = [executor.submit(MEDimage.biomarkers.glcm.extract_all, vol, dist_correction)
+                       for dist_correction in [False, True]]
+            features[backend] = [future.result() for future in futures]
+    assert features["thread"] == features["serial"]
+    assert features["process"] == features["serial"]
+
+    try:
+        MEDimage.utils.get_executor("foo")
+        assert False, "Unknown backends must be rejected"
+    except ValueError:
+        pass
+
+    # Each process worker is limited to threads_per_worker BLAS/OpenMP threads
+    with MEDimage.utils.get_executor("process", n_workers=1, threads_per_worker=1) as executor:
+        omp_num_threads, num_threads = executor.submit(get_thread_limits).result()
+    assert omp_num_threads == "1"
+    assert all(n == 1 for n in num_threads)
@@ -0,0 +1,84 @@
+import json
+import os
+import sys
+
+import numpy as np
+import pydicom
+from pydicom.dataset import Dataset, FileMetaDataset
+from pydicom.uid import ExplicitVRLittleEndian, generate_uid
+
+MODULE_DIR = os.path.dirname(os.path.abspath('./MEDimage/'))
+sys.path.append(MODULE_DIR)
+
+from MEDimage.wrangling.crawl_dicoms import crawl_dicoms
+
+
+def write_dicom(path, modality, series_uid, frame_uid, referenced_series_uid=None):
+    file_meta = FileMetaDataset()
+    file_meta.MediaStorageSOPClassUID = '1.2.840.10008.5.1.4.1.1.2'
+    file_meta.MediaStorageSOPInstanceUID = generate_uid()
+    file_meta.TransferSyntaxUID = ExplicitVRLittleEndian
+    ds = Dataset()
+    ds.file_meta = file_meta
+    ds.Modality = modality
+    ds.SeriesInstanceUID = series_uid
+    ds.FrameOfReferenceUID = frame_uid
+    if referenced_series_uid is not None:
+        series = Dataset()
+        series.SeriesInstanceUID = referenced_series_uid
+        study = Dataset()
+        study.RTReferencedSeriesSequence = [series]
+        frame = Dataset()
+        frame.FrameOfReferenceUID = frame_uid
+        frame.RTReferencedStudySequence = [study]
+        ds.ReferencedFrameOfReferenceSequence = [frame]
+    else:
+        ds.Rows, ds.Columns = 4, 4
+        ds.BitsAllocated, ds.BitsStored, ds.HighBit = 16, 16, 15
+        ds.SamplesPerPixel, ds.PixelRepresentation = 1, 0
+        ds.PhotometricInterpretation = 'MONOCHROME2'
+        ds.PixelData = np.zeros((4, 4), dtype=np.uint16).tobytes()
+    ds.save_as(path, enforce_file_format=True)
+
+    return path
+
+def test_crawl_dicoms(tmp_path, monkeypatch):
+    ct_uid, pt_uid, frame_uid = generate_uid(), generate_uid(), generate_uid()
+    files = [write_dicom(tmp_path / f'ct_{i}.dcm', 'CT', ct_uid, frame_uid) for i in range(2)]
+    files.append(write_dicom(tmp_path / 'pt_0.dcm', 'PT', pt_uid, frame_uid))
+    files.append(write_dicom(tmp_path / 'rs.dcm', 'RTSTRUCT', generate_uid(), frame_uid, ct_uid))
+    (tmp_path / 'notes.txt').write_text('not a DICOM file')
+    files.append(tmp_path / 'notes.txt')
+
+    # Only the headers are read
+    dcmread = pydicom.dcmread
+    read_kwargs = []
+    def spy_dcmread(*args, **kwargs):
+        read_kwargs.append(kwargs)
+        return dcmread(*args, **kwargs)
+    monkeypatch.setattr(pydicom, 'dcmread', spy_dcmread)
+    path_manifest = tmp_path / 'manifest.json'
+    headers = crawl_dicoms(files, path_manifest)
+    assert len(read_kwargs) == 4
+    assert all(kwargs['stop_before_pixels'] for kwargs in read_kwargs)
+
+    # Files are grouped by series, and the RT structure points to the series it references
+    assert headers[str(files[0])]['SeriesInstanceUID'] == headers[str(files[1])]['SeriesInstanceUID'] == ct_uid
+    assert headers[str(files[2])]['SeriesInstanceUID'] == pt_uid
+    assert headers[str(files[3])] == {'Modality': 'RTSTRUCT', 'SeriesInstanceUID': ct_uid, 'FrameOfReferenceUID': frame_uid}
+    assert headers[str(files[4])] is None
+
+    # Unchanged files are taken from the manifest, and missing files are pruned from it
+    read_kwargs.clear()
+    os.remove(files[2])
+    write_dicom(files[1], 'CT', generate_uid(), frame_uid)
+    os.utime(files[1], ns=(0, 0))
+    headers = crawl_dicoms([file for file in files if file != files[2]], path_manifest)
+    assert len(read_kwargs) == 1
+    assert headers[str(files[0])]['SeriesInstanceUID'] == ct_uid
+    assert headers[str(files[1])]['SeriesInstanceUID'] != ct_uid
+    with open(path_manifest, 'r') as f:
+        manifest = json.load(f)
+    assert str(files[2]) not in manifest
+    assert len(manifest) == 4
+    assert not path_manifest.with_suffix('.tmp').exists()